@@ -111,6 +111,73 @@ from .spacetimedb_async_client import SpacetimeDBAsyncClient
 # Client cache
 from .client_cache import ClientCache
 
+# Versioned row cache
+from .row_cache import (
+    RowCache,
+    TableVersion,
+    CacheSnapshot,
+    AppliedTransaction,
+    AppliedTableChange
+)
+
+# Compact row classes
+from .row_types import (
+    RowBase,
+    make_row_class,
+    row_class_from_product_type,
+    row_class_for_table,
+    decode_row,
+    decode_dict_row,
+    column_getter,
+    project_columns,
+    dict_projector
+)
+
+# Ordered callback execution
+from .callback_executor import CallbackExecutor
+
+# Incremental aggregate views
+from .aggregates import AggregateView
+
+# Local queries over the client cache
+from .local_query import col, Column, Predicate, LocalQuery, QueryEngine, QueryPlan, HashIndex, RangeIndex
+
+# Change cursors
+from .change_log import ChangeLog, ChangeEntry, TableChanges
+
+# Async change streams
+from .change_stream import ChangeStream
+
+# Per-key update debouncing
+from .update_coalescer import UpdateCoalescer
+
+# Columnar exports of cached tables
+from .columnar import ColumnarMirror
+
+# Shared-memory cache replicas for worker processes
+from .shared_cache import SharedCachePublisher, SharedCacheReplica, ReplicaHandle
+
+# Many clients on shared I/O and decode threads
+from .client_hub import ClientHub
+
+# Identity flyweights and per-column string interning
+from .interning import RowInterner, IdentityTable, default_identity_table
+
+# Cache memory accounting and budgets
+from .memory_accounting import CacheMemoryTracker, MemoryBudget, MemoryBudgetExceededError
+
+# Request-id correlation of reducer calls
+from .pending_calls import PendingCallRegistry, ReducerCallError
+
+# One-off query results
+from .one_off_queries import OneOffQueryResult, OneOffQueryError, OneOffQueryCache
+
+# Optimistic reducer effects
+from .optimistic import PredictedChange, PredictionOutcome
+
+# Coalescing of idempotent reducer calls
+from .reducer_coalescing import CoalescingMode, CoalescingPolicy
+
 # Local config functions (not a class)
 from . import local_config
 
@@ -476,6 +543,57 @@ __all__ = [
     "ClientCache",
     "local_config",
     
+    # Versioned row cache
+    "RowCache",
+    "TableVersion",
+    "CacheSnapshot",
+    "AppliedTransaction",
+    "AppliedTableChange",
+    "CallbackExecutor",
+    "RowBase",
+    "make_row_class",
+    "row_class_from_product_type",
+    "row_class_for_table",
+    "decode_row",
+    "decode_dict_row",
+    "column_getter",
+    "project_columns",
+    "dict_projector",
+    "AggregateView",
+    "col",
+    "Column",
+    "Predicate",
+    "LocalQuery",
+    "QueryEngine",
+    "QueryPlan",
+    "HashIndex",
+    "RangeIndex",
+    "ChangeLog",
+    "ChangeEntry",
+    "TableChanges",
+    "ChangeStream",
+    "UpdateCoalescer",
+    "ColumnarMirror",
+    "SharedCachePublisher",
+    "SharedCacheReplica",
+    "ReplicaHandle",
+    "ClientHub",
+    "RowInterner",
+    "IdentityTable",
+    "default_identity_table",
+    "CacheMemoryTracker",
+    "MemoryBudget",
+    "MemoryBudgetExceededError",
+    "PendingCallRegistry",
+    "ReducerCallError",
+    "OneOffQueryResult",
+    "OneOffQueryError",
+    "OneOffQueryCache",
+    "PredictedChange",
+    "PredictionOutcome",
+    "CoalescingMode",
+    "CoalescingPolicy",
+    
     # Energy management
     "EnergyError",
     "OutOfEnergyError",
@@ -0,0 +1,292 @@
+"""
+Incrementally maintained aggregates for SpacetimeDB Python SDK.
+
+Materialized aggregate views over cached tables:
+- Computed once from the row cache, then updated from each transaction's
+  inserted and deleted rows, so the cost per transaction is O(changed rows)
+  instead of O(table)
+- Grouping by one or more columns, or by a key function
+- count, sum, min and max per group
+- Callbacks fire when the aggregate values of a group change
+
+Example:
+    points = conn.db.scores.aggregate(group_by="team", count=True, sum="points", max="points")
+    points.on_change(lambda team, old, new: print(team, new))
+    points.get("red")   # {"count": 3, "sum_points": 42, "max_points": 20}
+"""
+
+import logging
+import threading
+import uuid
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple, Union
+
+from .row_cache import RowCache, AppliedTransaction
+from .row_types import column_getter
+
+logger = logging.getLogger(__name__)
+
+GroupBy = Union[None, str, Sequence[str], Callable[[Any], Hashable]]
+Columns = Union[None, str, Sequence[str]]
+AggregateCallback = Callable[[Hashable, Optional[Dict[str, Any]], Optional[Dict[str, Any]]], None]
+
+
+def _column_list(columns: Columns) -> Tuple[str, ...]:
+    if columns is None:
+        return ()
+    if isinstance(columns, str):
+        return (columns,)
+    return tuple(columns)
+
+
+def _group_key_getter(group_by: GroupBy) -> Callable[[Any], Hashable]:
+    if group_by is None:
+        return lambda row: None
+    if callable(group_by):
+        return group_by
+    if isinstance(group_by, str):
+        return column_getter(group_by)
+    getters = [column_getter(name) for name in group_by]
+    return lambda row: tuple(getter(row) for getter in getters)
+
+
+class _ValueBag:
+    """Multiset of one column's values in a group, with cached min and max."""
+
+    __slots__ = ('counts', 'min', 'max')
+
+    def __init__(self):
+        self.counts: Dict[Any, int] = {}
+        self.min: Any = None
+        self.max: Any = None
+
+    def add(self, value: Any) -> None:
+        self.counts[value] = self.counts.get(value, 0) + 1
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def remove(self, value: Any) -> None:
+        remaining = self.counts.get(value, 0) - 1
+        if remaining > 0:
+            self.counts[value] = remaining
+            return
+        self.counts.pop(value, None)
+        # Only losing the last copy of an extreme needs a rescan of distinct values
+        if value == self.min:
+            self.min = min(self.counts) if self.counts else None
+        if value == self.max:
+            self.max = max(self.counts) if self.counts else None
+
+
+class _GroupState:
+    """Running aggregates for one group."""
+
+    __slots__ = ('count', 'sums', 'bags')
+
+    def __init__(self, sum_columns: Tuple[str, ...], bag_columns: Tuple[str, ...]):
+        self.count = 0
+        self.sums: Dict[str, Any] = {column: 0 for column in sum_columns}
+        self.bags: Dict[str, _ValueBag] = {column: _ValueBag() for column in bag_columns}
+
+
+class AggregateView:
+    """
+    Incrementally maintained group-by aggregate over one cached table.
+
+    The view registers a listener on the RowCache and applies only the rows
+    each transaction inserted or deleted. NULL (None) values are ignored by
+    sum, min and max, as in SQL.
+    """
+
+    def __init__(self, cache: RowCache, table_name: str, group_by: GroupBy = None,
+                 count: bool = True, sum: Columns = None, min: Columns = None,
+                 max: Columns = None):
+        """
+        Build the view from the current cache contents.
+
+        Args:
+            cache: Row cache to follow
+            table_name: Table to aggregate
+            group_by: Column name, column names, or key function (None for one group)
+            count: Maintain a row count per group
+            sum: Column(s) to sum
+            min: Column(s) to track the minimum of
+            max: Column(s) to track the maximum of
+        """
+        self.table_name = table_name
+        self._cache = cache
+        self._group_key = _group_key_getter(group_by)
+        self._count = count
+        self._sum_columns = _column_list(sum)
+        self._min_columns = _column_list(min)
+        self._max_columns = _column_list(max)
+        self._bag_columns = tuple(dict.fromkeys(self._min_columns + self._max_columns))
+        self._getters = {
+            column: column_getter(column)
+            for column in self._sum_columns + self._bag_columns
+        }
+        if not (count or self._getters):
+            raise ValueError("aggregate() needs at least one of count, sum, min or max")
+
+        self._lock = threading.Lock()
+        self._groups: Dict[Hashable, _GroupState] = {}
+        self._callbacks: Dict[str, AggregateCallback] = {}
+        self._version = 0
+        self._closed = False
+
+        # Seed under the view lock so a concurrent transaction waits for it
+        with self._lock:
+            snapshot = cache.add_listener(self._on_transaction)
+            self._version = snapshot.version
+            for row in snapshot.table(table_name).values():
+                self._add_row(row)
+
+    @property
+    def version(self) -> int:
+        """Cache version the view reflects."""
+        return self._version
+
+    def get(self, group: Hashable = None) -> Optional[Dict[str, Any]]:
+        """
+        Get the aggregate values of a group.
+
+        Args:
+            group: Group key (a tuple when grouping by several columns;
+                None when not grouping)
+
+        Returns:
+            Dict with count, sum_<col>, min_<col> and max_<col> entries,
+            or None if the group has no rows
+        """
+        with self._lock:
+            state = self._groups.get(group)
+            return self._values(state) if state else None
+
+    def groups(self) -> Dict[Hashable, Dict[str, Any]]:
+        """Get the aggregate values of every group."""
+        with self._lock:
+            return {group: self._values(state) for group, state in self._groups.items()}
+
+    def __len__(self) -> int:
+        return len(self._groups)
+
+    def __contains__(self, group: Hashable) -> bool:
+        return group in self._groups
+
+    def on_change(self, callback: AggregateCallback) -> str:
+        """
+        Register a callback for aggregate changes.
+
+        Args:
+            callback: Called with (group, old_values, new_values); old_values
+                is None for a new group and new_values is None when the
+                group's last row was deleted
+
+        Returns:
+            Callback id for remove_on_change
+        """
+        callback_id = str(uuid.uuid4())
+        with self._lock:
+            self._callbacks[callback_id] = callback
+        return callback_id
+
+    def remove_on_change(self, callback_id: str) -> bool:
+        """Remove a change callback."""
+        with self._lock:
+            return self._callbacks.pop(callback_id, None) is not None
+
+    def close(self) -> None:
+        """Stop following the cache."""
+        self._closed = True
+        self._cache.remove_listener(self._on_transaction)
+
+    def __enter__(self) -> 'AggregateView':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def _on_transaction(self, applied: AppliedTransaction) -> None:
+        change = applied.tables.get(self.table_name)
+        if change is None or self._closed:
+            return
+
+        with self._lock:
+            self._version = applied.version
+            if not change.inserts and not change.deletes:
+                return
+            before: Dict[Hashable, Optional[Dict[str, Any]]] = {}
+            for row in change.deletes:
+                group = self._group_key(row)
+                if group not in before:
+                    state = self._groups.get(group)
+                    before[group] = self._values(state) if state else None
+                self._remove_row(group, row)
+            for row in change.inserts:
+                group = self._group_key(row)
+                if group not in before:
+                    state = self._groups.get(group)
+                    before[group] = self._values(state) if state else None
+                self._add_row(row, group)
+
+            changed: List[Tuple[Hashable, Any, Any]] = []
+            for group, old in before.items():
+                state = self._groups.get(group)
+                new = self._values(state) if state else None
+                if new != old:
+                    changed.append((group, old, new))
+            callbacks = list(self._callbacks.values())
+
+        for group, old, new in changed:
+            for callback in callbacks:
+                try:
+                    callback(group, old, new)
+                except Exception as e:
+                    logger.error(f"Error in aggregate callback for {self.table_name}: {e}")
+
+    def _add_row(self, row: Any, group: Hashable = None) -> None:
+        if group is None:
+            group = self._group_key(row)
+        state = self._groups.get(group)
+        if state is None:
+            state = _GroupState(self._sum_columns, self._bag_columns)
+            self._groups[group] = state
+        state.count += 1
+        for column in self._sum_columns:
+            value = self._getters[column](row)
+            if value is not None:
+                state.sums[column] += value
+        for column, bag in state.bags.items():
+            value = self._getters[column](row)
+            if value is not None:
+                bag.add(value)
+
+    def _remove_row(self, group: Hashable, row: Any) -> None:
+        state = self._groups.get(group)
+        if state is None:
+            return
+        state.count -= 1
+        if state.count <= 0:
+            del self._groups[group]
+            return
+        for column in self._sum_columns:
+            value = self._getters[column](row)
+            if value is not None:
+                state.sums[column] -= value
+        for column, bag in state.bags.items():
+            value = self._getters[column](row)
+            if value is not None:
+                bag.remove(value)
+
+    def _values(self, state: _GroupState) -> Dict[str, Any]:
+        values: Dict[str, Any] = {}
+        if self._count:
+            values['count'] = state.count
+        for column in self._sum_columns:
+            values[f'sum_{column}'] = state.sums[column]
+        for column in self._min_columns:
+            values[f'min_{column}'] = state.bags[column].min
+        for column in self._max_columns:
+            values[f'max_{column}'] = state.bags[column].max
+        return values
@@ -0,0 +1,221 @@
+"""
+Ordered callback executors for SpacetimeDB Python SDK.
+
+Runs table callbacks off the message processing thread:
+- Work is grouped by an ordering key (a table name, or a table and primary key)
+- Tasks with the same key run serially, in submission order
+- Different keys run in parallel on a shared thread pool
+- Queue depth and scheduling lag are tracked per key; a key's queue is
+  dropped once drained, its counters folded into executor-wide totals
+
+Example:
+    executor = client.enable_callback_executor(max_workers=4, ordering="table")
+    client.db.users.on_insert(slow_handler)   # no longer blocks other tables
+    print(executor.get_metrics())
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# How many tasks one key may run before yielding its worker to other keys
+DEFAULT_BATCH_SIZE = 64
+
+
+@dataclass
+class KeyQueueStats:
+    """Counters for one ordering key."""
+    submitted: int = 0
+    completed: int = 0
+    errors: int = 0
+    total_lag: float = 0.0
+    max_lag: float = 0.0
+
+    @property
+    def average_lag(self) -> float:
+        return self.total_lag / self.completed if self.completed else 0.0
+
+    def merge(self, other: 'KeyQueueStats') -> None:
+        """Add another key's counters to these."""
+        self.submitted += other.submitted
+        self.completed += other.completed
+        self.errors += other.errors
+        self.total_lag += other.total_lag
+        if other.max_lag > self.max_lag:
+            self.max_lag = other.max_lag
+
+
+class _KeyQueue:
+    """Pending tasks for one ordering key."""
+
+    __slots__ = ('tasks', 'scheduled', 'stats')
+
+    def __init__(self):
+        self.tasks: Deque[Tuple[float, Callable, tuple, dict]] = deque()
+        self.scheduled = False
+        self.stats = KeyQueueStats()
+
+
+class CallbackExecutor:
+    """
+    Thread-pool executor with per-key serial ordering.
+
+    Each key has its own FIFO queue. At most one worker drains a given key
+    at a time, so tasks for a key never run concurrently or out of order,
+    while tasks for different keys proceed in parallel.
+    """
+
+    def __init__(self, max_workers: int = 4, batch_size: int = DEFAULT_BATCH_SIZE,
+                 name: str = "spacetimedb-callbacks"):
+        """
+        Initialize the executor.
+
+        Args:
+            max_workers: Number of pool threads shared by all keys
+            batch_size: Tasks a key may run before yielding its worker
+            name: Thread name prefix
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        self._batch_size = max(1, batch_size)
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        # Only keys with queued or running tasks; drained keys are retired
+        self._queues: Dict[Hashable, _KeyQueue] = {}
+        # Counters of retired keys
+        self._retired = KeyQueueStats()
+        self._pending = 0
+        self._shutdown = False
+
+    def submit(self, key: Hashable, fn: Callable, *args, **kwargs) -> None:
+        """
+        Queue a task behind earlier tasks with the same key.
+
+        Args:
+            key: Ordering key
+            fn: Callable to run on a pool thread
+        """
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("CallbackExecutor has been shut down")
+            queue = self._queues.get(key)
+            if queue is None:
+                queue = _KeyQueue()
+                self._queues[key] = queue
+            queue.tasks.append((time.monotonic(), fn, args, kwargs))
+            queue.stats.submitted += 1
+            self._pending += 1
+            if queue.scheduled:
+                return
+            queue.scheduled = True
+        self._pool.submit(self._drain, key)
+
+    def _drain(self, key: Hashable) -> None:
+        """Run up to batch_size tasks for a key, then yield or reschedule."""
+        with self._lock:
+            queue = self._queues[key]
+
+        for _ in range(self._batch_size):
+            with self._lock:
+                enqueued_at, fn, args, kwargs = queue.tasks.popleft()
+
+            lag = time.monotonic() - enqueued_at
+            failed = False
+            try:
+                fn(*args, **kwargs)
+            except Exception as e:
+                failed = True
+                logger.error(f"Error in callback for key {key!r}: {e}")
+
+            with self._lock:
+                stats = queue.stats
+                stats.completed += 1
+                stats.total_lag += lag
+                if lag > stats.max_lag:
+                    stats.max_lag = lag
+                if failed:
+                    stats.errors += 1
+                self._pending -= 1
+                drained = not queue.tasks
+                if drained:
+                    # Retire before waking wait_idle() so idle keys are gone
+                    queue.scheduled = False
+                    del self._queues[key]
+                    self._retired.merge(stats)
+                if self._pending == 0:
+                    self._idle.notify_all()
+            if drained:
+                return
+
+        # Batch exhausted: go to the back of the pool queue so other keys get a turn
+        self._pool.submit(self._drain, key)
+
+    def queue_depth(self, key: Optional[Hashable] = None) -> int:
+        """Get the number of queued tasks for a key, or for all keys."""
+        with self._lock:
+            if key is None:
+                return self._pending
+            queue = self._queues.get(key)
+            return len(queue.tasks) if queue else 0
+
+    def lag(self, key: Hashable) -> float:
+        """Age in seconds of the oldest queued task for a key (0 if idle)."""
+        with self._lock:
+            queue = self._queues.get(key)
+            if not queue or not queue.tasks:
+                return 0.0
+            return time.monotonic() - queue.tasks[0][0]
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until every queued task has run.
+
+        Returns:
+            True if idle, False if the timeout expired first
+        """
+        with self._lock:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get queue depth and lag metrics per busy key and in total."""
+        now = time.monotonic()
+        with self._lock:
+            keys = {}
+            totals = KeyQueueStats()
+            totals.merge(self._retired)
+            for key, queue in self._queues.items():
+                stats = queue.stats
+                totals.merge(stats)
+                keys[str(key)] = {
+                    'queue_depth': len(queue.tasks),
+                    'current_lag': now - queue.tasks[0][0] if queue.tasks else 0.0,
+                    'submitted': stats.submitted,
+                    'completed': stats.completed,
+                    'errors': stats.errors,
+                    'average_lag': stats.average_lag,
+                    'max_lag': stats.max_lag,
+                }
+            return {
+                'pending': self._pending,
+                'submitted': totals.submitted,
+                'completed': totals.completed,
+                'errors': totals.errors,
+                'average_lag': totals.average_lag,
+                'max_lag': totals.max_lag,
+                'keys': keys,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting tasks and optionally wait for queued tasks to finish."""
+        with self._lock:
+            self._shutdown = True
+        if wait:
+            self.wait_idle()
+        self._pool.shutdown(wait=wait)
@@ -0,0 +1,168 @@
+"""
+Change cursors for SpacetimeDB Python SDK.
+
+Lets consumers pull row changes instead of registering callbacks:
+- Every applied transaction has a monotonically increasing cache version
+- A bounded in-memory log keeps the most recent changes of each table
+- changes_since(version) returns the inserts and deletes after a version
+- When the log no longer reaches back that far, the result says so and
+  carries a snapshot of the table to restart from
+
+Example:
+    cursor = 0
+    while True:
+        changes = conn.db.users.changes_since(cursor)
+        if changes.too_old:
+            export_all(changes.snapshot.values())
+        else:
+            export_delta(changes.inserts, changes.deletes)
+        cursor = changes.version
+        time.sleep(5)
+"""
+
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional
+
+from .row_cache import RowCache, TableVersion, AppliedTransaction
+
+logger = logging.getLogger(__name__)
+
+# Transactions kept per table before the oldest are trimmed
+DEFAULT_MAX_ENTRIES_PER_TABLE = 1024
+
+
+@dataclass
+class ChangeEntry:
+    """Rows one transaction inserted and deleted in a table."""
+    version: int
+    inserts: List[Any]
+    deletes: List[Any]
+
+
+@dataclass
+class TableChanges:
+    """
+    Result of a changes_since() call.
+
+    version is the cursor to pass to the next call. If too_old is set the
+    log was trimmed past the requested version: entries are empty and
+    snapshot holds the whole table at version instead.
+    """
+    table_name: str
+    since: int
+    version: int
+    entries: List[ChangeEntry] = field(default_factory=list)
+    too_old: bool = False
+    snapshot: Optional[TableVersion] = None
+
+    @property
+    def inserts(self) -> List[Any]:
+        """Inserted rows of all entries, in transaction order."""
+        return [row for entry in self.entries for row in entry.inserts]
+
+    @property
+    def deletes(self) -> List[Any]:
+        """Deleted rows of all entries, in transaction order."""
+        return [row for entry in self.entries for row in entry.deletes]
+
+    def __bool__(self) -> bool:
+        return self.too_old or bool(self.entries)
+
+
+class _TableLog:
+    __slots__ = ('entries', 'trimmed_through')
+
+    def __init__(self, maxlen: int, trimmed_through: int):
+        self.entries: Deque[ChangeEntry] = deque(maxlen=maxlen)
+        # Changes at or before this version are no longer available
+        self.trimmed_through = trimmed_through
+
+
+class ChangeLog:
+    """
+    Bounded per-table log of applied transactions.
+
+    Fed by a RowCache listener; readers take the log lock only long enough
+    to copy the entries they need.
+    """
+
+    def __init__(self, cache: RowCache, max_entries_per_table: int = DEFAULT_MAX_ENTRIES_PER_TABLE):
+        """
+        Start logging changes.
+
+        Args:
+            cache: Row cache to follow
+            max_entries_per_table: Transactions retained per table
+        """
+        if max_entries_per_table < 1:
+            raise ValueError("max_entries_per_table must be at least 1")
+        self._cache = cache
+        self._max_entries = max_entries_per_table
+        self._lock = threading.Lock()
+        self._tables: Dict[str, _TableLog] = {}
+        with self._lock:
+            snapshot = cache.add_listener(self._on_transaction)
+            # Nothing before the log started is available
+            self._start_version = snapshot.version
+            self._version = snapshot.version
+
+    @property
+    def version(self) -> int:
+        """Latest cache version recorded by the log."""
+        return self._version
+
+    def changes_since(self, table_name: str, version: int) -> TableChanges:
+        """
+        Get a table's changes after a version.
+
+        Args:
+            table_name: Table to read
+            version: Cursor from a previous call (0 to start)
+
+        Returns:
+            TableChanges with the entries newer than version, or with
+            too_old set and a snapshot if the log no longer covers version
+        """
+        with self._lock:
+            current = self._version
+            log = self._tables.get(table_name)
+            trimmed_through = log.trimmed_through if log else self._start_version
+            if version >= trimmed_through:
+                if log is None or version >= current:
+                    return TableChanges(table_name, version, max(version, current))
+                # Pollers usually ask for the tail, so walk back from the newest entry
+                entries: List[ChangeEntry] = []
+                for entry in reversed(log.entries):
+                    if entry.version <= version:
+                        break
+                    entries.append(entry)
+                entries.reverse()
+                return TableChanges(table_name, version, current, entries)
+
+        # Too old: hand back the table as of a published version to resync from
+        snapshot = self._cache.snapshot([table_name])
+        return TableChanges(
+            table_name, version, snapshot.version,
+            too_old=True, snapshot=snapshot.table(table_name)
+        )
+
+    def close(self) -> None:
+        """Stop logging."""
+        self._cache.remove_listener(self._on_transaction)
+
+    def _on_transaction(self, applied: AppliedTransaction) -> None:
+        with self._lock:
+            for table_name, change in applied.tables.items():
+                if not change.inserts and not change.deletes:
+                    continue
+                log = self._tables.get(table_name)
+                if log is None:
+                    log = _TableLog(self._max_entries, self._start_version)
+                    self._tables[table_name] = log
+                if len(log.entries) == self._max_entries:
+                    log.trimmed_through = log.entries[0].version
+                log.entries.append(ChangeEntry(applied.version, change.inserts, change.deletes))
+            self._version = applied.version
@@ -0,0 +1,276 @@
+"""
+Async change streams for SpacetimeDB Python SDK.
+
+Delivers a table's row changes to asyncio code:
+- async for change in conn.db.users.changes(): ...
+- One bounded queue per subscriber, filled once per applied transaction
+  and woken with a single call_soon_threadsafe, not one per row
+- Overflow policies: drop the oldest change (the default), coalesce
+  pending changes by primary key, or block the producer for a bounded time
+- A stream that is garbage-collected without close() detaches itself
+- Optional batch delivery of everything pending in one list
+
+Example:
+    async with conn.db.prices.changes(overflow="coalesce", batch=True) as stream:
+        async for batch in stream:
+            for change in batch:
+                print(change.op, change.new_value)
+"""
+
+import asyncio
+import logging
+import threading
+import time
+import weakref
+from collections import OrderedDict, deque
+from typing import Any, Dict, Hashable, List, Optional, Union
+
+from .row_cache import RowCache, AppliedTransaction
+from .table_interface import RowChange
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_BLOCK = "block"
+OVERFLOW_DROP_OLDEST = "drop_oldest"
+OVERFLOW_COALESCE = "coalesce"
+OVERFLOW_POLICIES = (OVERFLOW_BLOCK, OVERFLOW_DROP_OLDEST, OVERFLOW_COALESCE)
+
+# Default number of pending changes per subscriber
+DEFAULT_STREAM_SIZE = 1024
+
+# Seconds a "block" stream holds the applying thread before dropping the oldest change
+DEFAULT_BLOCK_TIMEOUT = 1.0
+
+
+def _coalesce(earlier: RowChange, later: RowChange) -> Optional[RowChange]:
+    """Merge two pending changes to the same key; None means they cancel out."""
+    if earlier.op == "insert":
+        if later.op == "delete":
+            return None
+        return RowChange(op="insert", table_name=later.table_name,
+                         new_value=later.new_value, primary_key=later.primary_key)
+    if later.op == "delete":
+        return RowChange(op="delete", table_name=later.table_name,
+                         old_value=earlier.old_value, primary_key=later.primary_key)
+    if earlier.op in ("update", "delete"):
+        return RowChange(op="update", table_name=later.table_name, old_value=earlier.old_value,
+                         new_value=later.new_value, primary_key=later.primary_key)
+    return later
+
+
+def _set_waiter(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+class ChangeStream:
+    """
+    Bounded async iterator over one table's row changes.
+
+    Changes are RowChange objects (op "insert", "update" or "delete").
+    A delete and an insert of the same primary key within one transaction
+    are delivered as a single update.
+    """
+
+    def __init__(self, cache: RowCache, table_name: str, maxsize: int = DEFAULT_STREAM_SIZE,
+                 overflow: str = OVERFLOW_DROP_OLDEST, batch: bool = False,
+                 max_batch: Optional[int] = None,
+                 loop: Optional[asyncio.AbstractEventLoop] = None,
+                 block_timeout: float = DEFAULT_BLOCK_TIMEOUT):
+        """
+        Start streaming changes.
+
+        Args:
+            cache: Row cache to follow
+            table_name: Table to stream
+            maxsize: Pending changes kept before the overflow policy applies
+            overflow: "drop_oldest", "coalesce" (one pending change per
+                primary key; the oldest key is dropped if distinct keys still
+                overflow), or "block" (the applying thread waits for the
+                consumer up to block_timeout, then drops the oldest change)
+            batch: Yield lists of all pending changes instead of single changes
+            max_batch: Largest batch to yield (default: maxsize)
+            loop: Event loop of the consumer (default: the running loop)
+            block_timeout: Longest wait of the applying thread per change
+                under "block"
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {OVERFLOW_POLICIES}, got {overflow!r}")
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        if block_timeout < 0:
+            raise ValueError("block_timeout must not be negative")
+        if loop is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                raise RuntimeError("changes() must be called with a running event loop or an explicit loop")
+
+        self.table_name = table_name
+        self._cache = cache
+        self._loop = loop
+        self._loop_thread: Optional[int] = threading.get_ident() if loop.is_running() else None
+        self._maxsize = maxsize
+        self._overflow = overflow
+        self._batch = batch
+        self._max_batch = max_batch or maxsize
+        self._block_timeout = block_timeout
+        self._cond = threading.Condition()
+        self._pending: Union[deque, 'OrderedDict[Hashable, RowChange]'] = (
+            OrderedDict() if overflow == OVERFLOW_COALESCE else deque()
+        )
+        self._waiter: Optional[asyncio.Future] = None
+        self._closed = False
+        self._stats: Dict[str, int] = {'received': 0, 'delivered': 0, 'dropped': 0, 'coalesced': 0}
+
+        # The cache holds the listener, not the stream, so an abandoned
+        # stream can be collected; the finalizer then detaches the listener
+        stream_ref = weakref.ref(self)
+
+        def listener(applied: AppliedTransaction) -> None:
+            stream = stream_ref()
+            if stream is not None:
+                stream._on_transaction(applied)
+
+        self._detach = weakref.finalize(self, cache.remove_listener, listener)
+        cache.add_listener(listener)
+
+    def __aiter__(self) -> 'ChangeStream':
+        return self
+
+    async def __anext__(self) -> Union[RowChange, List[RowChange]]:
+        while True:
+            with self._cond:
+                if self._pending:
+                    items = self._take(self._max_batch if self._batch else 1)
+                    self._cond.notify_all()
+                    return items if self._batch else items[0]
+                if self._closed:
+                    raise StopAsyncIteration
+                if self._loop_thread is None:
+                    self._loop_thread = threading.get_ident()
+                waiter = self._loop.create_future()
+                self._waiter = waiter
+            await waiter
+
+    async def __aenter__(self) -> 'ChangeStream':
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    async def aclose(self) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Stop receiving changes; pending changes can still be consumed."""
+        self._detach()
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            self._wake()
+
+    def qsize(self) -> int:
+        """Number of pending changes."""
+        with self._cond:
+            return len(self._pending)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Counts of received, delivered, dropped and coalesced changes."""
+        with self._cond:
+            stats = dict(self._stats)
+            stats['pending'] = len(self._pending)
+            return stats
+
+    def _take(self, count: int) -> List[RowChange]:
+        pending = self._pending
+        count = min(count, len(pending))
+        if isinstance(pending, OrderedDict):
+            items = [pending.popitem(last=False)[1] for _ in range(count)]
+        else:
+            items = [pending.popleft() for _ in range(count)]
+        self._stats['delivered'] += count
+        return items
+
+    def _wake(self) -> None:
+        """Wake a waiting consumer (caller holds the condition)."""
+        waiter = self._waiter
+        if waiter is None:
+            return
+        self._waiter = None
+        try:
+            self._loop.call_soon_threadsafe(_set_waiter, waiter)
+        except RuntimeError:
+            pass  # Loop closed; nobody is waiting any more
+
+    def _on_transaction(self, applied: AppliedTransaction) -> None:
+        change = applied.tables.get(self.table_name)
+        if change is None or (not change.inserts and not change.deletes):
+            return
+        changes = self._row_changes(change)
+        with self._cond:
+            if self._closed:
+                return
+            for row_change in changes:
+                self._stats['received'] += 1
+                self._enqueue(row_change)
+            self._wake()
+
+    def _row_changes(self, change: Any) -> List[RowChange]:
+        row_key = self._cache.row_key
+        table_name = self.table_name
+        deleted = {row_key(table_name, row): row for row in change.deletes}
+        changes = []
+        for row in change.inserts:
+            key = row_key(table_name, row)
+            old = deleted.pop(key, None)
+            if old is None:
+                changes.append(RowChange(op="insert", table_name=table_name, new_value=row, primary_key=key))
+            else:
+                changes.append(RowChange(op="update", table_name=table_name, old_value=old,
+                                         new_value=row, primary_key=key))
+        for key, row in deleted.items():
+            changes.append(RowChange(op="delete", table_name=table_name, old_value=row, primary_key=key))
+        return changes
+
+    def _enqueue(self, row_change: RowChange) -> None:
+        """Add one change under the overflow policy (caller holds the condition)."""
+        pending = self._pending
+        if self._overflow == OVERFLOW_COALESCE:
+            key = row_change.primary_key
+            earlier = pending.get(key)
+            if earlier is not None:
+                self._stats['coalesced'] += 1
+                merged = _coalesce(earlier, row_change)
+                if merged is None:
+                    del pending[key]
+                else:
+                    pending[key] = merged
+                return
+            if len(pending) >= self._maxsize:
+                pending.popitem(last=False)
+                self._stats['dropped'] += 1
+            pending[key] = row_change
+            return
+
+        if len(pending) >= self._maxsize and self._overflow == OVERFLOW_BLOCK:
+            if threading.get_ident() == self._loop_thread:
+                # Applying on the consumer's own loop thread cannot block; let it grow
+                pending.append(row_change)
+                return
+            # Backpressure: hold the applying thread until the consumer catches
+            # up, but never longer than block_timeout
+            self._wake()
+            deadline = time.monotonic() + self._block_timeout
+            while len(pending) >= self._maxsize and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            if self._closed:
+                return
+        if len(pending) >= self._maxsize:
+            # drop_oldest, or a block that timed out
+            pending.popleft()
+            self._stats['dropped'] += 1
+        pending.append(row_change)
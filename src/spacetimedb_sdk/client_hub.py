@@ -0,0 +1,284 @@
+"""
+Multiplexed client hosting for SpacetimeDB Python SDK.
+
+Runs many database connections on a fixed number of threads:
+- One I/O thread runs an asyncio selector loop that reads every hosted
+  WebSocket (through websocket-client's dispatcher interface), runs
+  timers, and hosts each client's async event handlers
+- A small pool of decode workers decompresses, decodes and applies
+  messages; each client is pinned to one worker, so its messages stay
+  in order while different clients proceed in parallel
+- Hosted clients are ordinary ModernSpacetimeDBClient objects with the
+  full per-client API
+
+A standalone client uses a WebSocket thread, a message processing thread
+and an event loop thread; a hub uses 1 + decode_workers threads in total.
+
+Example:
+    with ClientHub(decode_workers=2) as hub:
+        clients = [hub.create_client() for _ in range(50)]
+        for client, db in zip(clients, databases):
+            client.connect(None, "localhost:3000", db, ssl_enabled=False)
+"""
+
+import asyncio
+import logging
+import queue
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+from .modern_client import ModernSpacetimeDBClient
+
+logger = logging.getLogger(__name__)
+
+# Default number of decode workers
+DEFAULT_DECODE_WORKERS = 2
+
+
+class _DecodeWorker:
+    """Thread running the messages of the clients pinned to it, in order."""
+
+    def __init__(self, name: str):
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self.processed = 0
+        self.clients = 0
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, task: Callable[[], None]) -> None:
+        self._queue.put(task)
+
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def stop(self, timeout: float) -> None:
+        self._queue.put(None)
+        if self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            task = self._queue.get()
+            if task is None:
+                return
+            try:
+                task()
+            except Exception as e:
+                logger.error(f"Error in hub decode worker task: {e}", exc_info=True)
+            self.processed += 1
+
+
+class _LoopDispatcher:
+    """
+    websocket-client dispatcher that reads hub sockets on the hub's loop.
+
+    Implements the interface WebSocketApp.run_forever(dispatcher=...)
+    expects: read, buffwrite, timeout, signal and abort.
+    """
+
+    def __init__(self, hub: 'ClientHub'):
+        self._hub = hub
+
+    def read(self, sock: Any, callback: Callable[[], bool]) -> None:
+        self._hub._call_soon(self._hub._add_reader, sock, callback)
+
+    def buffwrite(self, sock: Any, data: bytes, send: Callable[[Any, bytes], int],
+                  disconnect: Callable[[Exception], Any]) -> None:
+        # Sends are written directly from the calling thread
+        try:
+            send(sock, data)
+        except Exception as e:
+            disconnect(e)
+
+    def timeout(self, seconds: Optional[float], callback: Callable, *args: Any) -> None:
+        self._hub._call_soon(self._hub._loop.call_later, seconds or 0, self._hub._guarded, callback, *args)
+
+    def release(self, sock: Any) -> None:
+        """Stop reading a socket that is about to be closed."""
+        fd = sock.fileno()
+        if fd >= 0:
+            self._hub._call_soon(self._hub._remove_reader, fd)
+
+    def signal(self, sig: int, handler: Callable) -> None:
+        pass  # The hub never installs process signal handlers
+
+    def abort(self) -> None:
+        pass
+
+
+class ClientHub:
+    """
+    Hosts many ModernSpacetimeDBClient instances on shared threads.
+
+    Create clients with create_client(); they are shut down with the hub.
+    """
+
+    def __init__(self, decode_workers: int = DEFAULT_DECODE_WORKERS, name: str = "spacetimedb-hub"):
+        """
+        Start the I/O loop and the decode workers.
+
+        Args:
+            decode_workers: Threads decoding and applying messages
+            name: Prefix for thread names
+        """
+        if decode_workers < 1:
+            raise ValueError("decode_workers must be at least 1")
+        self.name = name
+        self._lock = threading.Lock()
+        self._clients: Dict[int, ModernSpacetimeDBClient] = {}
+        self._assignments: Dict[int, _DecodeWorker] = {}
+        self._readers: Dict[int, Any] = {}
+        self._closed = False
+
+        # A selector loop explicitly: add_reader is not available on the Proactor loop
+        self._loop = asyncio.SelectorEventLoop()
+        ready = threading.Event()
+        self._io_thread = threading.Thread(target=self._run_loop, args=(ready,),
+                                           name=f"{name}-io", daemon=True)
+        self._io_thread.start()
+        ready.wait()
+        self._workers = [_DecodeWorker(f"{name}-decode-{i}") for i in range(decode_workers)]
+        self.dispatcher = _LoopDispatcher(self)
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """The hub's event loop (runs hosted clients' async event handlers)."""
+        return self._loop
+
+    def create_client(self, **kwargs: Any) -> ModernSpacetimeDBClient:
+        """
+        Create a client hosted on this hub.
+
+        Args:
+            **kwargs: ModernSpacetimeDBClient arguments
+
+        Returns:
+            The client; use it exactly like a standalone client
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("ClientHub is closed")
+        return ModernSpacetimeDBClient(hub=self, **kwargs)
+
+    def attach(self, client: ModernSpacetimeDBClient) -> Callable[[Callable[[], None]], None]:
+        """
+        Pin a client to the least loaded decode worker.
+
+        Called by ModernSpacetimeDBClient(hub=...).
+
+        Returns:
+            Function that runs a task on the client's worker, in order
+        """
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("ClientHub is closed")
+            worker = min(self._workers, key=lambda w: w.clients)
+            worker.clients += 1
+            self._clients[id(client)] = client
+            self._assignments[id(client)] = worker
+        return worker.submit
+
+    def detach(self, client: ModernSpacetimeDBClient) -> None:
+        """Forget a client (called from its shutdown)."""
+        with self._lock:
+            self._clients.pop(id(client), None)
+            worker = self._assignments.pop(id(client), None)
+            if worker is not None:
+                worker.clients -= 1
+
+    def on_worker_thread(self, client: ModernSpacetimeDBClient) -> bool:
+        """Whether the calling thread is the decode worker a client is pinned to."""
+        worker = self._assignments.get(id(client))
+        return worker is not None and worker._thread is threading.current_thread()
+
+    def clients(self) -> List[ModernSpacetimeDBClient]:
+        """Clients currently hosted on the hub."""
+        with self._lock:
+            return list(self._clients.values())
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Client, socket and thread counts, and per-worker queue depths."""
+        with self._lock:
+            return {
+                'clients': len(self._clients),
+                'sockets': len(self._readers),
+                'threads': 1 + len(self._workers),
+                'workers': [
+                    {'clients': w.clients, 'pending': w.pending(), 'processed': w.processed}
+                    for w in self._workers
+                ],
+            }
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Shut down every hosted client, then the loop and the workers."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            clients = list(self._clients.values())
+        for client in clients:
+            try:
+                client.shutdown()
+            except Exception as e:
+                logger.error(f"Error shutting down hosted client: {e}")
+        for worker in self._workers:
+            worker.stop(timeout)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._io_thread.join(timeout)
+        if not self._io_thread.is_alive():
+            self._loop.close()
+
+    def __enter__(self) -> 'ClientHub':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def _run_loop(self, ready: threading.Event) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._loop.call_soon(ready.set)
+        self._loop.run_forever()
+
+    def _call_soon(self, callback: Callable, *args: Any) -> None:
+        if threading.current_thread() is self._io_thread:
+            callback(*args)
+            return
+        try:
+            self._loop.call_soon_threadsafe(callback, *args)
+        except RuntimeError:
+            logger.debug("ClientHub loop is closed; dropping I/O callback")
+
+    @staticmethod
+    def _guarded(callback: Callable, *args: Any) -> None:
+        try:
+            callback(*args)
+        except Exception as e:
+            logger.error(f"Error in hub timer callback: {e}", exc_info=True)
+
+    def _add_reader(self, sock: Any, callback: Callable[[], bool]) -> None:
+        fd = sock.fileno()
+        if fd < 0:
+            return
+        # A stale registration of a reused descriptor would never fire again
+        self._loop.remove_reader(fd)
+        self._loop.add_reader(fd, self._on_readable, fd, sock, callback)
+        with self._lock:
+            self._readers[fd] = sock
+
+    def _remove_reader(self, fd: int) -> None:
+        self._loop.remove_reader(fd)
+        with self._lock:
+            self._readers.pop(fd, None)
+
+    def _on_readable(self, fd: int, sock: Any, callback: Callable[[], bool]) -> None:
+        try:
+            keep = callback()
+            # TLS may hold decrypted records the selector cannot see
+            pending = getattr(sock, 'pending', None)
+            while keep and pending is not None and sock.fileno() >= 0 and pending():
+                keep = callback()
+        except Exception as e:
+            logger.error(f"Error reading hosted socket: {e}")
+            keep = False
+        if not keep or sock.fileno() < 0:
+            self._remove_reader(fd)
@@ -0,0 +1,255 @@
+"""
+Columnar export of cached tables for SpacetimeDB Python SDK.
+
+Keeps a column-oriented mirror of a cached table for analytics:
+- One array.array per numeric column (typed from the table schema, or
+  inferred from the data), a list for everything else
+- Maintained from each applied transaction: inserts append, deletes
+  swap the last row into the freed slot, so a refresh costs O(changed rows)
+- Export as array.array, NumPy arrays or a pyarrow Table; NumPy and
+  pyarrow are optional and only needed for those formats
+
+Example:
+    columns = conn.db.trades.to_columns(["price", "size"], format="numpy")
+    vwap = (columns["price"] * columns["size"]).sum() / columns["size"].sum()
+"""
+
+import importlib
+import logging
+import threading
+from array import array
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Union
+
+from .algebraic_type import ProductType, IntType, FloatType
+from .row_cache import RowCache, AppliedTransaction
+from .row_types import column_getter
+
+logger = logging.getLogger(__name__)
+
+COLUMN_FORMATS = ("array", "list", "numpy", "arrow")
+
+
+def _int_typecode(bits: int, signed: bool) -> str:
+    """The array typecode of a C integer of exactly bits bits on this platform."""
+    return next(code for code in ('bhiql' if signed else 'BHIQL') if array(code).itemsize * 8 == bits)
+
+
+# C 'long' is 8 bytes on most 64-bit platforms, so sizes are checked, not assumed
+_INT_TYPECODES = {(bits, signed): _int_typecode(bits, signed)
+                  for bits in (8, 16, 32, 64) for signed in (True, False)}
+
+Column = Union[array, List[Any]]
+
+
+def _optional_module(name: str, format: str) -> Any:
+    """Import NumPy or pyarrow on first use so the SDK does not pay for them at import."""
+    try:
+        return importlib.import_module(name)
+    except ImportError:
+        raise ImportError(f"{name} is required for format={format!r}") from None
+
+
+def schema_typecodes(product_type: Optional[ProductType]) -> Dict[str, Optional[str]]:
+    """Map each field of a schema to an array typecode (None for non-numeric fields)."""
+    if product_type is None:
+        return {}
+    typecodes: Dict[str, Optional[str]] = {}
+    for field in product_type.fields:
+        field_type = field.type
+        if isinstance(field_type, IntType):
+            typecodes[field.name] = _INT_TYPECODES.get((field_type.bits, field_type.signed))
+        elif isinstance(field_type, FloatType):
+            typecodes[field.name] = 'f' if field_type.bits == 32 else 'd'
+        else:
+            typecodes[field.name] = None
+    return typecodes
+
+
+def _infer_typecode(values: Sequence[Any]) -> Optional[str]:
+    """Pick a typecode for a column without schema information."""
+    if not values:
+        return None
+    if all(type(value) is int for value in values):
+        return 'q'
+    if all(type(value) in (int, float) for value in values):
+        return 'd'
+    return None
+
+
+class ColumnarMirror:
+    """
+    Column-oriented copy of one cached table, kept current incrementally.
+
+    Row order is unspecified (deletes move the last row into the freed
+    slot) but is the same across all columns.
+    """
+
+    def __init__(self, cache: RowCache, table_name: str, columns: Sequence[str],
+                 typecodes: Optional[Dict[str, Optional[str]]] = None):
+        """
+        Build the mirror from the current cache contents.
+
+        Args:
+            cache: Row cache to follow
+            table_name: Table to mirror
+            columns: Columns to keep
+            typecodes: array typecode per column; columns without one are
+                inferred from the initial rows
+        """
+        self.table_name = table_name
+        self.columns = tuple(columns)
+        self._cache = cache
+        self._getters = [column_getter(column) for column in self.columns]
+        self._lock = threading.Lock()
+        self._positions: Dict[Hashable, int] = {}
+        self._keys: List[Hashable] = []
+        self._data: List[Column] = []
+        # Columns without a schema typecode on an empty table: typed from the first rows
+        self._undecided: List[int] = []
+        self._version = 0
+
+        with self._lock:
+            snapshot = cache.add_listener(self._on_transaction)
+            table = snapshot.table(table_name)
+            rows = list(table.items())
+            typecodes = typecodes or {}
+            for column, getter in zip(self.columns, self._getters):
+                values = [getter(row) for _, row in rows]
+                typecode = typecodes.get(column) or _infer_typecode(values)
+                if typecode is None and not values:
+                    self._undecided.append(len(self._data))
+                self._data.append(self._make_column(typecode, values))
+            for position, (key, _) in enumerate(rows):
+                self._positions[key] = position
+                self._keys.append(key)
+            self._version = snapshot.version
+
+    @property
+    def version(self) -> int:
+        """Cache version the mirror reflects."""
+        return self._version
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def export(self, columns: Optional[Sequence[str]] = None, format: str = "array",
+               copy: bool = True) -> Any:
+        """
+        Export columns.
+
+        Args:
+            columns: Columns to export (default: all mirrored columns)
+            format: "array" (array.array for numeric columns, lists otherwise),
+                "list", "numpy" (dict of ndarrays) or "arrow" (pyarrow.Table)
+            copy: With copy=False, "array" returns the live mirror columns,
+                which change with the next transaction (NumPy and Arrow
+                exports always copy so the mirror stays appendable)
+
+        Returns:
+            Dict of column name to column, or a pyarrow.Table
+        """
+        if format not in COLUMN_FORMATS:
+            raise ValueError(f"format must be one of {COLUMN_FORMATS}, got {format!r}")
+        numpy = _optional_module("numpy", format) if format == "numpy" else None
+        pyarrow = _optional_module("pyarrow", format) if format == "arrow" else None
+
+        names = self.columns if columns is None else tuple(columns)
+        with self._lock:
+            indexes = []
+            for name in names:
+                if name not in self.columns:
+                    raise KeyError(f"Column {name!r} is not mirrored for table {self.table_name}")
+                indexes.append(self.columns.index(name))
+            if format == "list":
+                return {name: list(self._data[i]) for name, i in zip(names, indexes)}
+            if format == "array":
+                return {name: self._copy(self._data[i]) if copy else self._data[i]
+                        for name, i in zip(names, indexes)}
+            if format == "numpy":
+                return {name: self._to_numpy(numpy, self._data[i]) for name, i in zip(names, indexes)}
+            return pyarrow.table({name: self._to_arrow(pyarrow, self._data[i]) for name, i in zip(names, indexes)})
+
+    def close(self) -> None:
+        """Stop following the cache."""
+        self._cache.remove_listener(self._on_transaction)
+
+    @staticmethod
+    def _make_column(typecode: Optional[str], values: List[Any]) -> Column:
+        if typecode is not None:
+            try:
+                return array(typecode, values)
+            except (TypeError, OverflowError):
+                pass  # NULLs or out-of-range values: keep a plain list
+        return list(values)
+
+    @staticmethod
+    def _copy(column: Column) -> Column:
+        return array(column.typecode, column) if isinstance(column, array) else list(column)
+
+    @staticmethod
+    def _to_numpy(numpy: Any, column: Column) -> Any:
+        if isinstance(column, array):
+            # Always a copy: a view would pin the array's buffer and make
+            # the next append raise BufferError
+            return numpy.array(column, dtype=column.typecode)
+        return numpy.array(column, dtype=object)
+
+    @staticmethod
+    def _to_arrow(pyarrow: Any, column: Column) -> Any:
+        if not isinstance(column, array):
+            return pyarrow.array(column)
+        if column.typecode == 'f':
+            arrow_type = pyarrow.float32()
+        elif column.typecode == 'd':
+            arrow_type = pyarrow.float64()
+        else:
+            bits = column.itemsize * 8
+            signed = column.typecode.islower()
+            arrow_type = getattr(pyarrow, f"int{bits}" if signed else f"uint{bits}")()
+        return pyarrow.Array.from_buffers(arrow_type, len(column), [None, pyarrow.py_buffer(column.tobytes())])
+
+    def _append(self, key: Hashable, row: Any) -> None:
+        self._positions[key] = len(self._keys)
+        self._keys.append(key)
+        for i, getter in enumerate(self._getters):
+            value = getter(row)
+            column = self._data[i]
+            try:
+                column.append(value)
+            except (TypeError, OverflowError):
+                # The value does not fit the typed column; fall back to a list
+                column = self._data[i] = list(column)
+                column.append(value)
+
+    def _remove(self, key: Hashable) -> None:
+        position = self._positions.pop(key, None)
+        if position is None:
+            return
+        last = len(self._keys) - 1
+        if position != last:
+            moved = self._keys[last]
+            self._keys[position] = moved
+            self._positions[moved] = position
+            for column in self._data:
+                column[position] = column[last]
+        self._keys.pop()
+        for column in self._data:
+            column.pop()
+
+    def _on_transaction(self, applied: AppliedTransaction) -> None:
+        change = applied.tables.get(self.table_name)
+        with self._lock:
+            if change is not None:
+                row_key = self._cache.row_key
+                for row in change.deletes:
+                    self._remove(row_key(self.table_name, row))
+                for row in change.inserts:
+                    key = row_key(self.table_name, row)
+                    if key in self._positions:
+                        self._remove(key)
+                    self._append(key, row)
+                if self._undecided and self._keys:
+                    for i in self._undecided:
+                        self._data[i] = self._make_column(_infer_typecode(self._data[i]), self._data[i])
+                    self._undecided = []
+            self._version = applied.version
@@ -8,6 +8,7 @@ Implements connection pooling with:
 - Health monitoring and recovery
 - Circuit breaker patterns
 - Advanced retry policies
+- Hedged one-off queries against slow connections
 """
 
 import threading
@@ -20,9 +21,10 @@ from enum import Enum
 from collections import deque
 import uuid
 import asyncio
-from concurrent.futures import ThreadPoolExecutor, Future
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
 
 from .modern_client import ModernSpacetimeDBClient
+from .one_off_queries import OneOffQueryError, OneOffQueryResult
 from .websocket_client import ConnectionState as WebSocketConnectionState
 from .connection_id import (
     EnhancedConnectionId,
@@ -42,6 +44,12 @@ from .shared_types import (
 
 # No TYPE_CHECKING imports needed - SpacetimeDBConnectionBuilder is not used
 
+# Hedged queries: latency samples needed before their p95 is used as the
+# hedge delay, the delay used until then, and query latencies kept
+HEDGE_MIN_SAMPLES = 20
+DEFAULT_HEDGE_DELAY = 0.1
+HEDGE_LATENCY_WINDOW = 1000
+
 
 class PooledConnection:
     """A single connection in the pool with health tracking."""
@@ -237,6 +245,10 @@ class ConnectionPool:
         self.total_operations = 0
         self.failed_operations = 0
         self.total_retries = 0
+        self.hedged_queries = 0
+        self.hedges_sent = 0
+        self.hedge_wins = 0
+        self._query_latencies: deque = deque(maxlen=HEDGE_LATENCY_WINDOW)
         
         # Executor for async operations
         self._executor = ThreadPoolExecutor(max_workers=max_connections)
@@ -489,6 +501,159 @@ class ConnectionPool:
             operation_name
         )
     
+    def query_hedged(
+        self,
+        sql: str,
+        timeout: Optional[float] = 30.0,
+        hedge_after: Optional[float] = None
+    ) -> OneOffQueryResult:
+        """
+        Run a one-off query, hedging against a slow connection.
+        
+        The query is sent on one connection. If no answer arrives within
+        hedge_after seconds, or that connection fails, a copy is sent on
+        another idle connection. The first answer wins; the other copy is
+        cancelled locally (the server cannot abort a one-off query, so its
+        late answer is dropped).
+        
+        Args:
+            sql: SQL query string
+            timeout: Seconds each copy may take (None: wait indefinitely)
+            hedge_after: Seconds before hedging (default: get_hedge_delay())
+            
+        Returns:
+            The first result received
+            
+        Raises:
+            RuntimeError: If no connection is available
+            OneOffQueryError: If the server rejects the query
+            asyncio.TimeoutError: If every copy times out
+        """
+        delay = self.get_hedge_delay() if hedge_after is None else hedge_after
+        pending: Dict[Future, Tuple[PooledConnection, float]] = {}
+        acquired: List[PooledConnection] = []
+        last_error: Optional[BaseException] = None
+        with self._lock:
+            self.hedged_queries += 1
+        
+        try:
+            connection = self.get_connection()
+            if not connection:
+                raise RuntimeError("No available connections")
+            acquired.append(connection)
+            self._send_query_copy(connection, sql, timeout, pending)
+            # The query's latency runs from here, whichever copy answers
+            started_at = time.time()
+            
+            done, _ = wait(pending, timeout=delay)
+            primary_failed = any(
+                future.exception() is not None
+                and not isinstance(future.exception(), OneOffQueryError)
+                for future in done
+            )
+            if not done or primary_failed:
+                hedge = self._acquire_idle_connection()
+                if hedge:
+                    acquired.append(hedge)
+                    try:
+                        self._send_query_copy(hedge, sql, timeout, pending)
+                        with self._lock:
+                            self.hedges_sent += 1
+                    except Exception as e:
+                        self.logger.warning(f"Hedged query copy not sent: {e}")
+            
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    connection, sent_at = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except OneOffQueryError:
+                        # The query itself is at fault; a copy would fail the same way
+                        with self._lock:
+                            self.failed_operations += 1
+                        raise
+                    except Exception as e:
+                        last_error = e
+                        self._record_query_failure(connection)
+                        continue
+                    
+                    now = time.time()
+                    connection.health.record_success((now - sent_at) * 1000)
+                    connection.circuit_breaker.record_success()
+                    with self._lock:
+                        self._query_latencies.append((now - started_at) * 1000)
+                        if connection is not acquired[0]:
+                            self.hedge_wins += 1
+                        self.total_operations += 1
+                    return result
+            
+            with self._lock:
+                self.failed_operations += 1
+            raise last_error or RuntimeError("Hedged query failed on every connection")
+        finally:
+            for future in pending:
+                future.cancel()
+            for connection in acquired:
+                self.release_connection(connection)
+    
+    async def query_hedged_async(
+        self,
+        sql: str,
+        timeout: Optional[float] = 30.0,
+        hedge_after: Optional[float] = None
+    ) -> OneOffQueryResult:
+        """Async version of query_hedged."""
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(
+            self._executor,
+            self.query_hedged,
+            sql,
+            timeout,
+            hedge_after
+        )
+    
+    def get_hedge_delay(self) -> float:
+        """Seconds query_hedged waits before hedging: the p95 of recent query latencies."""
+        with self._lock:
+            samples = sorted(self._query_latencies)
+        if len(samples) < HEDGE_MIN_SAMPLES:
+            return DEFAULT_HEDGE_DELAY
+        return samples[int(len(samples) * 0.95)] / 1000
+    
+    def _send_query_copy(
+        self,
+        connection: PooledConnection,
+        sql: str,
+        timeout: Optional[float],
+        pending: Dict[Future, Tuple[PooledConnection, float]]
+    ) -> None:
+        """Send one copy of a hedged query, recording a failure to send."""
+        try:
+            future = connection.client.send_one_off_query(sql, timeout)
+        except Exception:
+            self._record_query_failure(connection)
+            raise
+        pending[future] = (connection, time.time())
+    
+    def _record_query_failure(self, connection: PooledConnection) -> None:
+        """Count a failed query copy against its connection."""
+        connection.health.record_failure()
+        connection.circuit_breaker.record_failure()
+        if connection.health.consecutive_failures > 3:
+            connection.mark_unhealthy()
+    
+    def _acquire_idle_connection(self) -> Optional[PooledConnection]:
+        """Acquire an idle connection without opening a new one."""
+        with self._lock:
+            if self._shutdown:
+                return None
+            for _ in range(len(self.connections)):
+                conn = self._select_connection()
+                if conn and conn.acquire():
+                    return conn
+            return None
+    
     def get_pool_metrics(self) -> Dict[str, Any]:
         """Get comprehensive pool metrics."""
         with self._lock:
@@ -540,6 +705,12 @@ class ConnectionPool:
                     "p95_ms": p95_latency,
                     "p99_ms": p99_latency
                 },
+                "hedging": {
+                    "hedged_queries": self.hedged_queries,
+                    "hedges_sent": self.hedges_sent,
+                    "hedge_wins": self.hedge_wins,
+                    "hedge_delay_ms": self.get_hedge_delay() * 1000
+                },
                 "connection_details": [
                     {
                         "id": conn.connection_id[:8],
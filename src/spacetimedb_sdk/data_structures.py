@@ -683,23 +683,38 @@ class ConcurrentSet(Generic[T]):
 
 
 class LRUCache(Generic[K, V]):
-    """Least Recently Used cache implementation for SpacetimeDB objects."""
+    """
+    Least Recently Used cache implementation for SpacetimeDB objects.
+    
+    With a ttl, entries also expire that many seconds after they were set;
+    expired entries read as missing and are dropped when encountered.
+    """
     
-    def __init__(self, max_size: int = 1000):
-        """Initialize the LRU cache with the specified maximum size."""
+    def __init__(self, max_size: int = 1000, ttl: Optional[float] = None):
+        """Initialize the LRU cache with the specified maximum size and optional TTL in seconds."""
         self._max_size = max_size
+        self._ttl = ttl
         self._data: OrderedDict[K, V] = OrderedDict()
+        self._expires: Dict[K, float] = {}
         self._lock = threading.RLock()
         self._metrics = CollectionMetrics()
         self._hit_count = 0
         self._miss_count = 0
     
+    def _expired(self, key: K) -> bool:
+        """Drop a key if its TTL has passed (caller holds the lock)."""
+        if self._ttl is None or self._expires[key] > time.monotonic():
+            return False
+        del self._data[key]
+        del self._expires[key]
+        return True
+    
     def get(self, key: K, default: Optional[V] = None) -> Optional[V]:
         """Get a value by key, moving it to the end (most recently used)."""
         start_time = time.perf_counter()
         
         with self._lock:
-            if key in self._data:
+            if key in self._data and not self._expired(key):
                 # Move to end (most recently used)
                 value = self._data.pop(key)
                 self._data[key] = value
@@ -723,9 +738,12 @@ class LRUCache(Generic[K, V]):
                 self._data.pop(key)
             elif len(self._data) >= self._max_size:
                 # Evict least recently used
-                self._data.popitem(last=False)
+                evicted, _ = self._data.popitem(last=False)
+                self._expires.pop(evicted, None)
             
             self._data[key] = value
+            if self._ttl is not None:
+                self._expires[key] = time.monotonic() + self._ttl
         
         operation_time = time.perf_counter() - start_time
         self._metrics.update(operation_time)
@@ -737,6 +755,7 @@ class LRUCache(Generic[K, V]):
         with self._lock:
             if key in self._data:
                 del self._data[key]
+                self._expires.pop(key, None)
                 operation_time = time.perf_counter() - start_time
                 self._metrics.update(operation_time)
                 return True
@@ -745,10 +764,31 @@ class LRUCache(Generic[K, V]):
         self._metrics.update(operation_time)
         return False
     
+    def pop(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        """Remove a key and return its value (default if missing or expired)."""
+        with self._lock:
+            if key not in self._data or self._expired(key):
+                return default
+            self._expires.pop(key, None)
+            return self._data.pop(key)
+    
+    def purge_expired(self) -> int:
+        """Drop every expired entry. Returns the number dropped."""
+        if self._ttl is None:
+            return 0
+        with self._lock:
+            now = time.monotonic()
+            expired = [key for key, expires in self._expires.items() if expires <= now]
+            for key in expired:
+                del self._data[key]
+                del self._expires[key]
+            return len(expired)
+    
     def clear(self) -> None:
         """Clear all entries from the cache."""
         with self._lock:
             self._data.clear()
+            self._expires.clear()
             self._hit_count = 0
             self._miss_count = 0
     
@@ -783,7 +823,7 @@ class LRUCache(Generic[K, V]):
     def __contains__(self, key: K) -> bool:
         """Check if the cache contains the specified key."""
         with self._lock:
-            return key in self._data
+            return key in self._data and not self._expired(key)
     
     def __getitem__(self, key: K) -> V:
         """Get a value by key, raising KeyError if not found."""
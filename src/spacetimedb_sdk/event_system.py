@@ -343,7 +343,8 @@ class EventEmitter:
         self,
         name: str = "default",
         max_history_size: int = 1000,
-        enable_async: bool = True
+        enable_async: bool = True,
+        loop: Optional[asyncio.AbstractEventLoop] = None
     ):
         self.name = name
         self.max_history_size = max_history_size
@@ -381,8 +382,13 @@ class EventEmitter:
         # Async event loop for async handlers
         self._async_loop: Optional[asyncio.AbstractEventLoop] = None
         self._async_thread: Optional[threading.Thread] = None
+        # A loop passed in (e.g. a ClientHub's) is shared and never stopped here
+        self._owns_loop = loop is None
         if enable_async:
-            self._setup_async_loop()
+            if loop is not None:
+                self._async_loop = loop
+            else:
+                self._setup_async_loop()
         
         self.logger = logging.getLogger(f"{__name__}.EventEmitter.{name}")
     
@@ -734,7 +740,7 @@ class EventEmitter:
     
     def shutdown(self) -> None:
         """Shutdown the event emitter."""
-        if self._async_loop:
+        if self._async_loop and self._owns_loop:
             self._async_loop.call_soon_threadsafe(self._async_loop.stop)
             if self._async_thread:
                 self._async_thread.join(timeout=5.0)
@@ -0,0 +1,213 @@
+"""
+Value interning for SpacetimeDB Python SDK.
+
+Deduplicates values that repeat across cached rows:
+- Identities and connection IDs share one object per value through a
+  weak-valued flyweight table, so an identity referenced by thousands of
+  rows is stored once and freed when the last row goes away
+- Strings (and bytes) of selected columns are interned per column, for
+  enum-like columns such as status, region or kind
+- Applied in the decode path before rows reach the cache, so the cache,
+  callbacks and snapshots all hold the shared objects
+
+Example:
+    conn.db.enable_interning(string_columns={"users": ["status", "region"]})
+"""
+
+import logging
+import threading
+import weakref
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from .protocol import Identity, ConnectionId
+from .connection_id import EnhancedIdentity, EnhancedConnectionId
+from .bsatn.spacetimedb_types import SpacetimeDBIdentity, SpacetimeDBConnectionId, SpacetimeDBAddress
+from .row_types import RowBase
+
+logger = logging.getLogger(__name__)
+
+# Types shared through the identity flyweight table (all keep their value in .data)
+IDENTITY_TYPES = frozenset({
+    Identity, ConnectionId,
+    EnhancedIdentity, EnhancedConnectionId,
+    SpacetimeDBIdentity, SpacetimeDBConnectionId, SpacetimeDBAddress,
+})
+
+# Default cap on distinct interned values per column
+DEFAULT_MAX_VALUES_PER_COLUMN = 65536
+
+
+class IdentityTable:
+    """
+    Weak-valued flyweight table for identity and connection ID objects.
+
+    Holds no strong references: an entry disappears when the last row or
+    message referencing the object is gone.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._objects: 'weakref.WeakValueDictionary[Tuple[type, bytes], Any]' = weakref.WeakValueDictionary()
+        self._hits = 0
+        self._misses = 0
+
+    def intern(self, value: Any) -> Any:
+        """Return the shared object equal to value (value itself if it is the first)."""
+        if type(value) not in IDENTITY_TYPES:
+            return value
+        key = (type(value), value.data)
+        with self._lock:
+            existing = self._objects.get(key)
+            if existing is not None:
+                self._hits += 1
+                return existing
+            self._objects[key] = value
+            self._misses += 1
+            return value
+
+    def __len__(self) -> int:
+        return len(self._objects)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Live entries and lookup hit/miss counts."""
+        with self._lock:
+            return {'entries': len(self._objects), 'hits': self._hits, 'misses': self._misses}
+
+
+# Process-wide table, shared by every client that enables identity interning
+default_identity_table = IdentityTable()
+
+
+class _ColumnPool:
+    """Canonical instances of the strings (or bytes) seen in one column."""
+
+    __slots__ = ('values', 'hits', 'misses')
+
+    def __init__(self):
+        self.values: Dict[Hashable, Any] = {}
+        self.hits = 0
+        self.misses = 0
+
+
+class RowInterner:
+    """
+    Interns identity values and selected string columns of decoded rows.
+
+    Works on dict rows (updated in place) and compact RowBase rows (a new
+    tuple is built only if a value was replaced).
+    """
+
+    def __init__(self, identities: bool = True,
+                 string_columns: Optional[Dict[str, Iterable[str]]] = None,
+                 max_values_per_column: int = DEFAULT_MAX_VALUES_PER_COLUMN,
+                 identity_table: Optional[IdentityTable] = None):
+        """
+        Configure interning.
+
+        Args:
+            identities: Share identity and connection ID objects in every column
+            string_columns: Table name -> columns whose str/bytes values are interned
+            max_values_per_column: Distinct values kept per column; later new
+                values are left as they are (high-cardinality columns gain nothing)
+            identity_table: Flyweight table to use (default: the process-wide one)
+        """
+        if max_values_per_column < 1:
+            raise ValueError("max_values_per_column must be at least 1")
+        self._identities = (identity_table or default_identity_table) if identities else None
+        self._string_columns: Dict[str, Tuple[str, ...]] = {
+            table: tuple(columns) for table, columns in (string_columns or {}).items()
+        }
+        self._max_values = max_values_per_column
+        self._lock = threading.Lock()
+        self._pools: Dict[Tuple[str, str], _ColumnPool] = {}
+
+    @property
+    def identity_table(self) -> Optional[IdentityTable]:
+        """Flyweight table used for identities (None if identity interning is off)."""
+        return self._identities
+
+    def identity(self, value: Any) -> Any:
+        """Intern one identity or connection ID (other values are returned unchanged)."""
+        if self._identities is None or value is None:
+            return value
+        return self._identities.intern(value)
+
+    def intern_rows(self, table_name: str, rows: List[Any]) -> List[Any]:
+        """Intern a list of rows of one table."""
+        columns = self._string_columns.get(table_name)
+        if self._identities is None and not columns:
+            return rows
+        return [self._intern_row(table_name, row, columns) for row in rows]
+
+    def intern_row(self, table_name: str, row: Any) -> Any:
+        """Intern one row of a table."""
+        return self._intern_row(table_name, row, self._string_columns.get(table_name))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-column pool sizes and hit counts, plus identity table stats."""
+        with self._lock:
+            columns = {
+                f"{table}.{column}": {'values': len(pool.values), 'hits': pool.hits, 'misses': pool.misses}
+                for (table, column), pool in self._pools.items()
+            }
+        stats: Dict[str, Any] = {'columns': columns}
+        if self._identities is not None:
+            stats['identities'] = self._identities.get_stats()
+        return stats
+
+    def _intern_value(self, pool: _ColumnPool, value: Any) -> Any:
+        if type(value) not in (str, bytes):
+            return value
+        existing = pool.values.get(value)
+        if existing is not None:
+            pool.hits += 1
+            return existing
+        pool.misses += 1
+        if len(pool.values) < self._max_values:
+            pool.values[value] = value
+        return value
+
+    def _pool(self, table_name: str, column: str) -> _ColumnPool:
+        pool = self._pools.get((table_name, column))
+        if pool is None:
+            pool = self._pools.setdefault((table_name, column), _ColumnPool())
+        return pool
+
+    def _intern_row(self, table_name: str, row: Any, columns: Optional[Tuple[str, ...]]) -> Any:
+        identities = self._identities
+        if isinstance(row, dict):
+            with self._lock:
+                if columns:
+                    for column in columns:
+                        if column in row:
+                            row[column] = self._intern_value(self._pool(table_name, column), row[column])
+                if identities is not None:
+                    for column, value in row.items():
+                        if type(value) in IDENTITY_TYPES:
+                            row[column] = identities.intern(value)
+            return row
+
+        if isinstance(row, RowBase):
+            values = None
+            with self._lock:
+                if columns:
+                    field_index = row._field_index
+                    for column in columns:
+                        index = field_index.get(column)
+                        if index is None:
+                            continue
+                        value = row[index]
+                        interned = self._intern_value(self._pool(table_name, column), value)
+                        if interned is not value:
+                            values = values or list(row)
+                            values[index] = interned
+                if identities is not None:
+                    for index, value in enumerate(row):
+                        if type(value) in IDENTITY_TYPES:
+                            interned = identities.intern(value)
+                            if interned is not value:
+                                values = values or list(row)
+                                values[index] = interned
+            return row if values is None else tuple.__new__(type(row), values)
+
+        return row
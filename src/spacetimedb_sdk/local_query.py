@@ -0,0 +1,568 @@
+"""
+Client-side query engine for SpacetimeDB Python SDK.
+
+Evaluates queries against the local row cache instead of the server:
+- Fluent queries: conn.db.query("users").where(col("age") > 30).order_by("name").limit(10)
+- Primary-key lookups, hash indexes for equality and range indexes for
+  <, <=, >, >= and equality, with a full scan as the fallback
+- Indexes are maintained incrementally from each applied transaction
+- Plans are compiled once per query shape (table, columns and operators)
+  and cached, so repeated queries only bind new values
+
+Example:
+    conn.db.users.create_index("age", kind="range")
+    adults = conn.db.query("users").where(col("age") >= 18, col("active") == True).limit(50).all()
+    print(conn.db.query("users").where(col("age") >= 18).explain())
+"""
+
+import bisect
+import heapq
+import logging
+import operator
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Sequence, Tuple
+
+from .data_structures import LRUCache
+from .row_cache import RowCache, AppliedTransaction
+from .row_types import column_getter
+
+logger = logging.getLogger(__name__)
+
+# Maximum number of compiled plans kept per engine
+DEFAULT_PLAN_CACHE_SIZE = 256
+
+_OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    'in': lambda value, options: value in options,
+}
+_RANGE_OPERATORS = frozenset(('<', '<=', '>', '>='))
+
+
+@dataclass(frozen=True)
+class Predicate:
+    """Comparison of one column against a value."""
+    column: str
+    op: str
+    value: Any
+
+
+class Column:
+    """
+    Column reference for building predicates.
+
+    Comparison operators return Predicate objects:
+    col("age") > 30, col("name") == "alice", col("id").in_([1, 2]).
+    """
+
+    __slots__ = ('name',)
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __eq__(self, value: Any) -> Predicate:  # type: ignore[override]
+        return Predicate(self.name, '==', value)
+
+    def __ne__(self, value: Any) -> Predicate:  # type: ignore[override]
+        return Predicate(self.name, '!=', value)
+
+    def __lt__(self, value: Any) -> Predicate:
+        return Predicate(self.name, '<', value)
+
+    def __le__(self, value: Any) -> Predicate:
+        return Predicate(self.name, '<=', value)
+
+    def __gt__(self, value: Any) -> Predicate:
+        return Predicate(self.name, '>', value)
+
+    def __ge__(self, value: Any) -> Predicate:
+        return Predicate(self.name, '>=', value)
+
+    def in_(self, values: Sequence[Any]) -> Predicate:
+        return Predicate(self.name, 'in', frozenset(values))
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"col({self.name!r})"
+
+
+def col(name: str) -> Column:
+    """Reference a column in a local query predicate."""
+    return Column(name)
+
+
+class HashIndex:
+    """Equality index: column value -> rows, maintained from applied transactions."""
+
+    kind = "hash"
+
+    def __init__(self, table_name: str, column: str):
+        self.table_name = table_name
+        self.column = column
+        self._getter = column_getter(column)
+        self._entries: Dict[Any, Dict[Hashable, Any]] = {}
+        self.lock = threading.Lock()
+        self.version = 0
+
+    def add(self, key: Hashable, row: Any) -> None:
+        value = self._getter(row)
+        try:
+            self._entries.setdefault(value, {})[key] = row
+        except TypeError:
+            pass  # Unhashable values cannot be indexed; scans still find them
+
+    def remove(self, key: Hashable, row: Any) -> None:
+        value = self._getter(row)
+        try:
+            rows = self._entries.get(value)
+        except TypeError:
+            return
+        if rows is not None:
+            rows.pop(key, None)
+            if not rows:
+                del self._entries[value]
+
+    def lookup(self, value: Any) -> List[Any]:
+        """Rows whose column equals value (caller holds the lock)."""
+        try:
+            rows = self._entries.get(value)
+        except TypeError:
+            return []
+        return list(rows.values()) if rows else []
+
+
+class RangeIndex(HashIndex):
+    """
+    Ordered index supporting equality and range lookups (None values are not indexed).
+
+    Values that cannot be ordered against the others (e.g. a str in an int
+    column) are kept out of the sorted list and compared one by one.
+    """
+
+    kind = "range"
+
+    def __init__(self, table_name: str, column: str):
+        super().__init__(table_name, column)
+        self._sorted: List[Any] = []
+        self._unordered: set = set()
+
+    def add(self, key: Hashable, row: Any) -> None:
+        value = self._getter(row)
+        if value is None:
+            return
+        try:
+            rows = self._entries.get(value)
+        except TypeError:
+            return  # Unhashable values cannot be indexed; scans still find them
+        if rows is None:
+            rows = self._entries[value] = {}
+            try:
+                bisect.insort(self._sorted, value)
+            except TypeError:
+                self._unordered.add(value)
+        rows[key] = row
+
+    def remove(self, key: Hashable, row: Any) -> None:
+        value = self._getter(row)
+        try:
+            rows = self._entries.get(value) if value is not None else None
+        except TypeError:
+            return
+        if rows is None:
+            return
+        rows.pop(key, None)
+        if not rows:
+            del self._entries[value]
+            if value in self._unordered:
+                self._unordered.discard(value)
+            else:
+                del self._sorted[bisect.bisect_left(self._sorted, value)]
+
+    def range(self, low: Any = None, low_inclusive: bool = True,
+              high: Any = None, high_inclusive: bool = True) -> List[Any]:
+        """Rows with low <(=) value <(=) high; None bounds are open (caller holds the lock)."""
+        values = self._sorted
+        result: List[Any] = []
+        try:
+            start = 0
+            if low is not None:
+                start = bisect.bisect_left(values, low) if low_inclusive else bisect.bisect_right(values, low)
+            end = len(values)
+            if high is not None:
+                end = bisect.bisect_right(values, high) if high_inclusive else bisect.bisect_left(values, high)
+        except TypeError:
+            # Bounds not comparable with the sorted values never match them
+            start = end = 0
+        for value in values[start:end]:
+            result.extend(self._entries[value].values())
+        for value in self._unordered:
+            try:
+                if low is not None and not (value >= low if low_inclusive else value > low):
+                    continue
+                if high is not None and not (value <= high if high_inclusive else value < high):
+                    continue
+            except TypeError:
+                continue
+            result.extend(self._entries[value].values())
+        return result
+
+
+@dataclass
+class QueryPlan:
+    """
+    Compiled plan for one query shape.
+
+    access is "primary_key", "hash", "range" or "scan". Predicate values
+    are not part of the plan; they are bound at execution time by position.
+    """
+    table_name: str
+    access: str
+    index_column: Optional[str] = None
+    # Positions and operators of the predicates consumed by the access path
+    access_params: Tuple[int, ...] = ()
+    access_ops: Tuple[str, ...] = ()
+    # (getter, compare, position) for predicates checked row by row
+    residual: Tuple[Tuple[Callable[[Any], Any], Callable[[Any, Any], bool], int], ...] = ()
+    residual_columns: Tuple[str, ...] = ()
+
+    def describe(self) -> str:
+        """Human-readable plan summary."""
+        access = self.access if self.index_column is None else f"{self.access}({self.index_column})"
+        if self.residual_columns:
+            return f"{self.table_name}: {access} + filter({', '.join(self.residual_columns)})"
+        return f"{self.table_name}: {access}"
+
+    def matches(self, row: Any, values: Sequence[Any]) -> bool:
+        for getter, compare, position in self.residual:
+            try:
+                if not compare(getter(row), values[position]):
+                    return False
+            except TypeError:
+                # Incomparable values (e.g. None < 3) never match, as NULL in SQL
+                return False
+        return True
+
+
+class LocalQuery:
+    """
+    Fluent query over one cached table.
+
+    Builder methods return the query itself; all(), first(), count(),
+    iteration and explain() run it.
+    """
+
+    def __init__(self, engine: 'QueryEngine', table_name: str):
+        self._engine = engine
+        self.table_name = table_name
+        self._predicates: List[Predicate] = []
+        self._order: List[Tuple[str, bool]] = []
+        self._limit: Optional[int] = None
+
+    def where(self, *predicates: Predicate, **equals: Any) -> 'LocalQuery':
+        """
+        Add conditions; all conditions must hold.
+
+        Args:
+            *predicates: Predicates such as col("age") > 30
+            **equals: Shorthand equality conditions, e.g. where(team="red")
+        """
+        for predicate in predicates:
+            if not isinstance(predicate, Predicate):
+                raise TypeError(f"where() expects col(...) comparisons, got {predicate!r}")
+            if predicate.op not in _OPERATORS:
+                raise ValueError(f"Unsupported operator {predicate.op!r}")
+            self._predicates.append(predicate)
+        for column, value in equals.items():
+            self._predicates.append(Predicate(column, '==', value))
+        return self
+
+    def order_by(self, *columns: str, desc: bool = False) -> 'LocalQuery':
+        """Sort by columns (None sorts last); later calls add lower-priority keys."""
+        for column in columns:
+            self._order.append((column, desc))
+        return self
+
+    def limit(self, n: int) -> 'LocalQuery':
+        """Return at most n rows."""
+        if n < 0:
+            raise ValueError("limit must be non-negative")
+        self._limit = n
+        return self
+
+    def explain(self) -> str:
+        """Describe the plan this query would use."""
+        return self._plan().describe()
+
+    def all(self) -> List[Any]:
+        """Run the query and return the matching rows."""
+        return self._engine.execute(self._plan(), [p.value for p in self._predicates],
+                                    self._order, self._limit)
+
+    def first(self) -> Optional[Any]:
+        """Run the query and return the first matching row, or None."""
+        limit = self._limit
+        self._limit = 1 if limit is None else min(limit, 1)
+        try:
+            rows = self.all()
+        finally:
+            self._limit = limit
+        return rows[0] if rows else None
+
+    def count(self) -> int:
+        """Number of matching rows (ignores ordering)."""
+        return len(self._engine.execute(self._plan(), [p.value for p in self._predicates], [], self._limit))
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self.all())
+
+    def _plan(self) -> QueryPlan:
+        return self._engine.plan(self.table_name, [(p.column, p.op) for p in self._predicates])
+
+
+class QueryEngine:
+    """
+    Plans and runs local queries, and owns the secondary indexes.
+
+    Indexes are kept current by a RowCache listener. An index read and the
+    rows it returns always come from the same applied version.
+    """
+
+    def __init__(self, cache: RowCache, plan_cache_size: int = DEFAULT_PLAN_CACHE_SIZE):
+        self._cache = cache
+        self._lock = threading.Lock()
+        self._indexes: Dict[str, Dict[str, HashIndex]] = {}
+        self._primary_keys: Dict[str, str] = {}
+        # Bumped whenever indexes change so cached plans are not reused
+        self._generation = 0
+        self._plans: LRUCache = LRUCache(max_size=plan_cache_size)
+        self._listening = False
+
+    def query(self, table_name: str) -> LocalQuery:
+        """Start a query on a table."""
+        return LocalQuery(self, table_name)
+
+    def set_primary_key(self, table_name: str, column: Optional[str]) -> None:
+        """Declare the column the cache keys a table by."""
+        with self._lock:
+            if column:
+                self._primary_keys[table_name] = column
+            else:
+                self._primary_keys.pop(table_name, None)
+            self._generation += 1
+
+    def create_index(self, table_name: str, column: str, kind: str = "hash") -> HashIndex:
+        """
+        Create (or return) a secondary index and build it from the cache.
+
+        Args:
+            table_name: Table to index
+            column: Column to index
+            kind: "hash" for equality lookups, "range" for ordered lookups
+
+        Returns:
+            The index
+        """
+        if kind not in ("hash", "range"):
+            raise ValueError(f"Unknown index kind {kind!r}, expected 'hash' or 'range'")
+        with self._lock:
+            existing = self._indexes.get(table_name, {}).get(column)
+            if existing is not None and (existing.kind == kind or existing.kind == "range"):
+                return existing
+            index = RangeIndex(table_name, column) if kind == "range" else HashIndex(table_name, column)
+            with index.lock:
+                if not self._listening:
+                    snapshot = self._cache.add_listener(self._on_transaction)
+                    self._listening = True
+                else:
+                    snapshot = self._cache.snapshot([table_name])
+                table = snapshot.table(table_name)
+                for key, row in table.items():
+                    index.add(key, row)
+                index.version = snapshot.version
+                self._indexes.setdefault(table_name, {})[column] = index
+                self._generation += 1
+        return index
+
+    def drop_index(self, table_name: str, column: str) -> bool:
+        """Remove a secondary index."""
+        with self._lock:
+            removed = self._indexes.get(table_name, {}).pop(column, None) is not None
+            if removed:
+                self._generation += 1
+            return removed
+
+    def indexes(self, table_name: str) -> Dict[str, str]:
+        """Indexed columns of a table and their kinds."""
+        with self._lock:
+            return {column: index.kind for column, index in self._indexes.get(table_name, {}).items()}
+
+    def plan(self, table_name: str, shape: Sequence[Tuple[str, str]]) -> QueryPlan:
+        """Get the compiled plan for a query shape, compiling it on first use."""
+        with self._lock:
+            generation = self._generation
+            indexes = dict(self._indexes.get(table_name, {}))
+            primary_key = self._primary_keys.get(table_name)
+        cache_key = (table_name, tuple(shape), generation)
+        plan = self._plans.get(cache_key)
+        if plan is None:
+            plan = self._compile(table_name, shape, indexes, primary_key)
+            self._plans.set(cache_key, plan)
+        return plan
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Plan cache and index statistics."""
+        with self._lock:
+            index_count = sum(len(indexes) for indexes in self._indexes.values())
+        return {
+            'indexes': index_count,
+            'plan_cache_size': self._plans.size(),
+            'plan_cache_hit_ratio': self._plans.get_hit_ratio(),
+        }
+
+    def close(self) -> None:
+        """Stop maintaining indexes."""
+        self._cache.remove_listener(self._on_transaction)
+        with self._lock:
+            self._indexes.clear()
+            self._listening = False
+            self._generation += 1
+
+    def _compile(self, table_name: str, shape: Sequence[Tuple[str, str]],
+                 indexes: Dict[str, HashIndex], primary_key: Optional[str]) -> QueryPlan:
+        access, index_column, consumed = "scan", None, ()
+
+        equalities = [i for i, (column, op) in enumerate(shape) if op == '==']
+        for i in equalities:
+            if shape[i][0] == primary_key:
+                access, index_column, consumed = "primary_key", primary_key, (i,)
+                break
+        else:
+            for i in equalities:
+                index = indexes.get(shape[i][0])
+                if index is not None:
+                    access, index_column, consumed = index.kind, index.column, (i,)
+                    break
+            else:
+                for column, index in indexes.items():
+                    if index.kind != "range":
+                        continue
+                    bounds = tuple(i for i, (c, op) in enumerate(shape) if c == column and op in _RANGE_OPERATORS)
+                    if bounds:
+                        access, index_column, consumed = "range", column, bounds
+                        break
+
+        residual = tuple(
+            (column_getter(column), _OPERATORS[op], i)
+            for i, (column, op) in enumerate(shape) if i not in consumed
+        )
+        return QueryPlan(
+            table_name=table_name,
+            access=access,
+            index_column=index_column,
+            access_params=consumed,
+            access_ops=tuple(shape[i][1] for i in consumed),
+            residual=residual,
+            residual_columns=tuple(shape[i][0] for i in range(len(shape)) if i not in consumed),
+        )
+
+    def execute(self, plan: QueryPlan, values: Sequence[Any],
+                order: Sequence[Tuple[str, bool]], limit: Optional[int]) -> List[Any]:
+        """Run a plan with bound predicate values."""
+        candidates = self._candidates(plan, values)
+        # Without ordering the limit can stop the filter early
+        stop = limit if not order else None
+        rows: List[Any] = []
+        for row in candidates:
+            if plan.matches(row, values):
+                rows.append(row)
+                if stop is not None and len(rows) >= stop:
+                    break
+        if order:
+            rows = self._sort(rows, order, limit)
+        return rows
+
+    def _candidates(self, plan: QueryPlan, values: Sequence[Any]) -> List[Any]:
+        if plan.access == "primary_key":
+            row = self._cache.table(plan.table_name).get(values[plan.access_params[0]])
+            return [row] if row is not None else []
+
+        if plan.access == "scan":
+            return self._cache.table(plan.table_name).values()
+
+        with self._lock:
+            index = self._indexes.get(plan.table_name, {}).get(plan.index_column)
+        if index is None:
+            # Index dropped after planning
+            return self._cache.table(plan.table_name).values()
+
+        with index.lock:
+            if plan.access == "hash":
+                return index.lookup(values[plan.access_params[0]])
+            return self._range_candidates(index, plan, values)
+
+    @staticmethod
+    def _range_candidates(index: RangeIndex, plan: QueryPlan, values: Sequence[Any]) -> List[Any]:
+        low, low_inclusive, high, high_inclusive = None, True, None, True
+        for position, op in zip(plan.access_params, plan.access_ops):
+            value = values[position]
+            if op == '==':
+                return index.lookup(value) if value is not None else []
+            if value is None:
+                return []
+            if op in ('>', '>='):
+                inclusive = op == '>='
+                if low is None or value > low or (value == low and not inclusive):
+                    low, low_inclusive = value, inclusive
+            else:
+                inclusive = op == '<='
+                if high is None or value < high or (value == high and not inclusive):
+                    high, high_inclusive = value, inclusive
+        return index.range(low, low_inclusive, high, high_inclusive)
+
+    @staticmethod
+    def _sort(rows: List[Any], order: Sequence[Tuple[str, bool]], limit: Optional[int]) -> List[Any]:
+        def sort_key(column: str, desc: bool) -> Callable[[Any], Tuple[bool, Any]]:
+            getter = column_getter(column)
+
+            def key(row: Any) -> Tuple[bool, Any]:
+                value = getter(row)
+                # Reversed sorts reverse the flag too, so None stays last
+                return (value is None) != desc, value
+            return key
+
+        directions = {desc for _, desc in order}
+        if len(directions) == 1:
+            getters = [sort_key(column, desc) for column, desc in order]
+            key = lambda row: tuple(g(row) for g in getters)
+            desc = directions.pop()
+            if limit is not None and limit < len(rows):
+                return (heapq.nlargest if desc else heapq.nsmallest)(limit, rows, key=key)
+            rows.sort(key=key, reverse=desc)
+        else:
+            # Mixed directions: stable sorts from the least significant key
+            for column, desc in reversed(order):
+                rows.sort(key=sort_key(column, desc), reverse=desc)
+        return rows if limit is None else rows[:limit]
+
+    def _on_transaction(self, applied: AppliedTransaction) -> None:
+        with self._lock:
+            tables = {name: list(indexes.values()) for name, indexes in self._indexes.items()
+                      if name in applied.tables}
+        for table_name, indexes in tables.items():
+            change = applied.tables[table_name]
+            row_key = self._cache.row_key
+            for index in indexes:
+                with index.lock:
+                    if index.version >= applied.version:
+                        continue  # Built from a snapshot that already includes this transaction
+                    for row in change.deletes:
+                        index.remove(row_key(table_name, row), row)
+                    for row in change.inserts:
+                        index.add(row_key(table_name, row), row)
+                    index.version = applied.version
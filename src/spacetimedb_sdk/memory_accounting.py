@@ -0,0 +1,335 @@
+"""
+Memory accounting for the client cache of SpacetimeDB Python SDK.
+
+Estimates how much memory each cached table holds and enforces budgets:
+- Per-row size comes from the table schema when every column is a
+  fixed-width number, and from a sampled deep sys.getsizeof() of inserted
+  rows otherwise
+- Per-table and total estimates are kept current by a RowCache listener
+  and reported by conn.get_connection_metrics()['cache_memory']
+- Budgets (total or per table) call a callback when exceeded and can
+  refuse further subscriptions until usage drops below them again
+
+Example:
+    conn.set_memory_budget(512 * 1024 * 1024,
+                           on_exceeded=lambda budget, used: alert(used))
+    conn.set_memory_budget(64 * 1024 * 1024, table="messages")
+    conn.get_connection_metrics()['cache_memory']['tables']['messages']
+"""
+
+import logging
+import sys
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from .row_cache import RowCache, AppliedTransaction
+from .row_types import RowBase
+from .algebraic_type import ProductType, BoolType, IntType, FloatType
+from .exceptions import SpacetimeDBError
+
+logger = logging.getLogger(__name__)
+
+# Bytes per cached row for the row key and its hash bucket slot
+ROW_OVERHEAD_BYTES = 80
+
+# Rows measured per transaction and table, and the window of the running average
+DEFAULT_SAMPLES_PER_TRANSACTION = 4
+DEFAULT_SAMPLE_WINDOW = 256
+
+# Nesting followed by estimate_size() (rows holding lists of structs, etc.)
+_MAX_DEPTH = 4
+
+_SINGLETONS = (None, True, False)
+
+
+def estimate_size(value: Any, _depth: int = 0) -> int:
+    """
+    Approximate deep size of a value in bytes.
+
+    Follows containers and object attributes a few levels down. Dict keys
+    are not counted: for dict rows they are column names shared by every row.
+    """
+    if value is None or value is True or value is False:
+        return 0
+    size = sys.getsizeof(value)
+    if _depth >= _MAX_DEPTH or isinstance(value, (str, bytes, int, float)):
+        return size
+    _depth += 1
+    if isinstance(value, dict):
+        return size + sum(estimate_size(item, _depth) for item in value.values())
+    if isinstance(value, (tuple, list, set, frozenset)):
+        return size + sum(estimate_size(item, _depth) for item in value)
+    attributes = getattr(value, '__dict__', None)
+    if attributes is not None:
+        return size + sys.getsizeof(attributes) + sum(estimate_size(item, _depth) for item in attributes.values())
+    return size
+
+
+def schema_row_size(product_type: ProductType, row_type: Optional[type] = None) -> Optional[int]:
+    """
+    Size of a row computed from its schema, if every column is fixed-width.
+
+    Args:
+        product_type: Table schema
+        row_type: Row class (compact RowBase rows are tuples; anything else
+            is assumed to decode to dicts)
+
+    Returns:
+        Bytes per row, or None when a column's size depends on its value
+    """
+    fields = product_type.fields
+    columns = getattr(row_type, '_fields', None)
+    if columns is not None:
+        wanted = set(columns)
+        fields = [field for field in fields if field.name in wanted]
+    size = 0
+    for field in fields:
+        field_type = field.type
+        if isinstance(field_type, BoolType):
+            continue
+        if isinstance(field_type, IntType):
+            # Largest magnitude the column can hold
+            size += sys.getsizeof((1 << field_type.bits) - 1)
+        elif isinstance(field_type, FloatType):
+            size += sys.getsizeof(0.0)
+        else:
+            return None
+    if isinstance(row_type, type) and issubclass(row_type, RowBase):
+        return size + sys.getsizeof(tuple(range(len(fields))))
+    return size + sys.getsizeof(dict.fromkeys(field.name for field in fields))
+
+
+class MemoryBudgetExceededError(SpacetimeDBError):
+    """Raised when a subscription is refused because a memory budget is exceeded."""
+
+    def __init__(self, message: str, table: Optional[str] = None,
+                 used_bytes: int = 0, max_bytes: int = 0):
+        super().__init__(
+            message,
+            error_code="MEMORY_BUDGET_EXCEEDED",
+            diagnostic_info={'table': table, 'used_bytes': used_bytes, 'max_bytes': max_bytes},
+            recovery_hint="Unsubscribe from queries or narrow them before subscribing again"
+        )
+        self.table = table
+        self.used_bytes = used_bytes
+        self.max_bytes = max_bytes
+
+
+@dataclass
+class MemoryBudget:
+    """
+    A limit on estimated cache memory.
+
+    table is None for a budget on the whole cache. exceeded is updated
+    after every applied transaction.
+    """
+    max_bytes: int
+    table: Optional[str] = None
+    on_exceeded: Optional[Callable[['MemoryBudget', int], None]] = None
+    refuse_subscriptions: bool = True
+    exceeded: bool = False
+
+
+class _TableUsage:
+    __slots__ = ('rows', 'row_bytes', 'samples', 'from_schema')
+
+    def __init__(self):
+        self.rows = 0
+        self.row_bytes = 0.0
+        self.samples = 0
+        self.from_schema = False
+
+    @property
+    def bytes(self) -> int:
+        return int(self.rows * (self.row_bytes + ROW_OVERHEAD_BYTES))
+
+
+class CacheMemoryTracker:
+    """
+    Estimates memory held by a RowCache and checks budgets against it.
+
+    Fed by a RowCache listener on the writer thread: each transaction
+    updates row counts and measures a few of its inserted rows.
+    """
+
+    def __init__(self, cache: RowCache,
+                 samples_per_transaction: int = DEFAULT_SAMPLES_PER_TRANSACTION,
+                 sample_window: int = DEFAULT_SAMPLE_WINDOW):
+        """
+        Start tracking a cache.
+
+        Args:
+            cache: Row cache to follow
+            samples_per_transaction: Inserted rows measured per table and transaction
+            sample_window: Samples averaged per table; older samples fade out
+        """
+        if samples_per_transaction < 1 or sample_window < 1:
+            raise ValueError("samples_per_transaction and sample_window must be at least 1")
+        self._cache = cache
+        self._samples_per_transaction = samples_per_transaction
+        self._sample_window = sample_window
+        self._lock = threading.Lock()
+        self._tables: Dict[str, _TableUsage] = {}
+        self._budgets: List[MemoryBudget] = []
+        snapshot = cache.add_listener(self._on_transaction)
+        with self._lock:
+            for name in snapshot.table_names():
+                rows = snapshot.table(name)
+                self._record(name, len(rows), list(rows.values()))
+
+    def set_schema(self, table_name: str, product_type: Optional[ProductType],
+                   row_type: Optional[type] = None) -> None:
+        """Use a schema-derived row size for a table when its columns are fixed-width."""
+        size = schema_row_size(product_type, row_type) if product_type is not None else None
+        with self._lock:
+            usage = self._tables.setdefault(table_name, _TableUsage())
+            if size is None:
+                usage.from_schema = False
+                return
+            usage.from_schema = True
+            usage.row_bytes = float(size)
+        self._check_budgets()
+
+    def add_budget(self, max_bytes: int, table: Optional[str] = None,
+                   on_exceeded: Optional[Callable[[MemoryBudget, int], None]] = None,
+                   refuse_subscriptions: bool = True) -> MemoryBudget:
+        """
+        Add a memory budget.
+
+        Args:
+            max_bytes: Estimated bytes allowed
+            table: Table the budget applies to (None for the whole cache)
+            on_exceeded: Called with (budget, used_bytes) each time usage
+                goes over the budget, on the thread applying transactions
+            refuse_subscriptions: Make check_subscription() raise while exceeded
+
+        Returns:
+            The budget, for remove_budget()
+        """
+        if max_bytes < 1:
+            raise ValueError("max_bytes must be at least 1")
+        budget = MemoryBudget(max_bytes=max_bytes, table=table, on_exceeded=on_exceeded,
+                              refuse_subscriptions=refuse_subscriptions)
+        with self._lock:
+            self._budgets.append(budget)
+        self._check_budgets()
+        return budget
+
+    def remove_budget(self, budget: MemoryBudget) -> bool:
+        """Remove a budget added with add_budget()."""
+        with self._lock:
+            if budget not in self._budgets:
+                return False
+            self._budgets = [b for b in self._budgets if b is not budget]
+            return True
+
+    def budgets(self) -> List[MemoryBudget]:
+        """Budgets currently in force."""
+        with self._lock:
+            return list(self._budgets)
+
+    def table_bytes(self, table_name: str) -> int:
+        """Estimated bytes held by one table."""
+        with self._lock:
+            usage = self._tables.get(table_name)
+            return usage.bytes if usage is not None else 0
+
+    def total_bytes(self) -> int:
+        """Estimated bytes held by the whole cache."""
+        with self._lock:
+            return sum(usage.bytes for usage in self._tables.values())
+
+    def check_subscription(self, tables: Optional[Iterable[str]] = None) -> None:
+        """
+        Refuse a new subscription if a budget it could grow is exceeded.
+
+        Args:
+            tables: Tables the subscription reads (None if unknown: every
+                table budget applies)
+
+        Raises:
+            MemoryBudgetExceededError: If a refusing budget is exceeded
+        """
+        wanted = {name.lower() for name in tables} if tables is not None else None
+        with self._lock:
+            for budget in self._budgets:
+                if not (budget.exceeded and budget.refuse_subscriptions):
+                    continue
+                if budget.table is not None and wanted is not None and budget.table.lower() not in wanted:
+                    continue
+                used = self._used_bytes(budget)
+                scope = f"table '{budget.table}'" if budget.table is not None else "client cache"
+                raise MemoryBudgetExceededError(
+                    f"Memory budget exceeded for {scope}: {used} of {budget.max_bytes} bytes",
+                    table=budget.table, used_bytes=used, max_bytes=budget.max_bytes
+                )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Per-table estimates, the total and budget states."""
+        with self._lock:
+            tables = {
+                name: {
+                    'rows': usage.rows,
+                    'row_bytes': int(usage.row_bytes),
+                    'bytes': usage.bytes,
+                    'estimate': 'schema' if usage.from_schema else 'sampled',
+                }
+                for name, usage in self._tables.items()
+            }
+            budgets = [
+                {'table': budget.table, 'max_bytes': budget.max_bytes,
+                 'used_bytes': self._used_bytes(budget), 'exceeded': budget.exceeded}
+                for budget in self._budgets
+            ]
+        return {
+            'total_bytes': sum(table['bytes'] for table in tables.values()),
+            'tables': tables,
+            'budgets': budgets,
+        }
+
+    def close(self) -> None:
+        """Stop following the cache."""
+        self._cache.remove_listener(self._on_transaction)
+
+    def _on_transaction(self, applied: AppliedTransaction) -> None:
+        with self._lock:
+            for name, change in applied.tables.items():
+                self._record(name, len(self._cache.table(name)), change.inserts)
+        self._check_budgets()
+
+    def _record(self, table_name: str, rows: int, inserted: List[Any]) -> None:
+        usage = self._tables.get(table_name)
+        if usage is None:
+            usage = self._tables[table_name] = _TableUsage()
+        usage.rows = rows
+        if usage.from_schema or not inserted:
+            return
+        step = max(1, len(inserted) // self._samples_per_transaction)
+        for row in inserted[::step][:self._samples_per_transaction]:
+            usage.samples += 1
+            usage.row_bytes += (estimate_size(row) - usage.row_bytes) / min(usage.samples, self._sample_window)
+
+    def _used_bytes(self, budget: MemoryBudget) -> int:
+        if budget.table is None:
+            return sum(usage.bytes for usage in self._tables.values())
+        usage = self._tables.get(budget.table)
+        return usage.bytes if usage is not None else 0
+
+    def _check_budgets(self) -> None:
+        crossed = []
+        with self._lock:
+            for budget in self._budgets:
+                used = self._used_bytes(budget)
+                over = used > budget.max_bytes
+                if over and not budget.exceeded:
+                    crossed.append((budget, used))
+                budget.exceeded = over
+        for budget, used in crossed:
+            scope = f"table '{budget.table}'" if budget.table is not None else "client cache"
+            logger.warning(f"Memory budget exceeded for {scope}: {used} of {budget.max_bytes} bytes")
+            if budget.on_exceeded is not None:
+                try:
+                    budget.on_exceeded(budget, used)
+                except Exception as e:
+                    logger.error(f"Error in memory budget callback: {e}")
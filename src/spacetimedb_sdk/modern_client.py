@@ -12,10 +12,12 @@ This is the modernized version of spacetimedb_client.py with support for:
 - Fluent builder API for connection setup
 """
 
-from typing import List, Dict, Callable, Optional, Any, Union, Tuple
+from typing import List, Dict, Callable, Optional, Any, Union, Tuple, Set, Sequence, Iterator, AsyncIterator
+from concurrent.futures import Future
 from types import ModuleType
 import json
 import queue
+import re
 import threading
 import logging
 import time
@@ -36,8 +38,9 @@ from .protocol import (
     ServerMessage, Identity, ConnectionId,
     IdentityToken, TransactionUpdate, TransactionUpdateLight,
     SubscribeApplied, UnsubscribeApplied, SubscriptionError,
-    OneOffQueryResponse, CallReducerFlags,
-    generate_request_id,
+    SubscribeMultiApplied, UnsubscribeMultiApplied, TableUpdate,
+    OneOffQueryResponse, CallReducerFlags, DatabaseUpdate,
+    generate_request_id, update_status_committed,
     ensure_enhanced_connection_id,
     ensure_enhanced_identity
 )
@@ -55,6 +58,21 @@ from .connection_id import (
 )
 from .query_id import QueryId
 from .client_cache import ClientCache
+from .row_cache import RowCache, TableVersion, AppliedTransaction
+from .change_log import ChangeLog
+from .shared_cache import SharedCachePublisher, DEFAULT_RING_SIZE
+from .pending_calls import PendingCallRegistry, ReducerCallError
+from .one_off_queries import (
+    OneOffQueryResult, OneOffQueryError, OneOffQueryCache, encode_message_id, decode_message_id,
+    keyset_page_sql, iter_row_batches,
+    DEFAULT_QUERY_CACHE_SIZE, DEFAULT_QUERY_CACHE_TTL, DEFAULT_BATCH_SIZE, DEFAULT_PAGE_SIZE
+)
+from .optimistic import OptimisticUpdates, Predictor, PredictionOutcome, DEFAULT_PREDICTION_TIMEOUT
+from .reducer_coalescing import ReducerCoalescer, CoalescingPolicy, CoalescedCall
+from .row_types import column_getter
+from .memory_accounting import CacheMemoryTracker, MemoryBudget
+from .callback_executor import CallbackExecutor
+from .algebraic_type import ProductType
 from .compression import (
     CompressionManager,
     CompressionConfig,
@@ -99,6 +117,9 @@ from .remote_module import (
     get_module_registry, register_module
 )
 
+# Tables named by a subscription query (FROM and JOIN clauses)
+_QUERY_TABLE_PATTERN = re.compile(r'\b(?:FROM|JOIN)\s+"?(\w+)"?', re.IGNORECASE)
+
 
 @dataclass
 class ReducerEvent:
@@ -231,6 +252,148 @@ class ModernSpacetimeDBClient:
         """
         return self._db_interface
     
+    @property
+    def row_cache(self) -> RowCache:
+        """Get the versioned row cache holding subscribed rows."""
+        return self._row_cache
+    
+    @property
+    def change_log(self) -> ChangeLog:
+        """Get the per-table log of recently applied changes."""
+        return self._change_log
+    
+    @property
+    def memory_tracker(self) -> CacheMemoryTracker:
+        """Get the estimator of memory held by the row cache."""
+        return self._memory_tracker
+    
+    def set_memory_budget(self, max_bytes: int, table: Optional[str] = None,
+                          on_exceeded: Optional[Callable[[MemoryBudget, int], None]] = None,
+                          refuse_subscriptions: bool = True) -> MemoryBudget:
+        """
+        Limit the estimated memory of the row cache or one cached table.
+        
+        While a budget is exceeded, on_exceeded has been called once and
+        (with refuse_subscriptions) subscribe calls that could grow it
+        raise MemoryBudgetExceededError instead of reaching the server.
+        
+        Args:
+            max_bytes: Estimated bytes allowed
+            table: Table to limit (None for the whole cache)
+            on_exceeded: Called with (budget, used_bytes) when usage goes over
+            refuse_subscriptions: Refuse new subscriptions while exceeded
+            
+        Returns:
+            The budget; pass it to memory_tracker.remove_budget() to lift it
+        """
+        return self._memory_tracker.add_budget(max_bytes, table=table, on_exceeded=on_exceeded,
+                                               refuse_subscriptions=refuse_subscriptions)
+    
+    @property
+    def query_cache(self) -> Optional[OneOffQueryCache]:
+        """Get the one-off query result cache, if enabled."""
+        return self._query_cache
+    
+    def enable_query_cache(self, max_size: int = DEFAULT_QUERY_CACHE_SIZE,
+                           ttl: Optional[float] = DEFAULT_QUERY_CACHE_TTL,
+                           subscribed_only: bool = False) -> OneOffQueryCache:
+        """
+        Serve repeated query() and query_async() calls from a local cache.
+        
+        Results are keyed by normalized SQL and kept for ttl seconds. A
+        result is dropped as soon as a transaction touches a table it
+        reads; only subscribed tables deliver transactions, so results over
+        other tables rely on the TTL alone unless subscribed_only is set.
+        
+        Args:
+            max_size: Results kept; the least recently used go first
+            ttl: Seconds a result stays valid (None: until invalidated,
+                requires subscribed_only)
+            subscribed_only: Only cache queries whose tables are all subscribed
+            
+        Returns:
+            The cache; its get_stats() reports the hit ratio
+        """
+        self.disable_query_cache()
+        cache = OneOffQueryCache(max_size=max_size, ttl=ttl, subscribed_only=subscribed_only)
+        self._row_cache.add_listener(self._invalidate_query_cache)
+        self._query_cache = cache
+        return cache
+    
+    def disable_query_cache(self) -> None:
+        """Stop caching one-off query results and drop the cached ones."""
+        if self._query_cache is not None:
+            self._row_cache.remove_listener(self._invalidate_query_cache)
+            self._query_cache.clear()
+            self._query_cache = None
+    
+    def _invalidate_query_cache(self, applied: AppliedTransaction) -> None:
+        cache = self._query_cache
+        if cache is not None and applied.tables:
+            cache.invalidate_tables(applied.tables)
+    
+    def publish_shared_cache(self, tables: Optional[List[str]] = None,
+                             ring_size: int = DEFAULT_RING_SIZE) -> SharedCachePublisher:
+        """
+        Publish the row cache to replicas in other processes.
+        
+        Worker processes attach with SharedCacheReplica(handle) using
+        handles from the returned publisher's create_replica_handle(), and
+        follow this client's cache without their own server connection.
+        The publisher is closed on shutdown().
+        
+        Args:
+            tables: Tables to publish (default: every table)
+            ring_size: Shared memory ring buffer size in bytes
+        """
+        key_columns = {
+            name: handle._primary_key_column
+            for name, handle in self._db_interface._table_handles.items()
+            if handle._primary_key_column
+        }
+        publisher = SharedCachePublisher(self._row_cache, key_columns=key_columns,
+                                         tables=tables, ring_size=ring_size)
+        self._shared_cache_publishers.append(publisher)
+        return publisher
+    
+    def _get_table_cache(self, table_name: str) -> TableVersion:
+        """Get the latest published version of a cached table."""
+        return self._row_cache.table(table_name)
+    
+    def enable_callback_executor(
+        self,
+        max_workers: int = 4,
+        ordering: str = "table",
+        tables: Optional[List[str]] = None
+    ) -> CallbackExecutor:
+        """
+        Run table callbacks on a thread pool instead of the message thread.
+        
+        Callbacks for one table (or one primary key with ordering="key")
+        keep their order; different tables proceed in parallel, so a slow
+        handler no longer delays decoding and cache apply.
+        
+        Args:
+            max_workers: Pool threads shared by all tables
+            ordering: "table" or "key"
+            tables: Tables to move to the executor (all tables if None)
+            
+        Returns:
+            The CallbackExecutor, whose get_metrics() reports queue depth and lag
+        """
+        if self._callback_executor is None:
+            self._callback_executor = CallbackExecutor(
+                max_workers=max_workers,
+                name=f"ModernSpacetimeDBClient-Callbacks-{id(self)}"
+            )
+        self._db_interface.use_callback_executor(self._callback_executor, ordering, tables)
+        return self._callback_executor
+    
+    @property
+    def callback_executor(self) -> Optional[CallbackExecutor]:
+        """Get the table callback executor, if enabled."""
+        return self._callback_executor
+    
     def get_context(
         self,
         db_view_class: type = DbView,
@@ -296,7 +459,8 @@ class ModernSpacetimeDBClient:
     
     def register_table(self, table_name: str, row_type: type,
                       primary_key: Optional[str] = None,
-                      unique_columns: Optional[List[str]] = None):
+                      unique_columns: Optional[List[str]] = None,
+                      columns: Optional[List[str]] = None):
         """
         Register a table with the client for enhanced table interface.
         
@@ -305,8 +469,13 @@ class ModernSpacetimeDBClient:
             row_type: Type of rows in the table
             primary_key: Name of the primary key column (if any)
             unique_columns: List of unique column names
+            columns: Only cache these columns (plus the keys)
         """
-        self._db_interface.register_table(table_name, row_type, primary_key, unique_columns)
+        self._db_interface.register_table(table_name, row_type, primary_key, unique_columns,
+                                          columns=columns)
+        handle = self._db_interface.get_table(table_name)
+        if handle is not None and handle._schema is not None:
+            self._memory_tracker.set_schema(table_name, handle._schema, handle.row_type)
     
     def __init__(
         self,
@@ -320,10 +489,16 @@ class ModernSpacetimeDBClient:
         energy_budget: int = 5000,  # Energy budget per hour
         compression_config: Optional[CompressionConfig] = None,
         test_mode: bool = False,  # New parameter to prevent real connections
-        auto_trigger_lifecycle: bool = True  # Automatically trigger client_connected reducer
+        auto_trigger_lifecycle: bool = True,  # Automatically trigger client_connected reducer
+        hub: Optional[Any] = None  # ClientHub hosting this client on shared threads
     ):
         # Client state
         self.autogen_package = autogen_package
+        # Hosting hub; its decode worker runs this client's messages in order
+        self._hub = hub
+        self._hub_executor: Optional[Callable[[Callable[[], None]], None]] = (
+            hub.attach(self) if hub is not None else None
+        )
         # Convert protocol shortcuts to full protocol strings
         if protocol == "text":
             self.protocol = TEXT_PROTOCOL
@@ -367,6 +542,7 @@ class ModernSpacetimeDBClient:
         # Subscription management
         self.active_subscriptions: Dict[QueryId, List[str]] = {}  # QueryId -> queries
         self.subscription_callbacks: Dict[QueryId, List[Callable]] = {}
+        self._subscription_tables: Dict[QueryId, Set[str]] = {}  # QueryId -> lowercased table names
         
         # Event callbacks
         self._row_update_callbacks: Dict[str, List[Callable]] = {}
@@ -397,15 +573,46 @@ class ModernSpacetimeDBClient:
         # Connection diagnostics
         self._diagnostics = ConnectionDiagnostics()
         
+        # Futures of in-flight reducer calls, keyed by request ID
+        self._reducer_calls = PendingCallRegistry(name=f"ModernSpacetimeDBClient-Calls-{id(self)}")
+        # Futures of in-flight one-off queries, keyed by the request ID in their message ID
+        self._one_off_queries = PendingCallRegistry(name=f"ModernSpacetimeDBClient-Queries-{id(self)}")
+        # Request ID -> (query, query cache epoch when it was sent, deliver the raw response)
+        self._one_off_query_info: Dict[int, Tuple[str, int, bool]] = {}
+        # Opt-in result cache, see enable_query_cache()
+        self._query_cache: Optional[OneOffQueryCache] = None
+        
+        # Versioned row cache backing conn.db table reads
+        self._row_cache = RowCache()
+        # Bounded per-table log of applied changes for changes_since() cursors
+        self._change_log = ChangeLog(self._row_cache)
+        self._shared_cache_publishers: List[SharedCachePublisher] = []
+        # Estimated cache memory per table, and budgets on it
+        self._memory_tracker = CacheMemoryTracker(self._row_cache)
+        
+        # Optional executor running table callbacks off the message thread
+        self._callback_executor: Optional[CallbackExecutor] = None
+        
         # Database interface for table access
         self._db_interface = DatabaseInterface(self)
         self._table_event_processor = TableEventProcessor(self._db_interface)
         
+        # Predicted effects of in-flight reducer calls, see register_predictor()
+        self._predictions = OptimisticUpdates(self._row_cache, self._db_interface.decode_rows)
+        # Per-reducer coalescing of idempotent calls, see set_coalescing_policy()
+        self._coalescer = ReducerCoalescer(
+            self._register_reducer_call, self._send_coalesced_calls,
+            estimate_cost=lambda reducer_name, args: self.energy_cost_estimator.estimate_reducer_cost(
+                reducer_name, list(args)),
+            name=f"ModernSpacetimeDBClient-Coalescer-{id(self)}"
+        )
+        
         # Module information
         self._module: Optional[RemoteModule] = None
         
         # Advanced event system
-        self._event_emitter = EventEmitter(name=f"client_{id(self)}")
+        self._event_emitter = EventEmitter(name=f"client_{id(self)}",
+                                           loop=hub.loop if hub is not None else None)
         self._setup_advanced_events()
         
         # JSON API client (initialized on demand)
@@ -431,8 +638,9 @@ class ModernSpacetimeDBClient:
         # Setup energy event handling
         self._setup_energy_events()
         
-        # Start message processing (can be disabled for testing)
-        if start_message_processing:
+        # Start message processing (can be disabled for testing); hosted
+        # clients are processed on their hub's decode worker instead
+        if start_message_processing and hub is None:
             self._start_message_processing()
         self.logger.debug("ModernSpacetimeDBClient initialized.")
     
@@ -496,6 +704,23 @@ class ModernSpacetimeDBClient:
             else:
                 self.logger.debug("Shutdown: processing_thread is None or not alive.")
             
+            if self._hub is not None:
+                self._hub.detach(self)
+            
+            for publisher in self._shared_cache_publishers:
+                publisher.close()
+            self._shared_cache_publishers.clear()
+            
+            # Held coalesced calls are failed with the other pending calls
+            self._coalescer.close()
+            self._reducer_calls.close()
+            self._one_off_queries.close()
+            
+            if self._callback_executor is not None:
+                self._db_interface.use_callback_executor(None)
+                self._callback_executor.shutdown(wait=False)
+                self._callback_executor = None
+            
             self.logger.debug("Shutdown: Clearing client state.")
             # Clear all state
             self.identity = None
@@ -505,6 +730,7 @@ class ModernSpacetimeDBClient:
             self.enhanced_identity_token = None
             self.active_subscriptions.clear()
             self.subscription_callbacks.clear()
+            self._subscription_tables.clear()
             self._connection_event_listeners.clear()
             
             # Clear message queue
@@ -580,6 +806,10 @@ class ModernSpacetimeDBClient:
                 self._simulate_test_connection()
                 return
             
+            if self._hub is not None:
+                # No processing thread to restart; just accept messages again
+                self.should_stop_processing.clear()
+            
             # Create WebSocket client
             self.ws_client = ModernWebSocketClient(
                 protocol=self.protocol,
@@ -588,8 +818,12 @@ class ModernSpacetimeDBClient:
                 on_error=self._handle_error,
                 on_message=self._handle_message,
                 auto_reconnect=True,
-                compression_config=self.compression_config
+                compression_config=self.compression_config,
+                dispatcher=self._hub.dispatcher if self._hub is not None else None,
+                message_dispatcher=self._hub_executor
             )
+            # Rows of registered tables decode straight into their row types
+            self.ws_client.decoder.row_decoder = self._db_interface.row_decoder
             
             # Connect
             self.auth_token = auth_token
@@ -657,6 +891,7 @@ class ModernSpacetimeDBClient:
             self.enhanced_identity_token = None
             self.active_subscriptions.clear()
             self.subscription_callbacks.clear()
+            self._subscription_tables.clear()
             self.logger.info("Client disconnect process complete.")
     
     # Enhanced connection management methods
@@ -676,7 +911,17 @@ class ModernSpacetimeDBClient:
     
     def get_connection_metrics(self) -> Dict[str, Any]:
         """Get connection metrics."""
-        return self.connection_metrics.get_connection_stats()
+        metrics = self.connection_metrics.get_connection_stats()
+        if self._callback_executor is not None:
+            metrics['callback_executor'] = self._callback_executor.get_metrics()
+        metrics['cache_memory'] = self._memory_tracker.get_stats()
+        if self._query_cache is not None:
+            metrics['query_cache'] = self._query_cache.get_stats()
+        if self._predictions.get_stats()['predicted']:
+            metrics['predictions'] = self._predictions.get_stats()
+        if self._coalescer.get_stats()['submitted']:
+            metrics['reducer_coalescing'] = self._coalescer.get_stats()
+        return metrics
     
     def get_identity_info(self) -> Optional[Dict[str, Any]]:
         """Get enhanced identity information."""
@@ -729,10 +974,27 @@ class ModernSpacetimeDBClient:
             # In test mode, return a mock request ID
             return generate_request_id()
         
+        if self._coalescer.policy(reducer_name) is not None:
+            request_id, _, _ = self._coalescer.submit(reducer_name, args, flags)
+            return request_id
+        
         # Encode arguments as JSON for now (BSATN in Task 4)
         args_json = json.dumps(args).encode('utf-8')
         
-        return self.ws_client.call_reducer(reducer_name, args_json, flags)
+        # Tracked and untracked calls share one ID sequence, so IDs never collide
+        request_id = self._reducer_calls.next_request_id()
+        if not self._predictions.has_predictor(reducer_name):
+            return self.ws_client.call_reducer(reducer_name, args_json, flags, request_id=request_id)
+        
+        # A predicted call is tracked so a timeout rolls its prediction back
+        future = self._reducer_calls.register(request_id, timeout=DEFAULT_PREDICTION_TIMEOUT,
+                                              description=f"Reducer call '{reducer_name}'")
+        self._predict_reducer_call(reducer_name, args, request_id, future)
+        try:
+            return self.ws_client.call_reducer(reducer_name, args_json, flags, request_id=request_id)
+        except Exception as e:
+            self._reducer_calls.fail(request_id, e)
+            raise
     
     async def call_reducer_async(
         self,
@@ -751,63 +1013,209 @@ class ModernSpacetimeDBClient:
             timeout: Timeout in seconds
             
         Returns:
-            The reducer result
+            The ReducerEvent of the call
             
         Raises:
             RuntimeError: If not connected
             asyncio.TimeoutError: If the call times out
-            Exception: If the reducer call fails
+            ReducerCallError: If the reducer call fails
         """
         if not self.ws_client or not self.ws_client.is_connected:
             raise RuntimeError("Not connected to SpacetimeDB")
         
         import asyncio
-        import uuid
         
-        # Generate a unique request ID for tracking
-        request_id = self.call_reducer(reducer_name, *args, flags=flags)
+        if self._coalescer.policy(reducer_name) is not None:
+            _, future, _ = self._coalescer.submit(reducer_name, args, flags, timeout)
+            return await asyncio.wrap_future(future)
         
-        # Create a future to wait for the result
-        result_future = asyncio.Future()
+        # Register before sending so an immediate answer finds its future
+        request_id = self._reducer_calls.next_request_id()
+        future = self._reducer_calls.register(request_id, timeout=timeout,
+                                              description=f"Reducer call '{reducer_name}'")
+        self._predict_reducer_call(reducer_name, args, request_id, future)
+        try:
+            args_json = json.dumps(args).encode('utf-8')
+            self.ws_client.call_reducer(reducer_name, args_json, flags, request_id=request_id)
+        except Exception as e:
+            self._reducer_calls.fail(request_id, e)
         
-        def handle_reducer_result(event):
-            """Handle reducer result event."""
-            if hasattr(event, 'request_id') and event.request_id == request_id:
-                if hasattr(event, 'status') and event.status == "success":
-                    if not result_future.done():
-                        result_future.set_result(getattr(event, 'result', None))
-                else:
-                    error_msg = getattr(event, 'message', 'Reducer call failed')
-                    if not result_future.done():
-                        result_future.set_exception(Exception(error_msg))
-            elif hasattr(event, 'reducer') and event.reducer == reducer_name:
-                # Fallback for events without request_id
-                if hasattr(event, 'status') and event.status == "success":
-                    if not result_future.done():
-                        result_future.set_result(getattr(event, 'result', None))
-                else:
-                    error_msg = getattr(event, 'message', 'Reducer call failed')
-                    if not result_future.done():
-                        result_future.set_exception(Exception(error_msg))
+        return await asyncio.wrap_future(future)
+    
+    def call_reducers(
+        self,
+        calls: List[Tuple[str, Sequence[Any]]],
+        flags: CallReducerFlags = CallReducerFlags.FULL_UPDATE,
+        timeout: Optional[float] = 30.0
+    ) -> List[Future]:
+        """
+        Call many reducers in one pipelined write.
+        
+        All calls are encoded first and sent back to back, so per-call
+        overhead stays small for large batches. Each call still gets its
+        own request ID and TransactionUpdate. Calls to reducers with a
+        coalescing policy are coalesced as by call_reducer() instead.
+        
+        Args:
+            calls: (reducer_name, args) pairs, args being a sequence
+            flags: Flags applied to every call
+            timeout: Seconds before an unanswered call's future fails
+            
+        Returns:
+            One concurrent.futures.Future per call, in order, resolved with
+            the call's ReducerEvent or failed with ReducerCallError or
+            asyncio.TimeoutError
+            
+        Raises:
+            RuntimeError: If not connected
+        """
+        if not self.ws_client or not self.ws_client.is_connected:
+            raise RuntimeError("Not connected to SpacetimeDB")
+        
+        results: List[Optional[Future]] = [None] * len(calls)
+        direct = []
+        for index, (reducer_name, args) in enumerate(calls):
+            if self._coalescer.policy(reducer_name) is not None:
+                results[index] = self._coalescer.submit(reducer_name, args, flags, timeout)[1]
+            else:
+                direct.append(index)
+        if not direct:
+            return results
+        
+        encoded = []
+        for index in direct:
+            reducer_name, args = calls[index]
+            encoded.append((reducer_name, json.dumps(list(args)).encode('utf-8'),
+                            self._reducer_calls.next_request_id()))
+        futures = self._reducer_calls.register_many(
+            [request_id for _, _, request_id in encoded], timeout,
+            [f"Reducer call '{reducer_name}'" for reducer_name, _, _ in encoded]
+        )
+        for index, (reducer_name, _, request_id), future in zip(direct, encoded, futures):
+            self._predict_reducer_call(reducer_name, calls[index][1], request_id, future)
+            results[index] = future
+        try:
+            self.ws_client.call_reducers(encoded, flags)
+        except Exception as e:
+            for _, _, request_id in encoded:
+                self._reducer_calls.fail(request_id, e)
+            raise
+        return results
+    
+    def set_coalescing_policy(self, reducer_name: str, policy: Optional[CoalescingPolicy]) -> None:
+        """
+        Coalesce bursts of calls to an idempotent reducer.
         
-        # Register temporary event handler
-        self.register_on_event(handle_reducer_result)
+        With DROP_DUPLICATES, a call identical to one sent within the
+        window is not sent; with LAST_PER_KEY, calls are held for the
+        window and only the last one per key is sent. Callers of coalesced
+        calls get the outcome of the call that was sent.
         
+        Args:
+            reducer_name: Reducer whose calls are coalesced
+            policy: Coalescing policy, or None to send every call again
+                (held calls are sent first)
+        """
+        self._coalescer.set_policy(reducer_name, policy)
+    
+    def flush_coalesced_calls(self) -> int:
+        """Send held coalesced calls now instead of at the end of their window."""
+        return self._coalescer.flush()
+    
+    def _register_reducer_call(self, reducer_name: str, timeout: Optional[float]) -> Tuple[int, Future]:
+        """Allocate the request ID and future of a coalesced call."""
+        request_id = self._reducer_calls.next_request_id()
+        return request_id, self._reducer_calls.register(request_id, timeout=timeout,
+                                                        description=f"Reducer call '{reducer_name}'")
+    
+    def _send_coalesced_calls(self, calls: List[CoalescedCall]) -> None:
+        """Send the surviving calls of coalesced bursts, runs of equal flags in one write."""
         try:
-            # Wait for the result with timeout
-            result = await asyncio.wait_for(result_future, timeout=timeout)
-            return result
-        except asyncio.TimeoutError:
-            raise asyncio.TimeoutError(f"Reducer call '{reducer_name}' timed out after {timeout} seconds")
-        finally:
-            # Clean up the event handler
-            if handle_reducer_result in self._on_event:
-                self._on_event.remove(handle_reducer_result)
+            if not self.ws_client or not self.ws_client.is_connected:
+                raise RuntimeError("Not connected to SpacetimeDB")
+            for call in calls:
+                self._predict_reducer_call(call.reducer_name, call.args, call.request_id, call.future)
+            start = 0
+            while start < len(calls):
+                end = start + 1
+                while end < len(calls) and calls[end].flags == calls[start].flags:
+                    end += 1
+                self.ws_client.call_reducers(
+                    [(call.reducer_name, call.args_json, call.request_id) for call in calls[start:end]],
+                    calls[start].flags
+                )
+                start = end
+        except Exception as e:
+            for call in calls:
+                self._reducer_calls.fail(call.request_id, e)
+            raise
+    
+    def register_predictor(self, reducer_name: str, predictor: Predictor) -> None:
+        """
+        Apply the expected effects of a reducer's calls to the cache at once.
+        
+        The predictor is called with a CacheSnapshot and the call's
+        arguments and returns PredictedChange objects; deleted rows must
+        be full rows (e.g. taken from the snapshot). The changes are
+        visible in conn.db as soon as the call is sent. The call's
+        TransactionUpdate replaces them with the server's rows; a
+        prediction that did not hold is reported to the callbacks of
+        register_on_prediction_rollback().
+        
+        Args:
+            reducer_name: Reducer whose calls are predicted
+            predictor: Returns the expected changes of one call
+        """
+        self._predictions.register(reducer_name, predictor)
+    
+    def unregister_predictor(self, reducer_name: str) -> bool:
+        """Stop predicting a reducer's calls."""
+        return self._predictions.unregister(reducer_name)
+    
+    def register_on_prediction_rollback(self, callback: Callable[[PredictionOutcome], None]) -> None:
+        """Register a callback for predictions corrected or undone by the server's answer."""
+        self._predictions.add_listener(callback)
+    
+    def _predict_reducer_call(self, reducer_name: str, args: Sequence[Any], request_id: int,
+                              future: Future) -> None:
+        """Apply the prediction of a call, undone if its future fails before the answer."""
+        if not self._predictions.predict(reducer_name, request_id, args):
+            return
+        # Answered calls have their prediction settled before the future resolves
+        future.add_done_callback(lambda done: self._predictions.rollback(
+            request_id, None if done.cancelled() else done.exception()))
+    
+    async def call_reducers_async(
+        self,
+        calls: List[Tuple[str, Sequence[Any]]],
+        flags: CallReducerFlags = CallReducerFlags.FULL_UPDATE,
+        timeout: Optional[float] = 30.0,
+        return_exceptions: bool = False
+    ) -> List[Any]:
+        """
+        Call many reducers in one pipelined write and wait for all results.
+        
+        Args:
+            calls: (reducer_name, args) pairs, args being a sequence
+            flags: Flags applied to every call
+            timeout: Seconds before an unanswered call fails
+            return_exceptions: Return failures in the result list instead
+                of raising the first one (as asyncio.gather does)
+            
+        Returns:
+            The ReducerEvent of each call, in order
+        """
+        import asyncio
+        
+        futures = self.call_reducers(calls, flags=flags, timeout=timeout)
+        return await asyncio.gather(*(asyncio.wrap_future(future) for future in futures),
+                                    return_exceptions=return_exceptions)
     
     def subscribe(self, queries: List[str]) -> int:
         """Subscribe to queries (legacy method)."""
         if not self.is_connected:
             raise RuntimeError("Not connected to SpacetimeDB")
+        self._check_memory_budget(queries)
         
         if self.test_mode:
             # In test mode, return a mock request ID
@@ -819,20 +1227,16 @@ class ModernSpacetimeDBClient:
         """Subscribe to a single query with QueryId tracking."""
         if not self.is_connected:
             raise RuntimeError("Not connected to SpacetimeDB")
+        self._check_memory_budget([query])
         
         if self.test_mode:
             # In test mode, create and track a mock QueryId
             query_id = QueryId(generate_request_id())
-            with self._lock:
-                self.active_subscriptions[query_id] = [query]
-                self.subscription_callbacks[query_id] = []
+            self._track_subscription(query_id, [query])
             return query_id
         
         query_id = self.ws_client.subscribe_single(query)
-        
-        with self._lock:
-            self.active_subscriptions[query_id] = [query]
-            self.subscription_callbacks[query_id] = []
+        self._track_subscription(query_id, [query])
         
         return query_id
     
@@ -840,20 +1244,16 @@ class ModernSpacetimeDBClient:
         """Subscribe to multiple queries with QueryId tracking."""
         if not self.is_connected:
             raise RuntimeError("Not connected to SpacetimeDB")
+        self._check_memory_budget(queries)
         
         if self.test_mode:
             # In test mode, create and track a mock QueryId
             query_id = QueryId(generate_request_id())
-            with self._lock:
-                self.active_subscriptions[query_id] = queries
-                self.subscription_callbacks[query_id] = []
+            self._track_subscription(query_id, queries)
             return query_id
         
         query_id = self.ws_client.subscribe_multi(queries)
-        
-        with self._lock:
-            self.active_subscriptions[query_id] = queries
-            self.subscription_callbacks[query_id] = []
+        self._track_subscription(query_id, queries)
         
         return query_id
     
@@ -869,11 +1269,81 @@ class ModernSpacetimeDBClient:
                 del self.subscription_callbacks[query_id]
         
         if self.test_mode:
-            # In test mode, return a mock request ID
+            # No server round trip in test mode: release cached rows now
+            self._release_subscription(query_id)
             return generate_request_id()
         
         return self.ws_client.unsubscribe(query_id)
     
+    def _check_memory_budget(self, queries: List[str]) -> None:
+        """Raise MemoryBudgetExceededError if the queries could grow an exceeded budget."""
+        tables = {match for query in queries for match in _QUERY_TABLE_PATTERN.findall(query)}
+        self._memory_tracker.check_subscription(tables or None)
+    
+    def _track_subscription(self, query_id: QueryId, queries: List[str]) -> None:
+        """Record a subscription's queries and the tables they read."""
+        tables = {
+            match.lower()
+            for query in queries
+            for match in _QUERY_TABLE_PATTERN.findall(query)
+        }
+        with self._lock:
+            self.active_subscriptions[query_id] = queries
+            self.subscription_callbacks[query_id] = []
+            self._subscription_tables[self._subscription_key(query_id)] = tables
+    
+    @staticmethod
+    def _subscription_key(query_id: Any) -> QueryId:
+        """Normalize protocol and client QueryIds to one hashable owner key."""
+        return QueryId(getattr(query_id, 'id', query_id))
+    
+    def _subscriptions_for_table(self, table_name: str) -> List[QueryId]:
+        """Get the subscriptions whose queries read a table."""
+        name = table_name.lower()
+        with self._lock:
+            return [
+                query_id for query_id, tables in self._subscription_tables.items()
+                if name in tables
+            ]
+    
+    def _release_subscription(self, query_id: Any, table_updates: Optional[List[Any]] = None) -> AppliedTransaction:
+        """
+        Drop a subscription's references to cached rows.
+        
+        Rows no other subscription still holds are evicted, and delete
+        callbacks fire for them.
+        
+        Args:
+            query_id: Subscription being removed
+            table_updates: The rows the server retracted for it; without
+                them the references recorded for the subscription are released
+        """
+        key = self._subscription_key(query_id)
+        with self._lock:
+            self._subscription_tables.pop(key, None)
+        if table_updates is None:
+            applied = self._row_cache.release(key)
+        else:
+            applied = self._apply_to_cache(
+                [update for update in table_updates if update is not None], owner=key)
+            self._row_cache.forget(key)
+        if applied.tables:
+            event_context = create_event_context(timestamp=time.time())
+            for change in applied.tables.values():
+                if not change.deletes:
+                    continue
+                self._table_event_processor.process_table_update(
+                    TableUpdate(
+                        table_id=0,
+                        table_name=change.table_name,
+                        num_rows=len(change.deletes),
+                        inserts=[],
+                        deletes=change.deletes
+                    ),
+                    event_context
+                )
+        return applied
+    
     def one_off_query(self, query: str) -> bytes:
         """Execute a one-off query."""
         if not self.is_connected:
@@ -885,6 +1355,177 @@ class ModernSpacetimeDBClient:
         
         return self.ws_client.one_off_query(query)
     
+    def query(self, sql: str, timeout: Optional[float] = 30.0) -> OneOffQueryResult:
+        """
+        Run a one-off SQL query over the connection and wait for its rows.
+        
+        Must not be called from a message callback, whose thread delivers
+        the response.
+        
+        Args:
+            sql: SQL query string
+            timeout: Seconds to wait for the response (None: wait indefinitely)
+            
+        Returns:
+            The decoded rows, per table
+            
+        Raises:
+            RuntimeError: If not connected, or called on the message thread
+            asyncio.TimeoutError: If the query times out
+            OneOffQueryError: If the server rejects the query
+        """
+        self._ensure_not_message_thread("query")
+        return self.send_one_off_query(sql, timeout).result()
+    
+    async def query_async(self, sql: str, timeout: Optional[float] = 30.0) -> OneOffQueryResult:
+        """
+        Run a one-off SQL query over the connection and await its rows.
+        
+        Any number of queries may be in flight at once; each response is
+        matched to its query by message ID.
+        
+        Args:
+            sql: SQL query string
+            timeout: Seconds to wait for the response (None: wait indefinitely)
+            
+        Returns:
+            The decoded rows, per table
+            
+        Raises:
+            RuntimeError: If not connected
+            asyncio.TimeoutError: If the query times out
+            OneOffQueryError: If the server rejects the query
+        """
+        import asyncio
+        
+        return await asyncio.wrap_future(self.send_one_off_query(sql, timeout))
+    
+    def send_one_off_query(self, sql: str, timeout: Optional[float] = 30.0,
+                           use_cache: bool = True) -> Future:
+        """
+        Send a one-off SQL query without waiting for it.
+        
+        With the query cache enabled, a cached result is returned without
+        a round trip unless use_cache is False.
+        
+        Returns:
+            concurrent.futures.Future resolved with a OneOffQueryResult
+        """
+        return self._send_one_off_query(sql, timeout, use_cache=use_cache)
+    
+    def query_batches(self, sql: str, batch_size: int = DEFAULT_BATCH_SIZE,
+                      timeout: Optional[float] = 30.0) -> Iterator[Tuple[str, List[Any]]]:
+        """
+        Run a one-off SQL query and decode its rows batch by batch.
+        
+        The query is sent on the first next(). Raw rows are released as
+        their batch is decoded, so a large result is never held decoded
+        all at once. Results are not cached.
+        
+        Args:
+            sql: SQL query string
+            batch_size: Rows per batch
+            timeout: Seconds to wait for the response
+            
+        Yields:
+            (table_name, rows) batches in response order
+        """
+        self._ensure_not_message_thread("query_batches")
+        response = self._send_one_off_query(sql, timeout, use_cache=False, raw=True).result()
+        yield from iter_row_batches(response, self._db_interface.decode_rows, batch_size)
+    
+    async def query_batches_async(self, sql: str, batch_size: int = DEFAULT_BATCH_SIZE,
+                                  timeout: Optional[float] = 30.0) -> AsyncIterator[Tuple[str, List[Any]]]:
+        """Async version of query_batches()."""
+        import asyncio
+        
+        response = await asyncio.wrap_future(
+            self._send_one_off_query(sql, timeout, use_cache=False, raw=True))
+        for batch in iter_row_batches(response, self._db_interface.decode_rows, batch_size):
+            yield batch
+    
+    def query_pages(self, sql: str, key_column: str, page_size: int = DEFAULT_PAGE_SIZE,
+                    timeout: Optional[float] = 30.0) -> Iterator[List[Any]]:
+        """
+        Read a large query in keyset pages of bounded size.
+        
+        Each page is its own one-off query ("... WHERE key_column > last
+        ORDER BY key_column LIMIT page_size"). The next page is requested
+        as soon as a page arrives, before it is handed out, so fetching
+        overlaps with processing and at most two pages are held.
+        
+        Args:
+            sql: SELECT ... FROM table [WHERE ...] without ORDER BY or LIMIT
+            key_column: Unique column to page by
+            page_size: Rows per page
+            timeout: Seconds to wait for each page
+            
+        Yields:
+            Lists of decoded rows, in key order
+        """
+        self._ensure_not_message_thread("query_pages")
+        future = self._send_one_off_query(keyset_page_sql(sql, key_column, None, page_size),
+                                          timeout, use_cache=False)
+        key = column_getter(key_column)
+        while future is not None:
+            page = future.result().rows
+            future = None
+            if len(page) >= page_size:
+                future = self._send_one_off_query(
+                    keyset_page_sql(sql, key_column, key(page[-1]), page_size), timeout, use_cache=False)
+            if page:
+                yield page
+    
+    async def query_pages_async(self, sql: str, key_column: str, page_size: int = DEFAULT_PAGE_SIZE,
+                                timeout: Optional[float] = 30.0) -> AsyncIterator[List[Any]]:
+        """Async version of query_pages()."""
+        import asyncio
+        
+        future = self._send_one_off_query(keyset_page_sql(sql, key_column, None, page_size),
+                                          timeout, use_cache=False)
+        key = column_getter(key_column)
+        while future is not None:
+            page = (await asyncio.wrap_future(future)).rows
+            future = None
+            if len(page) >= page_size:
+                future = self._send_one_off_query(
+                    keyset_page_sql(sql, key_column, key(page[-1]), page_size), timeout, use_cache=False)
+            if page:
+                yield page
+    
+    def _ensure_not_message_thread(self, method: str) -> None:
+        """Refuse a blocking wait on the thread that would deliver its answer."""
+        if (threading.current_thread() is self.processing_thread
+                or (self._hub is not None and self._hub.on_worker_thread(self))):
+            raise RuntimeError(f"{method}() would block the message thread; use its async version")
+    
+    def _send_one_off_query(self, sql: str, timeout: Optional[float], use_cache: bool = True,
+                            raw: bool = False) -> Future:
+        """Send a one-off query; raw futures get the undecoded OneOffQueryResponse."""
+        cache = self._query_cache
+        if cache is not None and use_cache:
+            cached = cache.get(sql)
+            if cached is not None:
+                future = Future()
+                future.set_result(cached)
+                return future
+        
+        if not self.ws_client or not self.ws_client.is_connected:
+            raise RuntimeError("Not connected to SpacetimeDB")
+        
+        # Register before sending so an immediate answer finds its future
+        request_id = self._one_off_queries.next_request_id()
+        self._one_off_query_info[request_id] = (sql, cache.epoch() if cache is not None else 0, raw)
+        future = self._one_off_queries.register(request_id, timeout=timeout,
+                                                description=f"One-off query {sql[:50]!r}")
+        future.add_done_callback(lambda _: self._one_off_query_info.pop(request_id, None))
+        try:
+            self.ws_client.execute_one_off_query(sql, message_id=encode_message_id(request_id))
+        except Exception as e:
+            self._one_off_queries.fail(request_id, e)
+            raise
+        return future
+    
     def subscription_builder(self) -> 'AdvancedSubscriptionBuilder':
         """
         Create a new subscription builder for fluent API configuration.
@@ -1163,6 +1804,11 @@ class ModernSpacetimeDBClient:
     
     def _handle_message(self, message: ServerMessage) -> None:
         """Handle incoming server message from WebSocketClient by putting it on the queue."""
+        if self._hub is not None:
+            # Already on this client's hub worker, which keeps messages in order
+            if not self.should_stop_processing.is_set():
+                self._handle_server_message(message)
+            return
         if not self.should_stop_processing.is_set():
             try:
                 self.message_queue.put(message)
@@ -1221,6 +1867,10 @@ class ModernSpacetimeDBClient:
             self._handle_subscribe_applied(message)
         elif isinstance(message, UnsubscribeApplied):
             self._handle_unsubscribe_applied(message)
+        elif isinstance(message, SubscribeMultiApplied):
+            self._handle_subscribe_multi_applied(message)
+        elif isinstance(message, UnsubscribeMultiApplied):
+            self._handle_unsubscribe_multi_applied(message)
         elif isinstance(message, SubscriptionError):
             self._handle_subscription_error(message)
         elif isinstance(message, OneOffQueryResponse):
@@ -1293,22 +1943,37 @@ class ModernSpacetimeDBClient:
     
     def _handle_transaction_update(self, message: TransactionUpdate) -> None:
         """Handle transaction update message."""
+        interner = self._db_interface.interner
+        if interner is not None:
+            message.caller_identity = interner.identity(message.caller_identity)
+            message.caller_connection_id = interner.identity(message.caller_connection_id)
+        status = "success" if self._transaction_committed(message.status) else "error"
+        
         # Create legacy reducer event for backward compatibility
         reducer_event = ReducerEvent(
             caller_identity=message.caller_identity,
             caller_connection_id=message.caller_connection_id,
             reducer_name=message.reducer_call.reducer_name,
-            status="success" if isinstance(message.status, dict) else "error",
+            status=status,
             message=str(message.status) if isinstance(message.status, str) else "",
             args={},  # TODO: Decode args
             energy_used=message.energy_quanta_used.quanta,
             execution_duration_nanos=message.total_host_execution_duration.nanos
         )
         
+        # Take this connection's predicted effects of the call before completing it
+        request_id = self._own_call_request_id(message)
+        prediction = None
+        if request_id is not None:
+            prediction = self._predictions.pop(request_id, message.reducer_call.reducer_name)
+        
+        # Complete this connection's own awaited call, if any
+        self._resolve_reducer_call(message, reducer_event)
+        
         # Create advanced reducer event
         advanced_reducer_event = create_reducer_event(
             reducer_name=message.reducer_call.reducer_name,
-            status="success" if isinstance(message.status, dict) else "error",
+            status=status,
             caller_identity=message.caller_identity,
             caller_connection_id=message.caller_connection_id,
             args={},  # TODO: Decode args
@@ -1332,7 +1997,7 @@ class ModernSpacetimeDBClient:
             reducer_name=message.reducer_call.reducer_name,
             args={},  # TODO: Decode args
             sender=str(message.caller_identity) if message.caller_identity else None,
-            status="success" if isinstance(message.status, dict) else "error", 
+            status=status, 
             message=str(message.status) if isinstance(message.status, str) else None,
             request_id=getattr(message.reducer_call, 'request_id', None)
         )
@@ -1343,9 +2008,17 @@ class ModernSpacetimeDBClient:
             timestamp=time.time() if hasattr(time, 'time') else None
         )
         
+        # Rows of a committed transaction, decoded from its status
+        database_update = message.database_update
+        if database_update is None and isinstance(message.status, DatabaseUpdate):
+            database_update = message.status
+        
         # Process table updates through table interface
-        if hasattr(message, 'database_update') and message.database_update:
-            for table_update in message.database_update.tables:
+        if database_update:
+            # Make the whole transaction visible to readers before callbacks run
+            self._apply_to_cache(database_update.tables, prediction=prediction)
+            
+            for table_update in database_update.tables:
                 # Process through table interface for new callbacks
                 self._table_event_processor.process_table_update(
                     table_update,
@@ -1357,6 +2030,9 @@ class ModernSpacetimeDBClient:
                 
                 # Also process through legacy system for backward compatibility
                 self._process_table_update(table_update)
+        elif prediction is not None:
+            self._predictions.settle(prediction, [], committed=status == "success",
+                                     error=None if status == "success" else reducer_event.message)
         
         # Call legacy event callbacks
         for callback in self._on_event:
@@ -1380,11 +2056,40 @@ class ModernSpacetimeDBClient:
                 except Exception as e:
                     self.logger.error(f"Error in reducer callback: {e}")
     
+    @staticmethod
+    def _transaction_committed(status: Any) -> bool:
+        """Whether a TransactionUpdate status reports a committed transaction."""
+        return update_status_committed(status)
+    
+    def _resolve_reducer_call(self, message: TransactionUpdate, reducer_event: ReducerEvent) -> None:
+        """Resolve the future of a call_reducer_async() call answered by a transaction update."""
+        request_id = self._own_call_request_id(message)
+        if request_id is None or not self._reducer_calls.is_pending(request_id):
+            return
+        if reducer_event.status == "success":
+            self._reducer_calls.resolve(request_id, reducer_event)
+        else:
+            self._reducer_calls.fail(request_id, ReducerCallError(
+                reducer_event.message or "Reducer call failed",
+                reducer_name=reducer_event.reducer_name,
+                request_id=request_id
+            ))
+    
+    def _own_call_request_id(self, message: TransactionUpdate) -> Optional[int]:
+        """Request ID of a transaction update answering this connection's own call."""
+        request_id = getattr(message.reducer_call, 'request_id', None)
+        # Request IDs are per connection: updates for other callers reuse them
+        if self.connection_id is not None and message.caller_connection_id != self.connection_id:
+            return None
+        return request_id
+    
     def _handle_transaction_update_light(self, message: TransactionUpdateLight) -> None:
         """Handle lightweight transaction update."""
         # Create minimal event context for table callbacks
         event_context = create_event_context(timestamp=time.time())
         
+        self._apply_to_cache(message.update.tables)
+        
         # Process table updates
         for table_update in message.update.tables:
             # Process through table interface for new callbacks
@@ -1400,9 +2105,39 @@ class ModernSpacetimeDBClient:
         self.logger.info(f"Subscription applied for query {message.query_id.id}")
         
         # Process initial table data
-        self._process_table_update(message.table_rows)
+        if message.table_rows is not None:
+            self._apply_to_cache([message.table_rows], owner=self._subscription_key(message.query_id))
+            self._process_table_update(message.table_rows)
+        
+        self._notify_subscription_applied()
+    
+    def _handle_subscribe_multi_applied(self, message: SubscribeMultiApplied) -> None:
+        """Handle subscribe multi applied message."""
+        self.logger.info(f"Multi-subscription applied for query {message.query_id.id}")
+        
+        tables = message.update.tables if message.update else []
+        # Rows already cached for an overlapping subscription only gain a reference
+        applied = self._apply_to_cache(tables, owner=self._subscription_key(message.query_id))
+        event_context = create_event_context(timestamp=time.time())
+        for change in applied.tables.values():
+            if change.inserts:
+                self._table_event_processor.process_table_update(
+                    TableUpdate(
+                        table_id=0,
+                        table_name=change.table_name,
+                        num_rows=len(change.inserts),
+                        inserts=change.inserts,
+                        deletes=[]
+                    ),
+                    event_context
+                )
+        for table_update in tables:
+            self._process_table_update(table_update)
         
-        # Call subscription applied callbacks
+        self._notify_subscription_applied()
+    
+    def _notify_subscription_applied(self) -> None:
+        """Call subscription applied callbacks."""
         for callback in self._on_subscription_applied:
             try:
                 callback()
@@ -1412,6 +2147,15 @@ class ModernSpacetimeDBClient:
     def _handle_unsubscribe_applied(self, message: UnsubscribeApplied) -> None:
         """Handle unsubscribe applied message."""
         self.logger.info(f"Unsubscription applied for query {message.query_id.id}")
+        # Each retracted row drops one reference: rows still delivered for
+        # other subscriptions stay cached
+        self._release_subscription(message.query_id, [message.table_rows])
+    
+    def _handle_unsubscribe_multi_applied(self, message: UnsubscribeMultiApplied) -> None:
+        """Handle unsubscribe multi applied message."""
+        self.logger.info(f"Multi-unsubscription applied for query {message.query_id.id}")
+        tables = message.update.tables if message.update else []
+        self._release_subscription(message.query_id, tables)
     
     def _handle_subscription_error(self, message: SubscriptionError) -> None:
         """Handle subscription error message."""
@@ -1421,13 +2165,59 @@ class ModernSpacetimeDBClient:
         # This might involve removing failed subscriptions and notifying callbacks
     
     def _handle_one_off_query_response(self, message: OneOffQueryResponse) -> None:
-        """Handle one-off query response."""
+        """Handle one-off query response, resolving the query's future."""
         if message.error:
             self.logger.error(f"One-off query error: {message.error}")
         else:
             self.logger.info(f"One-off query completed with {len(message.tables)} tables")
         
-        # TODO: Provide a way for applications to receive one-off query results
+        request_id = decode_message_id(message.message_id)
+        if request_id is None or not self._one_off_queries.is_pending(request_id):
+            return
+        query, sent_epoch, raw = self._one_off_query_info.get(request_id, ("", 0, False))
+        if message.error:
+            self._one_off_queries.fail(request_id, OneOffQueryError(message.error, query))
+            return
+        if raw:
+            # Decoded batch by batch by its consumer
+            self._one_off_queries.resolve(request_id, message)
+            return
+        
+        tables: Dict[str, List[Any]] = {}
+        for table in message.tables:
+            rows = self._db_interface.decode_rows(table.table_name, table.rows)
+            tables.setdefault(table.table_name, []).extend(rows)
+        result = OneOffQueryResult(
+            query=query,
+            tables=tables,
+            total_host_execution_duration_micros=message.total_host_execution_duration.nanos // 1000
+        )
+        
+        cache = self._query_cache
+        if cache is not None and query:
+            read_tables = set(_QUERY_TABLE_PATTERN.findall(query))
+            subscribed = bool(read_tables) and all(
+                self._subscriptions_for_table(table) for table in read_tables
+            )
+            cache.put(query, result, read_tables, since=sent_epoch, subscribed=subscribed)
+        self._one_off_queries.resolve(request_id, result)
+    
+    def _apply_to_cache(self, table_updates, owner: Optional[QueryId] = None,
+                        prediction: Any = None) -> AppliedTransaction:
+        """
+        Apply the table updates of one transaction to the row cache atomically.
+        
+        Args:
+            table_updates: Table updates of the transaction
+            owner: Subscription that delivered the rows, if known
+            prediction: Predicted effects the transaction settles, if any
+        """
+        for table_update in table_updates:
+            if table_update is not None:
+                self._db_interface.decode_table_update(table_update)
+        if prediction is not None:
+            return self._predictions.settle(prediction, table_updates)
+        return self._row_cache.apply(table_updates, owner=owner)
     
     def _process_table_update(self, table_update) -> None:
         """Process a table update and trigger callbacks."""
@@ -1639,7 +2429,14 @@ class ModernSpacetimeDBClient:
             
             try:
                 # Call the reducer
-                request_id = self.call_reducer(reducer_name, *args, flags=flags)
+                if self._coalescer.policy(reducer_name) is not None and not self.test_mode:
+                    request_id, _, absorbed = self._coalescer.submit(reducer_name, args, flags)
+                    if absorbed:
+                        # Coalesced into another call: nothing reaches the server
+                        self.energy_budget_manager.release_energy(reservation_id)
+                        return request_id
+                else:
+                    request_id = self.call_reducer(reducer_name, *args, flags=flags)
                 
                 # On success, consume energy and budget
                 duration = time.time() - start_time
@@ -1975,9 +2772,13 @@ class ModernSpacetimeDBClient:
         
         # Register tables with table interface
         for table_name, metadata in module.tables.items():
+            # Tables without a dedicated row class get a compact generated one
+            row_type = metadata.row_type
+            if row_type in (None, dict) and isinstance(metadata.algebraic_type, ProductType):
+                row_type = metadata.algebraic_type
             self.register_table(
                 table_name=table_name,
-                row_type=metadata.row_type,
+                row_type=row_type,
                 primary_key=metadata.primary_key,
                 unique_columns=metadata.unique_columns
             )
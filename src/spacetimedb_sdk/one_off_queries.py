@@ -0,0 +1,329 @@
+"""
+One-off query results for SpacetimeDB Python SDK.
+
+conn.query() and conn.query_async() run SQL over the WebSocket connection
+and return the rows, without a subscription or the HTTP SQL endpoint:
+- Each query's OneOffQueryMessage.message_id carries a request ID, so
+  responses are matched to their futures however many queries are in flight
+- Rows are decoded like subscription rows: into the table's compact row
+  type when it is registered, with interning applied
+- An opt-in OneOffQueryCache serves repeated queries locally, keyed by
+  normalized SQL, with a TTL and LRU eviction; entries are dropped as
+  soon as a transaction touches one of their (subscribed) tables
+- Large results can be consumed in batches (query_batches(), decoding
+  rows as they are handed out) or in keyset pages (query_pages(), one
+  bounded query per page, the next requested before the current one is
+  handed out)
+
+Example:
+    result = conn.query("SELECT * FROM users WHERE online = true", timeout=5.0)
+    for user in result.rows:
+        print(user.name)
+
+    result = await conn.query_async("SELECT * FROM messages")
+    result.table("messages")
+
+    conn.enable_query_cache(max_size=500, ttl=10.0)
+    conn.query_cache.get_stats()['hit_ratio']
+
+    for page in conn.query_pages("SELECT * FROM events", key_column="id", page_size=10000):
+        export(page)
+"""
+
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, List, Optional, Set, Tuple
+
+from .data_structures import LRUCache
+from .exceptions import SpacetimeDBError
+
+# Bytes of request ID in a one-off query's message ID
+MESSAGE_ID_BYTES = 16
+
+# Query cache defaults: entries kept and seconds an entry stays valid
+DEFAULT_QUERY_CACHE_SIZE = 1000
+DEFAULT_QUERY_CACHE_TTL = 30.0
+
+# Rows decoded per batch by query_batches(), and rows per query_pages() page
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_PAGE_SIZE = 10000
+
+# Quoted literals (kept verbatim) or runs of whitespace (collapsed)
+_SQL_TOKEN_PATTERN = re.compile(r"""('(?:[^']|'')*'|"(?:[^"]|"")*")|\s+""")
+_WHERE_PATTERN = re.compile(r"\bWHERE\b", re.IGNORECASE)
+_PAGE_UNSAFE_PATTERN = re.compile(r"\b(?:LIMIT|ORDER\s+BY)\b", re.IGNORECASE)
+
+
+def encode_message_id(request_id: int) -> bytes:
+    """Message ID of the one-off query with the given request ID."""
+    return request_id.to_bytes(MESSAGE_ID_BYTES, "big")
+
+
+def decode_message_id(message_id: bytes) -> Optional[int]:
+    """Request ID carried by a message ID, or None if it is not one of ours."""
+    if len(message_id) != MESSAGE_ID_BYTES:
+        return None
+    return int.from_bytes(message_id, "big")
+
+
+class OneOffQueryError(SpacetimeDBError):
+    """Raised when the server rejects a one-off query."""
+
+    def __init__(self, message: str, query: str = ""):
+        super().__init__(
+            message,
+            error_code="ONE_OFF_QUERY_FAILED",
+            diagnostic_info={'query': query}
+        )
+        self.query = query
+
+
+@dataclass
+class OneOffQueryResult:
+    """Rows returned by a one-off query, per table."""
+    query: str
+    tables: Dict[str, List[Any]] = field(default_factory=dict)
+    total_host_execution_duration_micros: int = 0
+
+    @property
+    def rows(self) -> List[Any]:
+        """Rows of every table, in response order."""
+        if len(self.tables) == 1:
+            return next(iter(self.tables.values()))
+        return [row for rows in self.tables.values() for row in rows]
+
+    def table(self, table_name: str) -> List[Any]:
+        """Rows of one table (empty if the result has none)."""
+        return self.tables.get(table_name, [])
+
+    def __len__(self) -> int:
+        return sum(len(rows) for rows in self.tables.values())
+
+    def __iter__(self):
+        return iter(self.rows)
+
+
+def normalize_sql(sql: str) -> str:
+    """
+    Cache key of a query: whitespace outside quoted literals collapsed,
+    trailing semicolons dropped. Identifier and literal case is kept.
+    """
+    normalized = _SQL_TOKEN_PATTERN.sub(lambda match: match.group(1) or " ", sql).strip()
+    return normalized.rstrip(";").rstrip()
+
+
+class OneOffQueryCache:
+    """
+    LRU cache of one-off query results keyed by normalized SQL.
+
+    Entries expire after ttl seconds. Entries whose tables are all
+    subscribed are also invalidated by invalidate_tables() as
+    transactions touch those tables, so they are never stale; the client
+    calls it for every transaction applied to its row cache. Results are
+    shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_QUERY_CACHE_SIZE,
+                 ttl: Optional[float] = DEFAULT_QUERY_CACHE_TTL,
+                 subscribed_only: bool = False):
+        """
+        Create an empty cache.
+
+        Args:
+            max_size: Results kept; the least recently used go first
+            ttl: Seconds a result stays valid (None: until invalidated)
+            subscribed_only: Only cache queries whose tables are all
+                subscribed, so every entry is invalidated precisely
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        if ttl is None and not subscribed_only:
+            raise ValueError("ttl is required unless subscribed_only is set")
+        self._entries: LRUCache = LRUCache(max_size=max_size, ttl=ttl)
+        self._max_size = max_size
+        self._ttl = ttl
+        self.subscribed_only = subscribed_only
+        self._lock = threading.Lock()
+        # Lowercased table name -> keys of entries reading it
+        self._keys_by_table: Dict[str, Set[str]] = {}
+        self._tables_by_key: Dict[str, FrozenSet[str]] = {}
+        # Invalidation counter, and its value when each table was last invalidated
+        self._epoch = 0
+        self._table_epochs: Dict[str, int] = {}
+        self._invalidations = 0
+        self._rejected = 0
+
+    def epoch(self) -> int:
+        """Invalidation counter to pass to put() for a query about to be sent."""
+        return self._epoch
+
+    def get(self, sql: str) -> Optional[OneOffQueryResult]:
+        """Get the cached result of a query, counting a hit or a miss."""
+        return self._entries.get(normalize_sql(sql))
+
+    def put(self, sql: str, result: OneOffQueryResult, tables: Iterable[str],
+            since: Optional[int] = None, subscribed: bool = True) -> bool:
+        """
+        Cache the result of a query.
+
+        Args:
+            sql: Query string
+            result: Its result
+            tables: Tables the query reads
+            since: epoch() taken when the query was sent; a result that
+                raced a write to one of its tables is not cached
+            subscribed: Whether every table is covered by a subscription
+
+        Returns:
+            True if the result was cached
+        """
+        key = normalize_sql(sql)
+        tables = frozenset(table.lower() for table in tables)
+        with self._lock:
+            if (self.subscribed_only and not subscribed) or (since is not None and any(
+                    self._table_epochs.get(table, 0) > since for table in tables)):
+                self._rejected += 1
+                return False
+            self._index(key, tables)
+            self._entries.set(key, result)
+        return True
+
+    def invalidate_tables(self, tables: Iterable[str]) -> int:
+        """
+        Drop every entry reading any of the tables.
+
+        Returns:
+            Number of entries dropped
+        """
+        dropped = 0
+        with self._lock:
+            self._epoch += 1
+            for table in tables:
+                table = table.lower()
+                self._table_epochs[table] = self._epoch
+                for key in self._keys_by_table.pop(table, ()):
+                    self._unindex(key)
+                    if self._entries.delete(key):
+                        dropped += 1
+            self._invalidations += dropped
+        return dropped
+
+    def invalidate(self, sql: str) -> bool:
+        """Drop the entry of one query."""
+        key = normalize_sql(sql)
+        with self._lock:
+            self._unindex(key)
+            return self._entries.delete(key)
+
+    def clear(self) -> None:
+        """Drop every entry and reset the hit counters."""
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_table.clear()
+            self._tables_by_key.clear()
+
+    def __len__(self) -> int:
+        return self._entries.size()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Hits, misses, hit ratio, size and invalidation counts."""
+        metrics = self._entries.get_metrics()
+        return {
+            'hits': metrics['hit_count'],
+            'misses': metrics['miss_count'],
+            'hit_ratio': metrics['hit_ratio'],
+            'entries': metrics['current_size'],
+            'max_size': self._max_size,
+            'ttl': self._ttl,
+            'invalidations': self._invalidations,
+            'rejected': self._rejected,
+        }
+
+    def _index(self, key: str, tables: FrozenSet[str]) -> None:
+        self._unindex(key)
+        self._tables_by_key[key] = tables
+        for table in tables:
+            self._keys_by_table.setdefault(table, set()).add(key)
+        if len(self._tables_by_key) > 2 * self._max_size:
+            # Evicted and expired entries leave index entries behind
+            for stale in [k for k in self._tables_by_key if k not in self._entries]:
+                self._unindex(stale)
+
+    def _unindex(self, key: str) -> None:
+        for table in self._tables_by_key.pop(key, ()):
+            keys = self._keys_by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_table[table]
+
+
+def sql_literal(value: Any) -> str:
+    """Render a key value as a SQL literal."""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, float)):
+        return repr(value)
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    raise ValueError(f"Cannot page on key values of type {type(value).__name__}")
+
+
+def keyset_page_sql(sql: str, key_column: str, after: Any, limit: int) -> str:
+    """
+    SQL of one keyset page of a query.
+
+    Args:
+        sql: SELECT ... FROM table [WHERE ...] without ORDER BY or LIMIT
+        key_column: Unique column the pages are ordered by
+        after: Key of the last row of the previous page (None: first page)
+        limit: Rows per page
+
+    Returns:
+        sql restricted to key_column > after, ordered by key_column, limited to limit rows
+    """
+    sql = normalize_sql(sql)
+    if _PAGE_UNSAFE_PATTERN.search(sql):
+        raise ValueError("Paged queries must not have their own ORDER BY or LIMIT")
+    if after is not None:
+        condition = f"{key_column} > {sql_literal(after)}"
+        where = _WHERE_PATTERN.search(sql)
+        if where is None:
+            sql = f"{sql} WHERE {condition}"
+        else:
+            sql = f"{sql[:where.start()]}WHERE ({sql[where.end():].strip()}) AND {condition}"
+    return f"{sql} ORDER BY {key_column} LIMIT {limit}"
+
+
+def iter_row_batches(response: Any, decode_rows: Callable[[str, List[Any]], List[Any]],
+                     batch_size: int = DEFAULT_BATCH_SIZE) -> Iterator[Tuple[str, List[Any]]]:
+    """
+    Decode the rows of a OneOffQueryResponse batch by batch.
+
+    Raw rows are released as their batch is decoded, so at most one
+    decoded batch exists next to the undecoded remainder.
+
+    Args:
+        response: OneOffQueryResponse; its tables are consumed
+        decode_rows: Converts (table_name, raw_rows) to decoded rows
+        batch_size: Rows per batch
+
+    Yields:
+        (table_name, rows) with at most batch_size rows; batches follow
+        the response's table order and never mix tables
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size must be at least 1")
+    tables, response.tables = response.tables, []
+    tables.reverse()
+    while tables:
+        table = tables.pop()
+        rows, table.rows = table.rows, []
+        # Batches are cut from the end so taking one frees its raw rows
+        rows.reverse()
+        while rows:
+            batch = rows[-batch_size:]
+            del rows[-batch_size:]
+            batch.reverse()
+            yield table.table_name, decode_rows(table.table_name, batch)
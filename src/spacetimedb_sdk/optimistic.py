@@ -0,0 +1,297 @@
+"""
+Optimistic reducer effects for SpacetimeDB Python SDK.
+
+A predictor registered for a reducer returns the row changes a call is
+expected to make. They are applied to the row cache as soon as the call
+is sent, so readers see them without waiting a round trip:
+- Predicted rows are held in the cache by the call (its request ID), like
+  rows held by a subscription
+- The call's TransactionUpdate settles the prediction in one atomic cache
+  transaction: the server's rows are applied, predicted rows the server
+  did not produce are evicted and predicted deletes it did not make are
+  restored
+- A prediction that did not hold (a failed, timed-out or differently
+  resolved call) is reported to rollback callbacks with the corrections
+
+Example:
+    def predict_set_name(cache, name):
+        me = cache.table("user").get(my_identity)
+        return [PredictedChange("user", inserts=[{**me.to_dict(), "name": name}], deletes=[me])]
+
+    conn.register_predictor("set_name", predict_set_name)
+    conn.register_on_prediction_rollback(lambda outcome: refresh_ui())
+    conn.call_reducer("set_name", "alice")  # conn.db.user shows "alice" at once
+"""
+
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from .row_cache import RowCache, AppliedTransaction
+
+logger = logging.getLogger(__name__)
+
+# Seconds an unanswered predicted call keeps its prediction applied
+DEFAULT_PREDICTION_TIMEOUT = 30.0
+
+
+@dataclass
+class PredictedChange:
+    """Rows a reducer call is expected to insert into and delete from one table."""
+    table_name: str
+    inserts: List[Any] = field(default_factory=list)
+    deletes: List[Any] = field(default_factory=list)
+
+
+# Called with a snapshot of the cache and the reducer arguments
+Predictor = Callable[..., Iterable[PredictedChange]]
+
+
+@dataclass
+class PredictionOutcome:
+    """
+    A prediction that did not hold.
+
+    corrections is the cache transaction that settled it, including the
+    server's own changes when the call committed. error is the call's
+    failure, if it did not commit.
+    """
+    request_id: int
+    reducer_name: str
+    committed: bool
+    corrections: AppliedTransaction
+    error: Optional[Any] = None
+
+
+class _Prediction:
+    """Predicted effects of one call; also their owner in the row cache."""
+
+    __slots__ = ('request_id', 'reducer_name', 'applied')
+
+    def __init__(self, request_id: int, reducer_name: str):
+        self.request_id = request_id
+        self.reducer_name = reducer_name
+        self.applied = AppliedTransaction(version=0)
+
+    def __repr__(self) -> str:
+        return f"<prediction of {self.reducer_name!r} #{self.request_id}>"
+
+
+class OptimisticUpdates:
+    """
+    Applies predicted reducer effects to a row cache and settles them.
+
+    predict() runs on the calling thread before the call is sent;
+    settle() runs on the message thread when the call's transaction
+    arrives, and rollback() wherever the call fails.
+    """
+
+    def __init__(self, cache: RowCache, decode_rows: Optional[Callable[[str, List[Any]], List[Any]]] = None):
+        """
+        Args:
+            cache: Row cache the predictions are applied to
+            decode_rows: Converts predicted rows to their cached form
+                (e.g. the table's compact row type)
+        """
+        self._cache = cache
+        self._decode_rows = decode_rows
+        self._predictors: Dict[str, Predictor] = {}
+        self._pending: Dict[int, _Prediction] = {}
+        self._listeners: List[Callable[[PredictionOutcome], None]] = []
+        self._lock = threading.Lock()
+        self._predicted = 0
+        self._confirmed = 0
+        self._rolled_back = 0
+
+    def register(self, reducer_name: str, predictor: Predictor) -> None:
+        """Set the predictor of a reducer."""
+        self._predictors[reducer_name] = predictor
+
+    def unregister(self, reducer_name: str) -> bool:
+        """Remove the predictor of a reducer."""
+        return self._predictors.pop(reducer_name, None) is not None
+
+    def has_predictor(self, reducer_name: str) -> bool:
+        return reducer_name in self._predictors
+
+    def add_listener(self, listener: Callable[[PredictionOutcome], None]) -> None:
+        """Register a callback for predictions that did not hold."""
+        self._listeners.append(listener)
+
+    def predict(self, reducer_name: str, request_id: int, args: Iterable[Any]) -> bool:
+        """
+        Apply the predicted effects of a call about to be sent.
+
+        Returns:
+            True if a prediction was applied and awaits settle() or rollback()
+        """
+        predictor = self._predictors.get(reducer_name)
+        if predictor is None:
+            return False
+        try:
+            changes = [self._decode(change) for change in predictor(self._cache.snapshot(), *args)]
+        except Exception as e:
+            logger.error(f"Error in predictor for reducer '{reducer_name}': {e}")
+            return False
+
+        prediction = _Prediction(request_id, reducer_name)
+        with self._lock:
+            self._pending[request_id] = prediction
+            self._predicted += 1
+        prediction.applied = self._cache.apply(changes, owner=prediction)
+        return True
+
+    def pop(self, request_id: int, reducer_name: Optional[str] = None) -> Optional[_Prediction]:
+        """Take the pending prediction of a call, if any (and of reducer_name, if given)."""
+        with self._lock:
+            prediction = self._pending.get(request_id)
+            if prediction is None or (reducer_name is not None and prediction.reducer_name != reducer_name):
+                return None
+            return self._pending.pop(request_id)
+
+    def settle(self, prediction: _Prediction, table_updates: Iterable[Any], committed: bool = True, error: Optional[Any] = None) -> AppliedTransaction:
+        """
+        Replace a prediction by the server's effects of the call.
+
+        Args:
+            prediction: Prediction taken with pop()
+            table_updates: Decoded table updates of the call's transaction
+                (empty if it did not commit)
+            committed: Whether the call committed
+            error: The call's failure, if it did not commit
+
+        Returns:
+            The AppliedTransaction settling the prediction
+        """
+        table_updates = [update for update in table_updates if update is not None]
+        confirmed = committed and self._matches(prediction, table_updates)
+        restores = self._restores(prediction, table_updates)
+        applied = self._cache.apply(self._unapplied(prediction, table_updates) + restores, release=prediction)
+        if confirmed:
+            with self._lock:
+                self._confirmed += 1
+            return applied
+
+        with self._lock:
+            self._rolled_back += 1
+        outcome = PredictionOutcome(prediction.request_id, prediction.reducer_name,
+                                    committed, applied, error)
+        for listener in list(self._listeners):
+            try:
+                listener(outcome)
+            except Exception as e:
+                logger.error(f"Error in prediction rollback callback: {e}")
+        return applied
+
+    def rollback(self, request_id: int, error: Optional[Any] = None) -> Optional[AppliedTransaction]:
+        """Undo the prediction of a call that will not be answered, if still pending."""
+        prediction = self.pop(request_id)
+        if prediction is None:
+            return None
+        return self.settle(prediction, [], committed=False, error=error)
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Predicted, confirmed, rolled back and pending prediction counts."""
+        with self._lock:
+            return {
+                'predicted': self._predicted,
+                'confirmed': self._confirmed,
+                'rolled_back': self._rolled_back,
+                'pending': len(self._pending),
+            }
+
+    def _decode(self, change: Any) -> PredictedChange:
+        inserts = list(getattr(change, 'inserts', None) or ())
+        deletes = list(getattr(change, 'deletes', None) or ())
+        if self._decode_rows is not None:
+            inserts = self._decode_rows(change.table_name, inserts)
+            deletes = self._decode_rows(change.table_name, deletes)
+        return PredictedChange(change.table_name, inserts, deletes)
+
+    def _matches(self, prediction: _Prediction, table_updates: List[Any]) -> bool:
+        """Whether the server made every predicted change."""
+        cache = self._cache
+        for table_name, change in prediction.applied.tables.items():
+            inserted: Dict[Any, Any] = {}
+            deleted: Set[Any] = set()
+            for update in table_updates:
+                if update.table_name != table_name:
+                    continue
+                for row in getattr(update, 'inserts', None) or ():
+                    inserted[cache.row_key(table_name, row)] = row
+                for row in getattr(update, 'deletes', None) or ():
+                    deleted.add(cache.row_key(table_name, row))
+
+            predicted_keys = set()
+            for row in change.inserts:
+                key = cache.row_key(table_name, row)
+                predicted_keys.add(key)
+                if key not in inserted or inserted[key] != row:
+                    return False
+            for row in change.deletes:
+                key = cache.row_key(table_name, row)
+                if key not in predicted_keys and key not in deleted:
+                    return False
+        return True
+
+    def _unapplied(self, prediction: _Prediction, table_updates: List[Any]) -> List[Any]:
+        """
+        The server's updates without the deletes the prediction already made.
+
+        Deletes go by key, so applying them again would remove the
+        predicted rows now stored under those keys.
+        """
+        cache = self._cache
+        result = []
+        for update in table_updates:
+            change = prediction.applied.tables.get(update.table_name)
+            deletes = getattr(update, 'deletes', None) or ()
+            if change is None or not change.deletes or not deletes:
+                result.append(update)
+                continue
+            table_name = update.table_name
+            predicted = {cache.row_key(table_name, row): row for row in change.deletes}
+            table = cache.table(table_name)
+            kept = []
+            for row in deletes:
+                key = cache.row_key(table_name, row)
+                if key in predicted and predicted[key] == row and table.get(key) != row:
+                    continue
+                kept.append(row)
+            result.append(PredictedChange(table_name, list(getattr(update, 'inserts', None) or ()), kept))
+        return result
+
+    def _restores(self, prediction: _Prediction, table_updates: List[Any]) -> List[PredictedChange]:
+        """
+        Rows the prediction deleted that the server left alone.
+
+        A row is only restored while its key is still free or holds the
+        predicted row: a transaction that touched it since wins.
+        """
+        cache = self._cache
+        restores = []
+        for table_name, change in prediction.applied.tables.items():
+            if not change.deletes:
+                continue
+            touched = set()
+            for update in table_updates:
+                if update.table_name == table_name:
+                    for row in (getattr(update, 'inserts', None) or ()):
+                        touched.add(cache.row_key(table_name, row))
+                    for row in (getattr(update, 'deletes', None) or ()):
+                        touched.add(cache.row_key(table_name, row))
+            table = cache.table(table_name)
+            rows = []
+            for row in change.deletes:
+                key = cache.row_key(table_name, row)
+                if key in touched:
+                    continue
+                if key not in table or prediction in cache.owners(table_name, key):
+                    rows.append(row)
+            if rows:
+                restores.append(PredictedChange(table_name, inserts=rows))
+        return restores
@@ -0,0 +1,252 @@
+"""
+Request-id correlation of reducer calls for SpacetimeDB Python SDK.
+
+Keeps one future per in-flight reducer call, keyed by request ID:
+- Request IDs come from a RequestTracker, which also records each call
+  as pending until it is answered
+- A TransactionUpdate resolves its call with one dict lookup, however
+  many calls are in flight
+- Timeouts come from the tracker's deadline heaps, served by one timer
+  thread, instead of a timer task per call
+- Futures are concurrent.futures.Future, usable from threads or awaited
+  through asyncio.wrap_future()
+
+Example:
+    future = registry.register(registry.next_request_id(), timeout=30.0)
+    ...
+    registry.resolve(request_id, reducer_event)  # from the message thread
+"""
+
+import asyncio
+import logging
+import math
+import threading
+import time
+from concurrent.futures import Future
+from functools import partial
+from typing import Any, Dict, List, Optional
+
+from .request_tracker import RequestTracker
+from .exceptions import SpacetimeDBError
+
+logger = logging.getLogger(__name__)
+
+
+class ReducerCallError(SpacetimeDBError):
+    """Raised when the server reports that a reducer call failed."""
+
+    def __init__(self, message: str, reducer_name: str = "", request_id: Optional[int] = None):
+        super().__init__(
+            message,
+            error_code="REDUCER_CALL_FAILED",
+            diagnostic_info={'reducer': reducer_name, 'request_id': request_id}
+        )
+        self.reducer_name = reducer_name
+        self.request_id = request_id
+
+
+class _PendingCall:
+    __slots__ = ('future', 'timeout', 'description')
+
+    def __init__(self, future: Future, timeout: Optional[float], description: str):
+        self.future = future
+        self.timeout = timeout
+        self.description = description
+
+
+class PendingCallRegistry:
+    """
+    Futures of in-flight calls keyed by request ID.
+
+    register() must happen before the request is sent, so a fast answer
+    always finds its future.
+    """
+
+    def __init__(self, tracker: Optional[RequestTracker] = None, name: str = "spacetimedb-calls"):
+        """
+        Create an empty registry.
+
+        Args:
+            tracker: Request tracker issuing IDs and recording pending calls;
+                the registry expires its requests through check_timeouts()
+            name: Name of the timer thread
+        """
+        self._tracker = tracker or RequestTracker()
+        self._name = name
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._calls: Dict[int, _PendingCall] = {}
+        # Deadline the timer thread is sleeping until
+        self._next_wakeup = math.inf
+        self._timer_thread: Optional[threading.Thread] = None
+        self._closed = False
+        self._resolved = 0
+        self._timed_out = 0
+
+    @property
+    def tracker(self) -> RequestTracker:
+        """The request tracker backing this registry."""
+        return self._tracker
+
+    def next_request_id(self) -> int:
+        """Get a request ID for a new call."""
+        return self._tracker.generate_request_id()
+
+    def register(self, request_id: int, timeout: Optional[float] = None, description: str = "") -> Future:
+        """
+        Create the future of a call about to be sent.
+
+        Args:
+            request_id: Request ID the answer will carry
+            timeout: Seconds before the future fails with asyncio.TimeoutError
+                (None: wait indefinitely)
+            description: Used in the timeout message, e.g. "Reducer call 'add'"
+
+        Returns:
+            Future resolved by resolve() or failed by fail() or the timeout
+        """
+        return self.register_many([request_id], timeout, [description])[0]
+
+    def register_many(self, request_ids: List[int], timeout: Optional[float] = None,
+                      descriptions: Optional[List[str]] = None) -> List[Future]:
+        """
+        Create the futures of a batch of calls, taking the lock once.
+
+        Args:
+            request_ids: Request IDs the answers will carry
+            timeout: Seconds before each future fails with asyncio.TimeoutError
+            descriptions: Used in timeout messages, one per request ID
+
+        Returns:
+            One future per request ID, in order
+        """
+        futures = [Future() for _ in request_ids]
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("PendingCallRegistry is closed")
+            for index, (request_id, future) in enumerate(zip(request_ids, futures)):
+                description = descriptions[index] if descriptions else ""
+                self._calls[request_id] = _PendingCall(future, timeout, description or f"Request {request_id}")
+            if timeout is not None:
+                self._ensure_timer_thread()
+        self._tracker.add_pending_requests(request_ids, timeout if timeout is not None else math.inf)
+        if timeout is not None and request_ids:
+            with self._lock:
+                if time.monotonic() + timeout < self._next_wakeup:
+                    self._wakeup.notify()
+        for request_id, future in zip(request_ids, futures):
+            # A caller giving up (e.g. a cancelled await) frees the entry at once
+            future.add_done_callback(partial(self._on_done, request_id))
+        return futures
+
+    def resolve(self, request_id: int, result: Any) -> bool:
+        """
+        Complete a call with its result.
+
+        Returns:
+            True if the request ID belonged to a pending call
+        """
+        call = self._pop(request_id, resolved=True)
+        if call is None:
+            return False
+        self._settle(call.future, result=result)
+        return True
+
+    def fail(self, request_id: int, error: BaseException) -> bool:
+        """
+        Fail a call with an exception.
+
+        Returns:
+            True if the request ID belonged to a pending call
+        """
+        call = self._pop(request_id)
+        if call is None:
+            return False
+        self._settle(call.future, error=error)
+        return True
+
+    def fail_all(self, error: BaseException) -> int:
+        """Fail every pending call (e.g. on shutdown); returns how many there were."""
+        with self._lock:
+            calls = list(self._calls.items())
+            self._calls.clear()
+        for request_id, call in calls:
+            self._tracker.pop_pending_request(request_id)
+            self._settle(call.future, error=error)
+        return len(calls)
+
+    def is_pending(self, request_id: int) -> bool:
+        """Check whether a call is still waiting for its answer."""
+        return request_id in self._calls
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def get_stats(self) -> Dict[str, int]:
+        """Pending, resolved and timed-out call counts."""
+        with self._lock:
+            return {
+                'pending': len(self._calls),
+                'resolved': self._resolved,
+                'timed_out': self._timed_out,
+            }
+
+    def close(self, error: Optional[BaseException] = None) -> None:
+        """Fail pending calls and stop the timer thread."""
+        self.fail_all(error or RuntimeError("Client shut down"))
+        with self._lock:
+            self._closed = True
+            self._wakeup.notify()
+            thread = self._timer_thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(1.0)
+
+    def _pop(self, request_id: int, resolved: bool = False) -> Optional[_PendingCall]:
+        with self._lock:
+            call = self._calls.pop(request_id, None)
+            if call is not None and resolved:
+                self._resolved += 1
+        if call is not None:
+            self._tracker.pop_pending_request(request_id)
+        return call
+
+    def _on_done(self, request_id: int, future: Future) -> None:
+        if future.cancelled():
+            self._pop(request_id)
+
+    @staticmethod
+    def _settle(future: Future, result: Any = None, error: Optional[BaseException] = None) -> None:
+        if not future.set_running_or_notify_cancel():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def _ensure_timer_thread(self) -> None:
+        if self._timer_thread is None:
+            self._timer_thread = threading.Thread(target=self._run_timers, name=f"{self._name}-timeouts",
+                                                  daemon=True)
+            self._timer_thread.start()
+
+    def _run_timers(self) -> None:
+        while True:
+            with self._lock:
+                while not self._closed:
+                    deadline = self._tracker.next_deadline()
+                    now = time.monotonic()
+                    if deadline is not None and deadline <= now:
+                        break
+                    self._next_wakeup = deadline if deadline is not None else math.inf
+                    self._wakeup.wait(deadline - now if deadline is not None else None)
+                self._next_wakeup = math.inf
+                if self._closed:
+                    return
+            timed_out = self._tracker.check_timeouts()
+            with self._lock:
+                expired = [(request_id, self._calls.pop(request_id)) for request_id in timed_out
+                           if request_id in self._calls]
+                self._timed_out += len(expired)
+            for request_id, call in expired:
+                self._settle(call.future, error=asyncio.TimeoutError(
+                    f"{call.description} timed out after {call.timeout} seconds"))
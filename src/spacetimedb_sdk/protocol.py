@@ -5,7 +5,7 @@ This module implements the modern WebSocket protocol as defined in
 SpacetimeDB/crates/client-api-messages/src/websocket.rs
 """
 
-from typing import Optional, List, Dict, Any, Union, Literal, TYPE_CHECKING
+from typing import Optional, List, Dict, Any, Callable, Union, Literal, TYPE_CHECKING
 from dataclasses import dataclass
 from enum import Enum
 import json
@@ -461,16 +461,64 @@ class ReducerCallInfo:
     request_id: int
 
 
+def _decoded_row(row: Any) -> Any:
+    """A row of a table update; rows carried as JSON text are parsed."""
+    if isinstance(row, (bytes, bytearray)):
+        row = row.decode('utf-8')
+    if isinstance(row, str):
+        return json.loads(row)
+    return row
+
+
+# UpdateStatus variants in wire order
+_UPDATE_STATUS_VARIANTS = ("Committed", "Failed", "OutOfEnergy")
+
+
+def normalize_update_status(status: Any) -> Union[DatabaseUpdate, str]:
+    """
+    Bring a TransactionUpdate status from either wire encoding to one form.
+
+    Committed transactions become their DatabaseUpdate, or "Committed" when
+    it was not decoded; failures become "Failed: <message>" and other
+    outcomes their variant name. Accepts JSON objects ({"Committed": ...}),
+    decoded BSATN enums ((variant, payload)) and plain strings.
+    """
+    if isinstance(status, DatabaseUpdate):
+        return status
+    if isinstance(status, tuple) and len(status) == 2 and isinstance(status[0], int):
+        variant, payload = status
+        name = _UPDATE_STATUS_VARIANTS[variant] if variant < len(_UPDATE_STATUS_VARIANTS) else str(variant)
+        status = {name: payload}
+    if isinstance(status, dict) and len(status) == 1:
+        (name, payload), = status.items()
+        if name.lower() == "committed":
+            return "Committed"
+        if name.lower() == "failed":
+            return f"Failed: {payload}"
+        return name
+    if isinstance(status, str):
+        return "Committed" if status.lower() in ("committed", "success") else status
+    return str(status)
+
+
+def update_status_committed(status: Any) -> bool:
+    """Whether a TransactionUpdate status, in any encoding, reports a committed transaction."""
+    status = normalize_update_status(status)
+    return isinstance(status, DatabaseUpdate) or status == "Committed"
+
+
 @dataclass
 class TransactionUpdate:
     """Server message for reducer run results."""
-    status: Union[DatabaseUpdate, str]  # DatabaseUpdate for success, str for error
+    status: Union[DatabaseUpdate, str]  # See normalize_update_status
     timestamp: Timestamp
     caller_identity: Identity
     caller_connection_id: ConnectionId
     reducer_call: ReducerCallInfo
     energy_quanta_used: EnergyQuanta
     total_host_execution_duration: TimeDuration
+    # Rows of a committed transaction, as decoded from the status
+    database_update: Optional[DatabaseUpdate] = None
 
 
 @dataclass
@@ -806,6 +854,9 @@ class ProtocolDecoder:
     
     def __init__(self, use_binary: bool = False):
         self.use_binary = use_binary
+        # Looks up the function decoding a table's BSATN rows into their
+        # cached form (e.g. DatabaseInterface.row_decoder); None: dict rows
+        self.row_decoder: Optional[Callable[[str], Optional[Callable[['BsatnReader'], Any]]]] = None
     
     def decode_server_message(self, data: bytes) -> ServerMessage:
         """Decode a server message from received data."""
@@ -871,16 +922,11 @@ class ProtocolDecoder:
         elif "TransactionUpdate" in message:
             tx_data = message["TransactionUpdate"]
             
-            # Enhanced status parsing
             status = tx_data.get("status", "Unknown")
-            if isinstance(status, dict):
-                # Handle structured status like {"Failed": "error message"} or {"Committed": {...}}
-                if "Failed" in status:
-                    status = f"Failed: {status['Failed']}"
-                elif "Committed" in status:
-                    status = "Committed"
-                else:
-                    status = str(status)
+            database_update = None
+            if isinstance(status, dict) and isinstance(status.get("Committed"), dict):
+                database_update = self._database_update(status["Committed"])
+            status = normalize_update_status(status)
             
             # Enhanced identity parsing for caller fields
             caller_identity_data = tx_data.get("caller_identity", "00")
@@ -905,19 +951,32 @@ class ProtocolDecoder:
             else:
                 caller_connection_id = ConnectionId(data=b"\x00")
             
+            # The reducer call and energy are nested objects on the wire
+            call = tx_data.get("reducer_call") or {}
+            args = call.get("args", b"")
+            energy = tx_data.get("energy_quanta_used", 0)
+            timestamp = tx_data.get("timestamp", 0)
+            if isinstance(timestamp, dict):
+                timestamp = timestamp.get("__timestamp_micros_since_unix_epoch__", 0) * 1000
+            duration = tx_data.get("total_host_execution_duration", 0)
+            if isinstance(duration, dict):
+                duration = duration.get("__time_duration_micros__", 0) * 1000
+            
             return TransactionUpdate(
                 status=status,
-                timestamp=Timestamp(nanos_since_epoch=tx_data.get("timestamp", 0)),
+                timestamp=Timestamp(nanos_since_epoch=timestamp),
                 caller_identity=caller_identity,
                 caller_connection_id=caller_connection_id,
                 reducer_call=ReducerCallInfo(
-                    reducer_name=tx_data.get("reducer_name", ""),
-                    reducer_id=tx_data.get("reducer_id", 0),
-                    args=b"",
-                    request_id=tx_data.get("request_id", 0)
+                    reducer_name=call.get("reducer_name", ""),
+                    reducer_id=call.get("reducer_id", 0),
+                    args=args.encode('utf-8') if isinstance(args, str) else bytes(args),
+                    request_id=call.get("request_id", 0)
                 ),
-                energy_quanta_used=EnergyQuanta(quanta=tx_data.get("energy_quanta_used", 0)),
-                total_host_execution_duration=TimeDuration(nanos=tx_data.get("total_host_execution_duration", 0))
+                energy_quanta_used=EnergyQuanta(
+                    quanta=energy.get("quanta", 0) if isinstance(energy, dict) else energy),
+                total_host_execution_duration=TimeDuration(nanos=duration),
+                database_update=database_update
             )
             
         elif "InitialSubscription" in message:
@@ -958,10 +1017,65 @@ class ProtocolDecoder:
                 error=error_data.get("error", "Unknown subscription error")
             )
             
+        elif "OneOffQueryResponse" in message:
+            return self._oneoff_query_response(message["OneOffQueryResponse"])
+            
         # Add more message type parsing as needed
         else:
             raise ValueError(f"Unknown server message format: {list(message.keys())}")
     
+    @staticmethod
+    def _database_update(data: Dict[str, Any]) -> DatabaseUpdate:
+        """Build a DatabaseUpdate from its decoded JSON or BSATN fields."""
+        tables = []
+        for table in data.get("tables") or []:
+            inserts = list(table.get("inserts") or [])
+            deletes = list(table.get("deletes") or [])
+            # Rows may come split into query updates
+            for update in table.get("updates") or []:
+                inserts.extend(update.get("inserts") or [])
+                deletes.extend(update.get("deletes") or [])
+            inserts = [_decoded_row(row) for row in inserts]
+            deletes = [_decoded_row(row) for row in deletes]
+            tables.append(TableUpdate(
+                table_id=table.get("table_id", 0),
+                table_name=table.get("table_name", ""),
+                num_rows=table.get("num_rows", len(inserts) + len(deletes)),
+                inserts=inserts,
+                deletes=deletes
+            ))
+        return DatabaseUpdate(tables=tables)
+    
+    @staticmethod
+    def _oneoff_query_response(data: Dict[str, Any]) -> OneOffQueryResponse:
+        """Build a OneOffQueryResponse from its decoded JSON or BSATN fields."""
+        message_id = data.get("message_id", b"")
+        if isinstance(message_id, list):
+            message_id = bytes(message_id)
+        
+        tables = []
+        for table in data.get("tables") or []:
+            rows = table.get("rows") or []
+            if isinstance(rows, (bytes, bytearray)):
+                # Rows carried as one JSON-encoded blob
+                rows = json.loads(rows.decode('utf-8'))
+            tables.append(OneOffTable(table_name=table.get("table_name", ""), rows=list(rows)))
+        
+        duration = data.get("total_host_execution_duration")
+        if duration is None:
+            nanos = data.get("total_host_execution_duration_micros", 0) * 1000
+        elif isinstance(duration, dict):
+            nanos = duration.get("__time_duration_micros__", 0) * 1000
+        else:
+            nanos = duration
+        
+        return OneOffQueryResponse(
+            message_id=message_id,
+            error=data.get("error") or None,
+            tables=tables,
+            total_host_execution_duration=TimeDuration(nanos=nanos)
+        )
+    
     def _decode_bsatn(self, data: bytes) -> ServerMessage:
         """Decode message from BSATN."""
         from .bsatn import BsatnReader
@@ -1078,8 +1192,7 @@ class ProtocolDecoder:
             elif field_name == "table_name":
                 table_name = reader.read_string()
             elif field_name == "table_rows":
-                # For now, skip table rows parsing (complex structure)
-                reader.skip_value()
+                table_rows = self._read_table_update_bsatn(reader)
             else:
                 reader.skip_value()
         
@@ -1110,8 +1223,7 @@ class ProtocolDecoder:
         for _ in range(field_count):
             field_name = reader.read_field_name()
             if field_name == "database_update":
-                # Skip complex database update parsing for now
-                reader.skip_value()
+                database_update = self._read_database_update_bsatn(reader)
             elif field_name == "request_id":
                 request_id = reader.read_u32()
             elif field_name == "total_host_execution_duration":
@@ -1128,58 +1240,132 @@ class ProtocolDecoder:
     
     def _decode_transaction_update_bsatn(self, reader: 'BsatnReader') -> TransactionUpdate:
         """Decode TransactionUpdate from BSATN."""
-        from .bsatn.constants import TAG_STRUCT
+        from .bsatn import decode_from_reader
+        from .bsatn.constants import TAG_STRUCT, TAG_ENUM
         
-        # Read struct header
         tag = reader.read_tag()
         if tag != TAG_STRUCT:
             raise ValueError(f"Expected struct tag for TransactionUpdate, got {tag}")
         
-        field_count = reader.read_struct_header()
-        
-        # Default values
-        status = "success"
-        timestamp = Timestamp(nanos_since_epoch=0)
-        caller_identity = Identity(data=b"")
-        caller_connection_id = ConnectionId(data=b"")
-        reducer_call = ReducerCallInfo(reducer_name="", reducer_id=0, args=b"", request_id=0)
-        energy_quanta_used = EnergyQuanta(quanta=0)
-        total_host_execution_duration = TimeDuration(nanos=0)
-        
-        for _ in range(field_count):
+        fields: Dict[str, Any] = {}
+        database_update = None
+        for _ in range(reader.read_struct_header()):
             field_name = reader.read_field_name()
             if field_name == "status":
-                # For now, read as string (simplified)
-                status = reader.read_string()
-            elif field_name == "timestamp":
-                timestamp_nanos = reader.read_u64()
-                timestamp = Timestamp(nanos_since_epoch=timestamp_nanos)
-            elif field_name == "caller_identity":
-                identity_data = reader.read_bytes()
-                caller_identity = Identity(data=identity_data)
-            elif field_name == "caller_connection_id":
-                connection_id_data = reader.read_bytes()
-                caller_connection_id = ConnectionId(data=connection_id_data)
-            elif field_name == "energy_quanta_used":
-                quanta = reader.read_u64()
-                energy_quanta_used = EnergyQuanta(quanta=quanta)
-            elif field_name == "total_host_execution_duration":
-                duration_nanos = reader.read_u64()
-                total_host_execution_duration = TimeDuration(nanos=duration_nanos)
+                # UpdateStatus enum; Committed carries the transaction's rows
+                tag = reader.read_tag()
+                if tag != TAG_ENUM:
+                    raise ValueError(f"Expected enum tag for UpdateStatus, got {tag}")
+                variant = reader.read_enum_header()
+                if variant == 0:
+                    database_update = self._read_database_update_bsatn(reader)
+                    fields["status"] = "Committed"
+                else:
+                    fields["status"] = (variant, decode_from_reader(reader))
             else:
-                # Skip complex fields for now
-                reader.skip_value()
+                fields[field_name] = decode_from_reader(reader)
         
+        call = fields.get("reducer_call")
+        call = call if isinstance(call, dict) else {}
         return TransactionUpdate(
-            status=status,
-            timestamp=timestamp,
-            caller_identity=caller_identity,
-            caller_connection_id=caller_connection_id,
-            reducer_call=reducer_call,
-            energy_quanta_used=energy_quanta_used,
-            total_host_execution_duration=total_host_execution_duration
+            status=normalize_update_status(fields.get("status", "Unknown")),
+            timestamp=Timestamp(nanos_since_epoch=fields.get("timestamp", 0)),
+            caller_identity=Identity(data=bytes(fields.get("caller_identity", b""))),
+            caller_connection_id=ConnectionId(data=bytes(fields.get("caller_connection_id", b""))),
+            reducer_call=ReducerCallInfo(
+                reducer_name=call.get("reducer_name", ""),
+                reducer_id=call.get("reducer_id", 0),
+                args=bytes(call.get("args", b"")),
+                request_id=call.get("request_id", 0)
+            ),
+            energy_quanta_used=EnergyQuanta(quanta=fields.get("energy_quanta_used", 0)),
+            total_host_execution_duration=TimeDuration(nanos=fields.get("total_host_execution_duration", 0)),
+            database_update=database_update
         )
     
+    def _read_database_update_bsatn(self, reader: 'BsatnReader') -> DatabaseUpdate:
+        """Read a DatabaseUpdate struct and the rows of its tables."""
+        from .bsatn.constants import TAG_STRUCT
+        
+        tag = reader.read_tag()
+        if tag != TAG_STRUCT:
+            raise ValueError(f"Expected struct tag for DatabaseUpdate, got {tag}")
+        
+        tables = []
+        for _ in range(reader.read_struct_header()):
+            if reader.read_field_name() == "tables":
+                for _ in range(self._read_sequence_header_bsatn(reader)):
+                    tables.append(self._read_table_update_bsatn(reader))
+            else:
+                reader.skip_value()
+        return DatabaseUpdate(tables=tables)
+    
+    def _read_table_update_bsatn(self, reader: 'BsatnReader') -> TableUpdate:
+        """
+        Read a TableUpdate struct.
+        
+        Rows of tables with a row decoder (see row_decoder) are decoded
+        straight into their cached form; the name must precede the rows.
+        Rows may come split into query updates.
+        """
+        from .bsatn import decode_from_reader
+        from .bsatn.constants import TAG_STRUCT
+        
+        tag = reader.read_tag()
+        if tag != TAG_STRUCT:
+            raise ValueError(f"Expected struct tag for TableUpdate, got {tag}")
+        
+        fields: Dict[str, Any] = {}
+        rows: Dict[str, List[Any]] = {"inserts": [], "deletes": []}
+        for _ in range(reader.read_struct_header()):
+            field_name = reader.read_field_name()
+            if field_name in rows:
+                self._read_rows_bsatn(reader, fields.get("table_name", ""), rows[field_name])
+            elif field_name == "updates":
+                for _ in range(self._read_sequence_header_bsatn(reader)):
+                    tag = reader.read_tag()
+                    if tag != TAG_STRUCT:
+                        raise ValueError(f"Expected struct tag for QueryUpdate, got {tag}")
+                    for _ in range(reader.read_struct_header()):
+                        update_field = reader.read_field_name()
+                        if update_field in rows:
+                            self._read_rows_bsatn(reader, fields.get("table_name", ""), rows[update_field])
+                        else:
+                            reader.skip_value()
+            else:
+                fields[field_name] = decode_from_reader(reader)
+        
+        inserts, deletes = rows["inserts"], rows["deletes"]
+        return TableUpdate(
+            table_id=fields.get("table_id", 0),
+            table_name=fields.get("table_name", ""),
+            num_rows=fields.get("num_rows", len(inserts) + len(deletes)),
+            inserts=inserts,
+            deletes=deletes
+        )
+    
+    def _read_rows_bsatn(self, reader: 'BsatnReader', table_name: str, rows: List[Any]) -> None:
+        """Read a sequence of rows of a table into rows."""
+        from .bsatn import decode_from_reader
+        
+        decode = self.row_decoder(table_name) if self.row_decoder is not None and table_name else None
+        if decode is None:
+            decode = decode_from_reader
+        for _ in range(self._read_sequence_header_bsatn(reader)):
+            rows.append(decode(reader))
+    
+    @staticmethod
+    def _read_sequence_header_bsatn(reader: 'BsatnReader') -> int:
+        """Read the header of a list or array and return its length."""
+        from .bsatn.constants import TAG_LIST, TAG_ARRAY
+        
+        tag = reader.read_tag()
+        if tag == TAG_LIST:
+            return reader.read_list_header()
+        if tag == TAG_ARRAY:
+            return reader.read_array_header()
+        raise ValueError(f"Expected list or array tag, got {tag}")
+    
     def _decode_transaction_update_light_bsatn(self, reader: 'BsatnReader') -> TransactionUpdateLight:
         """Decode TransactionUpdateLight from BSATN."""
         from .bsatn.constants import TAG_STRUCT
@@ -1199,8 +1385,7 @@ class ProtocolDecoder:
             if field_name == "request_id":
                 request_id = reader.read_u32()
             elif field_name == "update":
-                # Skip complex database update parsing for now
-                reader.skip_value()
+                update = self._read_database_update_bsatn(reader)
             else:
                 reader.skip_value()
         
@@ -1284,8 +1469,7 @@ class ProtocolDecoder:
                         else:
                             reader.skip_value()
             elif field_name == "update":
-                # Skip complex database update parsing for now
-                reader.skip_value()
+                update = self._read_database_update_bsatn(reader)
             else:
                 reader.skip_value()
         
@@ -1386,8 +1570,7 @@ class ProtocolDecoder:
                         else:
                             reader.skip_value()
             elif field_name == "update":
-                # Skip complex database update parsing for now
-                reader.skip_value()
+                update = self._read_database_update_bsatn(reader)
             else:
                 reader.skip_value()
         
@@ -1400,45 +1583,13 @@ class ProtocolDecoder:
     
     def _decode_oneoff_query_response_bsatn(self, reader: 'BsatnReader') -> OneOffQueryResponse:
         """Decode OneOffQueryResponse from BSATN."""
-        from .bsatn.constants import TAG_STRUCT
-        
-        # Read struct header
-        tag = reader.read_tag()
-        if tag != TAG_STRUCT:
-            raise ValueError(f"Expected struct tag for OneOffQueryResponse, got {tag}")
-        
-        field_count = reader.read_struct_header()
-        
-        message_id = b""
-        error = None
-        tables = []
-        total_host_execution_duration = TimeDuration(nanos=0)
-        
-        for _ in range(field_count):
-            field_name = reader.read_field_name()
-            if field_name == "message_id":
-                message_id = reader.read_bytes()
-            elif field_name == "error":
-                # Check if error is present (Option type)
-                error_tag = reader.read_tag()
-                if error_tag == 0x11:  # TAG_OPTION_SOME
-                    error = reader.read_string()
-                # else TAG_OPTION_NONE, error remains None
-            elif field_name == "tables":
-                # Skip complex table parsing for now
-                reader.skip_value()
-            elif field_name == "total_host_execution_duration":
-                duration_nanos = reader.read_u64()
-                total_host_execution_duration = TimeDuration(nanos=duration_nanos)
-            else:
-                reader.skip_value()
+        from .bsatn import decode_from_reader
         
-        return OneOffQueryResponse(
-            message_id=message_id,
-            error=error,
-            tables=tables,
-            total_host_execution_duration=total_host_execution_duration
-        )
+        # A tagged struct: message_id, error (option), tables, duration
+        fields = decode_from_reader(reader)
+        if not isinstance(fields, dict):
+            raise ValueError(f"Expected struct for OneOffQueryResponse, got {type(fields).__name__}")
+        return self._oneoff_query_response(fields)
 
 
 def generate_request_id() -> int:
@@ -0,0 +1,271 @@
+"""
+Coalescing of idempotent reducer calls for SpacetimeDB Python SDK.
+
+Bursts of identical or superseding calls to idempotent reducers (presence
+heartbeats, "set latest value") are collapsed before they are sent:
+- DROP_DUPLICATES: a call with the same arguments and flags as one sent
+  less than window_ms ago is not sent; its caller shares that call
+- LAST_PER_KEY: calls are held for window_ms; a later call with the same
+  key replaces the held one, and only the last is sent when the window
+  ends, all held keys in one pipelined write
+- Every caller's future resolves with the outcome of the call that was
+  sent, so coalesced callers complete together with it
+- Absorbed calls are counted with their estimated energy cost, and
+  call_reducer_energy_aware() charges nothing for them
+
+Held calls may be sent after later calls to other reducers.
+
+Example:
+    conn.set_coalescing_policy("heartbeat", CoalescingPolicy(CoalescingMode.DROP_DUPLICATES, window_ms=1000))
+    conn.set_coalescing_policy("set_position", CoalescingPolicy(
+        CoalescingMode.LAST_PER_KEY, window_ms=50, key=lambda entity_id, x, y: entity_id))
+"""
+
+import json
+import logging
+import threading
+import time
+from concurrent.futures import Future, CancelledError
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Window of a policy, and seconds a coalesced call waits for its answer
+DEFAULT_COALESCE_WINDOW_MS = 100.0
+DEFAULT_CALL_TIMEOUT = 30.0
+
+
+class CoalescingMode(Enum):
+    """How calls to one reducer are coalesced."""
+    DROP_DUPLICATES = "drop_duplicates"
+    LAST_PER_KEY = "last_per_key"
+
+
+@dataclass
+class CoalescingPolicy:
+    """
+    Coalescing of one reducer's calls.
+
+    key is called with a call's arguments and names the value it sets
+    (LAST_PER_KEY only); without it every call supersedes the held one.
+    """
+    mode: CoalescingMode
+    window_ms: float = DEFAULT_COALESCE_WINDOW_MS
+    key: Optional[Callable[..., Hashable]] = None
+
+    def __post_init__(self):
+        if self.window_ms <= 0:
+            raise ValueError("coalesce window must be positive")
+
+
+@dataclass
+class CoalescedCall:
+    """A reducer call about to be sent, shared by the calls coalesced into it."""
+    reducer_name: str
+    args: Tuple[Any, ...]
+    args_json: bytes
+    flags: Any
+    request_id: int
+    future: Future
+    expires_at: float = 0.0
+
+
+def _follow(source: Future) -> Future:
+    """A future settled like source; cancelling it leaves source alone."""
+    follower: Future = Future()
+
+    def settle(done: Future) -> None:
+        if not follower.set_running_or_notify_cancel():
+            return
+        if done.cancelled():
+            follower.set_exception(CancelledError())
+        elif done.exception() is not None:
+            follower.set_exception(done.exception())
+        else:
+            follower.set_result(done.result())
+    source.add_done_callback(settle)
+    return follower
+
+
+def _failed(future: Future) -> bool:
+    return future.done() and (future.cancelled() or future.exception() is not None)
+
+
+class ReducerCoalescer:
+    """
+    Applies per-reducer coalescing policies to outgoing calls.
+
+    The owner supplies how a call is registered (request ID and future)
+    and how calls are sent; send must fail the futures of calls it could
+    not send.
+    """
+
+    def __init__(self, register: Callable[[str, Optional[float]], Tuple[int, Future]],
+                 send: Callable[[List[CoalescedCall]], None],
+                 estimate_cost: Optional[Callable[[str, Sequence[Any]], int]] = None,
+                 name: str = "spacetimedb-reducer-coalescer"):
+        """
+        Args:
+            register: Called with (reducer_name, timeout); returns the
+                request ID and future of a new call
+            send: Sends calls in order, in as few writes as possible
+            estimate_cost: Estimated energy of a call, counted as saved
+                for every absorbed call
+            name: Timer thread name
+        """
+        self._register = register
+        self._send = send
+        self._estimate_cost = estimate_cost
+        self._name = name
+        self._lock = threading.Lock()
+        self._policies: Dict[str, CoalescingPolicy] = {}
+        # DROP_DUPLICATES: (reducer, args, flags) -> last call sent, oldest first
+        self._recent: Dict[Tuple[str, bytes, Any], CoalescedCall] = {}
+        # LAST_PER_KEY: reducer -> key -> held call, flushed by one timer per reducer
+        self._held: Dict[str, Dict[Hashable, CoalescedCall]] = {}
+        self._timers: Dict[str, threading.Timer] = {}
+        self._submitted = 0
+        self._sent = 0
+        self._dropped = 0
+        self._superseded = 0
+        self._energy_saved = 0
+
+    def set_policy(self, reducer_name: str, policy: Optional[CoalescingPolicy]) -> None:
+        """Set (or with None remove) a reducer's policy; its held calls are sent first."""
+        self.flush(reducer_name)
+        with self._lock:
+            if policy is None:
+                self._policies.pop(reducer_name, None)
+            else:
+                self._policies[reducer_name] = policy
+
+    def policy(self, reducer_name: str) -> Optional[CoalescingPolicy]:
+        return self._policies.get(reducer_name)
+
+    def submit(self, reducer_name: str, args: Sequence[Any], flags: Any,
+               timeout: Optional[float] = DEFAULT_CALL_TIMEOUT) -> Tuple[int, Future, bool]:
+        """
+        Submit a call to a reducer with a policy.
+
+        Returns:
+            (request_id, future, absorbed): the request ID the call is sent
+            under, a future settled with its outcome, and whether this call
+            was coalesced into another one instead of being sent itself
+        """
+        policy = self._policies.get(reducer_name)
+        if policy is None:
+            raise ValueError(f"No coalescing policy for reducer '{reducer_name}'")
+        args = tuple(args)
+        args_json = json.dumps(args).encode('utf-8')
+        if policy.mode is CoalescingMode.DROP_DUPLICATES:
+            call, absorbed = self._submit_unique(reducer_name, args, args_json, flags, timeout, policy)
+        else:
+            call, absorbed = self._submit_latest(reducer_name, args, args_json, flags, timeout, policy)
+        if absorbed and self._estimate_cost is not None:
+            saved = self._estimate_cost(reducer_name, args)
+            with self._lock:
+                self._energy_saved += saved
+        return call.request_id, _follow(call.future), absorbed
+
+    def flush(self, reducer_name: Optional[str] = None) -> int:
+        """
+        Send held calls now, of one reducer or of all.
+
+        Returns:
+            Number of calls sent
+        """
+        with self._lock:
+            names = [reducer_name] if reducer_name is not None else list(self._held)
+            calls: List[CoalescedCall] = []
+            for name in names:
+                calls.extend(self._held.pop(name, {}).values())
+                timer = self._timers.pop(name, None)
+                if timer is not None and timer is not threading.current_thread():
+                    timer.cancel()
+            self._sent += len(calls)
+        if calls:
+            try:
+                self._send(calls)
+            except Exception as e:
+                logger.error(f"Failed to send coalesced reducer calls: {e}")
+        return len(calls)
+
+    def close(self, flush: bool = False) -> None:
+        """Stop the timers, sending held calls first if flush is set; otherwise their owner fails them."""
+        if flush:
+            self.flush()
+        with self._lock:
+            self._held.clear()
+            self._recent.clear()
+            timers, self._timers = self._timers, {}
+        for timer in timers.values():
+            timer.cancel()
+
+    def held(self) -> int:
+        """Number of calls waiting for their window to end."""
+        with self._lock:
+            return sum(len(calls) for calls in self._held.values())
+
+    def get_stats(self) -> Dict[str, int]:
+        """Submitted, sent, dropped and superseded calls, held calls and energy saved."""
+        with self._lock:
+            return {
+                'submitted': self._submitted,
+                'sent': self._sent,
+                'dropped': self._dropped,
+                'superseded': self._superseded,
+                'held': sum(len(calls) for calls in self._held.values()),
+                'energy_saved': self._energy_saved,
+            }
+
+    def _submit_unique(self, reducer_name: str, args: Tuple[Any, ...], args_json: bytes, flags: Any,
+                       timeout: Optional[float], policy: CoalescingPolicy) -> Tuple[CoalescedCall, bool]:
+        key = (reducer_name, args_json, flags)
+        now = time.monotonic()
+        with self._lock:
+            self._submitted += 1
+            self._prune(now)
+            recent = self._recent.get(key)
+            if recent is not None and recent.expires_at > now and not _failed(recent.future):
+                self._dropped += 1
+                return recent, True
+            request_id, future = self._register(reducer_name, timeout)
+            call = CoalescedCall(reducer_name, args, args_json, flags, request_id, future,
+                                 expires_at=now + policy.window_ms / 1000)
+            self._recent.pop(key, None)
+            self._recent[key] = call
+            self._sent += 1
+        self._send([call])
+        return call, False
+
+    def _submit_latest(self, reducer_name: str, args: Tuple[Any, ...], args_json: bytes, flags: Any,
+                       timeout: Optional[float], policy: CoalescingPolicy) -> Tuple[CoalescedCall, bool]:
+        key = policy.key(*args) if policy.key is not None else None
+        with self._lock:
+            self._submitted += 1
+            held = self._held.setdefault(reducer_name, {})
+            call = held.get(key)
+            if call is not None:
+                call.args, call.args_json, call.flags = args, args_json, flags
+                self._superseded += 1
+                return call, True
+            request_id, future = self._register(reducer_name, timeout)
+            call = CoalescedCall(reducer_name, args, args_json, flags, request_id, future)
+            held[key] = call
+            if reducer_name not in self._timers:
+                timer = threading.Timer(policy.window_ms / 1000, self.flush, args=(reducer_name,))
+                timer.daemon = True
+                timer.name = self._name
+                self._timers[reducer_name] = timer
+                timer.start()
+        return call, False
+
+    def _prune(self, now: float) -> None:
+        """Forget expired duplicates, oldest first; caller holds the lock."""
+        while self._recent:
+            key, call = next(iter(self._recent.items()))
+            if call.expires_at > now:
+                break
+            del self._recent[key]
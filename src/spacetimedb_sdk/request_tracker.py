@@ -3,13 +3,37 @@ RequestTracker - System for tracking reducer call requests and responses
 
 This module provides the RequestTracker class that manages request IDs,
 tracks pending requests, and correlates requests with their responses.
+
+Built for many requests in flight:
+- Request IDs come from an atomic counter, without taking a lock
+- Pending requests are spread over lock stripes by request ID, so
+  threads adding and resolving different requests rarely contend
+- Each stripe keeps a deadline heap: check_timeouts() costs O(expired),
+  not O(pending)
+- Completed responses live in a bounded LRU store with a TTL, so
+  responses nobody collects no longer accumulate
 """
 
+import heapq
+import itertools
+import math
 import time
 import threading
-from typing import Dict, Any, Optional, Set
+from typing import Dict, Any, List, Optional, Set, Tuple
 from dataclasses import dataclass
 
+from .data_structures import LRUCache
+
+# Lock stripes (a power of two: stripe = request_id & (stripes - 1))
+DEFAULT_STRIPES = 16
+
+# Completed responses kept, and seconds they stay retrievable
+DEFAULT_MAX_COMPLETED = 10000
+DEFAULT_COMPLETED_TTL = 300.0
+
+# Request IDs wrap around to 1 after this value (2^31 - 2)
+_MAX_REQUEST_ID = 2147483646
+
 
 @dataclass
 class PendingRequest:
@@ -18,6 +42,44 @@ class PendingRequest:
     timestamp: float
     timeout_seconds: float
     response: Optional[Any] = None
+    deadline: float = math.inf  # time.monotonic() deadline
+
+
+class _Stripe:
+    """Pending requests, deadlines and completed responses of one stripe."""
+    
+    __slots__ = ('lock', 'pending', 'deadlines', 'completed')
+    
+    def __init__(self, max_completed: int, completed_ttl: Optional[float]):
+        self.lock = threading.Lock()
+        self.pending: Dict[int, PendingRequest] = {}
+        # (deadline, request_id); entries of resolved requests are skipped when popped
+        self.deadlines: List[Tuple[float, int]] = []
+        self.completed: LRUCache = LRUCache(max_size=max_completed, ttl=completed_ttl)
+    
+    def track(self, pending_request: PendingRequest) -> None:
+        """Add a pending request (caller holds the lock)."""
+        self.pending[pending_request.request_id] = pending_request
+        if pending_request.deadline != math.inf:
+            heapq.heappush(self.deadlines, (pending_request.deadline, pending_request.request_id))
+            # Resolved requests leave heap entries behind until their deadline
+            if len(self.deadlines) > 2 * len(self.pending) + 64:
+                self.deadlines = [
+                    (deadline, request_id) for deadline, request_id in self.deadlines
+                    if request_id in self.pending
+                ]
+                heapq.heapify(self.deadlines)
+    
+    def next_deadline(self) -> Optional[float]:
+        """Earliest live deadline (caller holds the lock)."""
+        deadlines = self.deadlines
+        while deadlines:
+            deadline, request_id = deadlines[0]
+            pending_request = self.pending.get(request_id)
+            if pending_request is not None and pending_request.deadline == deadline:
+                return deadline
+            heapq.heappop(deadlines)
+        return None
 
 
 class RequestTracker:
@@ -32,19 +94,44 @@ class RequestTracker:
     - Thread-safe operations
     """
     
-    def __init__(self, default_timeout: float = 30.0):
+    def __init__(
+        self,
+        default_timeout: float = 30.0,
+        stripes: int = DEFAULT_STRIPES,
+        max_completed: int = DEFAULT_MAX_COMPLETED,
+        completed_ttl: Optional[float] = DEFAULT_COMPLETED_TTL
+    ):
         """
         Initialize the request tracker.
         
         Args:
             default_timeout: Default timeout in seconds for requests
+            stripes: Number of lock stripes (a power of two)
+            max_completed: Completed responses kept; the least recently used go first
+            completed_ttl: Seconds a completed response stays retrievable (None: no limit)
         """
-        self._lock = threading.Lock()
-        self._next_request_id = 1
-        self._pending_requests: Dict[int, PendingRequest] = {}
-        self._completed_responses: Dict[int, Any] = {}
+        if stripes < 1 or stripes & (stripes - 1):
+            raise ValueError("stripes must be a power of two")
+        if max_completed < 1:
+            raise ValueError("max_completed must be at least 1")
+        self._ids = itertools.count()
+        self._stripe_mask = stripes - 1
+        per_stripe = -(-max_completed // stripes)
+        self._stripes = [_Stripe(per_stripe, completed_ttl) for _ in range(stripes)]
         self._default_timeout = default_timeout
     
+    def _stripe(self, request_id: int) -> _Stripe:
+        return self._stripes[request_id & self._stripe_mask]
+    
+    @staticmethod
+    def _new_pending(request_id: int, timeout: float, timestamp: float, now: float) -> PendingRequest:
+        return PendingRequest(
+            request_id=request_id,
+            timestamp=timestamp,
+            timeout_seconds=timeout,
+            deadline=now + timeout
+        )
+    
     def generate_request_id(self) -> int:
         """
         Generate a unique request ID.
@@ -52,13 +139,8 @@ class RequestTracker:
         Returns:
             A unique integer request ID
         """
-        with self._lock:
-            request_id = self._next_request_id
-            self._next_request_id += 1
-            # Handle wrap-around at reasonable limit (2^31 - 1)
-            if self._next_request_id >= 2147483647:
-                self._next_request_id = 1
-            return request_id
+        # next() on itertools.count is atomic; IDs wrap around within 1..2^31 - 2
+        return next(self._ids) % _MAX_REQUEST_ID + 1
     
     def add_pending_request(
         self, 
@@ -70,17 +152,39 @@ class RequestTracker:
         
         Args:
             request_id: The request ID to track
-            timeout_seconds: Timeout for this specific request (uses default if None)
+            timeout_seconds: Timeout for this specific request (uses default if None;
+                math.inf for a request that never times out)
+        """
+        timeout = timeout_seconds if timeout_seconds is not None else self._default_timeout
+        pending_request = self._new_pending(request_id, timeout, time.time(), time.monotonic())
+        stripe = self._stripe(request_id)
+        with stripe.lock:
+            stripe.track(pending_request)
+    
+    def add_pending_requests(
+        self,
+        request_ids: List[int],
+        timeout_seconds: Optional[float] = None
+    ) -> None:
+        """
+        Add several requests to the pending requests tracker at once.
+        
+        Args:
+            request_ids: The request IDs to track
+            timeout_seconds: Timeout for these requests (uses default if None)
         """
         timeout = timeout_seconds if timeout_seconds is not None else self._default_timeout
+        timestamp = time.time()
+        now = time.monotonic()
         
-        with self._lock:
-            pending_request = PendingRequest(
-                request_id=request_id,
-                timestamp=time.time(),
-                timeout_seconds=timeout
-            )
-            self._pending_requests[request_id] = pending_request
+        by_stripe: Dict[int, List[int]] = {}
+        for request_id in request_ids:
+            by_stripe.setdefault(request_id & self._stripe_mask, []).append(request_id)
+        for index, stripe_ids in by_stripe.items():
+            stripe = self._stripes[index]
+            with stripe.lock:
+                for request_id in stripe_ids:
+                    stripe.track(self._new_pending(request_id, timeout, timestamp, now))
     
     def is_request_pending(self, request_id: int) -> bool:
         """
@@ -92,8 +196,7 @@ class RequestTracker:
         Returns:
             True if the request is pending, False otherwise
         """
-        with self._lock:
-            return request_id in self._pending_requests
+        return request_id in self._stripe(request_id).pending
     
     def resolve_request(self, request_id: int, response: Any) -> bool:
         """
@@ -106,13 +209,29 @@ class RequestTracker:
         Returns:
             True if the request was pending and resolved, False otherwise
         """
-        with self._lock:
-            if request_id in self._pending_requests:
-                # Remove from pending and store response
-                del self._pending_requests[request_id]
-                self._completed_responses[request_id] = response
-                return True
-            return False
+        stripe = self._stripe(request_id)
+        with stripe.lock:
+            if stripe.pending.pop(request_id, None) is None:
+                return False
+        # Removed from pending; keep the response until collected, evicted or expired
+        stripe.completed.set(request_id, response)
+        return True
+    
+    def pop_pending_request(self, request_id: int) -> Optional[PendingRequest]:
+        """
+        Stop tracking a pending request without storing a response.
+        
+        Used when the response is delivered elsewhere (e.g. to a future).
+        
+        Args:
+            request_id: The request ID to stop tracking
+            
+        Returns:
+            The pending request if it was tracked, None otherwise
+        """
+        stripe = self._stripe(request_id)
+        with stripe.lock:
+            return stripe.pending.pop(request_id, None)
     
     def get_response(self, request_id: int) -> Optional[Any]:
         """
@@ -124,8 +243,7 @@ class RequestTracker:
         Returns:
             The response data if available, None otherwise
         """
-        with self._lock:
-            return self._completed_responses.get(request_id)
+        return self._stripe(request_id).completed.get(request_id)
     
     def remove_completed_response(self, request_id: int) -> Optional[Any]:
         """
@@ -137,29 +255,48 @@ class RequestTracker:
         Returns:
             The response data if it existed, None otherwise
         """
-        with self._lock:
-            return self._completed_responses.pop(request_id, None)
+        return self._stripe(request_id).completed.pop(request_id)
     
     def check_timeouts(self) -> Set[int]:
         """
         Check for timed out requests and remove them.
         
+        Only deadlines that have passed are visited, so the cost grows with
+        the number of expired requests, not the number pending.
+        
         Returns:
             Set of request IDs that have timed out
         """
-        current_time = time.time()
+        now = time.monotonic()
         timed_out_requests = set()
         
-        with self._lock:
-            # Find timed out requests
-            for request_id, pending_request in list(self._pending_requests.items()):
-                elapsed = current_time - pending_request.timestamp
-                if elapsed > pending_request.timeout_seconds:
-                    timed_out_requests.add(request_id)
-                    del self._pending_requests[request_id]
+        for stripe in self._stripes:
+            with stripe.lock:
+                deadlines = stripe.deadlines
+                while deadlines and deadlines[0][0] <= now:
+                    deadline, request_id = heapq.heappop(deadlines)
+                    pending_request = stripe.pending.get(request_id)
+                    if pending_request is not None and pending_request.deadline == deadline:
+                        del stripe.pending[request_id]
+                        timed_out_requests.add(request_id)
         
         return timed_out_requests
     
+    def next_deadline(self) -> Optional[float]:
+        """
+        Get the earliest deadline of any pending request.
+        
+        Returns:
+            A time.monotonic() value, or None if no pending request can time out
+        """
+        earliest = None
+        for stripe in self._stripes:
+            with stripe.lock:
+                deadline = stripe.next_deadline()
+            if deadline is not None and (earliest is None or deadline < earliest):
+                earliest = deadline
+        return earliest
+    
     def get_pending_count(self) -> int:
         """
         Get the number of pending requests.
@@ -167,8 +304,7 @@ class RequestTracker:
         Returns:
             Number of currently pending requests
         """
-        with self._lock:
-            return len(self._pending_requests)
+        return sum(len(stripe.pending) for stripe in self._stripes)
     
     def get_completed_count(self) -> int:
         """
@@ -177,14 +313,17 @@ class RequestTracker:
         Returns:
             Number of completed responses waiting to be retrieved
         """
-        with self._lock:
-            return len(self._completed_responses)
+        for stripe in self._stripes:
+            stripe.completed.purge_expired()
+        return sum(stripe.completed.size() for stripe in self._stripes)
     
     def clear_all(self) -> None:
         """Clear all pending requests and completed responses."""
-        with self._lock:
-            self._pending_requests.clear()
-            self._completed_responses.clear()
+        for stripe in self._stripes:
+            with stripe.lock:
+                stripe.pending.clear()
+                stripe.deadlines.clear()
+            stripe.completed.clear()
     
     def get_pending_request_ids(self) -> Set[int]:
         """
@@ -193,8 +332,11 @@ class RequestTracker:
         Returns:
             Set of pending request IDs
         """
-        with self._lock:
-            return set(self._pending_requests.keys())
+        request_ids: Set[int] = set()
+        for stripe in self._stripes:
+            with stripe.lock:
+                request_ids.update(stripe.pending.keys())
+        return request_ids
     
     def get_oldest_pending_age(self) -> Optional[float]:
         """
@@ -204,12 +346,15 @@ class RequestTracker:
             Age in seconds of oldest pending request, or None if no pending requests
         """
         current_time = time.time()
+        oldest_timestamp = None
         
-        with self._lock:
-            if not self._pending_requests:
-                return None
+        for stripe in self._stripes:
+            with stripe.lock:
+                if stripe.pending:
+                    stripe_oldest = min(pending.timestamp for pending in stripe.pending.values())
+                    if oldest_timestamp is None or stripe_oldest < oldest_timestamp:
+                        oldest_timestamp = stripe_oldest
             
-            oldest_timestamp = min(
-                pending.timestamp for pending in self._pending_requests.values()
-            )
-            return current_time - oldest_timestamp 
\ No newline at end of file
+        if oldest_timestamp is None:
+            return None
+        return current_time - oldest_timestamp
@@ -0,0 +1,717 @@
+"""
+Versioned client-side row cache for SpacetimeDB Python SDK.
+
+Rows from one server transaction become visible to readers all at once:
+- Each table is published as an immutable TableVersion
+- Writers build the next version with bucketed copy-on-write, so applying a
+  transaction only copies the buckets it touches
+- Readers never take a lock; they read the currently published state
+- CacheSnapshot pins several tables at a single cache version
+- Rows shared by overlapping subscriptions are stored once and
+  reference-counted: every delivered insert adds a reference and every
+  delivered delete drops one
+
+Example:
+    cache = RowCache()
+    cache.apply([TableUpdate(...), TableUpdate(...)])
+
+    with cache.snapshot() as snap:
+        users = snap.table("users").all()
+        messages = snap.table("messages").all()
+"""
+
+import threading
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from typing import (
+    Any, Callable, Deque, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+)
+
+logger = logging.getLogger(__name__)
+
+RowKey = Hashable
+KeyGetter = Callable[[Any], RowKey]
+ChangeListener = Callable[['AppliedTransaction'], None]
+
+# Initial bucket count for a table (must be a power of two)
+DEFAULT_BUCKET_COUNT = 8
+
+# Average rows per bucket before the bucket array is doubled
+MAX_BUCKET_LOAD = 64
+
+
+def _freeze(value: Any) -> Hashable:
+    """Convert a (possibly nested) row value into a hashable form."""
+    if isinstance(value, dict):
+        return tuple((k, _freeze(v)) for k, v in sorted(value.items(), key=lambda kv: str(kv[0])))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_freeze(v) for v in value)
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        if hasattr(value, '__dict__'):
+            return (type(value).__name__, _freeze(vars(value)))
+        return repr(value)
+
+
+def default_row_key(row: Any) -> RowKey:
+    """
+    Derive a cache key for a row of a table without a primary key.
+
+    Hashable rows are their own key; dicts, lists and plain objects are
+    frozen into an equivalent hashable tuple.
+    """
+    try:
+        hash(row)
+        return row
+    except TypeError:
+        return _freeze(row)
+
+
+class TableVersion:
+    """
+    Immutable view of one table at a single cache version.
+
+    Rows are spread over a tuple of bucket dicts keyed by row key. A
+    published version is never mutated, so it can be iterated from any
+    thread while newer versions are being applied.
+    """
+
+    __slots__ = ('table_name', 'version', '_buckets', '_size')
+
+    def __init__(self, table_name: str, version: int = 0,
+                 buckets: Optional[Tuple[Dict[RowKey, Any], ...]] = None,
+                 size: int = 0):
+        self.table_name = table_name
+        self.version = version
+        self._buckets = buckets if buckets is not None else tuple({} for _ in range(DEFAULT_BUCKET_COUNT))
+        self._size = size
+
+    def _bucket_for(self, key: RowKey) -> Dict[RowKey, Any]:
+        return self._buckets[hash(key) & (len(self._buckets) - 1)]
+
+    def get(self, key: RowKey, default: Any = None) -> Any:
+        """Get a row by key."""
+        return self._bucket_for(key).get(key, default)
+
+    def __contains__(self, key: RowKey) -> bool:
+        return key in self._bucket_for(key)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[Any]:
+        return self.values()
+
+    def keys(self) -> Iterator[RowKey]:
+        """Iterate over row keys."""
+        for bucket in self._buckets:
+            yield from bucket.keys()
+
+    def values(self) -> Iterator[Any]:
+        """Iterate over rows."""
+        for bucket in self._buckets:
+            yield from bucket.values()
+
+    def items(self) -> Iterator[Tuple[RowKey, Any]]:
+        """Iterate over (key, row) pairs."""
+        for bucket in self._buckets:
+            yield from bucket.items()
+
+    def all(self) -> List[Any]:
+        """Get all rows as a list."""
+        return list(self.values())
+
+    def __repr__(self) -> str:
+        return f"TableVersion(table_name={self.table_name!r}, version={self.version}, rows={self._size})"
+
+
+class _TableWriter:
+    """Builds the next TableVersion from a published one, copying buckets on first write."""
+
+    def __init__(self, base: TableVersion):
+        self._base = base
+        self._buckets = list(base._buckets)
+        self._copied: set = set()
+        self._size = base._size
+        self._mask = len(self._buckets) - 1
+
+    def _writable_bucket(self, key: RowKey) -> Dict[RowKey, Any]:
+        index = hash(key) & self._mask
+        if index not in self._copied:
+            self._buckets[index] = dict(self._buckets[index])
+            self._copied.add(index)
+        return self._buckets[index]
+
+    def get(self, key: RowKey) -> Any:
+        return self._buckets[hash(key) & self._mask].get(key)
+
+    def put(self, key: RowKey, row: Any) -> Optional[Any]:
+        bucket = self._writable_bucket(key)
+        old = bucket.get(key)
+        if key not in bucket:
+            self._size += 1
+        bucket[key] = row
+        return old
+
+    def remove(self, key: RowKey) -> Optional[Any]:
+        if key not in self._buckets[hash(key) & self._mask]:
+            return None
+        bucket = self._writable_bucket(key)
+        self._size -= 1
+        return bucket.pop(key)
+
+    def build(self, version: int) -> TableVersion:
+        buckets = self._buckets
+        if self._size > len(buckets) * MAX_BUCKET_LOAD:
+            buckets = self._rehash(buckets)
+        return TableVersion(self._base.table_name, version, tuple(buckets), self._size)
+
+    def _rehash(self, buckets: List[Dict[RowKey, Any]]) -> List[Dict[RowKey, Any]]:
+        count = len(buckets)
+        while self._size > count * MAX_BUCKET_LOAD:
+            count *= 2
+        mask = count - 1
+        new_buckets: List[Dict[RowKey, Any]] = [{} for _ in range(count)]
+        for bucket in buckets:
+            for key, row in bucket.items():
+                new_buckets[hash(key) & mask][key] = row
+        return new_buckets
+
+
+@dataclass
+class AppliedTableChange:
+    """Rows actually inserted and deleted in one table by a transaction."""
+    table_name: str
+    inserts: List[Any] = field(default_factory=list)
+    deletes: List[Any] = field(default_factory=list)
+
+
+@dataclass
+class AppliedTransaction:
+    """Result of applying a transaction to the row cache."""
+    version: int
+    tables: Dict[str, AppliedTableChange] = field(default_factory=dict)
+
+
+class CacheSnapshot:
+    """
+    Consistent view of several tables at one cache version.
+
+    Tables are accessed with snapshot.table(name), snapshot[name] or
+    snapshot.table_name. Usable as a context manager; leaving the block
+    drops the pinned versions so they can be reclaimed.
+    """
+
+    def __init__(self, version: int, tables: Dict[str, TableVersion]):
+        self.version = version
+        self._tables = tables
+
+    def table(self, table_name: str) -> TableVersion:
+        """Get a table as of this snapshot (empty if unknown)."""
+        table = self._tables.get(table_name)
+        if table is None:
+            return TableVersion(table_name, self.version)
+        return table
+
+    def table_names(self) -> List[str]:
+        """List tables present in this snapshot."""
+        return list(self._tables.keys())
+
+    def __getitem__(self, table_name: str) -> TableVersion:
+        return self.table(table_name)
+
+    def __getattr__(self, table_name: str) -> TableVersion:
+        if table_name.startswith('_'):
+            raise AttributeError(table_name)
+        tables = self.__dict__.get('_tables', {})
+        if table_name in tables:
+            return tables[table_name]
+        pascal_name = ''.join(word.capitalize() for word in table_name.split('_'))
+        if pascal_name in tables:
+            return tables[pascal_name]
+        raise AttributeError(f"No table '{table_name}' in cache snapshot")
+
+    def release(self) -> None:
+        """Drop references to the pinned table versions."""
+        self._tables = {}
+
+    def __enter__(self) -> 'CacheSnapshot':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.release()
+
+
+class _OwnerSet(set):
+    """Set of owners of a row held by more than one subscription."""
+
+    __slots__ = ()
+
+
+class RowCache:
+    """
+    Client-side row cache with atomic, versioned transaction apply.
+
+    A single writer (the message processing thread) applies transactions;
+    any number of reader threads read published versions without locking.
+    All tables touched by one transaction are published by a single
+    reference swap, so readers never observe a partially applied transaction.
+
+    Rows are stored once however many subscriptions match them. The
+    server delivers a row once per subscription it matches, so each row
+    counts its delivered inserts minus its delivered deletes and is only
+    evicted when the count reaches zero. References delivered with a
+    known owner (a subscription's initial rows, a predicted call) are also
+    recorded per owner, so release() can drop them in bulk.
+    """
+
+    def __init__(self):
+        self._write_lock = threading.Lock()
+        # (version, tables) published together so readers see a matching pair
+        self._state: Tuple[int, Dict[str, TableVersion]] = (0, {})
+        self._key_getters: Dict[str, KeyGetter] = {}
+        # Writer-side reference tracking: table -> key -> reference count
+        # (a cached row without an entry has one), table -> key -> owner (or
+        # _OwnerSet) of owned references, and owner -> table -> keys for
+        # bulk release
+        self._ref_counts: Dict[str, Dict[RowKey, int]] = {}
+        self._row_owners: Dict[str, Dict[RowKey, Any]] = {}
+        self._owner_keys: Dict[Hashable, Dict[str, set]] = {}
+        # Replaced, never mutated, so the writer can capture it under the lock
+        self._listeners: Tuple[ChangeListener, ...] = ()
+        # Published transactions not yet passed to their listeners, in
+        # version order, and whether a thread is delivering them
+        self._undelivered: Deque[Tuple[Tuple[ChangeListener, ...], 'AppliedTransaction']] = deque()
+        self._delivering = False
+
+    @property
+    def version(self) -> int:
+        """Version of the most recently applied transaction."""
+        return self._state[0]
+
+    def set_key_getter(self, table_name: str, getter: Optional[KeyGetter]) -> None:
+        """
+        Set the function used to key rows of a table.
+
+        Tables with a primary key should use it; otherwise rows are keyed
+        by their full value (see default_row_key).
+        """
+        with self._write_lock:
+            if getter is None:
+                self._key_getters.pop(table_name, None)
+            else:
+                self._key_getters[table_name] = getter
+
+    def row_key(self, table_name: str, row: Any) -> RowKey:
+        """Compute the cache key for a row of a table."""
+        getter = self._key_getters.get(table_name)
+        if getter is not None:
+            key = getter(row)
+            if key is not None:
+                return key
+        return default_row_key(row)
+
+    def table(self, table_name: str) -> TableVersion:
+        """Get the latest published version of a table."""
+        version, tables = self._state
+        table = tables.get(table_name)
+        if table is None:
+            return TableVersion(table_name, version)
+        return table
+
+    def table_names(self) -> List[str]:
+        """List tables that have been populated."""
+        return list(self._state[1].keys())
+
+    def snapshot(self, table_names: Optional[Iterable[str]] = None) -> CacheSnapshot:
+        """
+        Pin the current version of the given tables (or all tables).
+
+        Args:
+            table_names: Tables to include, or None for every table
+
+        Returns:
+            CacheSnapshot covering the tables at one cache version
+        """
+        # The published state is replaced, never mutated, so one read is enough
+        version, tables = self._state
+        if table_names is not None:
+            tables = {name: tables.get(name) or TableVersion(name, version) for name in table_names}
+        return CacheSnapshot(version, dict(tables))
+
+    def apply(self, table_updates: Iterable[Any], owner: Optional[Hashable] = None,
+              release: Optional[Hashable] = None) -> AppliedTransaction:
+        """
+        Apply one transaction atomically.
+
+        Each delivered insert adds a reference to its row and each
+        delivered delete drops one; a row is evicted when its last
+        reference is dropped.
+
+        Args:
+            table_updates: Objects with table_name, inserts and deletes
+                (e.g. protocol.TableUpdate). Deletes are applied before
+                inserts, so a delete+insert of the same key is an update.
+            owner: Subscription (QueryId) that delivered the rows, whose
+                references are recorded for release()
+            release: Owner whose references are released after the
+                updates, in the same transaction (see release())
+
+        Returns:
+            AppliedTransaction with the new version and the rows that
+            actually changed in each table. A row already cached for
+            another subscription only gains or loses a reference and is
+            not reported as inserted or deleted.
+        """
+        with self._write_lock:
+            current_version, current_tables = self._state
+            version = current_version + 1
+            writers: Dict[str, _TableWriter] = {}
+            applied = AppliedTransaction(version=version)
+
+            for table_update in table_updates:
+                if table_update is None:
+                    continue
+                table_name = table_update.table_name
+                writer = writers.get(table_name)
+                if writer is None:
+                    writer = _TableWriter(current_tables.get(table_name) or TableVersion(table_name))
+                    writers[table_name] = writer
+                change = applied.tables.setdefault(table_name, AppliedTableChange(table_name))
+
+                counts = self._ref_counts.setdefault(table_name, {})
+                for row in getattr(table_update, 'deletes', None) or ():
+                    key = self.row_key(table_name, row)
+                    if writer.get(key) is None:
+                        continue
+                    remaining = counts.get(key, 1) - 1
+                    if owner is not None:
+                        self._remove_owner(table_name, key, owner)
+                    if remaining > 0:
+                        # Still delivered by another subscription
+                        counts[key] = remaining
+                        continue
+                    counts.pop(key, None)
+                    self._drop_owners(table_name, key)
+                    change.deletes.append(writer.remove(key))
+
+                for row in getattr(table_update, 'inserts', None) or ():
+                    key = self.row_key(table_name, row)
+                    existing = writer.get(key)
+                    counts[key] = counts.get(key, 1) + 1 if existing is not None else 1
+                    if owner is not None:
+                        self._add_owner(table_name, key, owner)
+                    if existing is not None and existing == row:
+                        # Overlapping subscription: store once, add a reference
+                        continue
+                    writer.put(key, row)
+                    if existing is not None:
+                        change.deletes.append(existing)
+                    change.inserts.append(row)
+
+            if release is not None:
+                self._release_into(release, current_tables, writers, applied)
+            if not writers:
+                return AppliedTransaction(version=current_version)
+            self._publish(current_tables, writers, version)
+            deliver = self._enqueue(applied)
+
+        if deliver:
+            self._deliver()
+        return applied
+
+    def release(self, owner: Hashable) -> AppliedTransaction:
+        """
+        Release every row reference recorded for an owner.
+
+        Rows whose last reference goes away are evicted in one atomic
+        transaction; rows still held by other subscriptions stay cached.
+        Use forget() instead when the server delivered the deletes.
+
+        Args:
+            owner: Subscription (QueryId) being removed
+
+        Returns:
+            AppliedTransaction listing the evicted rows as deletes
+        """
+        with self._write_lock:
+            current_version, current_tables = self._state
+            version = current_version + 1
+            writers: Dict[str, _TableWriter] = {}
+            applied = AppliedTransaction(version=version)
+            self._release_into(owner, current_tables, writers, applied)
+
+            if not writers:
+                applied.version = current_version
+                return applied
+            self._publish(current_tables, writers, version)
+            deliver = self._enqueue(applied)
+
+        if deliver:
+            self._deliver()
+        return applied
+
+    def _release_into(self, owner: Hashable, current_tables: Dict[str, TableVersion],
+                      writers: Dict[str, '_TableWriter'], applied: AppliedTransaction) -> None:
+        """Release an owner's references into a transaction being built; caller holds the write lock."""
+        owned = self._owner_keys.pop(owner, None)
+        if not owned:
+            return
+        for table_name, keys in owned.items():
+            counts = self._ref_counts.setdefault(table_name, {})
+            writer = None
+            for key in keys:
+                others = self._remove_owner(table_name, key, owner)
+                if others is None:
+                    continue
+                count = counts.get(key, 1)
+                # A delivered delete of a row held only by owners is not
+                # charged to any of them; the first one released absorbs it
+                if count > others:
+                    count -= 1
+                if count > 0:
+                    counts[key] = count
+                    continue
+                counts.pop(key, None)
+                self._drop_owners(table_name, key)
+                if writer is None:
+                    writer = writers.setdefault(
+                        table_name,
+                        _TableWriter(current_tables.get(table_name) or TableVersion(table_name))
+                    )
+                removed = writer.remove(key)
+                if removed is not None:
+                    applied.tables.setdefault(table_name, AppliedTableChange(table_name)).deletes.append(removed)
+
+    def forget(self, owner: Hashable) -> None:
+        """
+        Drop an owner's records without releasing its references.
+
+        For subscriptions whose deletes the server delivered (applied with
+        owner=), leaving nothing of theirs to release.
+        """
+        with self._write_lock:
+            owned = self._owner_keys.pop(owner, None)
+            for table_name, keys in (owned or {}).items():
+                for key in keys:
+                    self._remove_owner(table_name, key, owner)
+
+    def ref_count(self, table_name: str, key: RowKey) -> int:
+        """Number of references to a cached row (0 if not cached)."""
+        with self._write_lock:
+            if key not in self.table(table_name):
+                return 0
+            return self._ref_counts.get(table_name, {}).get(key, 1)
+
+    def owners(self, table_name: str, key: RowKey) -> List[Hashable]:
+        """Owners with a recorded reference to a cached row."""
+        with self._write_lock:
+            holders = self._row_owners.get(table_name, {}).get(key)
+            if holders is None:
+                return []
+            return list(holders) if isinstance(holders, _OwnerSet) else [holders]
+
+    def _add_owner(self, table_name: str, key: RowKey, owner: Hashable) -> None:
+        """Record an owner's reference to a row; caller holds the write lock."""
+        self._owner_keys.setdefault(owner, {}).setdefault(table_name, set()).add(key)
+        table_owners = self._row_owners.setdefault(table_name, {})
+        holders = table_owners.get(key)
+        if holders is None:
+            table_owners[key] = owner
+        elif isinstance(holders, _OwnerSet):
+            holders.add(owner)
+        elif holders != owner:
+            table_owners[key] = _OwnerSet((holders, owner))
+
+    def _remove_owner(self, table_name: str, key: RowKey, owner: Hashable) -> Optional[int]:
+        """
+        Remove an owner's record of a row; caller holds the write lock.
+
+        Returns:
+            Number of other owners of the row, or None if owner had no record
+        """
+        owned = self._owner_keys.get(owner)
+        if owned and table_name in owned:
+            owned[table_name].discard(key)
+        table_owners = self._row_owners.get(table_name, {})
+        holders = table_owners.get(key)
+        if isinstance(holders, _OwnerSet):
+            if owner not in holders:
+                return None
+            holders.discard(owner)
+            if len(holders) == 1:
+                table_owners[key] = next(iter(holders))
+            return len(holders)
+        if holders is None or holders != owner:
+            return None
+        del table_owners[key]
+        return 0
+
+    def _drop_owners(self, table_name: str, key: RowKey) -> None:
+        """Forget every owner of an evicted row; caller holds the write lock."""
+        table_owners = self._row_owners.get(table_name)
+        if not table_owners:
+            return
+        holders = table_owners.pop(key, None)
+        if holders is None:
+            return
+        for owner in holders if isinstance(holders, _OwnerSet) else (holders,):
+            owned = self._owner_keys.get(owner)
+            if owned and table_name in owned:
+                owned[table_name].discard(key)
+
+    def _publish(self, current_tables: Dict[str, TableVersion],
+                 writers: Dict[str, '_TableWriter'], version: int) -> None:
+        """Build and publish new table versions; caller holds the write lock."""
+        new_tables = dict(current_tables)
+        for table_name, writer in writers.items():
+            new_tables[table_name] = writer.build(version)
+
+        # Publish: a single reference swap makes every table visible at once
+        self._state = (version, new_tables)
+
+    def clear(self, table_name: Optional[str] = None) -> AppliedTransaction:
+        """Remove all rows from one table, or from every table."""
+        with self._write_lock:
+            current_version, current_tables = self._state
+            version = current_version + 1
+            applied = AppliedTransaction(version=version)
+            cleared = current_tables if table_name is None else {
+                name: table for name, table in current_tables.items() if name == table_name
+            }
+            for name, table in cleared.items():
+                applied.tables[name] = AppliedTableChange(name, deletes=list(table.values()))
+
+            if table_name is None:
+                self._state = (version, {})
+                self._ref_counts.clear()
+                self._row_owners.clear()
+                self._owner_keys.clear()
+            else:
+                new_tables = dict(current_tables)
+                new_tables.pop(table_name, None)
+                self._state = (version, new_tables)
+                self._ref_counts.pop(table_name, None)
+                self._row_owners.pop(table_name, None)
+                for owned in self._owner_keys.values():
+                    owned.pop(table_name, None)
+            deliver = self._enqueue(applied)
+
+        if deliver:
+            self._deliver()
+        return applied
+
+    def replace(self, tables: Dict[str, Iterable[Any]]) -> AppliedTransaction:
+        """
+        Make the cache hold exactly the given rows, in one transaction.
+
+        Used to reload a cache from a snapshot: tables that are not given
+        are emptied, every row is left with a single reference and owner
+        records are dropped. Only rows that differ from the current
+        contents are reported as inserted or deleted.
+        """
+        with self._write_lock:
+            current_version, current_tables = self._state
+            version = current_version + 1
+            writers: Dict[str, _TableWriter] = {}
+            applied = AppliedTransaction(version=version)
+
+            for table_name in set(tables) | set(current_tables):
+                rows = {self.row_key(table_name, row): row for row in tables.get(table_name, ())}
+                current = current_tables.get(table_name) or TableVersion(table_name)
+                writer = _TableWriter(current)
+                change = AppliedTableChange(table_name)
+                for key in [key for key in current.keys() if key not in rows]:
+                    change.deletes.append(writer.remove(key))
+                for key, row in rows.items():
+                    existing = writer.get(key)
+                    if existing is not None and existing == row:
+                        continue
+                    writer.put(key, row)
+                    if existing is not None:
+                        change.deletes.append(existing)
+                    change.inserts.append(row)
+                if change.inserts or change.deletes:
+                    writers[table_name] = writer
+                    applied.tables[table_name] = change
+
+            # Reference counts restart from the snapshot, even if no row changed
+            self._ref_counts.clear()
+            self._row_owners.clear()
+            self._owner_keys.clear()
+            if not writers:
+                return AppliedTransaction(version=current_version)
+            self._publish(current_tables, writers, version)
+            deliver = self._enqueue(applied)
+
+        if deliver:
+            self._deliver()
+        return applied
+
+    def add_listener(self, listener: ChangeListener) -> CacheSnapshot:
+        """
+        Register a callback for every applied transaction.
+
+        Listeners run after each transaction is published, one transaction
+        at a time and in version order: a transaction published while
+        another thread is still notifying listeners is passed to them by
+        that thread, once the earlier ones are done. Registration is atomic with respect
+        to applies: the returned snapshot is exactly the state the first
+        notified transaction builds on.
+
+        Args:
+            listener: Called with each AppliedTransaction
+
+        Returns:
+            Snapshot of every table at registration time
+        """
+        with self._write_lock:
+            self._listeners = self._listeners + (listener,)
+            version, tables = self._state
+            return CacheSnapshot(version, dict(tables))
+
+    def remove_listener(self, listener: ChangeListener) -> bool:
+        """Unregister a transaction listener."""
+        with self._write_lock:
+            if listener not in self._listeners:
+                return False
+            self._listeners = tuple(l for l in self._listeners if l != listener)
+            return True
+
+    def _enqueue(self, applied: AppliedTransaction) -> bool:
+        """
+        Queue a published transaction for the listeners; caller holds the write lock.
+
+        Returns:
+            True if the caller must deliver the queue (no other thread is)
+        """
+        if not self._listeners:
+            return False
+        self._undelivered.append((self._listeners, applied))
+        if self._delivering:
+            return False
+        self._delivering = True
+        return True
+
+    def _deliver(self) -> None:
+        """Pass queued transactions to their listeners until the queue is empty."""
+        while True:
+            with self._write_lock:
+                if not self._undelivered:
+                    self._delivering = False
+                    return
+                listeners, applied = self._undelivered.popleft()
+            self._notify(listeners, applied)
+
+    @staticmethod
+    def _notify(listeners: Tuple[ChangeListener, ...], applied: AppliedTransaction) -> None:
+        for listener in listeners:
+            try:
+                listener(applied)
+            except Exception as e:
+                logger.error(f"Error in row cache listener: {e}")
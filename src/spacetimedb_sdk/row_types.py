@@ -0,0 +1,250 @@
+"""
+Compact row classes for SpacetimeDB Python SDK.
+
+Generates memory-efficient row types from table schemas:
+- Rows are tuple subclasses with __slots__ = () and named field accessors,
+  so a row costs one tuple instead of a dict with its own key table
+- Classes are generated from ProductType schemas or TableMetadata
+- Rows can be decoded from BSATN straight into the row class
+- Generated classes are cached, so one schema maps to one class
+- Projected classes keep only selected columns; decoding a row into one
+  skips the values of the other columns
+
+Example:
+    User = row_class_from_product_type(user_product_type, "User")
+    row = User.from_dict({"id": 1, "name": "Alice"})
+    row.name          # "Alice"
+    row.to_dict()     # {"id": 1, "name": "Alice"}
+"""
+
+import threading
+from collections import namedtuple
+from typing import AbstractSet, Any, Callable, Dict, Iterable, Mapping, Optional, Sequence, Tuple, Type
+
+from .algebraic_type import ProductType
+from .bsatn.reader import BsatnReader
+from .bsatn.constants import TAG_STRUCT
+from .bsatn.exceptions import BsatnError
+from .bsatn.utils import decode_from_reader
+
+
+class RowBase(tuple):
+    """
+    Base class for generated compact row types.
+
+    Subclasses are namedtuple-backed, so field access is a C-level tuple
+    lookup. dict-style helpers (get, to_dict) keep code written against
+    plain dict rows working.
+    """
+
+    __slots__ = ()
+
+    _fields: Tuple[str, ...]
+    _field_index: Dict[str, int]
+    _row_class_key: Tuple[str, Tuple[str, ...]]
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> 'RowBase':
+        """Build a row from a column -> value mapping (missing columns are None)."""
+        get = data.get
+        return tuple.__new__(cls, [get(name) for name in cls._fields])
+
+    @classmethod
+    def from_values(cls, values: Iterable[Any]) -> 'RowBase':
+        """Build a row from values in column order."""
+        row = tuple.__new__(cls, values)
+        if len(row) != len(cls._fields):
+            raise ValueError(f"{cls.__name__} expects {len(cls._fields)} values, got {len(row)}")
+        return row
+
+    @classmethod
+    def coerce(cls, row: Any) -> 'RowBase':
+        """Convert a dict row to this class; rows of this class pass through."""
+        if isinstance(row, cls):
+            return row
+        if isinstance(row, (Mapping, RowBase)):
+            # Also narrows rows of a wider class to a projected one
+            return cls.from_dict(row)
+        if isinstance(row, (list, tuple)):
+            return cls.from_values(row)
+        return cls.from_dict(vars(row))
+
+    def get(self, name: str, default: Any = None) -> Any:
+        """Get a column value by name."""
+        index = self._field_index.get(name)
+        if index is None:
+            return default
+        return tuple.__getitem__(self, index)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the row to a plain dict."""
+        return dict(zip(self._fields, self))
+
+    def __reduce__(self):
+        # Generated classes are not module attributes; rebuild them by schema
+        name, fields = self._row_class_key
+        return (_rebuild_row, (name, fields, tuple(self)))
+
+
+def _rebuild_row(name: str, fields: Tuple[str, ...], values: Tuple[Any, ...]) -> RowBase:
+    return tuple.__new__(make_row_class(name, fields), values)
+
+
+_class_cache: Dict[Tuple[str, Tuple[str, ...]], Type[RowBase]] = {}
+_class_cache_lock = threading.Lock()
+
+
+def make_row_class(name: str, fields: Sequence[str]) -> Type[RowBase]:
+    """
+    Create (or reuse) a compact row class with the given columns.
+
+    Args:
+        name: Class name, usually the table name
+        fields: Column names in schema order
+
+    Returns:
+        RowBase subclass with one read-only attribute per column
+    """
+    fields = tuple(fields)
+    cache_key = (name, fields)
+    with _class_cache_lock:
+        cls = _class_cache.get(cache_key)
+        if cls is not None:
+            return cls
+
+        class_name = ''.join(word.capitalize() for word in name.split('_')) or 'Row'
+        base = namedtuple(f"_{class_name}Base", fields, rename=False)
+        # The namedtuple base comes first so column accessors win over helpers
+        cls = type(class_name, (base, RowBase), {
+            '__slots__': (),
+            '_field_index': {field: i for i, field in enumerate(fields)},
+            '_row_class_key': cache_key,
+            '__module__': __name__,
+        })
+        _class_cache[cache_key] = cls
+        return cls
+
+
+def row_class_from_product_type(product_type: ProductType, name: Optional[str] = None,
+                                columns: Optional[Iterable[str]] = None) -> Type[RowBase]:
+    """
+    Create a compact row class from a ProductType schema.
+
+    Args:
+        product_type: Table schema
+        name: Class name (defaults to the schema name)
+        columns: Only keep these columns (schema order is preserved)
+    """
+    fields = [field.name for field in product_type.fields]
+    if columns is not None:
+        fields = project_columns(fields, columns)
+    return make_row_class(name or product_type.name or 'Row', fields)
+
+
+def project_columns(fields: Sequence[str], columns: Iterable[str]) -> Tuple[str, ...]:
+    """
+    Restrict fields to a projection, keeping field order.
+
+    Raises:
+        ValueError: If a projected column is not a field
+    """
+    wanted = set(columns)
+    unknown = wanted.difference(fields)
+    if unknown:
+        raise ValueError(f"Unknown columns in projection: {sorted(unknown)}")
+    return tuple(name for name in fields if name in wanted)
+
+
+def row_class_for_table(metadata: Any) -> Optional[Type[RowBase]]:
+    """
+    Create a compact row class from TableMetadata.
+
+    Returns None if the metadata has no ProductType schema.
+    """
+    algebraic_type = getattr(metadata, 'algebraic_type', None)
+    if not isinstance(algebraic_type, ProductType):
+        return None
+    return row_class_from_product_type(algebraic_type, metadata.table_name)
+
+
+def column_getter(column_name: str) -> Callable[[Any], Any]:
+    """Build a getter for a column that works for dict rows and object rows."""
+    def getter(row: Any) -> Any:
+        if isinstance(row, dict):
+            return row.get(column_name)
+        return getattr(row, column_name, None)
+    return getter
+
+
+def dict_projector(columns: Iterable[str]) -> Callable[[Any], Dict[str, Any]]:
+    """Build a function that reduces a row to a dict of the given columns."""
+    getters = [(name, column_getter(name)) for name in columns]
+    names = {name for name, _ in getters}
+
+    def project(row: Any) -> Dict[str, Any]:
+        # Rows decoded with the projection already are kept as they are
+        if type(row) is dict and row.keys() == names:
+            return row
+        return {name: getter(row) for name, getter in getters}
+    return project
+
+
+def decode_row(reader: BsatnReader, row_class: Type[RowBase],
+               product_type: Optional[ProductType] = None) -> RowBase:
+    """
+    Decode one BSATN row directly into a compact row.
+
+    Args:
+        reader: Reader positioned at the row
+        row_class: Target row class
+        product_type: Schema for positional (untagged-struct) rows; if
+            omitted the row is read as a tagged struct with field names,
+            and fields row_class lacks are skipped without being decoded
+
+    Returns:
+        Decoded row without an intermediate dict
+
+    Raises:
+        ValueError: If row_class is not the class of product_type (e.g. a projection)
+    """
+    if product_type is not None:
+        if len(row_class._fields) != len(product_type.fields):
+            raise ValueError(f"{row_class.__name__} does not have the fields of the schema")
+        return tuple.__new__(row_class, [field.type.deserialize(reader) for field in product_type.fields])
+
+    tag = reader.read_tag()
+    if tag != TAG_STRUCT:
+        raise BsatnError(f"Expected struct tag for {row_class.__name__} row, got {tag}")
+    values = [None] * len(row_class._fields)
+    field_index = row_class._field_index
+    for _ in range(reader.read_struct_header()):
+        index = field_index.get(reader.read_field_name())
+        if index is None:
+            reader.skip_value()
+        else:
+            values[index] = decode_from_reader(reader)
+    return tuple.__new__(row_class, values)
+
+
+def decode_dict_row(reader: BsatnReader, columns: Optional[AbstractSet[str]] = None) -> Dict[str, Any]:
+    """
+    Decode one tagged-struct BSATN row into a dict.
+
+    Args:
+        reader: Reader positioned at the row
+        columns: Projection; values of other columns are skipped, not decoded
+
+    Returns:
+        Decoded row
+    """
+    tag = reader.read_tag()
+    if tag != TAG_STRUCT:
+        raise BsatnError(f"Expected struct tag for row, got {tag}")
+    row = {}
+    for _ in range(reader.read_struct_header()):
+        name = reader.read_field_name()
+        if columns is not None and name not in columns:
+            reader.skip_value()
+        else:
+            row[name] = decode_from_reader(reader)
+    return row
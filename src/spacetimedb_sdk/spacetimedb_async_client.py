@@ -7,13 +7,17 @@ using asyncio.run().
 For details on how to use this module, see the documentation on the SpacetimeDB website and
 the examples in the examples/asyncio directory. 
 
+The client is event driven: callbacks arriving on the SDK's message thread wake the
+asyncio loop through loop.call_soon_threadsafe(), so nothing polls and latency is
+bounded by the network rather than a timer tick.
+
 """
 
 from typing import List
 import asyncio
 from datetime import timedelta
 from datetime import datetime
-import traceback
+import threading
 
 from spacetimedb_sdk import SpacetimeDBClient
 
@@ -47,6 +51,12 @@ class SpacetimeDBAsyncClient:
         self.client = SpacetimeDBClient(autogen_package)
         self.prescheduled_events = []
         self.event_queue = None
+        self._loop = None
+        self._loop_thread = None
+        self._scheduled_handles = set()
+        # (reducer_name, asyncio.Future) of call_reducer() calls awaiting their event
+        self._reducer_waiters = []
+        self._listening_for_reducers = False
 
     def schedule_event(self, delay_secs, callback, *args):
         """
@@ -68,18 +78,13 @@ class SpacetimeDBAsyncClient:
             fire_time = datetime.now() + timedelta(seconds=delay_secs)
             scheduled_event = SpacetimeDBScheduledEvent(fire_time, callback, args)
 
-            # create async task
             def on_scheduled_event():
+                self._scheduled_handles.discard(handle)
                 self.event_queue.put_nowait(("scheduled_event", scheduled_event))
                 scheduled_event.callback(*scheduled_event.args)
 
-            async def wait_for_delay():
-                await asyncio.sleep(
-                    (scheduled_event.fire_time - datetime.now()).total_seconds()
-                )
-                on_scheduled_event()
-
-            asyncio.create_task(wait_for_delay())
+            handle = self._loop.call_later(delay_secs, on_scheduled_event)
+            self._scheduled_handles.add(handle)
 
     def register_on_subscription_applied(self, callback):
         """
@@ -126,9 +131,8 @@ class SpacetimeDBAsyncClient:
 
         self.is_closing = True
 
-        # TODO Cancel all scheduled event tasks
-
-        self.event_queue.put_nowait(("force_close", None))
+        self._call_soon(self._cancel_scheduled_events)
+        self._post("force_close")
 
     async def run(
         self,
@@ -162,10 +166,10 @@ class SpacetimeDBAsyncClient:
             on_connect(identity_result[0], identity_result[1])
 
         def on_subscription_applied():
-            self.event_queue.put_nowait(("subscription_applied", None))
+            self._post("subscription_applied")
 
         def on_event(event):
-            self.event_queue.put_nowait(("reducer_transaction", event))
+            self._post("reducer_transaction", event)
 
         self.client.register_on_event(on_event)
         self.client.register_on_subscription_applied(on_subscription_applied)
@@ -203,20 +207,21 @@ class SpacetimeDBAsyncClient:
         if not self.event_queue:
             self._on_async_loop_start()
 
+        # These run on the SDK's message thread
         def on_error(error):
-            self.event_queue.put_nowait(("error", SpacetimeDBException(error)))
+            self._post("error", SpacetimeDBException(error))
 
         def on_disconnect(close_msg):
             if self.is_closing:
-                self.event_queue.put_nowait(("disconnected", close_msg))
+                self._post("disconnected", close_msg)
             else:
-                self.event_queue.put_nowait(("error", SpacetimeDBException(close_msg)))
+                self._post("error", SpacetimeDBException(close_msg))
 
         def on_identity_received(auth_token, identity, address):
             self.identity = identity
             self.address = address
             self.client.subscribe(subscription_queries)
-            self.event_queue.put_nowait(("connected", (auth_token, identity)))
+            self._post("connected", (auth_token, identity))
 
         self.client._connect_internal(
             auth_token,
@@ -250,24 +255,24 @@ class SpacetimeDBAsyncClient:
 
         """
 
-        def on_reducer_result(event):
-            if event.reducer == reducer_name and event.caller_identity == self.identity:
-                self.event_queue.put_nowait(("reducer_result", event))
-
-        self.client.register_on_event(on_reducer_result)
-
-        timeout_task = asyncio.create_task(self._timeout_task(self.request_timeout))
+        if not self.event_queue:
+            self._on_async_loop_start()
 
-        self.client.call_reducer(reducer_name, *reducer_args)
+        if not self._listening_for_reducers:
+            self._listening_for_reducers = True
+            self.client.register_on_event(
+                lambda event: self._call_soon(self._on_reducer_event, event)
+            )
 
-        while True:
-            event, payload = await self._event()
-            if event == "reducer_result":
-                if not timeout_task.done():
-                    timeout_task.cancel()
-                return payload
-            elif event == "timeout":
-                raise SpacetimeDBException("Reducer call timed out.")
+        waiter = (reducer_name, self._loop.create_future())
+        self._reducer_waiters.append(waiter)
+        try:
+            self.client.call_reducer(reducer_name, *reducer_args)
+            return await asyncio.wait_for(waiter[1], self.request_timeout)
+        except asyncio.TimeoutError:
+            raise SpacetimeDBException("Reducer call timed out.")
+        finally:
+            self._reducer_waiters.remove(waiter)
 
     async def close(self):
         """
@@ -276,47 +281,57 @@ class SpacetimeDBAsyncClient:
         NOTE: DO NOT call this function if you are using the run() function. It will close for you.
         """
         self.is_closing = True
+        self._cancel_scheduled_events()
 
-        timeout_task = asyncio.create_task(self._timeout_task(self.request_timeout))
-
-        self.client.disconnect()
+        async def disconnect():
+            # disconnect() joins the SDK's threads, so keep it off the loop
+            await self._loop.run_in_executor(None, self.client.disconnect)
+            while True:
+                event, payload = await self._event()
+                if event == "disconnected":
+                    return
 
-        while True:
-            event, payload = await self._event()
-            if event == "disconnected":
-                if not timeout_task.done():
-                    timeout_task.cancel()
-                break
-            elif event == "timeout":
-                raise SpacetimeDBException("Close time out.")
+        try:
+            await asyncio.wait_for(disconnect(), self.request_timeout)
+        except asyncio.TimeoutError:
+            raise SpacetimeDBException("Close time out.")
 
     def _on_async_loop_start(self):
         self.event_queue = asyncio.Queue()
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
         for event in self.prescheduled_events:
             self.schedule_event(event[0], event[1], *event[2])
+        self.prescheduled_events = []
 
-    async def _timeout_task(self, timeout):
-        await asyncio.sleep(timeout)
-        self.event_queue.put_nowait(("timeout",))
+    def _call_soon(self, callback, *args):
+        """Run callback on the event loop; safe to call from any thread."""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return
+        if threading.get_ident() == self._loop_thread:
+            callback(*args)
+        else:
+            loop.call_soon_threadsafe(callback, *args)
+
+    def _post(self, event, payload=None):
+        """Queue an event for the loop, waking it if it is waiting."""
+        if self.event_queue is not None:
+            self._call_soon(self.event_queue.put_nowait, (event, payload))
+
+    def _on_reducer_event(self, event):
+        if event.caller_identity != self.identity:
+            return
+        # Oldest call of this reducer first
+        for reducer_name, waiter in self._reducer_waiters:
+            if reducer_name == event.reducer_name and not waiter.done():
+                waiter.set_result(event)
+                return
+
+    def _cancel_scheduled_events(self):
+        for handle in self._scheduled_handles:
+            handle.cancel()
+        self._scheduled_handles.clear()
 
-    # TODO: Replace this with a proper async queue
     async def _event(self):
-        update_task = asyncio.create_task(self._periodic_update())
-        try:
-            result = await self.event_queue.get()
-            update_task.cancel()
-            return result
-        except Exception as e:
-            update_task.cancel()
-            print(f"Exception: {e}")
-            raise e
-
-    async def _periodic_update(self):
-        while True:
-            try:
-                self.client.update()
-            except Exception as e:
-                print(f"Exception: {e}")
-                self.event_queue.put_nowait(("error", e))
-                return
-            await asyncio.sleep(0.1)
+        return await self.event_queue.get()
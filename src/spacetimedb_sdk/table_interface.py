@@ -8,16 +8,36 @@ Provides rich table interaction APIs matching TypeScript SDK functionality:
 - conn.db.table_name.iter()
 - conn.db.table_name.count()
 - conn.db.table_name.find_by_<unique_column>(value)
+- conn.db.table_name.aggregate(group_by=..., count/sum/min/max=...)
+- conn.db.table_name.to_columns() for array/NumPy/Arrow column exports
+- conn.db.table_name.changes_since(version) for polling consumers
+- async for change in conn.db.table_name.changes()
+- conn.db.snapshot() for consistent reads across several tables
+- conn.db.enable_interning() to share repeated identities and strings
+- conn.db.query(table).where(...).order_by(...).limit(n) evaluated locally
 """
 
 import logging
-from typing import Any, Callable, Dict, Iterator, List, Optional, Type, TypeVar, Generic, Union
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Type, TypeVar, Generic, Union
 from dataclasses import dataclass, field
 from abc import ABC, abstractmethod
 import threading
 import uuid
 from weakref import WeakSet, WeakKeyDictionary
 
+from .row_cache import RowCache, TableVersion, CacheSnapshot
+from .callback_executor import CallbackExecutor
+from .row_types import (
+    RowBase, make_row_class, row_class_from_product_type, project_columns, dict_projector,
+    decode_row, decode_dict_row, column_getter as _column_getter
+)
+from .algebraic_type import ProductType
+from .aggregates import AggregateView, GroupBy, Columns
+from .local_query import QueryEngine, LocalQuery, HashIndex
+from .change_log import ChangeLog, TableChanges
+from .update_coalescer import UpdateCoalescer
+from .interning import RowInterner, DEFAULT_MAX_VALUES_PER_COLUMN
+
 logger = logging.getLogger(__name__)
 
 # Type variables
@@ -61,16 +81,23 @@ class CallbackManager:
         }
         self._lock = threading.RLock()
         self._next_id = 0
+        self._executor: Optional[CallbackExecutor] = None
         
     def add_callback(self, event_type: str, callback: Callable) -> CallbackId:
         """Add a callback and return its ID."""
         with self._lock:
-            callback_id = f"{self.table_name}_{event_type}_{self._next_id}"
-            self._next_id += 1
+            callback_id = self.new_callback_id(event_type)
             self._callbacks[event_type][callback_id] = callback
             logger.debug(f"Added {event_type} callback {callback_id} for table {self.table_name}")
             return callback_id
             
+    def new_callback_id(self, event_type: str) -> CallbackId:
+        """Allocate a callback ID for a callback invoked outside this manager."""
+        with self._lock:
+            callback_id = f"{self.table_name}_{event_type}_{self._next_id}"
+            self._next_id += 1
+            return callback_id
+            
     def remove_callback(self, event_type: str, callback_id: CallbackId) -> bool:
         """Remove a callback by ID. Returns True if removed."""
         with self._lock:
@@ -80,11 +107,37 @@ class CallbackManager:
                 return True
             return False
             
+    def set_executor(self, executor: Optional[CallbackExecutor]) -> None:
+        """Run callbacks on an ordered executor instead of the calling thread."""
+        self._executor = executor
+        
+    def has_callbacks(self, event_type: str) -> bool:
+        """Check whether any callback is registered for an event type."""
+        return bool(self._callbacks[event_type])
+        
+    def dispatch_callbacks(self, event_type: str, ordering_key: Any, *args):
+        """
+        Invoke callbacks for an event type, on the executor if one is set.
+        
+        Dispatches sharing an ordering key run in order; the callbacks of
+        one dispatch run together as a single executor task.
+        """
+        executor = self._executor
+        if executor is None:
+            self.invoke_callbacks(event_type, *args)
+            return
+        with self._lock:
+            callbacks = list(self._callbacks[event_type].values())
+        if callbacks:
+            executor.submit(ordering_key, self._run_callbacks, event_type, callbacks, args, {})
+            
     def invoke_callbacks(self, event_type: str, *args, **kwargs):
         """Invoke all callbacks for an event type."""
         with self._lock:
             callbacks = list(self._callbacks[event_type].values())
-            
+        self._run_callbacks(event_type, callbacks, args, kwargs)
+        
+    def _run_callbacks(self, event_type: str, callbacks: List[Callable], args: tuple, kwargs: dict):
         for callback in callbacks:
             try:
                 callback(*args, **kwargs)
@@ -107,10 +160,25 @@ class TableHandle(Generic[T]):
         self._unique_columns: Dict[str, Callable[[T], Any]] = {}
         self._primary_key_column: Optional[str] = None
         self._primary_key_getter: Optional[Callable[[T], Any]] = None
+        self._order_by_key = False
+        # Converts decoded dict rows into compact row objects (None keeps dicts)
+        self._row_factory: Optional[Callable[[Any], T]] = None
+        # Schema used to decode positional BSATN rows, if known
+        self._schema: Optional[ProductType] = None
+        # Projected columns (None means every column is kept)
+        self.columns: Optional[Tuple[str, ...]] = None
+        # Debouncers of update callbacks registered with coalesce_window_ms
+        self._coalescers: Dict[CallbackId, UpdateCoalescer] = {}
+        # Columnar mirror created on the first to_columns() call
+        self._columnar: Optional['ColumnarMirror'] = None
+        # Interns values of decoded rows (set by DatabaseInterface.enable_interning)
+        self._interner: Optional[RowInterner] = None
         
     def count(self) -> int:
         """Get the number of rows in the table."""
         cache = self.client._get_table_cache(self.table_name)
+        if isinstance(cache, TableVersion):
+            return len(cache)
         if hasattr(cache, 'entries'):
             return len(cache.entries)
         elif hasattr(cache, 'values'):
@@ -118,7 +186,12 @@ class TableHandle(Generic[T]):
         return 0
         
     def iter(self) -> Iterator[T]:
-        """Iterate over all rows in the table."""
+        """
+        Iterate over all rows in the table.
+        
+        The iterator reads a single published version of the table, so it
+        is stable while newer transactions are being applied.
+        """
         cache = self.client._get_table_cache(self.table_name)
         if hasattr(cache, 'values'):
             return iter(cache.values())
@@ -129,6 +202,142 @@ class TableHandle(Generic[T]):
     def all(self) -> List[T]:
         """Get all rows as a list."""
         return list(self.iter())
+    
+    def changes_since(self, version: int) -> TableChanges:
+        """
+        Get the rows inserted and deleted after a cache version.
+        
+        Args:
+            version: Cursor from a previous call's TableChanges.version (0 to start)
+            
+        Returns:
+            TableChanges; if too_old is set the change log no longer reaches
+            back to version and snapshot holds the full table to resync from
+        """
+        change_log = getattr(self.client, 'change_log', None)
+        if not isinstance(change_log, ChangeLog):
+            raise RuntimeError("Change cursors require a client with a change log")
+        return change_log.changes_since(self.table_name, version)
+    
+    def changes(self, maxsize: int = 1024, overflow: str = "drop_oldest", batch: bool = False,
+                max_batch: Optional[int] = None, block_timeout: float = 1.0) -> 'ChangeStream':
+        """
+        Stream this table's row changes to asyncio code.
+        
+        Must be called with the consumer's event loop running.
+        
+        Args:
+            maxsize: Pending changes kept before the overflow policy applies
+            overflow: "drop_oldest", "coalesce" (by primary key) or "block"
+                (the applying thread waits up to block_timeout per change)
+            batch: Yield lists of pending changes instead of single changes
+            max_batch: Largest batch to yield
+            block_timeout: Longest wait of the applying thread under "block"
+            
+        Example:
+            async for change in conn.db.users.changes():
+                print(change.op, change.new_value)
+        """
+        from .change_stream import ChangeStream
+        
+        cache = getattr(self.client, 'row_cache', None)
+        if not isinstance(cache, RowCache):
+            raise RuntimeError("Change streams require a client with a row cache")
+        return ChangeStream(cache, self.table_name, maxsize=maxsize, overflow=overflow,
+                            batch=batch, max_batch=max_batch, block_timeout=block_timeout)
+    
+    def query(self) -> LocalQuery:
+        """Start a local query on this table (see DatabaseInterface.query)."""
+        return self.client.db.query(self.table_name)
+    
+    def create_index(self, column: str, kind: str = "hash") -> HashIndex:
+        """
+        Index a column for local queries.
+        
+        Args:
+            column: Column to index
+            kind: "hash" for equality, "range" for ordered and range lookups
+        """
+        return self.client.db.query_engine.create_index(self.table_name, column, kind)
+    
+    def aggregate(self, group_by: GroupBy = None, count: bool = True, sum: Columns = None,
+                  min: Columns = None, max: Columns = None) -> AggregateView:
+        """
+        Create an incrementally maintained aggregate view of this table.
+        
+        The view is computed once from the cache and then updated from each
+        transaction's changed rows.
+        
+        Args:
+            group_by: Column name, column names, or key function
+            count: Maintain a row count per group
+            sum: Column(s) to sum
+            min: Column(s) to track the minimum of
+            max: Column(s) to track the maximum of
+            
+        Returns:
+            AggregateView; call close() when it is no longer needed
+        """
+        cache = getattr(self.client, 'row_cache', None)
+        if not isinstance(cache, RowCache):
+            raise RuntimeError("Aggregate views require a client with a row cache")
+        return AggregateView(cache, self.table_name, group_by=group_by, count=count,
+                             sum=sum, min=min, max=max)
+    
+    def to_columns(self, columns: Optional[Iterable[str]] = None, format: str = "array",
+                   copy: bool = True) -> Any:
+        """
+        Export the cached table column by column.
+        
+        The first call builds a columnar mirror of the table that is then
+        kept current from each transaction's changed rows, so repeated
+        exports do not walk the row cache again.
+        
+        Args:
+            columns: Columns to export (default: every column)
+            format: "array" (array.array per numeric column, lists otherwise),
+                "list", "numpy" or "arrow"; NumPy and pyarrow must be installed
+                for their formats
+            copy: Return copies rather than the live mirror columns ("array" only)
+            
+        Returns:
+            Dict of column name to column, or a pyarrow.Table for "arrow"
+            
+        Example:
+            prices = conn.db.trades.to_columns(["price"], format="numpy")["price"]
+        """
+        from .columnar import ColumnarMirror, schema_typecodes
+        
+        cache = getattr(self.client, 'row_cache', None)
+        if not isinstance(cache, RowCache):
+            raise RuntimeError("Columnar export requires a client with a row cache")
+        requested = tuple(columns) if columns is not None else None
+        mirror = self._columnar
+        if (mirror is None or not mirror.columns
+                or (requested and not set(requested) <= set(mirror.columns))):
+            known = self._column_names(cache)
+            if requested:
+                known = known + tuple(c for c in requested if c not in known)
+            if mirror is not None:
+                mirror.close()
+            mirror = self._columnar = ColumnarMirror(cache, self.table_name, known,
+                                                     schema_typecodes(self._schema))
+        return mirror.export(requested, format=format, copy=copy)
+    
+    def _column_names(self, cache: RowCache) -> Tuple[str, ...]:
+        """Columns of this table from the projection, schema, or a cached row."""
+        if self.columns is not None:
+            return self.columns
+        if self._schema is not None:
+            return tuple(field.name for field in self._schema.fields)
+        fields = getattr(self.row_type, '_fields', None)
+        if fields:
+            return tuple(fields)
+        for row in cache.table(self.table_name).values():
+            if isinstance(row, dict):
+                return tuple(row)
+            return tuple(getattr(row, '_fields', None) or vars(row))
+        return ()
         
     # Insert callbacks
     def on_insert(self, callback: Callable[[EventContext, T], None]) -> CallbackId:
@@ -173,7 +382,8 @@ class TableHandle(Generic[T]):
         return self._callback_manager.remove_callback('delete', callback_id)
         
     # Update callbacks (only for tables with primary key)
-    def on_update(self, callback: Callable[[EventContext, T, T], None]) -> CallbackId:
+    def on_update(self, callback: Callable[[EventContext, T, T], None],
+                  coalesce_window_ms: Optional[float] = None) -> CallbackId:
         """
         Register a callback to run when a row is updated.
         
@@ -181,6 +391,10 @@ class TableHandle(Generic[T]):
         
         Args:
             callback: Function called with (event_context, old_row, new_row) when updated
+            coalesce_window_ms: If set, updates to the same primary key within
+                the window collapse into one (old_row, latest_row) call, made
+                from a timer thread when the window ends (never on the
+                callback executor)
             
         Returns:
             CallbackId that can be used to remove the callback
@@ -188,6 +402,14 @@ class TableHandle(Generic[T]):
         if not self._primary_key_column:
             raise ValueError(f"Table {self.table_name} does not have a primary key - updates not supported")
             
+        if coalesce_window_ms is not None:
+            coalescer = UpdateCoalescer(callback, coalesce_window_ms,
+                                        name=f"spacetimedb-coalescer-{self.table_name}")
+            # Fed by _process_row_change, not dispatched as a callback
+            callback_id = self._callback_manager.new_callback_id('update')
+            self._coalescers[callback_id] = coalescer
+            return callback_id
+            
         def wrapper(event_context, row_change: RowChange):
             if row_change.old_value and row_change.new_value:
                 callback(event_context, row_change.old_value, row_change.new_value)
@@ -195,9 +417,34 @@ class TableHandle(Generic[T]):
         return self._callback_manager.add_callback('update', wrapper)
         
     def remove_on_update(self, callback_id: CallbackId) -> bool:
-        """Remove an update callback by ID."""
+        """Remove an update callback by ID (pending coalesced updates are dropped)."""
+        coalescer = self._coalescers.pop(callback_id, None)
+        if coalescer is not None:
+            coalescer.close()
+            return True
         return self._callback_manager.remove_callback('update', callback_id)
         
+    def flush_updates(self) -> int:
+        """
+        Deliver pending coalesced updates now instead of at the window end.
+        
+        Returns:
+            Number of update callbacks made
+        """
+        return sum(coalescer.flush() for coalescer in list(self._coalescers.values()))
+        
+    def _discard_coalesced(self, keys: Iterable[Any]) -> None:
+        """Drop pending coalesced updates of deleted rows."""
+        for coalescer in list(self._coalescers.values()):
+            for key in keys:
+                coalescer.discard(key)
+        
+    def _change_key(self, row_change: RowChange) -> Any:
+        if row_change.primary_key is not None:
+            return row_change.primary_key
+        row = row_change.new_value if row_change.new_value is not None else row_change.old_value
+        return self._primary_key_getter(row)
+        
     # Unique column support
     def add_unique_column(self, column_name: str, getter: Callable[[T], Any]):
         """Register a unique column for find_by operations."""
@@ -210,24 +457,63 @@ class TableHandle(Generic[T]):
         
     def find_by_unique_column(self, column_name: str, value: Any) -> Optional[T]:
         """Find a row by a unique column value."""
-        if column_name not in self._unique_columns:
+        is_primary_key = column_name == self._primary_key_column
+        if column_name not in self._unique_columns and not is_primary_key:
             raise ValueError(f"Column {column_name} is not registered as unique for table {self.table_name}")
             
-        getter = self._unique_columns[column_name]
+        if is_primary_key:
+            # Cached rows are keyed by primary key
+            cache = self.client._get_table_cache(self.table_name)
+            if isinstance(cache, TableVersion):
+                return cache.get(value)
+            
+        getter = self._unique_columns.get(column_name) or self._primary_key_getter
         for row in self.iter():
             if getter(row) == value:
                 return row
         return None
         
+    # Callback execution
+    def use_executor(self, executor: Optional[CallbackExecutor], ordering: str = "table"):
+        """
+        Run this table's callbacks on an ordered executor.
+        
+        Args:
+            executor: Shared CallbackExecutor, or None to run callbacks inline
+            ordering: "table" keeps every callback of the table in order;
+                "key" only orders callbacks for the same primary key
+                (tables without a primary key fall back to "table")
+        """
+        if ordering not in ("table", "key"):
+            raise ValueError(f"Unknown callback ordering: {ordering}")
+        self._order_by_key = ordering == "key"
+        self._callback_manager.set_executor(executor)
+        
+    def _ordering_key(self, row_change: RowChange) -> Any:
+        if self._order_by_key and self._primary_key_getter:
+            pk = row_change.primary_key
+            if pk is None:
+                row = row_change.new_value if row_change.new_value is not None else row_change.old_value
+                pk = self._primary_key_getter(row)
+            return (self.table_name, pk)
+        return self.table_name
+        
     # Internal methods for event processing
     def _process_row_change(self, row_change: RowChange, event_context: Any = None):
         """Process a row change and invoke appropriate callbacks."""
-        if row_change.op == "insert":
-            self._callback_manager.invoke_callbacks('insert', event_context, row_change)
-        elif row_change.op == "delete":
-            self._callback_manager.invoke_callbacks('delete', event_context, row_change)
-        elif row_change.op == "update":
-            self._callback_manager.invoke_callbacks('update', event_context, row_change)
+        if row_change.op not in ("insert", "delete", "update"):
+            return
+        if row_change.op == "update" and self._coalescers and row_change.old_value and row_change.new_value:
+            # Coalescing runs on the calling thread, in order with the discards
+            # of deleted rows, even when callbacks go to an executor
+            key = self._change_key(row_change)
+            for coalescer in list(self._coalescers.values()):
+                coalescer.add(key, event_context, row_change.old_value, row_change.new_value)
+        if not self._callback_manager.has_callbacks(row_change.op):
+            return
+        self._callback_manager.dispatch_callbacks(
+            row_change.op, self._ordering_key(row_change), event_context, row_change
+        )
             
 
 class DatabaseInterface:
@@ -241,41 +527,123 @@ class DatabaseInterface:
         self.client = client
         self._table_handles: Dict[str, TableHandle] = {}
         self._table_metadata: Dict[str, Dict[str, Any]] = {}
+        self._default_executor: Optional[CallbackExecutor] = None
+        self._default_ordering = "table"
+        self._query_engine: Optional[QueryEngine] = None
+        self._interner: Optional[RowInterner] = None
         
     def register_table(self, table_name: str, row_type: Type[Any], 
                       primary_key: Optional[str] = None,
-                      unique_columns: Optional[List[str]] = None):
+                      unique_columns: Optional[List[str]] = None,
+                      columns: Optional[List[str]] = None):
         """
         Register a table with the database interface.
         
         Args:
             table_name: Name of the table
-            row_type: Type of rows in the table
+            row_type: Type of rows in the table. A ProductType schema or a
+                RowBase subclass makes incoming rows decode into compact
+                slotted row objects instead of dicts.
             primary_key: Name of primary key column (if any)
             unique_columns: List of unique column names
+            columns: Projection: cached rows keep only these columns.
+                The primary key and unique columns are always kept.
         """
+        schema = row_type if isinstance(row_type, ProductType) else None
+        if columns is not None:
+            keep = [c for c in [primary_key, *(unique_columns or [])] if c and c not in columns]
+            columns = keep + list(columns)
+            
+        if schema is not None:
+            row_type = row_class_from_product_type(schema, table_name, columns=columns)
+        elif columns is not None and isinstance(row_type, type) and issubclass(row_type, RowBase):
+            row_type = make_row_class(table_name, project_columns(row_type._fields, columns))
+            
         # Create table handle
         handle = TableHandle(table_name, self.client, row_type)
+        handle._schema = schema
+        if columns is not None:
+            handle.columns = tuple(row_type._fields) if hasattr(row_type, '_fields') else tuple(columns)
+        if isinstance(row_type, type) and issubclass(row_type, RowBase):
+            handle._row_factory = row_type.coerce
+        elif columns is not None:
+            handle._row_factory = dict_projector(columns)
         
         # Store metadata
         self._table_metadata[table_name] = {
             'row_type': row_type,
             'primary_key': primary_key,
-            'unique_columns': unique_columns or []
+            'unique_columns': unique_columns or [],
+            'columns': handle.columns
         }
         
         # Register unique columns
         if unique_columns:
             for col in unique_columns:
-                # Assume getter is an attribute access
-                handle.add_unique_column(col, lambda row, c=col: getattr(row, c, None))
+                handle.add_unique_column(col, _column_getter(col))
                 
         # Set primary key
         if primary_key:
-            handle.set_primary_key(primary_key, lambda row: getattr(row, primary_key, None))
+            handle.set_primary_key(primary_key, _column_getter(primary_key))
+            
+        # Key cached rows by primary key when the table has one
+        row_cache = getattr(self.client, 'row_cache', None)
+        if isinstance(row_cache, RowCache):
+            row_cache.set_key_getter(table_name, handle._primary_key_getter)
+        if self._query_engine is not None:
+            self._query_engine.set_primary_key(table_name, primary_key)
+            
+        if self._default_executor is not None:
+            handle.use_executor(self._default_executor, self._default_ordering)
+        handle._interner = self._interner
             
         self._table_handles[table_name] = handle
         
+    def decode_table_update(self, table_update: 'TableUpdate') -> 'TableUpdate':
+        """
+        Convert a table update's rows into the table's compact row type.
+        
+        Rows are replaced in place so the cache and every callback see the
+        same row objects.
+        """
+        table_update.inserts = self.decode_rows(table_update.table_name, table_update.inserts)
+        table_update.deletes = self.decode_rows(table_update.table_name, table_update.deletes)
+        return table_update
+        
+    def decode_rows(self, table_name: str, rows: List[Any]) -> List[Any]:
+        """
+        Convert rows of a table into its compact row type, interning values.
+        
+        Used for subscription updates and one-off query results alike.
+        """
+        handle = self._table_handles.get(table_name)
+        factory = handle._row_factory if handle else None
+        if factory is not None:
+            rows = [factory(row) for row in rows]
+        interner = self._interner
+        if interner is not None:
+            rows = interner.intern_rows(table_name, rows)
+        return rows
+        
+    def row_decoder(self, table_name: str) -> Optional[Callable[[Any], Any]]:
+        """
+        Function decoding one BSATN row of a table straight into its compact
+        row type or projected dict, or None if the table keeps whole dict rows.
+        
+        Used by the protocol decoder, so subscription and transaction rows
+        are built once; columns outside a projection are skipped without being decoded.
+        """
+        handle = self._table_handles.get(table_name)
+        if handle is None:
+            return None
+        row_type = handle.row_type
+        if isinstance(row_type, type) and issubclass(row_type, RowBase):
+            return lambda reader: decode_row(reader, row_type)
+        if handle.columns is not None:
+            columns = frozenset(handle.columns)
+            return lambda reader: decode_dict_row(reader, columns)
+        return None
+        
     def get_table(self, table_name: str) -> Optional[TableHandle]:
         """Get a table handle by name."""
         return self._table_handles.get(table_name)
@@ -296,6 +664,104 @@ class DatabaseInterface:
             
         raise AttributeError(f"No table '{table_name}' registered in database interface")
         
+    def use_callback_executor(self, executor: Optional[CallbackExecutor],
+                              ordering: str = "table",
+                              tables: Optional[List[str]] = None):
+        """
+        Run table callbacks on an ordered executor.
+        
+        Args:
+            executor: Shared CallbackExecutor, or None to run callbacks inline
+            ordering: "table" or "key" (see TableHandle.use_executor)
+            tables: Tables to configure (all registered and future tables if None)
+        """
+        if tables is None:
+            self._default_executor = executor
+            self._default_ordering = ordering
+        for table_name in tables if tables is not None else list(self._table_handles):
+            handle = self._table_handles.get(table_name)
+            if handle is None:
+                raise ValueError(f"No table '{table_name}' registered in database interface")
+            handle.use_executor(executor, ordering)
+        
+    def enable_interning(self, identities: bool = True,
+                         string_columns: Optional[Dict[str, Iterable[str]]] = None,
+                         max_values_per_column: int = DEFAULT_MAX_VALUES_PER_COLUMN) -> RowInterner:
+        """
+        Deduplicate repeated values in decoded rows.
+        
+        Applies to rows decoded after the call; rows already cached keep
+        their own objects.
+        
+        Args:
+            identities: Share identity and connection ID objects process-wide
+            string_columns: Table name -> columns whose string values are interned
+            max_values_per_column: Distinct values kept per interned column
+            
+        Returns:
+            The RowInterner, for its statistics
+            
+        Example:
+            conn.db.enable_interning(string_columns={"users": ["status", "region"]})
+        """
+        interner = RowInterner(identities=identities, string_columns=string_columns,
+                               max_values_per_column=max_values_per_column)
+        self._set_interner(interner)
+        return interner
+        
+    def disable_interning(self) -> None:
+        """Stop interning newly decoded rows."""
+        self._set_interner(None)
+        
+    @property
+    def interner(self) -> Optional[RowInterner]:
+        """Active RowInterner, or None if interning is off."""
+        return self._interner
+        
+    def _set_interner(self, interner: Optional[RowInterner]) -> None:
+        self._interner = interner
+        for handle in self._table_handles.values():
+            handle._interner = interner
+        
+    def snapshot(self, table_names: Optional[List[str]] = None) -> CacheSnapshot:
+        """
+        Get a consistent snapshot of several tables at one cache version.
+        
+        Args:
+            table_names: Tables to include (all tables if None)
+            
+        Example:
+            with conn.db.snapshot() as snap:
+                users = snap.users.all()
+                messages = snap.messages.all()
+        """
+        return self.client.row_cache.snapshot(table_names)
+        
+    def query(self, table_name: str) -> LocalQuery:
+        """
+        Query a table locally against the client cache.
+        
+        Primary-key and indexed predicates use a lookup; anything else is
+        a scan of the cached table.
+        
+        Example:
+            conn.db.query("users").where(col("age") > 30, team="red").order_by("name").limit(10).all()
+        """
+        return self.query_engine.query(table_name)
+        
+    @property
+    def query_engine(self) -> QueryEngine:
+        """Local query engine over the client cache (created on first use)."""
+        if self._query_engine is None:
+            row_cache = getattr(self.client, 'row_cache', None)
+            if not isinstance(row_cache, RowCache):
+                raise RuntimeError("Local queries require a client with a row cache")
+            engine = QueryEngine(row_cache)
+            for table_name, metadata in self._table_metadata.items():
+                engine.set_primary_key(table_name, metadata.get('primary_key'))
+            self._query_engine = engine
+        return self._query_engine
+        
     def list_tables(self) -> List[str]:
         """List all registered table names."""
         return list(self._table_handles.keys())
@@ -369,6 +835,12 @@ class TableEventProcessor:
                     primary_key=pk
                 )
                 table_handle._process_row_change(row_change, event_context)
+                
+            # A deleted row must not get a late coalesced update
+            if table_handle._coalescers:
+                table_handle._discard_coalesced(
+                    [pk for pk in deletes_by_pk if pk not in inserts_by_pk]
+                )
 
 
 # Helper function to create event context
@@ -0,0 +1,151 @@
+"""
+Update coalescing for SpacetimeDB Python SDK.
+
+Debounces high-frequency update callbacks per primary key:
+- Successive updates to one key within a window collapse into a single
+  delivery from the first old row to the latest new row
+- Pending updates are flushed at the end of each window by one
+  long-lived timer thread per coalescer
+- A delete of the key drops its pending update, so no stale update is
+  delivered after the row is gone
+
+Example:
+    conn.db.positions.on_update(redraw, coalesce_window_ms=50)
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class UpdateCoalescer:
+    """
+    Per-key debouncer for one update callback.
+
+    The first update of a key opens the window for all keys; when the
+    window ends every pending key is delivered once, on the timer thread.
+    The timer thread is started with the first window and reused for
+    every later one until close().
+    """
+
+    def __init__(self, callback: Callable[[Any, Any, Any], None], window_ms: float,
+                 name: str = "spacetimedb-coalescer"):
+        """
+        Initialize the coalescer.
+
+        Args:
+            callback: Called with (event_context, old_row, new_row)
+            window_ms: Window length in milliseconds
+            name: Timer thread name
+        """
+        if window_ms <= 0:
+            raise ValueError("coalesce window must be positive")
+        self._callback = callback
+        self._window = window_ms / 1000.0
+        self._name = name
+        self._lock = threading.Lock()
+        # Serializes deliveries so a slow flush is never overtaken by the next one
+        self._flush_lock = threading.Lock()
+        # key -> (latest event context, first old row, latest new row)
+        self._pending: Dict[Hashable, Tuple[Any, Any, Any]] = {}
+        self._wakeup = threading.Condition(self._lock)
+        # End of the open window, or None while nothing is pending
+        self._deadline: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self._received = 0
+        self._delivered = 0
+
+    def add(self, key: Hashable, event_context: Any, old_row: Any, new_row: Any) -> None:
+        """Record an update; delivery happens when the current window ends."""
+        with self._lock:
+            if self._closed:
+                return
+            self._received += 1
+            pending = self._pending.get(key)
+            if pending is not None:
+                old_row = pending[1]
+            self._pending[key] = (event_context, old_row, new_row)
+            if self._deadline is None:
+                self._deadline = time.monotonic() + self._window
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name=self._name, daemon=True)
+                    self._thread.start()
+                else:
+                    self._wakeup.notify()
+
+    def _run(self) -> None:
+        """Timer thread: flush at the end of each window until closed."""
+        while True:
+            with self._lock:
+                while not self._closed:
+                    if self._deadline is None:
+                        self._wakeup.wait()
+                        continue
+                    remaining = self._deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._wakeup.wait(remaining)
+                if self._closed:
+                    return
+            self.flush()
+
+    def discard(self, key: Hashable) -> None:
+        """Drop a key's pending update (e.g. because the row was deleted)."""
+        with self._lock:
+            self._pending.pop(key, None)
+
+    def flush(self) -> int:
+        """
+        Deliver every pending update now.
+
+        Keys whose latest row equals the first old row changed and changed
+        back within the window and are not delivered.
+
+        Returns:
+            Number of callbacks made
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                self._deadline = None
+
+            delivered = 0
+            for event_context, old_row, new_row in pending.values():
+                if old_row == new_row:
+                    continue
+                try:
+                    self._callback(event_context, old_row, new_row)
+                except Exception as e:
+                    logger.error(f"Error in coalesced update callback: {e}")
+                delivered += 1
+            with self._lock:
+                self._delivered += delivered
+            return delivered
+
+    def close(self, flush: bool = False) -> None:
+        """Stop the coalescer, delivering pending updates first if flush is set."""
+        if flush:
+            self.flush()
+        with self._lock:
+            self._closed = True
+            self._pending.clear()
+            self._deadline = None
+            self._wakeup.notify_all()
+
+    def pending(self) -> int:
+        """Number of keys waiting for the window to end."""
+        with self._lock:
+            return len(self._pending)
+
+    def get_metrics(self) -> Dict[str, int]:
+        """Counts of received updates and delivered callbacks."""
+        with self._lock:
+            return {
+                'received': self._received,
+                'delivered': self._delivered,
+                'pending': len(self._pending),
+            }
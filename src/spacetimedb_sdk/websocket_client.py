@@ -16,9 +16,10 @@ import time
 import base64
 import logging
 import json
-from typing import Optional, Callable, Dict, List, Any
+from typing import Optional, Callable, Dict, List, Any, Tuple
 from enum import Enum
 import uuid
+from functools import partial
 
 from .exceptions import (
     WebSocketHandshakeError,
@@ -97,7 +98,9 @@ class ModernWebSocketClient:
         initial_reconnect_delay: float = 1.0,
         max_reconnect_delay: float = 60.0,
         compression_config: Optional[CompressionConfig] = None,
-        retry_policy: Optional[RetryPolicy] = None
+        retry_policy: Optional[RetryPolicy] = None,
+        dispatcher: Optional[Any] = None,
+        message_dispatcher: Optional[Callable[[Callable[[], None]], None]] = None
     ):
         self.protocol = protocol
         self.use_binary = protocol == BIN_PROTOCOL
@@ -112,6 +115,11 @@ class ModernWebSocketClient:
         self.state = ConnectionState.DISCONNECTED
         self.ws: Optional[websocket.WebSocketApp] = None
         self.connection_thread: Optional[threading.Thread] = None
+        # Optional shared I/O loop (websocket-client dispatcher, e.g. a
+        # ClientHub's) reading the socket instead of a thread per connection
+        self._dispatcher = dispatcher
+        # Optional serial executor that decodes messages off the I/O loop
+        self._message_dispatcher = message_dispatcher
         
         # Connection details
         self.auth_token: Optional[str] = None
@@ -252,18 +260,32 @@ class ModernWebSocketClient:
             compression_headers = self.compression_manager.create_compression_headers()
             headers.update(compression_headers)
             
+            on_message = self._on_ws_message
+            on_close = self._on_ws_close
+            if self._message_dispatcher is not None:
+                # Decode and close handling run in order on the message dispatcher, not the I/O loop
+                on_message = lambda ws, message: self._message_dispatcher(partial(self._on_ws_message, ws, message))
+                on_close = lambda ws, code, msg: self._message_dispatcher(partial(self._on_ws_close, ws, code, msg))
+            
             # Create WebSocket connection
             self.ws = websocket.WebSocketApp(
                 url,
                 on_open=self._on_ws_open,
-                on_message=self._on_ws_message,
+                on_message=on_message,
                 on_error=self._on_ws_error,
-                on_close=self._on_ws_close,
+                on_close=on_close,
                 header=headers,
                 subprotocols=[self.protocol]
             )
             self.logger.debug("_do_connect: WebSocketApp instance created.")
             
+            if self._dispatcher is not None:
+                # Shared loop: the handshake runs here, then the dispatcher reads the socket
+                self.connection_thread = None
+                self.ws.run_forever(dispatcher=self._dispatcher)
+                self.logger.debug(f"_do_connect: Connection handed to dispatcher for {url}")
+                return
+            
             # Start connection in separate thread
             self.connection_thread = threading.Thread(
                 target=self.ws.run_forever,
@@ -313,6 +335,12 @@ class ModernWebSocketClient:
             current_thread = self.connection_thread
             self.logger.debug(f"Disconnect: current_ws is {'set' if current_ws else 'None'}, current_thread is {'set and alive' if current_thread and current_thread.is_alive() else ('set but not alive' if current_thread else 'None')}")
 
+            if current_ws and self._dispatcher is not None:
+                release = getattr(self._dispatcher, 'release', None)
+                sock = getattr(current_ws.sock, 'sock', None)
+                if release is not None and sock is not None:
+                    release(sock)
+            
             if current_ws:
                 self.logger.debug("Disconnect: Calling current_ws.close().")
                 try:
@@ -341,31 +369,36 @@ class ModernWebSocketClient:
             self.negotiated_compression = None
             self.logger.info("WebSocket client disconnected and cleaned up.")
     
+    def _encode_for_send(self, message: ClientMessage) -> bytes:
+        """Encode a client message, compressed if negotiated and beneficial."""
+        encoded_data = self.encoder.encode_client_message(message)
+        
+        # Apply compression if negotiated and beneficial
+        if self.negotiated_compression and self.negotiated_compression != CompressionType.NONE:
+            try:
+                compressed_data, compression_used = self.compression_manager.compress(
+                    encoded_data, self.negotiated_compression
+                )
+                
+                if compression_used != CompressionType.NONE:
+                    # Add compression metadata if needed
+                    # For WebSocket, compression is typically transparent
+                    encoded_data = compressed_data
+                    self.logger.debug(f"Compressed message: {len(encoded_data)} -> {len(compressed_data)} bytes ({compression_used.value})")
+                
+            except Exception as e:
+                self.logger.warning(f"Compression failed, sending uncompressed: {e}")
+                # Continue with uncompressed data
+        
+        return encoded_data
+    
     def send_message(self, message: ClientMessage) -> None:
         """Send a client message to the server with optional compression."""
         if self.state != ConnectionState.CONNECTED or not self.ws:
             raise RuntimeError("Not connected to SpacetimeDB")
         
         try:
-            # Encode the message
-            encoded_data = self.encoder.encode_client_message(message)
-            
-            # Apply compression if negotiated and beneficial
-            if self.negotiated_compression and self.negotiated_compression != CompressionType.NONE:
-                try:
-                    compressed_data, compression_used = self.compression_manager.compress(
-                        encoded_data, self.negotiated_compression
-                    )
-                    
-                    if compression_used != CompressionType.NONE:
-                        # Add compression metadata if needed
-                        # For WebSocket, compression is typically transparent
-                        encoded_data = compressed_data
-                        self.logger.debug(f"Compressed message: {len(encoded_data)} -> {len(compressed_data)} bytes ({compression_used.value})")
-                    
-                except Exception as e:
-                    self.logger.warning(f"Compression failed, sending uncompressed: {e}")
-                    # Continue with uncompressed data
+            encoded_data = self._encode_for_send(message)
             
             # Send the message
             self.ws.send(encoded_data)
@@ -375,14 +408,58 @@ class ModernWebSocketClient:
             self.logger.error(f"Failed to send message: {e}")
             raise
     
+    def send_messages(self, messages: List[ClientMessage]) -> int:
+        """
+        Send several client messages back to back.
+        
+        Every message is encoded and framed first; the frames are then
+        written as one buffer while holding the socket's send lock once,
+        instead of once per message.
+        
+        Returns:
+            Number of bytes written
+        """
+        if self.state != ConnectionState.CONNECTED or not self.ws:
+            raise RuntimeError("Not connected to SpacetimeDB")
+        
+        try:
+            payloads = [self._encode_for_send(message) for message in messages]
+            sock = getattr(self.ws, 'sock', None)
+            if sock is None or not hasattr(sock, 'lock'):
+                # Not a websocket-client socket: send message by message
+                for payload in payloads:
+                    self.ws.send(payload)
+                return sum(len(payload) for payload in payloads)
+            
+            frames = []
+            for payload in payloads:
+                # Same opcode as send_message()
+                frame = websocket.ABNF.create_frame(payload, websocket.ABNF.OPCODE_TEXT)
+                if sock.get_mask_key:
+                    frame.get_mask_key = sock.get_mask_key
+                frames.append(frame.format())
+            data = b"".join(frames)
+            length = len(data)
+            with sock.lock:
+                while data:
+                    data = data[sock._send(data):]
+            self.logger.debug(f"Sent {len(messages)} messages ({length} bytes)")
+            return length
+            
+        except Exception as e:
+            self.logger.error(f"Failed to send messages: {e}")
+            raise
+    
     def call_reducer(
         self,
         reducer_name: str,
         args: bytes,
-        flags: Optional[Any] = None
+        flags: Optional[Any] = None,
+        request_id: Optional[int] = None
     ) -> int:
-        """Call a reducer and return the request ID."""
-        request_id = generate_request_id()
+        """Call a reducer and return the request ID (generated unless given)."""
+        if request_id is None:
+            request_id = generate_request_id()
         message = CallReducer(
             reducer=reducer_name,
             args=args,
@@ -392,6 +469,24 @@ class ModernWebSocketClient:
         self.send_message(message)
         return request_id
     
+    def call_reducers(
+        self,
+        calls: List[Tuple[str, bytes, int]],
+        flags: Optional[Any] = None
+    ) -> None:
+        """
+        Call several reducers in one pipelined write.
+        
+        Args:
+            calls: (reducer_name, args, request_id) per call
+            flags: Flags applied to every call
+        """
+        flags = flags or CallReducerFlags.FULL_UPDATE
+        self.send_messages([
+            CallReducer(reducer=reducer_name, args=args, request_id=request_id, flags=flags)
+            for reducer_name, args, request_id in calls
+        ])
+    
     def subscribe_to_queries(self, queries: List[str]) -> int:
         """Subscribe to a list of queries (legacy method)."""
         request_id = generate_request_id()
@@ -458,12 +553,13 @@ class ModernWebSocketClient:
         self.send_message(message)
         return request_id
     
-    def execute_one_off_query(self, query: str) -> Dict[str, Any]:
+    def execute_one_off_query(self, query: str, message_id: Optional[bytes] = None) -> Dict[str, Any]:
         """
         Execute a one-off query with enhanced metadata tracking.
         
         Args:
             query: The SQL query string to execute
+            message_id: Message ID the response will carry (random if None)
             
         Returns:
             Dict containing metadata about the query execution:
@@ -478,7 +574,10 @@ class ModernWebSocketClient:
             raise RuntimeError("Not connected to SpacetimeDB")
         
         # Generate enhanced one-off query message
-        message = OneOffQueryMessage.generate(query)
+        if message_id is None:
+            message = OneOffQueryMessage.generate(query)
+        else:
+            message = OneOffQueryMessage(message_id=message_id, query_string=query)
         
         # Track execution metadata
         metadata = {
@@ -818,11 +917,25 @@ class ModernWebSocketClient:
             self.max_reconnect_delay
         )
         self.reconnect_attempts += 1
+        if self._dispatcher is not None:
+            self.logger.debug(f"_schedule_reconnect: Scheduling dispatcher timeout for {delay:.1f}s.")
+            self._dispatcher.timeout(delay, self._reconnect_from_dispatcher)
+            return
         self.logger.debug(f"_schedule_reconnect: Scheduling timer for {delay:.1f}s.")
         self.reconnect_timer = threading.Timer(delay, self._do_connect)
         self.reconnect_timer.start()
         self.logger.debug(f"_schedule_reconnect: Reconnect timer started for attempt {self.reconnect_attempts}.")
     
+    def _reconnect_from_dispatcher(self) -> None:
+        """Reconnect after a dispatcher timeout unless disconnected meanwhile."""
+        if self.state == ConnectionState.CLOSED:
+            return
+        if self._message_dispatcher is not None:
+            # Keep the blocking handshake off the shared I/O loop
+            self._message_dispatcher(self._do_connect)
+        else:
+            self._do_connect()
+    
     # Compression-specific methods
     
     def set_compression_config(self, config: CompressionConfig) -> None:
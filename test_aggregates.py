@@ -0,0 +1,125 @@
+"""
+Test incrementally maintained aggregate views for SpacetimeDB Python SDK.
+
+Tests:
+- Initial computation from cached rows
+- Incremental count/sum/min/max under inserts, updates and deletes
+- Change callbacks per group
+- conn.db.<table>.aggregate() through the client
+"""
+
+import unittest
+from typing import Any, Dict, List
+
+from spacetimedb_sdk.aggregates import AggregateView
+from spacetimedb_sdk.row_cache import RowCache
+from spacetimedb_sdk.protocol import TableUpdate
+from spacetimedb_sdk.modern_client import ModernSpacetimeDBClient
+
+
+def make_update(table_name: str, inserts: List[Dict[str, Any]] = None,
+                deletes: List[Dict[str, Any]] = None) -> TableUpdate:
+    inserts = inserts or []
+    deletes = deletes or []
+    return TableUpdate(
+        table_id=0,
+        table_name=table_name,
+        num_rows=len(inserts) + len(deletes),
+        inserts=inserts,
+        deletes=deletes
+    )
+
+
+class TestAggregateView(unittest.TestCase):
+    """Test AggregateView maintenance."""
+
+    def setUp(self):
+        self.cache = RowCache()
+        self.cache.set_key_getter("scores", lambda row: row["id"])
+        self.cache.apply([make_update("scores", inserts=[
+            {"id": 1, "team": "red", "points": 10},
+            {"id": 2, "team": "red", "points": 5},
+            {"id": 3, "team": "blue", "points": 7},
+        ])])
+
+    def test_initial_values(self):
+        view = AggregateView(self.cache, "scores", group_by="team", sum="points",
+                             min="points", max="points")
+        self.assertEqual(view.get("red"), {"count": 2, "sum_points": 15, "min_points": 5, "max_points": 10})
+        self.assertEqual(view.get("blue")["count"], 1)
+        self.assertIsNone(view.get("green"))
+        self.assertEqual(len(view), 2)
+
+    def test_incremental_updates(self):
+        view = AggregateView(self.cache, "scores", group_by="team", sum="points", max="points")
+        self.cache.apply([make_update("scores", inserts=[{"id": 4, "team": "blue", "points": 20}])])
+        self.assertEqual(view.get("blue"), {"count": 2, "sum_points": 27, "max_points": 20})
+
+        # Update moves a row between groups
+        self.cache.apply([make_update(
+            "scores",
+            deletes=[{"id": 1, "team": "red", "points": 10}],
+            inserts=[{"id": 1, "team": "blue", "points": 10}]
+        )])
+        self.assertEqual(view.get("red"), {"count": 1, "sum_points": 5, "max_points": 5})
+        self.assertEqual(view.get("blue"), {"count": 3, "sum_points": 37, "max_points": 20})
+
+        self.cache.apply([make_update("scores", deletes=[{"id": 2, "team": "red", "points": 5}])])
+        self.assertNotIn("red", view)
+        self.assertEqual(view.version, self.cache.version)
+
+    def test_min_max_after_removing_extreme(self):
+        view = AggregateView(self.cache, "scores", min="points", max="points")
+        self.cache.apply([make_update("scores", deletes=[{"id": 1}])])
+        self.assertEqual(view.get(), {"count": 2, "min_points": 5, "max_points": 7})
+
+    def test_multi_column_group_and_nulls(self):
+        self.cache.apply([make_update("scores", inserts=[{"id": 9, "team": "red", "points": None}])])
+        view = AggregateView(self.cache, "scores", group_by=["team"], sum="points")
+        self.assertEqual(view.get(("red",)), {"count": 3, "sum_points": 15})
+
+    def test_change_callbacks(self):
+        view = AggregateView(self.cache, "scores", group_by="team", count=True)
+        changes = []
+        view.on_change(lambda group, old, new: changes.append((group, old, new)))
+
+        self.cache.apply([make_update("scores", inserts=[{"id": 5, "team": "green", "points": 1}])])
+        self.cache.apply([make_update("scores", deletes=[{"id": 3}])])
+        # A transaction that does not change any aggregate fires nothing
+        self.cache.apply([make_update("other", inserts=[{"x": 1}])])
+
+        self.assertEqual(changes, [
+            ("green", None, {"count": 1}),
+            ("blue", {"count": 1}, None),
+        ])
+
+    def test_close_stops_updates(self):
+        view = AggregateView(self.cache, "scores")
+        view.close()
+        self.cache.apply([make_update("scores", inserts=[{"id": 8, "team": "red", "points": 1}])])
+        self.assertEqual(view.get(), {"count": 3})
+
+    def test_requires_an_aggregate(self):
+        with self.assertRaises(ValueError):
+            AggregateView(self.cache, "scores", count=False)
+
+
+class TestClientAggregate(unittest.TestCase):
+    """Test aggregates through the table interface."""
+
+    def setUp(self):
+        self.client = ModernSpacetimeDBClient(start_message_processing=False)
+        self.client.register_table("scores", dict, primary_key="id")
+
+    def tearDown(self):
+        self.client.shutdown()
+
+    def test_table_aggregate(self):
+        self.client._apply_to_cache([make_update("scores", inserts=[{"id": 1, "team": "red", "points": 3}])])
+        with self.client.db.scores.aggregate(group_by="team", sum="points") as view:
+            self.client._apply_to_cache([make_update("scores", inserts=[{"id": 2, "team": "red", "points": 4}])])
+            self.assertEqual(view.get("red"), {"count": 2, "sum_points": 7})
+
+
+if __name__ == '__main__':
+    unittest.main()
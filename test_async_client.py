@@ -0,0 +1,130 @@
+"""
+Test the event-driven SpacetimeDBAsyncClient.
+
+Tests:
+- Callbacks from another thread wake the loop without polling
+- call_reducer() resolves from the reducer event, oldest call first
+- Reducer call and close timeouts
+- force_close() cancels scheduled events
+"""
+
+import asyncio
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+
+from spacetimedb_sdk.spacetimedb_async_client import SpacetimeDBAsyncClient, SpacetimeDBException
+
+IDENTITY = "identity"
+
+
+class FakeClient:
+    """Stands in for the SDK client, firing callbacks from its own thread."""
+
+    def __init__(self):
+        self.on_event = []
+        self.reducer_calls = []
+        self.callbacks = {}
+        self.answer_reducers = True
+
+    def _fire(self, callback, *args, delay=0.01):
+        def run():
+            time.sleep(delay)
+            callback(*args)
+        threading.Thread(target=run, daemon=True).start()
+
+    def _connect_internal(self, auth_token, host, database_address, ssl_enabled,
+                          on_connect, on_error, on_disconnect, on_identity):
+        self.callbacks = {'error': on_error, 'disconnect': on_disconnect}
+        self._fire(on_identity, "token", IDENTITY, "address")
+
+    def subscribe(self, queries):
+        pass
+
+    def register_on_event(self, callback):
+        self.on_event.append(callback)
+
+    def register_on_subscription_applied(self, callback):
+        pass
+
+    def call_reducer(self, reducer_name, *args):
+        self.reducer_calls.append((reducer_name, args))
+        if self.answer_reducers:
+            event = SimpleNamespace(reducer_name=reducer_name, caller_identity=IDENTITY, args=args)
+            for callback in list(self.on_event):
+                # Answers arrive in call order
+                self._fire(callback, event, delay=0.01 * len(self.reducer_calls))
+
+    def disconnect(self):
+        if 'disconnect' in self.callbacks:
+            self._fire(self.callbacks['disconnect'], "bye")
+
+
+class TestAsyncClient(unittest.TestCase):
+
+    def setUp(self):
+        self.async_client = SpacetimeDBAsyncClient(None)
+        self.async_client.client.shutdown()
+        self.fake = FakeClient()
+        self.async_client.client = self.fake
+        self.async_client.request_timeout = 1
+
+    def test_connect_and_call_reducer(self):
+        async def main():
+            start = time.monotonic()
+            token, identity = await self.async_client.connect(None, "localhost:3000", "db", False)
+            connect_latency = time.monotonic() - start
+            # Only this task: no polling task is running next to it
+            self.assertEqual(len(asyncio.all_tasks()), 1)
+            first, second = await asyncio.gather(
+                self.async_client.call_reducer("add", 1),
+                self.async_client.call_reducer("add", 2),
+            )
+            await self.async_client.close()
+            return identity, connect_latency, first, second
+
+        identity, connect_latency, first, second = asyncio.run(main())
+        self.assertEqual(identity, IDENTITY)
+        self.assertLess(connect_latency, 0.09)
+        self.assertEqual(first.args, (1,))
+        self.assertEqual(second.args, (2,))
+        self.assertEqual(len(self.fake.on_event), 1)
+        self.assertEqual(self.async_client._reducer_waiters, [])
+
+    def test_reducer_timeout(self):
+        self.fake.answer_reducers = False
+        self.async_client.request_timeout = 0.05
+
+        async def main():
+            await self.async_client.connect(None, "localhost:3000", "db", False)
+            with self.assertRaises(SpacetimeDBException):
+                await self.async_client.call_reducer("slow")
+
+        asyncio.run(main())
+        self.assertEqual(self.async_client._reducer_waiters, [])
+
+    def test_error_from_other_thread(self):
+        async def main():
+            await self.async_client.connect(None, "localhost:3000", "db", False)
+            self.fake._fire(self.fake.callbacks['error'], "boom")
+            await self.async_client.run(None, "localhost:3000", "db", False, None)
+
+        with self.assertRaises(SpacetimeDBException):
+            asyncio.run(main())
+
+    def test_force_close_cancels_scheduled_events(self):
+        fired = []
+        self.async_client.schedule_event(0.2, fired.append, "late")
+        self.async_client.schedule_event(0.05, self.async_client.force_close)
+
+        async def main():
+            await self.async_client.run(None, "localhost:3000", "db", False, None)
+            await asyncio.sleep(0.25)
+
+        asyncio.run(main())
+        self.assertEqual(fired, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+"""
+Test pipelined batch reducer calls for SpacetimeDB Python SDK.
+
+Tests:
+- ModernWebSocketClient.send_messages() writes all frames in one buffer, in order
+- conn.call_reducers() returns one future per call, resolved by request ID
+- conn.call_reducers_async() gathers the results
+- A failed send fails every future of the batch
+"""
+
+import asyncio
+import json
+import socket
+import unittest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import websocket
+
+from spacetimedb_sdk.websocket_client import ModernWebSocketClient, ConnectionState
+from spacetimedb_sdk.protocol import TEXT_PROTOCOL, ConnectionId, ProtocolDecoder
+from spacetimedb_sdk.pending_calls import ReducerCallError
+from spacetimedb_sdk.modern_client import ModernSpacetimeDBClient
+
+
+def transaction_update(request_id: int, reducer: str, status=None) -> bytes:
+    """A TransactionUpdate as the server sends it over the text protocol."""
+    return json.dumps({"TransactionUpdate": {
+        "status": status or {"Committed": {"tables": []}},
+        "caller_identity": {"data": [0] * 32},
+        "caller_connection_id": {"data": [1] * 16},
+        "reducer_call": {"reducer_name": reducer, "reducer_id": 0, "args": "[]", "request_id": request_id},
+        "energy_quanta_used": {"quanta": 1},
+    }}).encode()
+
+
+def read_frames(sock: socket.socket, count: int):
+    """Read masked client frames from the server side of a socket pair."""
+    data = b""
+    payloads = []
+    while len(payloads) < count:
+        chunk = sock.recv(65536)
+        if not chunk:
+            break
+        data += chunk
+        while len(data) >= 2:
+            length = data[1] & 0x7F
+            offset = 2
+            if length == 126:
+                length = int.from_bytes(data[2:4], "big")
+                offset = 4
+            elif length == 127:
+                length = int.from_bytes(data[2:10], "big")
+                offset = 10
+            if len(data) < offset + 4 + length:
+                break
+            mask = data[offset:offset + 4]
+            payload = bytes(b ^ mask[i % 4] for i, b in enumerate(data[offset + 4:offset + 4 + length]))
+            payloads.append(payload)
+            data = data[offset + 4 + length:]
+    return payloads
+
+
+class TestSendMessages(unittest.TestCase):
+    """Test pipelined writes on the WebSocket client."""
+
+    def test_frames_written_in_order(self):
+        client_sock, server_sock = socket.socketpair()
+        self.addCleanup(client_sock.close)
+        self.addCleanup(server_sock.close)
+        core = websocket.WebSocket(enable_multithread=True)
+        core.sock = client_sock
+        core.connected = True
+
+        ws_client = ModernWebSocketClient(protocol=TEXT_PROTOCOL, auto_reconnect=False)
+        ws_client.ws = SimpleNamespace(sock=core, send=MagicMock())
+        ws_client.state = ConnectionState.CONNECTED
+
+        calls = [("add", json.dumps([i]).encode(), 100 + i) for i in range(200)]
+        ws_client.call_reducers(calls)
+        ws_client.ws.send.assert_not_called()
+
+        messages = [json.loads(payload) for payload in read_frames(server_sock, 200)]
+        self.assertEqual([m["CallReducer"]["request_id"] for m in messages], list(range(100, 300)))
+        self.assertEqual(messages[5]["CallReducer"]["reducer"], "add")
+
+    def test_requires_connection(self):
+        ws_client = ModernWebSocketClient(protocol=TEXT_PROTOCOL, auto_reconnect=False)
+        with self.assertRaises(RuntimeError):
+            ws_client.send_messages([])
+
+
+class TestCallReducers(unittest.TestCase):
+    """Test the batch API on the client."""
+
+    def setUp(self):
+        self.client = ModernSpacetimeDBClient(start_message_processing=False)
+        self.client.ws_client = MagicMock()
+        self.client.ws_client.is_connected = True
+        self.client.connection_id = ConnectionId(data=b"\x01" * 16)
+        self.batches = []
+        self.client.ws_client.call_reducers.side_effect = lambda calls, flags: self.batches.append(calls)
+
+    def tearDown(self):
+        self.client.ws_client = None
+        self.client.shutdown()
+
+    def answer(self, batch, failed=()):
+        decoder = ProtocolDecoder(use_binary=False)
+        for index, (reducer, _, request_id) in reversed(list(enumerate(batch))):
+            status = {"Failed": "nope"} if index in failed else None
+            self.client._handle_transaction_update(
+                decoder.decode_server_message(transaction_update(request_id, reducer, status)))
+
+    def test_futures_resolved_by_request_id(self):
+        futures = self.client.call_reducers([("add", (i, "x")) for i in range(1000)])
+        self.assertEqual(len(self.batches), 1)
+        batch = self.batches[0]
+        self.assertEqual(json.loads(batch[3][1]), [3, "x"])
+        self.assertEqual(len({request_id for _, _, request_id in batch}), 1000)
+
+        self.answer(batch, failed={7})
+        self.assertEqual(futures[0].result(0).status, "success")
+        with self.assertRaises(ReducerCallError):
+            futures[7].result(0)
+        self.assertEqual(len(self.client._reducer_calls), 0)
+
+    def test_gather(self):
+        async def main():
+            task = asyncio.ensure_future(self.client.call_reducers_async(
+                [("a", ()), ("b", [1])], return_exceptions=True))
+            while not self.batches:
+                await asyncio.sleep(0)
+            self.answer(self.batches[0], failed={1})
+            return await task
+
+        first, second = asyncio.run(main())
+        self.assertEqual(first.reducer_name, "a")
+        self.assertIsInstance(second, ReducerCallError)
+
+    def test_failed_send_fails_batch(self):
+        self.client.ws_client.call_reducers.side_effect = OSError("broken pipe")
+        with self.assertRaises(OSError):
+            self.client.call_reducers([("a", ()), ("b", ())])
+        self.assertEqual(len(self.client._reducer_calls), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,164 @@
+"""
+Test ordered callback executors for SpacetimeDB Python SDK.
+
+Tests:
+- Per-key serial ordering
+- Parallel progress across keys
+- Queue depth and lag metrics
+- Drained key queues are dropped, their counts kept in the totals
+- Table callbacks dispatched through the executor
+"""
+
+import threading
+import time
+import unittest
+
+from spacetimedb_sdk.callback_executor import CallbackExecutor
+from spacetimedb_sdk.protocol import TableUpdate
+from spacetimedb_sdk.table_interface import DatabaseInterface, TableEventProcessor
+from spacetimedb_sdk.modern_client import ModernSpacetimeDBClient
+
+
+class TestCallbackExecutor(unittest.TestCase):
+    """Test the keyed serial executor."""
+
+    def setUp(self):
+        self.executor = CallbackExecutor(max_workers=4, batch_size=3)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def test_same_key_runs_in_order(self):
+        seen = []
+        for i in range(100):
+            self.executor.submit("users", seen.append, i)
+        self.assertTrue(self.executor.wait_idle(timeout=5))
+        self.assertEqual(seen, list(range(100)))
+
+    def test_slow_key_does_not_block_other_keys(self):
+        release = threading.Event()
+        fast_done = threading.Event()
+        self.executor.submit("slow", release.wait, 5)
+        self.executor.submit("fast", fast_done.set)
+        self.assertTrue(fast_done.wait(timeout=2))
+        self.assertEqual(self.executor.queue_depth("slow"), 0)
+        release.set()
+        self.assertTrue(self.executor.wait_idle(timeout=5))
+
+    def test_metrics_report_depth_and_lag(self):
+        release = threading.Event()
+        self.executor.submit("t", release.wait, 5)
+        for _ in range(5):
+            self.executor.submit("t", lambda: None)
+        time.sleep(0.05)
+        self.assertEqual(self.executor.queue_depth("t"), 5)
+        self.assertGreater(self.executor.lag("t"), 0.0)
+
+        metrics = self.executor.get_metrics()
+        self.assertEqual(metrics['keys']['t']['queue_depth'], 5)
+        release.set()
+        self.assertTrue(self.executor.wait_idle(timeout=5))
+
+        metrics = self.executor.get_metrics()
+        self.assertEqual(metrics['pending'], 0)
+        self.assertEqual(metrics['completed'], 6)
+        self.assertGreater(metrics['max_lag'], 0.0)
+
+    def test_drained_keys_are_dropped(self):
+        for key in range(100):
+            self.executor.submit(key, lambda: None)
+        self.assertTrue(self.executor.wait_idle(timeout=5))
+        metrics = self.executor.get_metrics()
+        self.assertEqual(metrics['keys'], {})
+        self.assertEqual((metrics['submitted'], metrics['completed']), (100, 100))
+        self.assertEqual(len(self.executor._queues), 0)
+
+        # A retired key starts a fresh queue
+        self.executor.submit(0, lambda: None)
+        self.assertTrue(self.executor.wait_idle(timeout=5))
+        self.assertEqual(self.executor.get_metrics()['completed'], 101)
+
+    def test_errors_are_counted(self):
+        def boom():
+            raise RuntimeError("boom")
+        self.executor.submit("t", boom)
+        self.executor.submit("t", lambda: None)
+        self.assertTrue(self.executor.wait_idle(timeout=5))
+        self.assertEqual(self.executor.get_metrics()['errors'], 1)
+
+    def test_submit_after_shutdown_fails(self):
+        self.executor.shutdown()
+        with self.assertRaises(RuntimeError):
+            self.executor.submit("t", lambda: None)
+
+
+class TestTableCallbacksOnExecutor(unittest.TestCase):
+    """Test table callbacks dispatched through an executor."""
+
+    def setUp(self):
+        self.executor = CallbackExecutor(max_workers=4)
+        self.db = DatabaseInterface(client=None)
+        self.db.register_table("users", dict, primary_key="id")
+        self.db.register_table("messages", dict)
+        self.processor = TableEventProcessor(self.db)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def _insert(self, table_name, rows):
+        update = TableUpdate(table_id=0, table_name=table_name, num_rows=len(rows), inserts=rows, deletes=[])
+        self.processor.process_table_update(update)
+
+    def test_callbacks_run_off_calling_thread_in_order(self):
+        self.db.use_callback_executor(self.executor)
+        seen = []
+        threads = set()
+
+        def on_insert(ctx, row):
+            threads.add(threading.get_ident())
+            seen.append(row["id"])
+
+        self.db.users.on_insert(on_insert)
+        self._insert("users", [{"id": i} for i in range(50)])
+        self.assertTrue(self.executor.wait_idle(timeout=5))
+        self.assertEqual(seen, list(range(50)))
+        self.assertNotIn(threading.get_ident(), threads)
+
+    def test_per_key_ordering(self):
+        self.db.users.use_executor(self.executor, ordering="key")
+        release = threading.Event()
+        self.db.users.on_insert(lambda ctx, row: release.wait(5))
+        self._insert("users", [{"id": 1}, {"id": 2}])
+        keys = self.executor.get_metrics()['keys']
+        release.set()
+        self.assertIn(str(("users", 1)), keys)
+        self.assertIn(str(("users", 2)), keys)
+        self.assertTrue(self.executor.wait_idle(timeout=5))
+
+    def test_future_tables_use_default_executor(self):
+        self.db.use_callback_executor(self.executor)
+        self.db.register_table("scores", dict)
+        self.assertIs(self.db.scores._callback_manager._executor, self.executor)
+
+    def test_invalid_ordering(self):
+        with self.assertRaises(ValueError):
+            self.db.users.use_executor(self.executor, ordering="row")
+
+
+class TestClientCallbackExecutor(unittest.TestCase):
+    """Test enabling the executor on the client."""
+
+    def test_enable_and_metrics(self):
+        client = ModernSpacetimeDBClient(start_message_processing=False)
+        try:
+            client.register_table("users", dict, primary_key="id")
+            executor = client.enable_callback_executor(max_workers=2)
+            self.assertIs(client.callback_executor, executor)
+            self.assertIn('callback_executor', client.get_connection_metrics())
+        finally:
+            client.shutdown()
+        self.assertIsNone(client.callback_executor)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+"""
+Test change cursors for SpacetimeDB Python SDK.
+
+Tests:
+- changes_since() returns the inserts and deletes after a version
+- Cursor advancement across transactions and tables
+- "Too old" results with a snapshot once the log is trimmed
+- conn.db.<table>.changes_since() through the client
+"""
+
+import unittest
+from typing import Any, Dict, List
+
+from spacetimedb_sdk.change_log import ChangeLog
+from spacetimedb_sdk.row_cache import RowCache
+from spacetimedb_sdk.protocol import TableUpdate
+from spacetimedb_sdk.modern_client import ModernSpacetimeDBClient
+
+
+def make_update(table_name: str, inserts: List[Dict[str, Any]] = None,
+                deletes: List[Dict[str, Any]] = None) -> TableUpdate:
+    inserts = inserts or []
+    deletes = deletes or []
+    return TableUpdate(
+        table_id=0,
+        table_name=table_name,
+        num_rows=len(inserts) + len(deletes),
+        inserts=inserts,
+        deletes=deletes
+    )
+
+
+class TestChangeLog(unittest.TestCase):
+    """Test ChangeLog cursors."""
+
+    def setUp(self):
+        self.cache = RowCache()
+        self.cache.set_key_getter("users", lambda row: row["id"])
+        self.log = ChangeLog(self.cache, max_entries_per_table=3)
+
+    def test_changes_since_start(self):
+        self.cache.apply([make_update("users", inserts=[{"id": 1}])])
+        self.cache.apply([make_update("users", deletes=[{"id": 1}], inserts=[{"id": 2}])])
+
+        changes = self.log.changes_since("users", 0)
+        self.assertFalse(changes.too_old)
+        self.assertEqual(changes.version, 2)
+        self.assertEqual(changes.inserts, [{"id": 1}, {"id": 2}])
+        self.assertEqual(changes.deletes, [{"id": 1}])
+        self.assertEqual([entry.version for entry in changes.entries], [1, 2])
+
+    def test_cursor_advances(self):
+        self.cache.apply([make_update("users", inserts=[{"id": 1}])])
+        cursor = self.log.changes_since("users", 0).version
+
+        # Other tables advance the version without adding entries here
+        self.cache.apply([make_update("messages", inserts=[{"text": "hi"}])])
+        changes = self.log.changes_since("users", cursor)
+        self.assertFalse(changes)
+        self.assertEqual(changes.version, 2)
+
+        self.cache.apply([make_update("users", inserts=[{"id": 5}])])
+        changes = self.log.changes_since("users", changes.version)
+        self.assertEqual(changes.inserts, [{"id": 5}])
+        self.assertEqual(self.log.changes_since("users", changes.version).entries, [])
+
+    def test_too_old_after_trim(self):
+        for i in range(5):
+            self.cache.apply([make_update("users", inserts=[{"id": i}])])
+
+        changes = self.log.changes_since("users", 1)
+        self.assertTrue(changes.too_old)
+        self.assertEqual(changes.entries, [])
+        self.assertEqual(len(changes.snapshot), 5)
+        self.assertEqual(changes.version, 5)
+
+        # The retained window is still served incrementally
+        changes = self.log.changes_since("users", 2)
+        self.assertFalse(changes.too_old)
+        self.assertEqual(changes.inserts, [{"id": 2}, {"id": 3}, {"id": 4}])
+
+    def test_versions_before_log_started_are_too_old(self):
+        cache = RowCache()
+        cache.apply([make_update("users", inserts=[{"id": 1}])])
+        log = ChangeLog(cache)
+        self.assertTrue(log.changes_since("users", 0).too_old)
+        self.assertFalse(log.changes_since("users", 1).too_old)
+
+
+class TestClientChangesSince(unittest.TestCase):
+    """Test change cursors through the table interface."""
+
+    def setUp(self):
+        self.client = ModernSpacetimeDBClient(start_message_processing=False)
+        self.client.register_table("users", dict, primary_key="id")
+
+    def tearDown(self):
+        self.client.shutdown()
+
+    def test_table_changes_since(self):
+        self.client._apply_to_cache([make_update("users", inserts=[{"id": 1}, {"id": 2}])])
+        changes = self.client.db.users.changes_since(0)
+        self.assertEqual(len(changes.inserts), 2)
+
+        self.client._apply_to_cache([make_update("users", deletes=[{"id": 2}])])
+        changes = self.client.db.users.changes_since(changes.version)
+        self.assertEqual(changes.deletes, [{"id": 2}])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,206 @@
+"""
+Test async change streams for SpacetimeDB Python SDK.
+
+Tests:
+- async for delivery of inserts, updates and deletes
+- Overflow policies: drop oldest, coalesce by primary key, bounded block
+- Abandoned streams detach from the cache
+- Batch delivery
+- conn.db.<table>.changes() through the client
+"""
+
+import asyncio
+import gc
+import threading
+import time
+import unittest
+from typing import Any, Dict, List
+
+from spacetimedb_sdk.change_stream import ChangeStream
+from spacetimedb_sdk.row_cache import RowCache
+from spacetimedb_sdk.protocol import TableUpdate
+from spacetimedb_sdk.modern_client import ModernSpacetimeDBClient
+
+
+def make_update(table_name: str, inserts: List[Dict[str, Any]] = None,
+                deletes: List[Dict[str, Any]] = None) -> TableUpdate:
+    inserts = inserts or []
+    deletes = deletes or []
+    return TableUpdate(
+        table_id=0,
+        table_name=table_name,
+        num_rows=len(inserts) + len(deletes),
+        inserts=inserts,
+        deletes=deletes
+    )
+
+
+class TestChangeStream(unittest.TestCase):
+    """Test ChangeStream delivery and overflow policies."""
+
+    def setUp(self):
+        self.cache = RowCache()
+        self.cache.set_key_getter("prices", lambda row: row["id"])
+
+    def run_async(self, coro):
+        return asyncio.run(asyncio.wait_for(coro, timeout=5))
+
+    def test_ops_in_order(self):
+        async def main():
+            stream = ChangeStream(self.cache, "prices")
+            self.cache.apply([make_update("prices", inserts=[{"id": 1, "p": 10}])])
+            self.cache.apply([make_update("prices", deletes=[{"id": 1, "p": 10}], inserts=[{"id": 1, "p": 11}])])
+            self.cache.apply([make_update("prices", deletes=[{"id": 1, "p": 11}])])
+            stream.close()
+            return [(c.op, c.old_value, c.new_value) async for c in stream]
+
+        self.assertEqual(self.run_async(main()), [
+            ("insert", None, {"id": 1, "p": 10}),
+            ("update", {"id": 1, "p": 10}, {"id": 1, "p": 11}),
+            ("delete", {"id": 1, "p": 11}, None),
+        ])
+
+    def test_wakes_waiting_consumer_from_thread(self):
+        async def main():
+            stream = ChangeStream(self.cache, "prices")
+
+            def producer():
+                for i in range(3):
+                    self.cache.apply([make_update("prices", inserts=[{"id": i}])])
+
+            threading.Thread(target=producer).start()
+            received = []
+            async for change in stream:
+                received.append(change.new_value["id"])
+                if len(received) == 3:
+                    break
+            stream.close()
+            return received
+
+        self.assertEqual(self.run_async(main()), [0, 1, 2])
+
+    def test_block_applies_backpressure(self):
+        async def main():
+            stream = ChangeStream(self.cache, "prices", maxsize=2, overflow="block")
+            done = threading.Event()
+
+            def producer():
+                for i in range(6):
+                    self.cache.apply([make_update("prices", inserts=[{"id": i}])])
+                done.set()
+
+            threading.Thread(target=producer).start()
+            await asyncio.sleep(0.05)
+            self.assertFalse(done.is_set())
+            self.assertEqual(stream.qsize(), 2)
+            received = []
+            async for change in stream:
+                received.append(change.new_value["id"])
+                if len(received) == 6:
+                    break
+            stream.close()
+            return received, stream.get_stats()
+
+        received, stats = self.run_async(main())
+        self.assertEqual(received, list(range(6)))
+        self.assertEqual(stats['dropped'], 0)
+
+    def test_block_is_bounded(self):
+        async def main():
+            stream = ChangeStream(self.cache, "prices", maxsize=1, overflow="block", block_timeout=0.05)
+            done = threading.Event()
+
+            def producer():
+                for i in range(3):
+                    self.cache.apply([make_update("prices", inserts=[{"id": i}])])
+                done.set()
+
+            start = time.monotonic()
+            threading.Thread(target=producer).start()
+            while not done.is_set():
+                await asyncio.sleep(0.01)
+            elapsed = time.monotonic() - start
+            stream.close()
+            return elapsed, [c.new_value["id"] async for c in stream], stream.get_stats()
+
+        elapsed, received, stats = self.run_async(main())
+        self.assertLess(elapsed, 2)
+        self.assertEqual(received, [2])
+        self.assertEqual(stats['dropped'], 2)
+
+    def test_abandoned_stream_detaches(self):
+        loop = asyncio.new_event_loop()
+        try:
+            ChangeStream(self.cache, "prices", loop=loop)
+            gc.collect()
+            self.assertEqual(self.cache._listeners, ())
+        finally:
+            loop.close()
+
+    def test_drop_oldest(self):
+        async def main():
+            stream = ChangeStream(self.cache, "prices", maxsize=2)
+            for i in range(5):
+                self.cache.apply([make_update("prices", inserts=[{"id": i}])])
+            stream.close()
+            return [c.new_value["id"] async for c in stream], stream.get_stats()
+
+        received, stats = self.run_async(main())
+        self.assertEqual(received, [3, 4])
+        self.assertEqual(stats['dropped'], 3)
+
+    def test_coalesce_by_primary_key(self):
+        async def main():
+            stream = ChangeStream(self.cache, "prices", overflow="coalesce", batch=True)
+            self.cache.apply([make_update("prices", inserts=[{"id": 1, "p": 1}, {"id": 2, "p": 1}])])
+            for p in range(2, 6):
+                self.cache.apply([make_update("prices", deletes=[{"id": 1, "p": p - 1}], inserts=[{"id": 1, "p": p}])])
+            self.cache.apply([make_update("prices", deletes=[{"id": 2, "p": 1}])])
+            stream.close()
+            return [batch async for batch in stream]
+
+        batches = self.run_async(main())
+        self.assertEqual(len(batches), 1)
+        self.assertEqual([(c.op, c.new_value) for c in batches[0]], [("insert", {"id": 1, "p": 5})])
+
+    def test_batches_respect_max_batch(self):
+        async def main():
+            stream = ChangeStream(self.cache, "prices", batch=True, max_batch=2)
+            self.cache.apply([make_update("prices", inserts=[{"id": i} for i in range(5)])])
+            stream.close()
+            return [len(batch) async for batch in stream]
+
+        self.assertEqual(self.run_async(main()), [2, 2, 1])
+
+    def test_requires_event_loop(self):
+        with self.assertRaises(RuntimeError):
+            ChangeStream(self.cache, "prices")
+        loop = asyncio.new_event_loop()
+        try:
+            with self.assertRaises(ValueError):
+                ChangeStream(self.cache, "prices", overflow="spill", loop=loop)
+        finally:
+            loop.close()
+
+
+class TestClientChangeStream(unittest.TestCase):
+    """Test change streams through the table interface."""
+
+    def test_table_changes(self):
+        client = ModernSpacetimeDBClient(start_message_processing=False)
+        client.register_table("prices", dict, primary_key="id")
+
+        async def main():
+            async with client.db.prices.changes() as stream:
+                client._apply_to_cache([make_update("prices", inserts=[{"id": 7}])])
+                return await stream.__anext__()
+
+        try:
+            change = asyncio.run(asyncio.wait_for(main(), timeout=5))
+        finally:
+            client.shutdown()
+        self.assertEqual((change.op, change.primary_key), ("insert", 7))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,179 @@
+"""
+Test multiplexed client hosting for SpacetimeDB Python SDK.
+
+Tests:
+- Hosted clients add no threads of their own
+- The loop dispatcher reads sockets and runs timers on the hub's I/O thread
+- Clients are spread over decode workers and detached on shutdown
+- A WebSocket connection read by the hub loop and decoded on a worker
+"""
+
+import base64
+import hashlib
+import json
+import socket
+import threading
+import time
+import unittest
+
+from spacetimedb_sdk.client_hub import ClientHub
+from spacetimedb_sdk.websocket_client import ModernWebSocketClient
+from spacetimedb_sdk.protocol import TEXT_PROTOCOL
+
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+def text_frame(payload: str) -> bytes:
+    data = payload.encode("utf-8")
+    if len(data) < 126:
+        return bytes([0x81, len(data)]) + data
+    return bytes([0x81, 126]) + len(data).to_bytes(2, "big") + data
+
+
+def accept_websocket(listener: socket.socket) -> socket.socket:
+    """Accept one connection and complete the server side of the handshake."""
+    conn, _ = listener.accept()
+    request = b""
+    while b"\r\n\r\n" not in request:
+        request += conn.recv(4096)
+    headers = {}
+    for line in request.decode().split("\r\n")[1:]:
+        if ": " in line:
+            name, value = line.split(": ", 1)
+            headers[name.lower()] = value
+    accept = base64.b64encode(
+        hashlib.sha1((headers["sec-websocket-key"] + WEBSOCKET_GUID).encode()).digest()
+    ).decode()
+    response = (
+        "HTTP/1.1 101 Switching Protocols\r\n"
+        "Upgrade: websocket\r\nConnection: Upgrade\r\n"
+        f"Sec-WebSocket-Accept: {accept}\r\n"
+    )
+    if "sec-websocket-protocol" in headers:
+        response += f"Sec-WebSocket-Protocol: {headers['sec-websocket-protocol']}\r\n"
+    conn.sendall((response + "\r\n").encode())
+    return conn
+
+
+class TestClientHub(unittest.TestCase):
+    """Test ClientHub threading and dispatch."""
+
+    def setUp(self):
+        self.hub = ClientHub(decode_workers=2, name="test-hub")
+
+    def tearDown(self):
+        self.hub.close()
+
+    def test_hosted_clients_add_no_threads(self):
+        before = threading.active_count()
+        clients = [self.hub.create_client() for _ in range(20)]
+        self.assertEqual(threading.active_count(), before)
+        stats = self.hub.get_stats()
+        self.assertEqual(stats['clients'], 20)
+        self.assertEqual(stats['threads'], 3)
+        self.assertEqual([w['clients'] for w in stats['workers']], [10, 10])
+
+        clients[0].shutdown()
+        self.assertEqual(self.hub.get_stats()['clients'], 19)
+
+    def test_dispatcher_reads_on_io_thread(self):
+        a, b = socket.socketpair()
+        self.addCleanup(a.close)
+        self.addCleanup(b.close)
+        received = []
+        done = threading.Event()
+
+        def on_readable():
+            received.append((a.recv(16), threading.current_thread().name))
+            if len(received) == 2:
+                done.set()
+                return False
+            return True
+
+        self.hub.dispatcher.read(a, on_readable)
+        b.send(b"one")
+        time.sleep(0.05)
+        b.send(b"two")
+        self.assertTrue(done.wait(5))
+        self.assertEqual([data for data, _ in received], [b"one", b"two"])
+        self.assertEqual({name for _, name in received}, {"test-hub-io"})
+        time.sleep(0.05)
+        self.assertEqual(self.hub.get_stats()['sockets'], 0)
+
+    def test_timeout(self):
+        fired = threading.Event()
+        self.hub.dispatcher.timeout(0.01, fired.set)
+        self.assertTrue(fired.wait(5))
+
+    def test_client_tasks_run_in_order_on_one_worker(self):
+        client = self.hub.create_client()
+        order = []
+        for i in range(100):
+            client._hub_executor(lambda i=i: order.append((i, threading.current_thread().name)))
+        deadline = time.monotonic() + 5
+        while len(order) < 100 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual([i for i, _ in order], list(range(100)))
+        self.assertEqual(len({name for _, name in order}), 1)
+
+    def test_closed_hub_refuses_clients(self):
+        self.hub.close()
+        with self.assertRaises(RuntimeError):
+            self.hub.create_client()
+
+
+class TestHubWebSocket(unittest.TestCase):
+    """Test a WebSocket connection hosted on the hub."""
+
+    def test_message_decoded_on_worker(self):
+        listener = socket.socket()
+        listener.bind(("127.0.0.1", 0))
+        listener.listen(1)
+        port = listener.getsockname()[1]
+        hub = ClientHub(decode_workers=1, name="ws-hub")
+        client = hub.create_client()
+        identities = []
+        identified = threading.Event()
+
+        def on_identity(token, identity, connection_id):
+            identities.append((token, threading.current_thread().name))
+            identified.set()
+
+        client._on_identity.append(on_identity)
+        ws = ModernWebSocketClient(
+            protocol=TEXT_PROTOCOL,
+            on_message=client._handle_message,
+            auto_reconnect=False,
+            dispatcher=hub.dispatcher,
+            message_dispatcher=client._hub_executor
+        )
+        ws.enable_preflight_checks = False
+        ws.retry_on_transient_errors = False
+        server_conn = None
+        try:
+            threads_before = threading.active_count()
+            accepted = {}
+            server = threading.Thread(target=lambda: accepted.setdefault("conn", accept_websocket(listener)))
+            server.start()
+            ws.connect(None, f"127.0.0.1:{port}", "db", ssl_enabled=False)
+            server.join(5)
+            server_conn = accepted["conn"]
+            self.assertIsNone(ws.connection_thread)
+            self.assertEqual(threading.active_count(), threads_before)
+
+            server_conn.sendall(text_frame(json.dumps({"IdentityToken": {
+                "identity": "ab" * 32, "token": "tok", "connection_id": "cd" * 16
+            }})))
+            self.assertTrue(identified.wait(5))
+            self.assertEqual(identities, [("tok", "ws-hub-decode-0")])
+            self.assertEqual(hub.get_stats()['sockets'], 1)
+        finally:
+            ws.disconnect()
+            if server_conn is not None:
+                server_conn.close()
+            listener.close()
+            hub.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
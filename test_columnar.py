@@ -0,0 +1,158 @@
+"""
+Test columnar exports of cached tables for SpacetimeDB Python SDK.
+
+Tests:
+- Typed array.array columns from the schema, lists for other columns
+- Incremental maintenance on insert, update and delete
+- Fallback to a list when a value does not fit the typed column
+- conn.db.<table>.to_columns() through the client
+- NumPy and Arrow formats when those packages are installed
+"""
+
+import importlib.util
+import unittest
+from array import array
+from typing import Any, Dict, List
+
+from spacetimedb_sdk.columnar import ColumnarMirror, schema_typecodes
+from spacetimedb_sdk.row_cache import RowCache
+from spacetimedb_sdk.protocol import TableUpdate
+from spacetimedb_sdk.algebraic_type import ProductType, FieldInfo, IntType, FloatType, StringType
+from spacetimedb_sdk.modern_client import ModernSpacetimeDBClient
+
+HAS_NUMPY = importlib.util.find_spec("numpy") is not None
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+
+def make_update(table_name: str, inserts: List[Dict[str, Any]] = None,
+                deletes: List[Dict[str, Any]] = None) -> TableUpdate:
+    inserts = inserts or []
+    deletes = deletes or []
+    return TableUpdate(
+        table_id=0,
+        table_name=table_name,
+        num_rows=len(inserts) + len(deletes),
+        inserts=inserts,
+        deletes=deletes
+    )
+
+
+TRADE_SCHEMA = ProductType([
+    FieldInfo("id", IntType(32, False)),
+    FieldInfo("price", FloatType(64)),
+    FieldInfo("symbol", StringType()),
+])
+
+
+class TestColumnarMirror(unittest.TestCase):
+    """Test ColumnarMirror maintenance and export."""
+
+    def setUp(self):
+        self.cache = RowCache()
+        self.cache.set_key_getter("trades", lambda row: row["id"])
+        self.cache.apply([make_update("trades", inserts=[
+            {"id": i, "price": float(i), "symbol": "S%d" % i} for i in range(3)
+        ])])
+        self.mirror = ColumnarMirror(self.cache, "trades", ("id", "price", "symbol"),
+                                     schema_typecodes(TRADE_SCHEMA))
+
+    def tearDown(self):
+        self.mirror.close()
+
+    def rows(self) -> Dict[int, tuple]:
+        columns = self.mirror.export(format="list")
+        return {i: (p, s) for i, p, s in zip(columns["id"], columns["price"], columns["symbol"])}
+
+    def test_typed_columns(self):
+        columns = self.mirror.export()
+        # u32 is stored in 4 bytes whatever the size of C long
+        self.assertEqual((columns["id"].typecode.isupper(), columns["id"].itemsize), (True, 4))
+        self.assertEqual(columns["price"].typecode, 'd')
+        self.assertIsInstance(columns["symbol"], list)
+        self.assertEqual(sorted(columns["id"]), [0, 1, 2])
+
+    def test_incremental_changes(self):
+        self.cache.apply([make_update("trades", inserts=[{"id": 3, "price": 3.0, "symbol": "S3"}])])
+        self.cache.apply([make_update("trades", deletes=[{"id": 0, "price": 0.0, "symbol": "S0"}])])
+        self.cache.apply([make_update("trades", deletes=[{"id": 1, "price": 1.0, "symbol": "S1"}],
+                                      inserts=[{"id": 1, "price": 1.5, "symbol": "S1"}])])
+        self.assertEqual(self.rows(), {1: (1.5, "S1"), 2: (2.0, "S2"), 3: (3.0, "S3")})
+        self.assertEqual(len(self.mirror), 3)
+        self.assertEqual(self.mirror.version, self.cache.version)
+
+    def test_untyped_value_falls_back_to_list(self):
+        self.cache.apply([make_update("trades", inserts=[{"id": 9, "price": None, "symbol": "S9"}])])
+        columns = self.mirror.export()
+        self.assertIsInstance(columns["price"], list)
+        self.assertEqual(self.rows()[9], (None, "S9"))
+
+    def test_empty_table_types_columns_from_first_rows(self):
+        self.cache.set_key_getter("quotes", lambda row: row["id"])
+        mirror = ColumnarMirror(self.cache, "quotes", ("id", "bid", "venue"))
+        try:
+            self.assertEqual(mirror.export(), {"id": [], "bid": [], "venue": []})
+            self.cache.apply([make_update("quotes", inserts=[{"id": 1, "bid": 2.5, "venue": "X"}])])
+            columns = mirror.export()
+            self.assertEqual((columns["id"].typecode, columns["bid"].typecode), ('q', 'd'))
+            self.assertEqual(columns["venue"], ["X"])
+        finally:
+            mirror.close()
+
+    def test_copy_and_live_columns(self):
+        copied = self.mirror.export(["id"])["id"]
+        live = self.mirror.export(["id"], copy=False)["id"]
+        self.cache.apply([make_update("trades", inserts=[{"id": 5, "price": 5.0, "symbol": "S5"}])])
+        self.assertEqual(len(copied), 3)
+        self.assertEqual(len(live), 4)
+
+    def test_unknown_column_and_format(self):
+        with self.assertRaises(KeyError):
+            self.mirror.export(["volume"])
+        with self.assertRaises(ValueError):
+            self.mirror.export(format="csv")
+
+    @unittest.skipUnless(HAS_NUMPY, "numpy not installed")
+    def test_numpy(self):
+        columns = self.mirror.export(format="numpy")
+        self.assertEqual(columns["price"].sum(), 3.0)
+
+    @unittest.skipUnless(HAS_PYARROW, "pyarrow not installed")
+    def test_arrow(self):
+        table = self.mirror.export(format="arrow")
+        self.assertEqual(table.num_rows, 3)
+        self.assertEqual(str(table.schema.field("id").type), "uint32")
+
+    @unittest.skipIf(HAS_NUMPY, "numpy installed")
+    def test_missing_numpy(self):
+        with self.assertRaises(ImportError):
+            self.mirror.export(format="numpy")
+
+
+class TestTableToColumns(unittest.TestCase):
+    """Test to_columns() through the table interface."""
+
+    def setUp(self):
+        self.client = ModernSpacetimeDBClient(start_message_processing=False)
+        self.client.register_table("trades", dict, primary_key="id")
+
+    def tearDown(self):
+        self.client.shutdown()
+
+    def test_columns_follow_cache(self):
+        self.client._apply_to_cache([make_update("trades", inserts=[{"id": 1, "size": 10}, {"id": 2, "size": 5}])])
+        columns = self.client.db.trades.to_columns()
+        self.assertEqual(set(columns), {"id", "size"})
+        self.assertIsInstance(columns["size"], array)
+        self.assertEqual(sum(columns["size"]), 15)
+
+        self.client._apply_to_cache([make_update("trades", deletes=[{"id": 2, "size": 5}])])
+        self.assertEqual(list(self.client.db.trades.to_columns(["size"])["size"]), [10])
+
+    def test_empty_table_then_rows(self):
+        self.assertEqual(self.client.db.trades.to_columns(), {})
+        self.client._apply_to_cache([make_update("trades", inserts=[{"id": 1, "size": 10}])])
+        self.assertEqual(self.client.db.trades.to_columns(format="list"), {"id": [1], "size": [10]})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -511,6 +511,25 @@ class TestLRUCache:
         assert cache.get("key2") is None
         assert cache.get("key3") == 3
     
+    def test_ttl_expiry(self):
+        """Test entries expiring after their TTL."""
+        cache = LRUCache[str, int](max_size=10, ttl=0.05)
+        
+        cache.set("key1", 1)
+        cache.set("key2", 2)
+        assert cache.pop("key2") == 2
+        assert "key2" not in cache
+        assert cache.get("key1") == 1
+        
+        time.sleep(0.06)
+        assert cache.get("key1") is None
+        assert "key1" not in cache
+        
+        cache.set("key3", 3)
+        time.sleep(0.06)
+        assert cache.purge_expired() == 1
+        assert cache.size() == 0
+    
     def test_hit_ratio_tracking(self):
         """Test hit ratio tracking."""
         cache = LRUCache[str, int](max_size=2)
@@ -0,0 +1,151 @@
+"""
+Test hedged one-off queries across pooled connections.
+
+Tests:
+- A fast answer is returned without sending a second copy
+- A slow connection is hedged on another one, the slow copy cancelled
+- A failed connection is hedged at once; a rejected query is not
+- The hedge delay follows the p95 of recent query latencies, measured
+  from when the first copy was sent
+- Counters stay exact under concurrent queries
+"""
+
+import threading
+import time
+import unittest
+from concurrent.futures import Future
+from unittest.mock import patch
+
+from spacetimedb_sdk.connection_pool import (
+    ConnectionPool, PooledConnection, DEFAULT_HEDGE_DELAY, HEDGE_MIN_SAMPLES
+)
+from spacetimedb_sdk.one_off_queries import OneOffQueryError, OneOffQueryResult
+from spacetimedb_sdk.shared_types import PooledConnectionState
+
+
+class FakeClient:
+    """Answers one-off queries from another thread after a delay."""
+
+    def __init__(self, name, delay=0.0, error=None):
+        self.name = name
+        self.delay = delay
+        self.error = error
+        self.is_connected = True
+        self.futures = []
+
+    def send_one_off_query(self, sql, timeout=None):
+        future = Future()
+        self.futures.append(future)
+
+        def answer():
+            time.sleep(self.delay)
+            if not future.set_running_or_notify_cancel():
+                return
+            if self.error is not None:
+                future.set_exception(self.error)
+            else:
+                future.set_result(OneOffQueryResult(query=sql, tables={"user": [self.name]}))
+        threading.Thread(target=answer, daemon=True).start()
+        return future
+
+    def disconnect(self):
+        pass
+
+
+class TestHedgedQueries(unittest.TestCase):
+
+    def setUp(self):
+        with patch.object(ConnectionPool, "_start_health_monitor"):
+            self.pool = ConnectionPool(min_connections=0, max_connections=2,
+                                       health_check_interval=3600)
+
+    def tearDown(self):
+        self.pool.shutdown(graceful=False)
+
+    def add(self, client):
+        conn = PooledConnection(self.pool.pool_id, {}, health_check_interval=3600)
+        conn.client = client
+        self.pool.connections[conn.connection_id] = conn
+        self.pool.connection_order.append(conn.connection_id)
+        return conn
+
+    def assert_all_idle(self):
+        self.assertTrue(all(conn.state == PooledConnectionState.IDLE
+                            for conn in self.pool.connections.values()))
+
+    def test_fast_answer_not_hedged(self):
+        self.add(FakeClient("primary"))
+        hedge = FakeClient("hedge")
+        self.add(hedge)
+
+        result = self.pool.query_hedged("SELECT * FROM user", hedge_after=0.5)
+        self.assertEqual(result.rows, ["primary"])
+        self.assertEqual(hedge.futures, [])
+        hedging = self.pool.get_pool_metrics()["hedging"]
+        self.assertEqual((hedging["hedged_queries"], hedging["hedges_sent"]), (1, 0))
+        self.assert_all_idle()
+
+    def test_slow_connection_hedged(self):
+        slow = FakeClient("slow", delay=1.0)
+        self.add(slow)
+        self.add(FakeClient("fast", delay=0.01))
+
+        start = time.monotonic()
+        result = self.pool.query_hedged("SELECT * FROM user", hedge_after=0.05)
+        self.assertLess(time.monotonic() - start, 0.5)
+        self.assertEqual(result.rows, ["fast"])
+        self.assertTrue(slow.futures[0].cancelled())
+        hedging = self.pool.get_pool_metrics()["hedging"]
+        self.assertEqual((hedging["hedges_sent"], hedging["hedge_wins"]), (1, 1))
+        # The winning copy took 10ms, but the query waited for the hedge too
+        self.assertGreaterEqual(self.pool._query_latencies[-1], 50)
+        self.assert_all_idle()
+
+    def test_failed_connection_hedged_at_once(self):
+        broken = self.add(FakeClient("broken", error=ConnectionError("reset")))
+        self.add(FakeClient("ok", delay=0.01))
+
+        start = time.monotonic()
+        result = self.pool.query_hedged("SELECT * FROM user", hedge_after=5)
+        self.assertLess(time.monotonic() - start, 1)
+        self.assertEqual(result.rows, ["ok"])
+        self.assertEqual(broken.health.consecutive_failures, 1)
+
+    def test_rejected_query_not_hedged(self):
+        self.add(FakeClient("primary", error=OneOffQueryError("no such table", "SELECT * FROM nope")))
+        hedge = FakeClient("hedge")
+        self.add(hedge)
+
+        with self.assertRaises(OneOffQueryError):
+            self.pool.query_hedged("SELECT * FROM nope", hedge_after=0.5)
+        self.assertEqual(hedge.futures, [])
+        self.assert_all_idle()
+
+    def test_concurrent_counters(self):
+        for i in range(4):
+            self.add(FakeClient(f"c{i}"))
+
+        def run():
+            for _ in range(25):
+                try:
+                    self.pool.query_hedged("SELECT * FROM user", hedge_after=0.5)
+                except RuntimeError:
+                    pass
+        threads = [threading.Thread(target=run) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        metrics = self.pool.get_pool_metrics()
+        self.assertEqual(metrics["hedging"]["hedged_queries"], 100)
+        self.assertEqual(metrics["total_operations"], len(self.pool._query_latencies))
+
+    def test_hedge_delay_from_p95(self):
+        self.assertEqual(self.pool.get_hedge_delay(), DEFAULT_HEDGE_DELAY)
+        self.pool._query_latencies.extend(float(ms) for ms in range(1, 101))
+        self.assertGreater(len(self.pool._query_latencies), HEDGE_MIN_SAMPLES)
+        self.assertAlmostEqual(self.pool.get_hedge_delay(), 0.096)
+
+
+if __name__ == '__main__':
+    unittest.main()
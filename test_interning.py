@@ -0,0 +1,115 @@
+"""
+Test value interning for SpacetimeDB Python SDK.
+
+Tests:
+- Identity flyweight table shares equal identities and holds them weakly
+- Per-column string interning with a per-column cap
+- Dict rows and compact rows
+- conn.db.enable_interning() in the decode path
+"""
+
+import gc
+import unittest
+
+from spacetimedb_sdk.interning import IdentityTable, RowInterner
+from spacetimedb_sdk.protocol import Identity, ConnectionId, TableUpdate
+from spacetimedb_sdk.connection_id import EnhancedIdentity
+from spacetimedb_sdk.row_types import make_row_class
+from spacetimedb_sdk.modern_client import ModernSpacetimeDBClient
+
+
+def fresh_string(text: str) -> str:
+    # Build at runtime so equal strings are distinct objects
+    return "".join(list(text))
+
+
+class TestIdentityTable(unittest.TestCase):
+    """Test the weak-valued identity flyweight table."""
+
+    def test_shares_equal_identities(self):
+        table = IdentityTable()
+        first = table.intern(Identity(data=b"\x01" * 32))
+        second = table.intern(Identity(data=b"\x01" * 32))
+        self.assertIs(first, second)
+        self.assertIsNot(table.intern(ConnectionId(data=b"\x01" * 32)), first)
+        self.assertIsNot(table.intern(EnhancedIdentity(b"\x01" * 32)), first)
+        self.assertEqual(table.get_stats()['hits'], 1)
+
+    def test_entries_are_weak(self):
+        table = IdentityTable()
+        table.intern(Identity(data=b"\x02" * 32))
+        gc.collect()
+        self.assertEqual(len(table), 0)
+
+    def test_other_values_pass_through(self):
+        table = IdentityTable()
+        self.assertEqual(table.intern("abc"), "abc")
+        self.assertEqual(len(table), 0)
+
+
+class TestRowInterner(unittest.TestCase):
+    """Test RowInterner on dict and compact rows."""
+
+    def setUp(self):
+        self.interner = RowInterner(string_columns={"users": ["status"]},
+                                    identity_table=IdentityTable())
+
+    def test_dict_rows(self):
+        rows = [{"id": i, "status": fresh_string("online"), "owner": Identity(data=b"\x03" * 32),
+                 "name": fresh_string("same")} for i in range(3)]
+        rows = self.interner.intern_rows("users", rows)
+        self.assertIs(rows[0]["status"], rows[2]["status"])
+        self.assertIs(rows[0]["owner"], rows[1]["owner"])
+        self.assertIsNot(rows[0]["name"], rows[1]["name"])
+        stats = self.interner.get_stats()
+        self.assertEqual(stats['columns']['users.status'], {'values': 1, 'hits': 2, 'misses': 1})
+
+    def test_compact_rows(self):
+        User = make_row_class("users", ("id", "status", "owner"))
+        first = self.interner.intern_row("users", User(1, fresh_string("away"), Identity(data=b"\x04" * 32)))
+        second = self.interner.intern_row("users", User(2, fresh_string("away"), Identity(data=b"\x04" * 32)))
+        self.assertIsInstance(second, User)
+        self.assertEqual(second.id, 2)
+        self.assertIs(first.status, second.status)
+        self.assertIs(first.owner, second.owner)
+
+    def test_column_cap(self):
+        interner = RowInterner(identities=False, string_columns={"users": ["status"]}, max_values_per_column=1)
+        interner.intern_rows("users", [{"status": "a"}, {"status": "b"}])
+        self.assertEqual(interner.get_stats()['columns']['users.status']['values'], 1)
+        with self.assertRaises(ValueError):
+            RowInterner(max_values_per_column=0)
+
+    def test_untouched_tables(self):
+        interner = RowInterner(identities=False, string_columns={"users": ["status"]})
+        rows = [{"status": "x"}]
+        self.assertIs(interner.intern_rows("messages", rows), rows)
+
+
+class TestClientInterning(unittest.TestCase):
+    """Test interning in the client decode path."""
+
+    def test_cached_rows_share_values(self):
+        client = ModernSpacetimeDBClient(start_message_processing=False)
+        try:
+            client.register_table("users", dict, primary_key="id")
+            interner = client.db.enable_interning(string_columns={"users": ["region"]})
+            self.assertIs(client.db.users._interner, interner)
+            owner = b"\x05" * 32
+            client._apply_to_cache([TableUpdate(
+                table_id=0, table_name="users", num_rows=2, deletes=[],
+                inserts=[{"id": i, "region": fresh_string("eu-west"), "owner": Identity(data=owner)}
+                         for i in range(2)]
+            )])
+            rows = sorted(client.db.users.iter(), key=lambda row: row["id"])
+            self.assertIs(rows[0]["region"], rows[1]["region"])
+            self.assertIs(rows[0]["owner"], rows[1]["owner"])
+
+            client.db.disable_interning()
+            self.assertIsNone(client.db.users._interner)
+        finally:
+            client.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,151 @@
+"""
+Test the client-side query engine for SpacetimeDB Python SDK.
+
+Tests:
+- Predicates, ordering and limits evaluated against the row cache
+- Access path selection (primary key, hash index, range index, scan)
+- Incremental index maintenance
+- Plan caching per query shape
+- conn.db.query() through the client
+"""
+
+import unittest
+from typing import Any, Dict, List
+
+from spacetimedb_sdk.local_query import QueryEngine, col
+from spacetimedb_sdk.row_cache import RowCache
+from spacetimedb_sdk.protocol import TableUpdate
+from spacetimedb_sdk.modern_client import ModernSpacetimeDBClient
+
+
+def make_update(table_name: str, inserts: List[Dict[str, Any]] = None,
+                deletes: List[Dict[str, Any]] = None) -> TableUpdate:
+    inserts = inserts or []
+    deletes = deletes or []
+    return TableUpdate(
+        table_id=0,
+        table_name=table_name,
+        num_rows=len(inserts) + len(deletes),
+        inserts=inserts,
+        deletes=deletes
+    )
+
+
+def ids(rows) -> List[int]:
+    return [row["id"] for row in rows]
+
+
+class TestQueryEngine(unittest.TestCase):
+    """Test planning and execution."""
+
+    def setUp(self):
+        self.cache = RowCache()
+        self.cache.set_key_getter("users", lambda row: row["id"])
+        self.cache.apply([make_update("users", inserts=[
+            {"id": i, "age": 20 + i % 10, "team": "red" if i % 2 else "blue", "name": f"u{i:02d}"}
+            for i in range(30)
+        ])])
+        self.engine = QueryEngine(self.cache)
+        self.engine.set_primary_key("users", "id")
+
+    def test_scan_with_filters(self):
+        query = self.engine.query("users").where(col("age") > 27, team="red")
+        self.assertEqual(query.explain(), "users: scan + filter(age, team)")
+        self.assertEqual(sorted(ids(query.all())), [9, 19, 29])
+
+    def test_primary_key_lookup(self):
+        query = self.engine.query("users").where(col("id") == 7, col("age") == 27)
+        self.assertEqual(query.explain(), "users: primary_key(id) + filter(age)")
+        self.assertEqual(ids(query.all()), [7])
+        self.assertIsNone(self.engine.query("users").where(col("id") == 99).first())
+
+    def test_hash_index(self):
+        self.engine.create_index("users", "team")
+        query = self.engine.query("users").where(col("team") == "blue", col("age") < 22)
+        self.assertEqual(query.explain(), "users: hash(team) + filter(age)")
+        self.assertEqual(sorted(ids(query.all())), [0, 10, 20])
+
+    def test_range_index(self):
+        self.engine.create_index("users", "age", kind="range")
+        query = self.engine.query("users").where(col("age") >= 28, col("age") < 29)
+        self.assertEqual(query.explain(), "users: range(age)")
+        self.assertEqual(sorted(ids(query.all())), [8, 18, 28])
+        self.assertEqual(len(self.engine.query("users").where(col("age") == 21).all()), 3)
+
+    def test_index_follows_transactions(self):
+        self.engine.create_index("users", "age", kind="range")
+        self.engine.create_index("users", "team")
+        self.cache.apply([make_update(
+            "users",
+            deletes=[{"id": 9, "age": 29, "team": "red"}],
+            inserts=[{"id": 9, "age": 50, "team": "green"}, {"id": 100, "age": 51, "team": "green"}]
+        )])
+        self.assertEqual(ids(self.engine.query("users").where(col("age") > 29).order_by("age").all()), [9, 100])
+        self.assertEqual(sorted(ids(self.engine.query("users").where(team="green").all())), [9, 100])
+        self.assertNotIn(9, ids(self.engine.query("users").where(team="red").all()))
+
+    def test_order_by_and_limit(self):
+        rows = self.engine.query("users").where(team="red").order_by("age", desc=True).order_by("id").limit(4).all()
+        self.assertEqual(ids(rows), [9, 19, 29, 7])
+        rows = self.engine.query("users").order_by("name").limit(3).all()
+        self.assertEqual(ids(rows), [0, 1, 2])
+
+    def test_nulls_never_match_comparisons(self):
+        self.cache.apply([make_update("users", inserts=[{"id": 200, "age": None, "team": "red"}])])
+        self.assertNotIn(200, ids(self.engine.query("users").where(col("age") > 0).all()))
+        rows = self.engine.query("users").where(team="red").order_by("age").all()
+        self.assertEqual(rows[-1]["id"], 200)
+        rows = self.engine.query("users").where(team="red").order_by("age", desc=True).all()
+        self.assertEqual((rows[0]["age"], rows[-1]["id"]), (29, 200))
+        rows = self.engine.query("users").where(team="red").order_by("age", desc=True).limit(20).all()
+        self.assertEqual(rows[-1]["id"], 200)
+
+    def test_range_index_tolerates_nulls_and_mixed_types(self):
+        self.engine.create_index("users", "age", kind="range")
+        self.cache.apply([make_update("users", inserts=[
+            {"id": 200, "age": None}, {"id": 201, "age": "old"}, {"id": 202, "age": 29.5}
+        ])])
+        self.assertEqual(sorted(ids(self.engine.query("users").where(col("age") > 29).all())), [202])
+        self.assertEqual(ids(self.engine.query("users").where(col("age") == "old").all()), [201])
+        self.cache.apply([make_update("users", deletes=[{"id": 201, "age": "old"}])])
+        self.assertEqual(self.engine.query("users").where(col("age") == "old").all(), [])
+        self.assertEqual(len(self.engine.query("users").where(col("age") >= 20).all()), 31)
+
+    def test_in_predicate(self):
+        rows = self.engine.query("users").where(col("id").in_([1, 2, 300])).all()
+        self.assertEqual(sorted(ids(rows)), [1, 2])
+
+    def test_plan_cache_per_shape(self):
+        first = self.engine.query("users").where(col("age") > 21)._plan()
+        second = self.engine.query("users").where(col("age") > 25)._plan()
+        self.assertIs(first, second)
+        self.engine.create_index("users", "age", kind="range")
+        third = self.engine.query("users").where(col("age") > 25)._plan()
+        self.assertEqual(third.access, "range")
+
+    def test_invalid_where(self):
+        with self.assertRaises(TypeError):
+            self.engine.query("users").where(True)
+
+
+class TestClientLocalQuery(unittest.TestCase):
+    """Test local queries through the table interface."""
+
+    def setUp(self):
+        self.client = ModernSpacetimeDBClient(start_message_processing=False)
+        self.client.register_table("users", dict, primary_key="id")
+
+    def tearDown(self):
+        self.client.shutdown()
+
+    def test_db_query(self):
+        self.client.db.users.create_index("age", kind="range")
+        self.client._apply_to_cache([make_update("users", inserts=[{"id": 1, "age": 30}, {"id": 2, "age": 40}])])
+        query = self.client.db.query("users").where(col("age") > 35)
+        self.assertEqual(query.explain(), "users: range(age)")
+        self.assertEqual(ids(query.all()), [2])
+        self.assertEqual(self.client.db.users.query().where(id=1).count(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+"""
+Test cache memory accounting for SpacetimeDB Python SDK.
+
+Tests:
+- Sampled and schema-derived row size estimates
+- Per-table estimates follow inserts and deletes
+- Budgets call their callback once per crossing and refuse subscriptions
+- conn.get_connection_metrics() and conn.set_memory_budget()
+"""
+
+import unittest
+from typing import Any, Dict, List
+
+from spacetimedb_sdk.memory_accounting import (
+    CacheMemoryTracker, MemoryBudgetExceededError, estimate_size, schema_row_size, ROW_OVERHEAD_BYTES
+)
+from spacetimedb_sdk.row_cache import RowCache
+from spacetimedb_sdk.row_types import make_row_class
+from spacetimedb_sdk.algebraic_type import ProductType, FieldInfo, IntType, FloatType, StringType
+from spacetimedb_sdk.protocol import TableUpdate
+from spacetimedb_sdk.connection_id import EnhancedConnectionId
+from spacetimedb_sdk.modern_client import ModernSpacetimeDBClient
+
+
+def make_update(table_name: str, inserts: List[Dict[str, Any]] = None,
+                deletes: List[Dict[str, Any]] = None) -> TableUpdate:
+    inserts = inserts or []
+    deletes = deletes or []
+    return TableUpdate(
+        table_id=0,
+        table_name=table_name,
+        num_rows=len(inserts) + len(deletes),
+        inserts=inserts,
+        deletes=deletes
+    )
+
+
+class TestEstimates(unittest.TestCase):
+    """Test row size estimates."""
+
+    def test_estimate_size_is_deep(self):
+        small = {"id": 1, "name": "a"}
+        large = {"id": 1, "name": "a" * 1000}
+        self.assertGreater(estimate_size(large) - estimate_size(small), 990)
+        self.assertEqual(estimate_size(None), 0)
+
+    def test_schema_row_size(self):
+        numeric = ProductType([FieldInfo("id", IntType(64, False)), FieldInfo("x", FloatType(64))])
+        self.assertIsNotNone(schema_row_size(numeric))
+        Row = make_row_class("points", ("id", "x"))
+        self.assertLess(schema_row_size(numeric, Row), schema_row_size(numeric))
+        with_text = ProductType([FieldInfo("id", IntType(32, True)), FieldInfo("name", StringType())])
+        self.assertIsNone(schema_row_size(with_text))
+
+
+class TestCacheMemoryTracker(unittest.TestCase):
+    """Test tracking and budgets on a RowCache."""
+
+    def setUp(self):
+        self.cache = RowCache()
+        self.cache.set_key_getter("users", lambda row: row["id"])
+        self.tracker = CacheMemoryTracker(self.cache)
+
+    def tearDown(self):
+        self.tracker.close()
+
+    def insert_users(self, ids, name="x" * 100):
+        self.cache.apply([make_update("users", inserts=[{"id": i, "name": name} for i in ids])])
+
+    def test_tracks_rows(self):
+        self.insert_users(range(100))
+        stats = self.tracker.get_stats()['tables']['users']
+        self.assertEqual(stats['rows'], 100)
+        self.assertEqual(stats['estimate'], 'sampled')
+        self.assertGreater(stats['row_bytes'], 100)
+        self.assertEqual(self.tracker.total_bytes(), stats['bytes'])
+
+        self.cache.apply([make_update("users", deletes=[{"id": i, "name": "x" * 100} for i in range(50)])])
+        self.assertEqual(self.tracker.get_stats()['tables']['users']['rows'], 50)
+        self.assertEqual(self.tracker.table_bytes("users"), 50 * (stats['row_bytes'] + ROW_OVERHEAD_BYTES))
+
+    def test_existing_rows_counted(self):
+        self.insert_users(range(10))
+        tracker = CacheMemoryTracker(self.cache)
+        self.addCleanup(tracker.close)
+        self.assertEqual(tracker.get_stats()['tables']['users']['rows'], 10)
+
+    def test_schema_estimate(self):
+        self.tracker.set_schema("points", ProductType([FieldInfo("id", IntType(64, True))]))
+        self.cache.apply([make_update("points", inserts=[{"id": i} for i in range(4)])])
+        stats = self.tracker.get_stats()['tables']['points']
+        self.assertEqual(stats['estimate'], 'schema')
+        self.assertEqual(stats['rows'], 4)
+
+    def test_budget_callback_once_per_crossing(self):
+        crossings = []
+        budget = self.tracker.add_budget(20_000, table="users",
+                                         on_exceeded=lambda b, used: crossings.append(used))
+        self.insert_users(range(10))
+        self.assertEqual(crossings, [])
+        self.insert_users(range(10, 200))
+        self.insert_users(range(200, 300))
+        self.assertEqual(len(crossings), 1)
+        self.assertTrue(budget.exceeded)
+
+        self.cache.clear("users")
+        self.assertFalse(budget.exceeded)
+        self.insert_users(range(300))
+        self.assertEqual(len(crossings), 2)
+
+    def test_refuses_subscriptions(self):
+        self.tracker.add_budget(1000, table="users")
+        self.insert_users(range(100))
+        with self.assertRaises(MemoryBudgetExceededError) as raised:
+            self.tracker.check_subscription(["Users"])
+        self.assertEqual(raised.exception.table, "users")
+        self.assertGreater(raised.exception.used_bytes, 1000)
+        # Subscriptions to other tables cannot grow this budget
+        self.tracker.check_subscription(["messages"])
+        with self.assertRaises(MemoryBudgetExceededError):
+            self.tracker.check_subscription(None)
+
+    def test_remove_budget(self):
+        budget = self.tracker.add_budget(1000, refuse_subscriptions=True)
+        self.insert_users(range(100))
+        self.assertTrue(self.tracker.remove_budget(budget))
+        self.tracker.check_subscription(["users"])
+        with self.assertRaises(ValueError):
+            self.tracker.add_budget(0)
+
+
+class TestClientMemoryBudget(unittest.TestCase):
+    """Test memory accounting through the client."""
+
+    def test_metrics_and_subscription_refusal(self):
+        client = ModernSpacetimeDBClient(start_message_processing=False, test_mode=True)
+        try:
+            client.enhanced_connection_id = EnhancedConnectionId(b"\x01" * 16)
+            client.register_table("users", dict, primary_key="id")
+            exceeded = []
+            client.set_memory_budget(5000, on_exceeded=lambda budget, used: exceeded.append(used))
+            client._apply_to_cache([make_update("users", inserts=[{"id": i, "bio": "y" * 200} for i in range(50)])])
+
+            memory = client.get_connection_metrics()['cache_memory']
+            self.assertEqual(memory['tables']['users']['rows'], 50)
+            self.assertTrue(memory['budgets'][0]['exceeded'])
+            self.assertEqual(len(exceeded), 1)
+            with self.assertRaises(MemoryBudgetExceededError):
+                client.subscribe_single("SELECT * FROM messages")
+            self.assertEqual(client.active_subscriptions, {})
+        finally:
+            client.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,163 @@
+"""
+Test one-off query futures for SpacetimeDB Python SDK.
+
+Tests:
+- OneOffQueryResponse decoded with its tables from JSON and BSATN
+- query_async() results matched to queries by message ID, many in flight
+- Rows decoded into the registered compact row type
+- Server errors, timeouts and unknown message IDs
+- Blocking queries refused on the thread that delivers their answer
+"""
+
+import asyncio
+import json
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from spacetimedb_sdk.algebraic_type import ProductType, FieldInfo, IntType, StringType
+from spacetimedb_sdk.bsatn import BsatnWriter
+from spacetimedb_sdk.client_hub import ClientHub
+from spacetimedb_sdk.messages.one_off_query import OneOffQueryResponseMessage, OneOffTable
+from spacetimedb_sdk.protocol import ProtocolDecoder, OneOffQueryResponse, TimeDuration
+from spacetimedb_sdk.protocol import OneOffTable as ProtocolOneOffTable
+from spacetimedb_sdk.one_off_queries import (
+    OneOffQueryError, OneOffQueryResult, encode_message_id, decode_message_id
+)
+from spacetimedb_sdk.row_types import RowBase
+from spacetimedb_sdk.modern_client import ModernSpacetimeDBClient
+
+USER_TYPE = ProductType([
+    FieldInfo("id", IntType(32, False)),
+    FieldInfo("name", StringType()),
+])
+
+
+def response(message_id: bytes, rows=None, error=None, table="user") -> OneOffQueryResponse:
+    return OneOffQueryResponse(
+        message_id=message_id,
+        error=error,
+        tables=[ProtocolOneOffTable(table_name=table, rows=rows)] if rows is not None else [],
+        total_host_execution_duration=TimeDuration(nanos=7000)
+    )
+
+
+class TestDecoding(unittest.TestCase):
+    """Test decoding OneOffQueryResponse messages."""
+
+    def setUp(self):
+        self.message = OneOffQueryResponseMessage(
+            encode_message_id(42), None, [OneOffTable("user", [{"id": 1, "name": "a"}])], 7)
+
+    def test_json(self):
+        data = json.dumps(self.message.to_json()).encode()
+        decoded = ProtocolDecoder().decode_server_message(data)
+        self.assertIsInstance(decoded, OneOffQueryResponse)
+        self.assertEqual(decode_message_id(decoded.message_id), 42)
+        self.assertEqual(decoded.tables[0].rows, [{"id": 1, "name": "a"}])
+        self.assertEqual(decoded.total_host_execution_duration.nanos, 7000)
+
+    def test_bsatn(self):
+        writer = BsatnWriter()
+        writer.write_enum_header(9)
+        self.message.write_bsatn(writer)
+        decoded = ProtocolDecoder(use_binary=True).decode_server_message(writer.get_bytes())
+        self.assertEqual(decoded.message_id, encode_message_id(42))
+        self.assertIsNone(decoded.error)
+        self.assertEqual(decoded.tables[0].table_name, "user")
+        self.assertEqual(decoded.tables[0].rows, [{"id": 1, "name": "a"}])
+
+
+class TestQueries(unittest.TestCase):
+    """Test query() and query_async() through the client."""
+
+    def setUp(self):
+        self.client = ModernSpacetimeDBClient(start_message_processing=False)
+        self.client.register_table("user", USER_TYPE, primary_key="id")
+        self.client.ws_client = MagicMock()
+        self.client.ws_client.is_connected = True
+        self.sent = []
+        self.client.ws_client.execute_one_off_query.side_effect = \
+            lambda sql, message_id: self.sent.append((sql, message_id))
+
+    def tearDown(self):
+        self.client.ws_client = None
+        self.client.shutdown()
+
+    def answer_later(self, count, answer):
+        def run():
+            while len(self.sent) < count:
+                time.sleep(0.001)
+            # Answer in reverse order
+            for sql, message_id in reversed(self.sent):
+                self.client._handle_one_off_query_response(answer(sql, message_id))
+        threading.Thread(target=run, daemon=True).start()
+
+    def test_many_in_flight(self):
+        def answer(sql, message_id):
+            user_id = int(sql.rsplit(" ", 1)[1])
+            return response(message_id, [{"id": user_id, "name": f"user{user_id}"}])
+
+        async def main():
+            self.answer_later(100, answer)
+            return await asyncio.gather(*[
+                self.client.query_async(f"SELECT * FROM user WHERE id = {i}", timeout=5)
+                for i in range(100)
+            ])
+
+        results = asyncio.run(main())
+        for i, result in enumerate(results):
+            self.assertIsInstance(result, OneOffQueryResult)
+            self.assertEqual(len(result), 1)
+            row = result.rows[0]
+            self.assertIsInstance(row, RowBase)
+            self.assertEqual((row.id, row.name), (i, f"user{i}"))
+            self.assertEqual(result.total_host_execution_duration_micros, 7)
+        self.assertEqual(len({message_id for _, message_id in self.sent}), 100)
+        self.assertEqual(len(self.client._one_off_queries), 0)
+        self.assertEqual(self.client._one_off_query_info, {})
+
+    def test_sync_query_and_error(self):
+        self.answer_later(1, lambda sql, message_id: response(message_id, error="no such table"))
+        with self.assertRaises(OneOffQueryError) as raised:
+            self.client.query("SELECT * FROM nope", timeout=5)
+        self.assertEqual(raised.exception.query, "SELECT * FROM nope")
+        self.assertIn("no such table", str(raised.exception))
+
+    def test_timeout_and_unknown_message_ids(self):
+        with self.assertRaises(asyncio.TimeoutError):
+            self.client.query("SELECT * FROM user", timeout=0.05)
+        # Late answers and foreign message IDs are ignored
+        self.client._handle_one_off_query_response(response(self.sent[0][1], []))
+        self.client._handle_one_off_query_response(response(b"\x01" * 16, []))
+        self.assertEqual(len(self.client._one_off_queries), 0)
+
+    def test_requires_connection(self):
+        self.client.ws_client.is_connected = False
+        with self.assertRaises(RuntimeError):
+            self.client.query("SELECT * FROM user")
+
+    def test_refused_on_hub_worker(self):
+        with ClientHub(decode_workers=1) as hub:
+            client = hub.create_client()
+            client.ws_client = MagicMock()
+            client.ws_client.is_connected = True
+            done = threading.Event()
+            errors = []
+
+            def on_worker():
+                try:
+                    client.query("SELECT * FROM user", timeout=5)
+                except RuntimeError as e:
+                    errors.append(e)
+                done.set()
+            client._hub_executor(on_worker)
+            self.assertTrue(done.wait(5))
+            client.ws_client = None
+        self.assertEqual(len(errors), 1)
+        self.assertIn("message thread", str(errors[0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
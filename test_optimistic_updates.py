@@ -0,0 +1,137 @@
+"""
+Test optimistic reducer effects for SpacetimeDB Python SDK.
+
+Tests:
+- Predicted rows are visible in the cache as soon as the call is sent
+- A matching TransactionUpdate confirms them without further changes
+- A different or failed outcome corrects the cache and fires rollback callbacks
+- Unanswered calls roll back on timeout
+- Transactions of other connections do not settle predictions
+"""
+
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from spacetimedb_sdk.algebraic_type import ProductType, FieldInfo, IntType, StringType
+from spacetimedb_sdk.optimistic import PredictedChange
+from spacetimedb_sdk.protocol import (
+    TransactionUpdate, ReducerCallInfo, Timestamp, Identity, ConnectionId,
+    EnergyQuanta, TimeDuration, DatabaseUpdate, TableUpdate
+)
+from spacetimedb_sdk.modern_client import ModernSpacetimeDBClient
+
+USER_TYPE = ProductType([
+    FieldInfo("id", IntType(32, False)),
+    FieldInfo("name", StringType()),
+])
+
+
+def user_update(inserts=(), deletes=()) -> TableUpdate:
+    return TableUpdate(table_id=0, table_name="user", num_rows=len(inserts),
+                       inserts=[dict(row) for row in inserts], deletes=[dict(row) for row in deletes])
+
+
+def transaction_update(request_id: int, reducer: str, status,
+                       connection_id: bytes = b"\x01" * 16) -> TransactionUpdate:
+    return TransactionUpdate(
+        status=status,
+        timestamp=Timestamp(nanos_since_epoch=0),
+        caller_identity=Identity(data=b"\x00" * 32),
+        caller_connection_id=ConnectionId(data=connection_id),
+        reducer_call=ReducerCallInfo(reducer_name=reducer, reducer_id=0, args=b"", request_id=request_id),
+        energy_quanta_used=EnergyQuanta(quanta=1),
+        total_host_execution_duration=TimeDuration(nanos=1)
+    )
+
+
+def predict_set_name(cache, user_id, name):
+    old = cache.table("user").get(user_id)
+    return [PredictedChange("user", inserts=[{"id": user_id, "name": name}], deletes=[old])]
+
+
+def predict_add_user(cache, user_id, name):
+    return [PredictedChange("user", inserts=[{"id": user_id, "name": name}])]
+
+
+class TestOptimisticUpdates(unittest.TestCase):
+
+    def setUp(self):
+        self.client = ModernSpacetimeDBClient(start_message_processing=False)
+        self.client.register_table("user", USER_TYPE, primary_key="id")
+        self.client.ws_client = MagicMock()
+        self.client.ws_client.is_connected = True
+        self.client.connection_id = ConnectionId(data=b"\x01" * 16)
+        self.client.ws_client.call_reducer.side_effect = \
+            lambda name, args, flags, request_id: request_id
+        self.client._apply_to_cache([user_update(inserts=[{"id": 1, "name": "a"}])])
+
+        self.client.register_predictor("set_name", predict_set_name)
+        self.client.register_predictor("add_user", predict_add_user)
+        self.outcomes = []
+        self.client.register_on_prediction_rollback(self.outcomes.append)
+        self.transactions = []
+        self.client.row_cache.add_listener(self.transactions.append)
+
+    def tearDown(self):
+        self.client.ws_client = None
+        self.client.shutdown()
+
+    def name_of(self, user_id):
+        row = self.client.row_cache.table("user").get(user_id)
+        return row.name if row is not None else None
+
+    def test_confirmed(self):
+        request_id = self.client.call_reducer("set_name", 1, "b")
+        self.assertEqual(self.name_of(1), "b")
+
+        self.client._handle_transaction_update(transaction_update(request_id, "set_name", DatabaseUpdate(
+            tables=[user_update(inserts=[{"id": 1, "name": "b"}], deletes=[{"id": 1, "name": "a"}])])))
+        self.assertEqual(self.name_of(1), "b")
+        self.assertEqual(self.outcomes, [])
+        # The confirmation changed nothing readers had not already seen
+        self.assertEqual(self.transactions[-1].tables["user"].inserts, [])
+        self.assertEqual(self.client.row_cache.owners("user", 1), [])
+        self.assertEqual(self.client.get_connection_metrics()['predictions']['confirmed'], 1)
+
+    def test_server_result_differs(self):
+        request_id = self.client.call_reducer("set_name", 1, "b")
+        self.client._handle_transaction_update(transaction_update(request_id, "set_name", DatabaseUpdate(
+            tables=[user_update(inserts=[{"id": 1, "name": "c"}], deletes=[{"id": 1, "name": "a"}])])))
+        self.assertEqual(self.name_of(1), "c")
+        outcome, = self.outcomes
+        self.assertEqual((outcome.request_id, outcome.committed), (request_id, True))
+        change = outcome.corrections.tables["user"]
+        self.assertEqual(([row.name for row in change.deletes], [row.name for row in change.inserts]),
+                         (["b"], ["c"]))
+
+    def test_failed_call_restores_rows(self):
+        request_id = self.client.call_reducer("set_name", 1, "b")
+        self.client.call_reducer("add_user", 2, "z")
+        self.client._handle_transaction_update(transaction_update(request_id, "set_name", "name taken"))
+        self.assertEqual(self.name_of(1), "a")
+        self.assertEqual(self.name_of(2), "z")
+        outcome, = self.outcomes
+        self.assertFalse(outcome.committed)
+        self.assertEqual(outcome.error, "name taken")
+
+    def test_timeout_rolls_back(self):
+        future, = self.client.call_reducers([("add_user", (2, "z"))], timeout=0.05)
+        self.assertEqual(self.name_of(2), "z")
+        deadline = time.monotonic() + 2
+        while not self.outcomes and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertIsNone(self.name_of(2))
+        self.assertIsInstance(self.outcomes[0].error, Exception)
+        self.assertEqual(len(self.client._predictions), 0)
+
+    def test_other_connection_does_not_settle(self):
+        request_id = self.client.call_reducer("add_user", 2, "z")
+        self.client._handle_transaction_update(transaction_update(
+            request_id, "add_user", DatabaseUpdate(tables=[]), connection_id=b"\x02" * 16))
+        self.assertEqual(self.name_of(2), "z")
+        self.assertEqual(len(self.client._predictions), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,232 @@
+"""
+Test request-id correlation of reducer calls for SpacetimeDB Python SDK.
+
+Tests:
+- Futures resolved and failed by request ID
+- Timeouts from the shared deadline heap
+- Cancelled futures leave the registry
+- call_reducer_async() resolved by a TransactionUpdate with its request ID,
+  decoded from the text protocol
+- JSON and BSATN TransactionUpdates carry their status and reducer call
+"""
+
+import asyncio
+import json
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from spacetimedb_sdk.bsatn import BsatnWriter
+from spacetimedb_sdk.pending_calls import PendingCallRegistry, ReducerCallError
+from spacetimedb_sdk.request_tracker import RequestTracker
+from spacetimedb_sdk.protocol import ReducerCallInfo, ConnectionId, ProtocolDecoder
+from spacetimedb_sdk.modern_client import ModernSpacetimeDBClient
+
+
+def transaction_update(request_id: int, status=None, reducer="add",
+                       connection_id: bytes = b"\x01" * 16) -> bytes:
+    """A TransactionUpdate as the server sends it over the text protocol."""
+    return json.dumps({"TransactionUpdate": {
+        "status": status or {"Committed": {"tables": []}},
+        "timestamp": {"__timestamp_micros_since_unix_epoch__": 1},
+        "caller_identity": {"data": [0] * 32},
+        "caller_connection_id": {"data": list(connection_id)},
+        "reducer_call": {"reducer_name": reducer, "reducer_id": 3, "args": "[]", "request_id": request_id},
+        "energy_quanta_used": {"quanta": 5},
+        "total_host_execution_duration": {"__time_duration_micros__": 2},
+    }}).encode()
+
+
+class TestPendingCallRegistry(unittest.TestCase):
+    """Test the future registry."""
+
+    def setUp(self):
+        self.tracker = RequestTracker()
+        self.registry = PendingCallRegistry(self.tracker, name="test-calls")
+
+    def tearDown(self):
+        self.registry.close()
+
+    def test_resolve_and_fail(self):
+        ids = [self.registry.next_request_id() for _ in range(3)]
+        futures = [self.registry.register(request_id, timeout=10) for request_id in ids]
+        self.assertEqual(self.tracker.get_pending_count(), 3)
+
+        self.assertTrue(self.registry.resolve(ids[1], "ok"))
+        self.assertFalse(self.registry.resolve(ids[1], "again"))
+        self.assertTrue(self.registry.fail(ids[0], ValueError("bad")))
+        self.assertEqual(futures[1].result(0), "ok")
+        with self.assertRaises(ValueError):
+            futures[0].result(0)
+        self.assertFalse(futures[2].done())
+        self.assertEqual(len(self.registry), 1)
+        self.assertEqual(self.tracker.get_pending_count(), 1)
+        self.assertEqual(self.tracker.get_completed_count(), 0)
+
+    def test_timeouts_in_deadline_order(self):
+        slow = self.registry.register(1, timeout=5, description="Reducer call 'slow'")
+        fast = self.registry.register(2, timeout=0.05, description="Reducer call 'fast'")
+        with self.assertRaises(asyncio.TimeoutError) as raised:
+            fast.result(2)
+        self.assertIn("Reducer call 'fast' timed out", str(raised.exception))
+        self.assertFalse(slow.done())
+        self.assertEqual(self.registry.get_stats()['timed_out'], 1)
+        self.assertFalse(self.tracker.is_request_pending(2))
+
+    def test_answered_calls_never_time_out(self):
+        future = self.registry.register(1, timeout=0.05)
+        self.registry.resolve(1, "done")
+        time.sleep(0.1)
+        self.assertEqual(future.result(0), "done")
+        self.assertEqual(self.registry.get_stats()['timed_out'], 0)
+
+    def test_cancel_discards(self):
+        future = self.registry.register(7, timeout=10)
+        future.cancel()
+        self.assertFalse(self.registry.is_pending(7))
+        self.assertFalse(self.registry.resolve(7, "late"))
+
+    def test_many_in_flight(self):
+        futures = {i: self.registry.register(i, timeout=30) for i in range(1, 5001)}
+        for i in reversed(range(1, 5001)):
+            self.registry.resolve(i, i)
+        self.assertTrue(all(future.result(0) == i for i, future in futures.items()))
+        self.assertEqual(len(self.registry), 0)
+
+    def test_close_fails_pending(self):
+        future = self.registry.register(1)
+        self.registry.close()
+        with self.assertRaises(RuntimeError):
+            future.result(0)
+        with self.assertRaises(RuntimeError):
+            self.registry.register(2)
+
+
+class TestCallReducerAsync(unittest.TestCase):
+    """Test call_reducer_async() correlation through the client."""
+
+    def setUp(self):
+        self.client = ModernSpacetimeDBClient(start_message_processing=False)
+        self.client.ws_client = MagicMock()
+        self.client.ws_client.is_connected = True
+        self.client.connection_id = ConnectionId(data=b"\x01" * 16)
+        self.sent = []
+        self.client.ws_client.call_reducer.side_effect = \
+            lambda name, args, flags, request_id: self.sent.append(request_id) or request_id
+
+    def tearDown(self):
+        self.client.ws_client = None
+        self.client.shutdown()
+
+    def answer_later(self, calls, *messages):
+        decoder = ProtocolDecoder(use_binary=False)
+
+        def run():
+            while len(self.sent) < calls:
+                time.sleep(0.001)
+            for make in messages:
+                self.client._handle_transaction_update(decoder.decode_server_message(make(self.sent)))
+        threading.Thread(target=run, daemon=True).start()
+
+    def test_resolved_by_request_id(self):
+        async def main():
+            self.answer_later(
+                2,
+                # Another connection's update reusing our request ID is ignored
+                lambda sent: transaction_update(sent[1], reducer="b", connection_id=b"\x02" * 16),
+                lambda sent: transaction_update(sent[1], reducer="b"),
+                lambda sent: transaction_update(sent[0], status={"Failed": "boom"}, reducer="a"),
+            )
+            return await asyncio.gather(
+                self.client.call_reducer_async("a", 1, timeout=5),
+                self.client.call_reducer_async("b", 2, timeout=5),
+                return_exceptions=True
+            )
+
+        failed, succeeded = asyncio.run(main())
+        self.assertIsInstance(failed, ReducerCallError)
+        self.assertIn("boom", str(failed))
+        self.assertEqual(succeeded.reducer_name, "b")
+        self.assertEqual(succeeded.status, "success")
+        self.assertEqual(len(self.client._reducer_calls), 0)
+        self.assertEqual(self.client._on_event, [])
+
+    def test_timeout(self):
+        with self.assertRaises(asyncio.TimeoutError):
+            asyncio.run(self.client.call_reducer_async("slow", timeout=0.05))
+        self.assertEqual(len(self.client._reducer_calls), 0)
+
+
+def bsatn_transaction_update(request_id: int, status_variant: int, status_payload: str = "") -> bytes:
+    writer = BsatnWriter()
+    writer.write_enum_header(2)  # TransactionUpdate
+    writer.write_struct_header(7)
+    writer.write_field_name("status")
+    writer.write_enum_header(status_variant)
+    if status_variant == 0:
+        writer.write_struct_header(0)
+    else:
+        writer.write_string(status_payload)
+    writer.write_field_name("timestamp")
+    writer.write_u64(5)
+    writer.write_field_name("caller_identity")
+    writer.write_bytes(b"\x00" * 32)
+    writer.write_field_name("caller_connection_id")
+    writer.write_bytes(b"\x01" * 16)
+    writer.write_field_name("reducer_call")
+    writer.write_struct_header(4)
+    writer.write_field_name("reducer_name")
+    writer.write_string("add")
+    writer.write_field_name("reducer_id")
+    writer.write_u32(3)
+    writer.write_field_name("args")
+    writer.write_bytes(b"[1]")
+    writer.write_field_name("request_id")
+    writer.write_u32(request_id)
+    writer.write_field_name("energy_quanta_used")
+    writer.write_u64(7)
+    writer.write_field_name("total_host_execution_duration")
+    writer.write_u64(11)
+    return writer.get_bytes()
+
+
+class TestTransactionUpdateDecoding(unittest.TestCase):
+    """Test TransactionUpdate decoding from JSON and BSATN."""
+
+    def setUp(self):
+        self.decoder = ProtocolDecoder(use_binary=True)
+
+    def test_committed(self):
+        message = self.decoder.decode_server_message(bsatn_transaction_update(42, 0))
+        self.assertEqual(message.status, "Committed")
+        self.assertTrue(ModernSpacetimeDBClient._transaction_committed(message.status))
+        self.assertEqual((message.reducer_call.reducer_name, message.reducer_call.request_id), ("add", 42))
+        self.assertEqual(message.caller_connection_id.data, b"\x01" * 16)
+        self.assertEqual(message.energy_quanta_used.quanta, 7)
+
+    def test_failed(self):
+        message = self.decoder.decode_server_message(bsatn_transaction_update(43, 1, "boom"))
+        self.assertEqual(message.status, "Failed: boom")
+        self.assertFalse(ModernSpacetimeDBClient._transaction_committed(message.status))
+
+    def test_json_reducer_call(self):
+        message = ProtocolDecoder(use_binary=False).decode_server_message(transaction_update(42))
+        self.assertEqual(message.reducer_call, ReducerCallInfo(reducer_name="add", reducer_id=3,
+                                                               args=b"[]", request_id=42))
+        self.assertEqual(message.caller_connection_id.data, b"\x01" * 16)
+        self.assertEqual(message.energy_quanta_used.quanta, 5)
+        self.assertEqual(message.timestamp.nanos_since_epoch, 1000)
+        self.assertEqual(message.total_host_execution_duration.nanos, 2000)
+        self.assertTrue(ModernSpacetimeDBClient._transaction_committed(message.status))
+
+    def test_matches_json(self):
+        decoder = ProtocolDecoder(use_binary=False)
+        for status, data in (({"Committed": {"tables": []}}, bsatn_transaction_update(1, 0)),
+                             ({"Failed": "boom"}, bsatn_transaction_update(1, 1, "boom"))):
+            message = decoder.decode_server_message(json.dumps({"TransactionUpdate": {"status": status}}).encode())
+            self.assertEqual(message.status, self.decoder.decode_server_message(data).status)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+"""
+Test the one-off query result cache for SpacetimeDB Python SDK.
+
+Tests:
+- SQL normalization for cache keys
+- TTL, LRU eviction and hit-ratio metrics
+- Table-based invalidation, including results racing a write
+- Client integration: cached queries skip the round trip and are
+  invalidated by transactions applied to the row cache
+"""
+
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from spacetimedb_sdk.one_off_queries import (
+    OneOffQueryCache, OneOffQueryResult, normalize_sql
+)
+from spacetimedb_sdk.protocol import OneOffQueryResponse, OneOffTable, TableUpdate, TimeDuration
+from spacetimedb_sdk.query_id import QueryId
+from spacetimedb_sdk.modern_client import ModernSpacetimeDBClient
+
+
+def result(sql: str, rows=()) -> OneOffQueryResult:
+    return OneOffQueryResult(query=sql, tables={"user": list(rows)})
+
+
+class TestNormalization(unittest.TestCase):
+
+    def test_whitespace_and_semicolons(self):
+        self.assertEqual(normalize_sql("  SELECT *\n\tFROM user ;"), "SELECT * FROM user")
+        self.assertEqual(normalize_sql("SELECT * FROM user WHERE name = 'a  b'"),
+                         "SELECT * FROM user WHERE name = 'a  b'")
+        self.assertNotEqual(normalize_sql("SELECT * FROM User"), normalize_sql("SELECT * FROM user"))
+
+
+class TestOneOffQueryCache(unittest.TestCase):
+
+    def test_hits_misses_and_ttl(self):
+        cache = OneOffQueryCache(ttl=0.05)
+        self.assertIsNone(cache.get("SELECT * FROM user"))
+        cache.put("SELECT * FROM user", result("q"), ["user"])
+        self.assertIsNotNone(cache.get("SELECT  *  FROM user;"))
+        stats = cache.get_stats()
+        self.assertEqual((stats['hits'], stats['misses'], stats['hit_ratio']), (1, 1, 0.5))
+        time.sleep(0.06)
+        self.assertIsNone(cache.get("SELECT * FROM user"))
+
+    def test_lru_eviction(self):
+        cache = OneOffQueryCache(max_size=2)
+        for i in range(3):
+            cache.put(f"SELECT * FROM t{i}", result(str(i)), [f"t{i}"])
+        self.assertIsNone(cache.get("SELECT * FROM t0"))
+        self.assertEqual(len(cache), 2)
+
+    def test_invalidation_by_table(self):
+        cache = OneOffQueryCache()
+        cache.put("SELECT * FROM user", result("a"), ["user"])
+        cache.put("SELECT * FROM user JOIN team", result("b"), ["user", "team"])
+        cache.put("SELECT * FROM team", result("c"), ["team"])
+        self.assertEqual(cache.invalidate_tables(["User"]), 2)
+        self.assertIsNone(cache.get("SELECT * FROM user"))
+        self.assertIsNotNone(cache.get("SELECT * FROM team"))
+        self.assertEqual(cache.get_stats()['invalidations'], 2)
+        self.assertNotIn("user", cache._keys_by_table)
+
+    def test_result_racing_a_write_not_cached(self):
+        cache = OneOffQueryCache()
+        since = cache.epoch()
+        cache.invalidate_tables(["user"])
+        self.assertFalse(cache.put("SELECT * FROM user", result("a"), ["user"], since=since))
+        self.assertTrue(cache.put("SELECT * FROM team", result("b"), ["team"], since=since))
+        self.assertEqual(cache.get_stats()['rejected'], 1)
+
+    def test_subscribed_only(self):
+        cache = OneOffQueryCache(ttl=None, subscribed_only=True)
+        self.assertFalse(cache.put("SELECT * FROM user", result("a"), ["user"], subscribed=False))
+        self.assertTrue(cache.put("SELECT * FROM user", result("a"), ["user"], subscribed=True))
+        with self.assertRaises(ValueError):
+            OneOffQueryCache(ttl=None)
+
+    def test_index_pruned_after_eviction(self):
+        cache = OneOffQueryCache(max_size=10)
+        for i in range(1000):
+            cache.put(f"SELECT * FROM user WHERE id = {i}", result(str(i)), ["user"])
+        self.assertLessEqual(len(cache._tables_by_key), 21)
+
+
+class TestClientQueryCache(unittest.TestCase):
+
+    def setUp(self):
+        self.client = ModernSpacetimeDBClient(start_message_processing=False)
+        self.client.ws_client = MagicMock()
+        self.client.ws_client.is_connected = True
+        self.sent = []
+
+        def send(sql, message_id):
+            self.sent.append(sql)
+            # Answer from another thread, like the message thread would
+            threading.Thread(target=self.client._handle_one_off_query_response, args=(
+                OneOffQueryResponse(message_id=message_id, error=None,
+                                    tables=[OneOffTable(table_name="user", rows=[{"id": len(self.sent)}])],
+                                    total_host_execution_duration=TimeDuration(nanos=0)),
+            )).start()
+        self.client.ws_client.execute_one_off_query.side_effect = send
+
+    def tearDown(self):
+        self.client.ws_client = None
+        self.client.shutdown()
+
+    def apply_user_update(self):
+        self.client._apply_to_cache([TableUpdate(table_id=0, table_name="user", num_rows=1,
+                                                 inserts=[{"id": 99}], deletes=[])])
+
+    def test_cached_until_table_changes(self):
+        cache = self.client.enable_query_cache(ttl=60)
+        first = self.client.query("SELECT * FROM user", timeout=5)
+        second = self.client.query("SELECT *  FROM user", timeout=5)
+        self.assertIs(first, second)
+        self.assertEqual(len(self.sent), 1)
+        self.assertEqual(self.client.get_connection_metrics()['query_cache']['hit_ratio'], 0.5)
+
+        self.apply_user_update()
+        self.assertEqual(len(cache), 0)
+        third = self.client.query("SELECT * FROM user", timeout=5)
+        self.assertEqual(third.rows, [{"id": 2}])
+        self.assertEqual(len(self.sent), 2)
+
+        # Bypass on request
+        self.client.send_one_off_query("SELECT * FROM user", timeout=5, use_cache=False).result(5)
+        self.assertEqual(len(self.sent), 3)
+
+    def test_subscribed_only(self):
+        self.client.enable_query_cache(ttl=None, subscribed_only=True)
+        self.client.query("SELECT * FROM user", timeout=5)
+        self.assertEqual(len(self.client.query_cache), 0)
+
+        self.client._track_subscription(QueryId(1), ["SELECT * FROM user"])
+        self.client.query("SELECT * FROM user", timeout=5)
+        self.client.query("SELECT * FROM user", timeout=5)
+        self.assertEqual(len(self.sent), 2)
+
+    def test_disable(self):
+        self.client.enable_query_cache()
+        self.client.disable_query_cache()
+        self.assertIsNone(self.client.query_cache)
+        self.assertNotIn('query_cache', self.client.get_connection_metrics())
+        self.apply_user_update()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+"""
+Test batched and paged consumption of one-off queries for SpacetimeDB Python SDK.
+
+Tests:
+- Keyset page SQL generation
+- Batch decoding releases raw rows as it goes
+- query_batches() yields decoded batches per table
+- query_pages() walks a table in key order, requesting the next page
+  before handing out the current one
+"""
+
+import asyncio
+import re
+import threading
+import unittest
+from unittest.mock import MagicMock
+
+from spacetimedb_sdk.algebraic_type import ProductType, FieldInfo, IntType, StringType
+from spacetimedb_sdk.one_off_queries import keyset_page_sql, iter_row_batches, sql_literal
+from spacetimedb_sdk.protocol import OneOffQueryResponse, OneOffTable, TimeDuration
+from spacetimedb_sdk.row_types import RowBase
+from spacetimedb_sdk.modern_client import ModernSpacetimeDBClient
+
+EVENT_TYPE = ProductType([
+    FieldInfo("id", IntType(32, False)),
+    FieldInfo("kind", StringType()),
+])
+
+ROWS = [{"id": i * 3, "kind": "odd" if i % 2 else "even"} for i in range(25)]
+
+
+def response(message_id: bytes, tables) -> OneOffQueryResponse:
+    return OneOffQueryResponse(
+        message_id=message_id, error=None,
+        tables=[OneOffTable(table_name=name, rows=rows) for name, rows in tables],
+        total_host_execution_duration=TimeDuration(nanos=0)
+    )
+
+
+def answer_page(sql: str):
+    """Evaluate the keyset page queries produced by query_pages() against ROWS."""
+    after = re.search(r"id > (\d+)", sql)
+    limit = int(re.search(r"LIMIT (\d+)", sql).group(1))
+    rows = [row for row in ROWS if after is None or row["id"] > int(after.group(1))]
+    if "kind = 'odd'" in sql:
+        rows = [row for row in rows if row["kind"] == "odd"]
+    return sorted(rows, key=lambda row: row["id"])[:limit]
+
+
+class TestPageSql(unittest.TestCase):
+
+    def test_first_and_later_pages(self):
+        self.assertEqual(keyset_page_sql("SELECT * FROM events;", "id", None, 100),
+                         "SELECT * FROM events ORDER BY id LIMIT 100")
+        self.assertEqual(keyset_page_sql("SELECT * FROM events", "id", 42, 100),
+                         "SELECT * FROM events WHERE id > 42 ORDER BY id LIMIT 100")
+        self.assertEqual(keyset_page_sql("SELECT * FROM events WHERE a = 1 OR b = 2", "name", "o'k", 5),
+                         "SELECT * FROM events WHERE (a = 1 OR b = 2) AND name > 'o''k' ORDER BY name LIMIT 5")
+
+    def test_rejects_own_ordering(self):
+        with self.assertRaises(ValueError):
+            keyset_page_sql("SELECT * FROM events LIMIT 5", "id", None, 100)
+        with self.assertRaises(ValueError):
+            sql_literal(object())
+
+
+class TestRowBatches(unittest.TestCase):
+
+    def test_batches_release_raw_rows(self):
+        first = [{"id": i} for i in range(5)]
+        message = response(b"", [("a", first), ("b", [{"id": 9}])])
+        batches = iter_row_batches(message, lambda table, rows: list(rows), batch_size=2)
+
+        self.assertEqual(next(batches), ("a", [{"id": 0}, {"id": 1}]))
+        self.assertEqual(message.tables, [])
+        self.assertEqual(len(first), 3)
+        self.assertEqual(list(batches), [("a", [{"id": 2}, {"id": 3}]), ("a", [{"id": 4}]), ("b", [{"id": 9}])])
+        self.assertEqual(first, [])
+
+
+class TestClientPaging(unittest.TestCase):
+
+    def setUp(self):
+        self.client = ModernSpacetimeDBClient(start_message_processing=False)
+        self.client.register_table("events", EVENT_TYPE, primary_key="id")
+        self.client.ws_client = MagicMock()
+        self.client.ws_client.is_connected = True
+        self.sent = []
+
+        def send(sql, message_id):
+            self.sent.append(sql)
+            rows = ROWS if "LIMIT" not in sql else answer_page(sql)
+            threading.Thread(target=self.client._handle_one_off_query_response,
+                             args=(response(message_id, [("events", [dict(row) for row in rows])]),)).start()
+        self.client.ws_client.execute_one_off_query.side_effect = send
+
+    def tearDown(self):
+        self.client.ws_client = None
+        self.client.shutdown()
+
+    def test_query_batches(self):
+        batches = list(self.client.query_batches("SELECT * FROM events", batch_size=10, timeout=5))
+        self.assertEqual([len(rows) for _, rows in batches], [10, 10, 5])
+        self.assertIsInstance(batches[0][1][0], RowBase)
+        self.assertEqual([row.id for _, rows in batches for row in rows], [row["id"] for row in ROWS])
+        self.assertEqual(self.client._one_off_query_info, {})
+
+    def test_query_pages(self):
+        pages = self.client.query_pages("SELECT * FROM events", "id", page_size=10, timeout=5)
+        first = next(pages)
+        # The second page was requested before the first was handed out
+        self.assertEqual(len(self.sent), 2)
+        rest = list(pages)
+        self.assertEqual([len(page) for page in [first] + rest], [10, 10, 5])
+        self.assertEqual([row.id for page in [first] + rest for row in page], [row["id"] for row in ROWS])
+        self.assertEqual(len(self.sent), 3)
+
+    def test_query_pages_async_with_filter(self):
+        async def main():
+            return [page async for page in self.client.query_pages_async(
+                "SELECT * FROM events WHERE kind = 'odd'", "id", page_size=4, timeout=5)]
+
+        pages = asyncio.run(main())
+        self.assertEqual([len(page) for page in pages], [4, 4, 4])
+        self.assertTrue(all(row.kind == "odd" for page in pages for row in page))
+        # A full last page costs one extra, empty request
+        self.assertEqual(len(self.sent), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+"""
+Test coalescing of idempotent reducer calls for SpacetimeDB Python SDK.
+
+Tests:
+- Duplicate calls within the window are dropped and share the sent call's outcome
+- Duplicates after the window, or with other arguments, are sent
+- Last-per-key calls are held, superseded and sent in one write at the end of the window
+- Removing a policy sends held calls
+- Absorbed calls are not charged energy
+"""
+
+import time
+import unittest
+from unittest.mock import MagicMock
+
+from spacetimedb_sdk.reducer_coalescing import CoalescingMode, CoalescingPolicy
+from spacetimedb_sdk.protocol import (
+    TransactionUpdate, ReducerCallInfo, Timestamp, Identity, ConnectionId,
+    EnergyQuanta, TimeDuration
+)
+from spacetimedb_sdk.modern_client import ModernSpacetimeDBClient
+
+
+def transaction_update(request_id: int, reducer: str, status="Committed") -> TransactionUpdate:
+    return TransactionUpdate(
+        status=status,
+        timestamp=Timestamp(nanos_since_epoch=0),
+        caller_identity=Identity(data=b"\x00" * 32),
+        caller_connection_id=ConnectionId(data=b"\x01" * 16),
+        reducer_call=ReducerCallInfo(reducer_name=reducer, reducer_id=0, args=b"", request_id=request_id),
+        energy_quanta_used=EnergyQuanta(quanta=1),
+        total_host_execution_duration=TimeDuration(nanos=1)
+    )
+
+
+class TestReducerCoalescing(unittest.TestCase):
+
+    def setUp(self):
+        self.client = ModernSpacetimeDBClient(start_message_processing=False)
+        self.client.ws_client = MagicMock()
+        self.client.ws_client.is_connected = True
+        self.client.connection_id = ConnectionId(data=b"\x01" * 16)
+        self.writes = []
+        self.client.ws_client.call_reducers.side_effect = \
+            lambda calls, flags: self.writes.append([(name, args, request_id) for name, args, request_id in calls])
+
+    def tearDown(self):
+        self.client.ws_client = None
+        self.client.shutdown()
+
+    def sent(self):
+        return [call for write in self.writes for call in write]
+
+    def test_drop_duplicates(self):
+        self.client.set_coalescing_policy("heartbeat", CoalescingPolicy(CoalescingMode.DROP_DUPLICATES, window_ms=500))
+        first = self.client.call_reducer("heartbeat", "online")
+        futures = self.client.call_reducers([("heartbeat", ("online",)), ("heartbeat", ("away",))])
+        self.assertEqual(self.client.call_reducer("heartbeat", "online"), first)
+        self.assertEqual([args for _, args, _ in self.sent()], [b'["online"]', b'["away"]'])
+
+        self.client._handle_transaction_update(transaction_update(first, "heartbeat"))
+        self.assertEqual(futures[0].result(1).reducer_name, "heartbeat")
+        self.assertFalse(futures[1].done())
+        stats = self.client.get_connection_metrics()['reducer_coalescing']
+        self.assertEqual((stats['submitted'], stats['sent'], stats['dropped']), (4, 2, 2))
+
+    def test_duplicate_after_window_sent(self):
+        self.client.set_coalescing_policy("heartbeat", CoalescingPolicy(CoalescingMode.DROP_DUPLICATES, window_ms=20))
+        first = self.client.call_reducer("heartbeat")
+        time.sleep(0.03)
+        self.assertNotEqual(self.client.call_reducer("heartbeat"), first)
+        self.assertEqual(len(self.sent()), 2)
+
+    def test_last_per_key(self):
+        self.client.set_coalescing_policy("set_position", CoalescingPolicy(
+            CoalescingMode.LAST_PER_KEY, window_ms=50, key=lambda entity_id, x: entity_id))
+        futures = self.client.call_reducers([("set_position", (1, 10)), ("set_position", (1, 11)),
+                                             ("set_position", (2, 20))])
+        self.assertEqual(self.writes, [])
+
+        deadline = time.monotonic() + 2
+        while not self.writes and time.monotonic() < deadline:
+            time.sleep(0.005)
+        write, = self.writes
+        self.assertEqual([args for _, args, _ in write], [b'[1, 11]', b'[2, 20]'])
+
+        self.client._handle_transaction_update(transaction_update(write[0][2], "set_position", status="bad"))
+        for future in futures[:2]:
+            with self.assertRaises(Exception):
+                future.result(1)
+        self.assertFalse(futures[2].done())
+
+    def test_removing_policy_sends_held_calls(self):
+        self.client.set_coalescing_policy("set_value", CoalescingPolicy(CoalescingMode.LAST_PER_KEY, window_ms=10000))
+        self.client.call_reducer("set_value", 1)
+        self.client.call_reducer("set_value", 2)
+        self.client.set_coalescing_policy("set_value", None)
+        self.assertEqual([args for _, args, _ in self.sent()], [b'[2]'])
+        self.client.call_reducer("set_value", 3)
+        self.assertEqual(self.client.ws_client.call_reducer.call_count, 1)
+
+    def test_absorbed_calls_not_charged(self):
+        self.client.set_coalescing_policy("heartbeat", CoalescingPolicy(CoalescingMode.DROP_DUPLICATES, window_ms=500))
+        before = self.client.energy_tracker.get_current_energy()
+        self.client.call_reducer_energy_aware("heartbeat")
+        after_first = self.client.energy_tracker.get_current_energy()
+        self.client.call_reducer_energy_aware("heartbeat")
+        self.assertLess(after_first, before)
+        self.assertGreaterEqual(self.client.energy_tracker.get_current_energy(), after_first)
+        self.assertGreater(self.client.get_connection_metrics()['reducer_coalescing']['energy_saved'], 0)
+
+    def test_policy_validation(self):
+        with self.assertRaises(ValueError):
+            CoalescingPolicy(CoalescingMode.DROP_DUPLICATES, window_ms=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
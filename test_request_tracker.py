@@ -0,0 +1,118 @@
+"""
+Test RequestTracker scaling for SpacetimeDB Python SDK.
+
+Tests:
+- Deadline heaps expire only requests whose deadline passed
+- Resolved requests never time out, and stale heap entries are compacted
+- Completed responses are bounded in number and expire after their TTL
+- Request IDs stay unique across threads and wrap around
+"""
+
+import math
+import threading
+import time
+import unittest
+
+from spacetimedb_sdk.request_tracker import RequestTracker
+
+
+class TestRequestTrackerTimeouts(unittest.TestCase):
+    """Test deadline-ordered expiry."""
+
+    def test_only_expired_requests_removed(self):
+        tracker = RequestTracker()
+        tracker.add_pending_request(1, timeout_seconds=0.01)
+        tracker.add_pending_request(2, timeout_seconds=10)
+        tracker.add_pending_request(3, timeout_seconds=math.inf)
+        self.assertIsNotNone(tracker.next_deadline())
+        time.sleep(0.02)
+        self.assertEqual(tracker.check_timeouts(), {1})
+        self.assertEqual(tracker.get_pending_request_ids(), {2, 3})
+        self.assertGreater(tracker.next_deadline(), time.monotonic() + 5)
+
+    def test_resolved_requests_do_not_time_out(self):
+        tracker = RequestTracker()
+        tracker.add_pending_request(1, timeout_seconds=0.01)
+        tracker.resolve_request(1, "done")
+        time.sleep(0.02)
+        self.assertEqual(tracker.check_timeouts(), set())
+        self.assertIsNone(tracker.next_deadline())
+        self.assertEqual(tracker.get_response(1), "done")
+
+    def test_readding_request_uses_new_deadline(self):
+        tracker = RequestTracker()
+        tracker.add_pending_request(1, timeout_seconds=0.01)
+        tracker.add_pending_request(1, timeout_seconds=10)
+        time.sleep(0.02)
+        self.assertEqual(tracker.check_timeouts(), set())
+        self.assertTrue(tracker.is_request_pending(1))
+
+    def test_stale_deadlines_compacted(self):
+        tracker = RequestTracker(stripes=1)
+        for request_id in range(1, 10001):
+            tracker.add_pending_request(request_id, timeout_seconds=60)
+            tracker.pop_pending_request(request_id)
+        self.assertLess(len(tracker._stripes[0].deadlines), 200)
+
+
+class TestCompletedStore(unittest.TestCase):
+    """Test the bounded completed-response store."""
+
+    def test_bounded(self):
+        tracker = RequestTracker(stripes=2, max_completed=100)
+        for request_id in range(1, 1001):
+            tracker.add_pending_request(request_id)
+            tracker.resolve_request(request_id, request_id)
+        self.assertEqual(tracker.get_completed_count(), 100)
+        self.assertIsNone(tracker.get_response(1))
+        self.assertEqual(tracker.remove_completed_response(1000), 1000)
+        self.assertIsNone(tracker.get_response(1000))
+
+    def test_ttl(self):
+        tracker = RequestTracker(completed_ttl=0.02)
+        tracker.add_pending_request(1)
+        tracker.resolve_request(1, "x")
+        self.assertEqual(tracker.get_response(1), "x")
+        time.sleep(0.03)
+        self.assertIsNone(tracker.get_response(1))
+        self.assertEqual(tracker.get_completed_count(), 0)
+
+    def test_invalid_configuration(self):
+        with self.assertRaises(ValueError):
+            RequestTracker(stripes=3)
+        with self.assertRaises(ValueError):
+            RequestTracker(max_completed=0)
+
+
+class TestRequestIds(unittest.TestCase):
+    """Test lock-free request ID generation."""
+
+    def test_unique_across_threads(self):
+        tracker = RequestTracker()
+        results = [[] for _ in range(8)]
+
+        def generate(out):
+            for _ in range(5000):
+                request_id = tracker.generate_request_id()
+                out.append(request_id)
+                tracker.add_pending_request(request_id)
+                tracker.resolve_request(request_id, None)
+
+        threads = [threading.Thread(target=generate, args=(out,)) for out in results]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        ids = [request_id for out in results for request_id in out]
+        self.assertEqual(len(set(ids)), 40000)
+        self.assertEqual(tracker.get_pending_count(), 0)
+
+    def test_wrap_around(self):
+        tracker = RequestTracker()
+        tracker._ids = iter([2147483645, 2147483646])
+        self.assertEqual(tracker.generate_request_id(), 2147483646)
+        self.assertEqual(tracker.generate_request_id(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,393 @@
+"""
+Test the versioned row cache for SpacetimeDB Python SDK.
+
+Tests:
+- Atomic multi-table transaction apply
+- Listeners notified one transaction at a time, in version order
+- Copy-on-write table versions (old versions stay stable)
+- Consistent snapshots across tables
+- conn.db.snapshot() and TableHandle reads through the client
+- Reference-counted rows shared by overlapping subscriptions
+- Committed transactions decoded from JSON and BSATN reach the cache
+"""
+
+import json
+import threading
+import unittest
+from dataclasses import dataclass
+from typing import Any, Dict, List
+
+from spacetimedb_sdk.row_cache import (
+    RowCache,
+    TableVersion,
+    CacheSnapshot,
+    default_row_key,
+    MAX_BUCKET_LOAD,
+)
+from spacetimedb_sdk.bsatn import BsatnWriter
+from spacetimedb_sdk.protocol import (
+    ProtocolDecoder,
+    TableUpdate,
+    DatabaseUpdate,
+    SubscribeApplied,
+    SubscribeMultiApplied,
+    UnsubscribeMultiApplied,
+    QueryId as ProtocolQueryId,
+)
+from spacetimedb_sdk.query_id import QueryId
+from spacetimedb_sdk.modern_client import ModernSpacetimeDBClient
+
+
+def make_update(table_name: str, inserts: List[Dict[str, Any]] = None,
+                deletes: List[Dict[str, Any]] = None) -> TableUpdate:
+    inserts = inserts or []
+    deletes = deletes or []
+    return TableUpdate(
+        table_id=0,
+        table_name=table_name,
+        num_rows=len(inserts) + len(deletes),
+        inserts=inserts,
+        deletes=deletes
+    )
+
+
+class TestRowCache(unittest.TestCase):
+    """Test RowCache apply and versioning."""
+
+    def setUp(self):
+        self.cache = RowCache()
+        self.cache.set_key_getter("users", lambda row: row["id"])
+
+    def test_apply_inserts_and_deletes(self):
+        applied = self.cache.apply([make_update("users", inserts=[{"id": 1, "name": "a"}, {"id": 2, "name": "b"}])])
+        self.assertEqual(applied.version, 1)
+        self.assertEqual(len(self.cache.table("users")), 2)
+
+        applied = self.cache.apply([make_update("users", deletes=[{"id": 1, "name": "a"}])])
+        self.assertEqual(applied.version, 2)
+        self.assertEqual(len(applied.tables["users"].deletes), 1)
+        self.assertIsNone(self.cache.table("users").get(1))
+        self.assertEqual(self.cache.table("users").get(2)["name"], "b")
+
+    def test_update_by_primary_key(self):
+        self.cache.apply([make_update("users", inserts=[{"id": 1, "name": "a"}])])
+        self.cache.apply([make_update("users", inserts=[{"id": 1, "name": "z"}], deletes=[{"id": 1, "name": "a"}])])
+        table = self.cache.table("users")
+        self.assertEqual(len(table), 1)
+        self.assertEqual(table.get(1)["name"], "z")
+
+    def test_rows_without_primary_key(self):
+        row = {"text": "hello", "tags": ["x"]}
+        self.cache.apply([make_update("messages", inserts=[row])])
+        self.assertEqual(len(self.cache.table("messages")), 1)
+        self.cache.apply([make_update("messages", deletes=[{"tags": ["x"], "text": "hello"}])])
+        self.assertEqual(len(self.cache.table("messages")), 0)
+        self.assertEqual(default_row_key({"a": 1}), default_row_key({"a": 1}))
+
+    def test_old_versions_are_unchanged(self):
+        self.cache.apply([make_update("users", inserts=[{"id": i} for i in range(10)])])
+        before = self.cache.table("users")
+        self.cache.apply([make_update("users", deletes=[{"id": 0}], inserts=[{"id": 99}])])
+        after = self.cache.table("users")
+
+        self.assertEqual(len(before), 10)
+        self.assertIn(0, before)
+        self.assertNotIn(99, before)
+        self.assertNotIn(0, after)
+        self.assertIn(99, after)
+
+    def test_untouched_buckets_are_shared(self):
+        self.cache.apply([make_update("users", inserts=[{"id": i} for i in range(100)])])
+        before = self.cache.table("users")
+        self.cache.apply([make_update("users", inserts=[{"id": 1000}])])
+        after = self.cache.table("users")
+        shared = sum(1 for a, b in zip(before._buckets, after._buckets) if a is b)
+        self.assertEqual(shared, len(before._buckets) - 1)
+
+    def test_growth_rehashes_buckets(self):
+        count = MAX_BUCKET_LOAD * 8 * 3
+        self.cache.apply([make_update("users", inserts=[{"id": i} for i in range(count)])])
+        table = self.cache.table("users")
+        self.assertEqual(len(table), count)
+        self.assertGreater(len(table._buckets), 8)
+        self.assertEqual(table.get(count - 1), {"id": count - 1})
+
+    def test_snapshot_spans_tables_at_one_version(self):
+        self.cache.apply([
+            make_update("users", inserts=[{"id": 1}]),
+            make_update("messages", inserts=[{"text": "hi"}]),
+        ])
+        with self.cache.snapshot() as snap:
+            self.assertIsInstance(snap, CacheSnapshot)
+            self.cache.apply([
+                make_update("users", inserts=[{"id": 2}]),
+                make_update("messages", inserts=[{"text": "again"}]),
+            ])
+            self.assertEqual(snap.version, 1)
+            self.assertEqual(len(snap.users), 1)
+            self.assertEqual(len(snap["messages"]), 1)
+        self.assertEqual(self.cache.version, 2)
+
+    def test_snapshot_of_unknown_table_is_empty(self):
+        snap = self.cache.snapshot(["missing"])
+        self.assertIsInstance(snap.table("missing"), TableVersion)
+        self.assertEqual(len(snap.table("missing")), 0)
+
+    def test_listeners_notified_in_version_order(self):
+        seen = []
+        first_delivered = threading.Event()
+        second_applied = threading.Event()
+
+        def listener(applied):
+            if applied.version == 1:
+                first_delivered.set()
+                second_applied.wait(5)
+            seen.append(applied.version)
+        self.cache.add_listener(listener)
+
+        writer = threading.Thread(target=self.cache.apply, args=([make_update("users", inserts=[{"id": 1}])],))
+        writer.start()
+        self.assertTrue(first_delivered.wait(5))
+        # Published while version 1 is still being delivered on the other thread
+        self.assertEqual(self.cache.apply([make_update("users", inserts=[{"id": 2}])]).version, 2)
+        second_applied.set()
+        writer.join(5)
+        self.assertEqual(seen, [1, 2])
+
+    def test_readers_never_see_torn_transactions(self):
+        """Each transaction moves one row between two tables; totals must stay constant."""
+        self.cache.set_key_getter("a", lambda row: row["id"])
+        self.cache.set_key_getter("b", lambda row: row["id"])
+        self.cache.apply([make_update("a", inserts=[{"id": i} for i in range(50)])])
+
+        errors = []
+        stop = threading.Event()
+
+        def reader():
+            while not stop.is_set():
+                snap = self.cache.snapshot(["a", "b"])
+                total = len(snap.a) + len(snap.b)
+                if total != 50:
+                    errors.append(total)
+
+        threads = [threading.Thread(target=reader) for _ in range(3)]
+        for t in threads:
+            t.start()
+        for i in range(50):
+            self.cache.apply([
+                make_update("a", deletes=[{"id": i}]),
+                make_update("b", inserts=[{"id": i}]),
+            ])
+        stop.set()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(self.cache.table("b")), 50)
+
+
+class TestClientRowCache(unittest.TestCase):
+    """Test the row cache through the client's table interface."""
+
+    def setUp(self):
+        self.client = ModernSpacetimeDBClient(start_message_processing=False)
+        self.client.register_table("users", dict, primary_key="id")
+
+    def tearDown(self):
+        self.client.shutdown()
+
+    def test_table_handle_reads_cache(self):
+        self.client._apply_to_cache([make_update("users", inserts=[{"id": 1, "name": "a"}, {"id": 2, "name": "b"}])])
+        self.assertEqual(self.client.db.users.count(), 2)
+        self.assertEqual(len(self.client.db.users.all()), 2)
+        self.assertEqual(self.client.db.users.find_by_unique_column("id", 2)["name"], "b")
+
+    def test_iter_is_stable_during_apply(self):
+        self.client._apply_to_cache([make_update("users", inserts=[{"id": i} for i in range(5)])])
+        rows = self.client.db.users.iter()
+        first = next(rows)
+        self.client._apply_to_cache([make_update("users", inserts=[{"id": i} for i in range(5, 500)])])
+        self.assertEqual(1 + len(list(rows)), 5)
+        self.assertIsNotNone(first)
+
+    def test_transaction_rows_from_json(self):
+        data = json.dumps({"TransactionUpdate": {
+            "status": {"Committed": {"tables": [{
+                "table_id": 4096, "table_name": "users", "num_rows": 2,
+                "updates": [{"inserts": [json.dumps({"id": 1, "name": "a"}), json.dumps({"id": 2, "name": "b"})],
+                             "deletes": []}],
+            }]}},
+        }}).encode()
+        message = ProtocolDecoder(use_binary=False).decode_server_message(data)
+        self.client._handle_transaction_update(message)
+        self.assertEqual(self.client.db.users.count(), 2)
+        self.assertEqual(self.client.db.users.find_by_unique_column("id", 2)["name"], "b")
+
+    def test_transaction_rows_from_bsatn(self):
+        writer = BsatnWriter()
+        writer.write_enum_header(2)  # TransactionUpdate
+        writer.write_struct_header(1)
+        writer.write_field_name("status")
+        writer.write_enum_header(0)  # Committed
+        writer.write_struct_header(1)
+        writer.write_field_name("tables")
+        writer.write_list_header(1)
+        writer.write_struct_header(4)
+        writer.write_field_name("table_id")
+        writer.write_u32(4096)
+        writer.write_field_name("table_name")
+        writer.write_string("users")
+        writer.write_field_name("inserts")
+        writer.write_list_header(2)
+        for user_id, name in ((1, "a"), (2, "b")):
+            writer.write_struct_header(2)
+            writer.write_field_name("id")
+            writer.write_u32(user_id)
+            writer.write_field_name("name")
+            writer.write_string(name)
+        writer.write_field_name("deletes")
+        writer.write_list_header(0)
+        message = ProtocolDecoder(use_binary=True).decode_server_message(writer.get_bytes())
+        self.client._handle_transaction_update(message)
+        self.assertEqual(self.client.db.users.count(), 2)
+        self.assertEqual(self.client.db.users.find_by_unique_column("id", 1)["name"], "a")
+
+    def test_db_snapshot(self):
+        self.client._apply_to_cache([make_update("users", inserts=[{"id": 1}])])
+        with self.client.db.snapshot() as snap:
+            self.client._apply_to_cache([make_update("users", inserts=[{"id": 2}])])
+            self.assertEqual(len(snap.users), 1)
+        self.assertEqual(self.client.db.users.count(), 2)
+
+
+class TestRowReferenceCounts(unittest.TestCase):
+    """Test row reference counts and ownership in RowCache."""
+
+    def setUp(self):
+        self.cache = RowCache()
+        self.cache.set_key_getter("users", lambda row: row["id"])
+        self.q1 = QueryId(1)
+        self.q2 = QueryId(2)
+
+    def test_overlapping_rows_are_stored_once(self):
+        self.cache.apply([make_update("users", inserts=[{"id": 1}, {"id": 2}])], owner=self.q1)
+        applied = self.cache.apply([make_update("users", inserts=[{"id": 2}, {"id": 3}])], owner=self.q2)
+
+        self.assertEqual(len(self.cache.table("users")), 3)
+        self.assertEqual(applied.tables["users"].inserts, [{"id": 3}])
+        self.assertEqual(self.cache.ref_count("users", 2), 2)
+        self.assertEqual(self.cache.ref_count("users", 1), 1)
+        self.assertEqual(set(self.cache.owners("users", 2)), {self.q1, self.q2})
+
+    def test_release_evicts_only_unshared_rows(self):
+        self.cache.apply([make_update("users", inserts=[{"id": 1}, {"id": 2}])], owner=self.q1)
+        self.cache.apply([make_update("users", inserts=[{"id": 2}, {"id": 3}])], owner=self.q2)
+        version = self.cache.version
+
+        applied = self.cache.release(self.q1)
+        self.assertEqual(applied.version, version + 1)
+        self.assertEqual(applied.tables["users"].deletes, [{"id": 1}])
+        self.assertEqual(sorted(self.cache.table("users").keys()), [2, 3])
+        self.assertEqual(self.cache.ref_count("users", 2), 1)
+
+        self.cache.release(self.q2)
+        self.assertEqual(len(self.cache.table("users")), 0)
+        self.assertEqual(self.cache.release(self.q2).tables, {})
+
+    def test_transaction_delete_drops_one_reference(self):
+        self.cache.apply([make_update("users", inserts=[{"id": 1}])], owner=self.q1)
+        self.cache.apply([make_update("users", inserts=[{"id": 1}])], owner=self.q2)
+        applied = self.cache.apply([make_update("users", deletes=[{"id": 1}])])
+        self.assertEqual(applied.tables["users"].deletes, [])
+        self.assertEqual(self.cache.ref_count("users", 1), 1)
+
+        # The delete is charged to the first owner released
+        self.assertEqual(self.cache.release(self.q1).tables, {})
+        self.assertEqual(self.cache.release(self.q2).tables["users"].deletes, [{"id": 1}])
+
+    def test_transaction_references_counted_per_delivery(self):
+        self.cache.apply([make_update("users", inserts=[{"id": 7}, {"id": 7}])])
+        self.assertEqual(self.cache.ref_count("users", 7), 2)
+        self.cache.apply([make_update("users", deletes=[{"id": 7}])])
+        self.assertIn(7, self.cache.table("users"))
+        applied = self.cache.apply([make_update("users", deletes=[{"id": 7}])])
+        self.assertEqual(applied.tables["users"].deletes, [{"id": 7}])
+        self.assertEqual(self.cache.ref_count("users", 7), 0)
+
+    def test_shared_row_update(self):
+        self.cache.apply([make_update("users", inserts=[{"id": 1, "v": 0}])], owner=self.q1)
+        self.cache.apply([make_update("users", inserts=[{"id": 1, "v": 0}])], owner=self.q2)
+        # The update is delivered once for each subscription
+        applied = self.cache.apply([
+            make_update("users", inserts=[{"id": 1, "v": 1}], deletes=[{"id": 1, "v": 0}]),
+            make_update("users", inserts=[{"id": 1, "v": 1}], deletes=[{"id": 1, "v": 0}]),
+        ])
+        self.assertEqual(applied.tables["users"].inserts, [{"id": 1, "v": 1}])
+        self.assertEqual(self.cache.table("users").get(1), {"id": 1, "v": 1})
+        self.assertEqual(self.cache.ref_count("users", 1), 2)
+
+    def test_unattributed_rows_survive_release(self):
+        self.cache.apply([make_update("users", inserts=[{"id": 1}])])
+        self.cache.apply([make_update("users", inserts=[{"id": 1}])], owner=self.q1)
+        self.cache.release(self.q1)
+        self.assertIn(1, self.cache.table("users"))
+
+
+class TestClientSubscriptionRefCounts(unittest.TestCase):
+    """Test reference counting through subscription messages."""
+
+    def setUp(self):
+        self.client = ModernSpacetimeDBClient(start_message_processing=False)
+        self.client.register_table("users", dict, primary_key="id")
+        self.client._track_subscription(QueryId(1), ["SELECT * FROM users WHERE id < 3"])
+        self.client._track_subscription(QueryId(2), ["SELECT * FROM users WHERE id > 1"])
+        self.deleted = []
+        self.client.db.users.on_delete(lambda ctx, row: self.deleted.append(row["id"]))
+
+    def tearDown(self):
+        self.client.shutdown()
+
+    def test_unsubscribe_keeps_shared_rows(self):
+        self.client._handle_server_message(SubscribeApplied(
+            request_id=1, total_host_execution_duration_micros=0,
+            query_id=ProtocolQueryId(1), table_id=0, table_name="users",
+            table_rows=make_update("users", inserts=[{"id": 1}, {"id": 2}])
+        ))
+        self.client._handle_server_message(SubscribeMultiApplied(
+            request_id=2, total_host_execution_duration_micros=0,
+            query_id=ProtocolQueryId(2),
+            update=DatabaseUpdate(tables=[make_update("users", inserts=[{"id": 2}, {"id": 3}])])
+        ))
+        self.assertEqual(self.client.db.users.count(), 3)
+        self.assertEqual(self.client.row_cache.ref_count("users", 2), 2)
+
+        self.client._handle_server_message(UnsubscribeMultiApplied(
+            request_id=3, total_host_execution_duration_micros=0,
+            query_id=ProtocolQueryId(1),
+            update=DatabaseUpdate(tables=[make_update("users", deletes=[{"id": 1}, {"id": 2}])])
+        ))
+        self.assertEqual(sorted(row["id"] for row in self.client.db.users.iter()), [2, 3])
+        self.assertEqual(self.deleted, [1])
+
+    def test_transaction_rows_counted_per_delivery(self):
+        # id 5 only matches subscription 2, so the server delivers it once
+        self.client._apply_to_cache([make_update("users", inserts=[{"id": 5}])])
+        self.assertEqual(self.client.row_cache.ref_count("users", 5), 1)
+
+        self.client._handle_server_message(UnsubscribeMultiApplied(
+            request_id=3, total_host_execution_duration_micros=0,
+            query_id=ProtocolQueryId(1),
+            update=DatabaseUpdate(tables=[])
+        ))
+        self.assertIn(5, self.client.row_cache.table("users"))
+        self.client._handle_server_message(UnsubscribeMultiApplied(
+            request_id=4, total_host_execution_duration_micros=0,
+            query_id=ProtocolQueryId(2),
+            update=DatabaseUpdate(tables=[make_update("users", deletes=[{"id": 5}])])
+        ))
+        self.assertEqual(self.client.db.users.count(), 0)
+        self.assertEqual(self.deleted, [5])
+
+
+if __name__ == '__main__':
+    unittest.main()
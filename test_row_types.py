@@ -0,0 +1,267 @@
+"""
+Test compact row classes for SpacetimeDB Python SDK.
+
+Tests:
+- Row classes generated from ProductType schemas and TableMetadata
+- Named accessors, dict helpers and pickling
+- Direct BSATN decoding into row classes, also of transaction rows
+- register_table with a schema decodes cached rows into row objects
+- Column projections narrow cached rows to the selected columns, skipping
+  the other columns' values when decoding BSATN
+"""
+
+import pickle
+import sys
+import unittest
+from unittest.mock import patch
+
+from spacetimedb_sdk.algebraic_type import ProductType, FieldInfo, IntType, StringType, BoolType
+from spacetimedb_sdk.bsatn import BsatnWriter, BsatnReader
+from spacetimedb_sdk.protocol import ProtocolDecoder, TableUpdate
+from spacetimedb_sdk.remote_module import TableMetadata
+from spacetimedb_sdk import row_types
+from spacetimedb_sdk.row_types import (
+    RowBase,
+    make_row_class,
+    row_class_from_product_type,
+    row_class_for_table,
+    decode_row,
+    project_columns,
+)
+from spacetimedb_sdk.modern_client import ModernSpacetimeDBClient
+
+
+USER_TYPE = ProductType([
+    FieldInfo("id", IntType(32, False)),
+    FieldInfo("name", StringType()),
+    FieldInfo("online", BoolType()),
+])
+
+
+def bsatn_transaction(table_name: str, rows) -> bytes:
+    """A committed BSATN TransactionUpdate inserting rows written as tagged structs."""
+    writer = BsatnWriter()
+    writer.write_enum_header(2)  # TransactionUpdate
+    writer.write_struct_header(1)
+    writer.write_field_name("status")
+    writer.write_enum_header(0)  # Committed
+    writer.write_struct_header(1)
+    writer.write_field_name("tables")
+    writer.write_list_header(1)
+    writer.write_struct_header(2)
+    writer.write_field_name("table_name")
+    writer.write_string(table_name)
+    writer.write_field_name("inserts")
+    writer.write_list_header(len(rows))
+    for row in rows:
+        writer.write_struct_header(len(row))
+        for name, value in row.items():
+            writer.write_field_name(name)
+            if isinstance(value, bool):
+                writer.write_bool(value)
+            elif isinstance(value, int):
+                writer.write_i32(value)
+            else:
+                writer.write_string(value)
+    return writer.get_bytes()
+
+
+class TestRowClasses(unittest.TestCase):
+    """Test generated row classes."""
+
+    def setUp(self):
+        self.User = row_class_from_product_type(USER_TYPE, "user")
+
+    def test_accessors_and_helpers(self):
+        row = self.User.from_dict({"id": 1, "name": "Alice", "online": True})
+        self.assertIsInstance(row, RowBase)
+        self.assertEqual(row.id, 1)
+        self.assertEqual(row.name, "Alice")
+        self.assertEqual(row.get("online"), True)
+        self.assertIsNone(row.get("missing"))
+        self.assertEqual(row.to_dict(), {"id": 1, "name": "Alice", "online": True})
+
+    def test_missing_columns_are_none(self):
+        row = self.User.from_dict({"id": 2})
+        self.assertIsNone(row.name)
+
+    def test_rows_are_compact(self):
+        row = self.User.from_dict({"id": 1, "name": "Alice", "online": True})
+        self.assertFalse(hasattr(row, '__dict__'))
+        self.assertLess(sys.getsizeof(row), sys.getsizeof(row.to_dict()))
+
+    def test_class_is_reused_per_schema(self):
+        self.assertIs(row_class_from_product_type(USER_TYPE, "user"), self.User)
+        self.assertIsNot(make_row_class("user", ["id"]), self.User)
+
+    def test_pickle_round_trip(self):
+        row = self.User.from_values([1, "Alice", False])
+        copy = pickle.loads(pickle.dumps(row))
+        self.assertEqual(copy, row)
+        self.assertIs(type(copy), self.User)
+
+    def test_from_values_checks_arity(self):
+        with self.assertRaises(ValueError):
+            self.User.from_values([1, "Alice"])
+
+    def test_row_class_for_table(self):
+        metadata = TableMetadata(table_name="user", row_type=dict, algebraic_type=USER_TYPE)
+        self.assertIs(row_class_for_table(metadata), self.User)
+        self.assertIsNone(row_class_for_table(TableMetadata(table_name="x", row_type=dict)))
+
+
+class TestDecodeRow(unittest.TestCase):
+    """Test decoding BSATN straight into row classes."""
+
+    def setUp(self):
+        self.User = row_class_from_product_type(USER_TYPE, "user")
+
+    def test_decode_positional_row(self):
+        writer = BsatnWriter()
+        USER_TYPE.serialize({"id": 7, "name": "Bob", "online": False}, writer)
+        row = decode_row(BsatnReader(writer.get_bytes()), self.User, USER_TYPE)
+        self.assertEqual(row, self.User.from_values([7, "Bob", False]))
+
+    def test_decode_tagged_struct_row(self):
+        writer = BsatnWriter()
+        writer.write_struct_header(3)
+        writer.write_field_name("name")
+        writer.write_string("Carol")
+        writer.write_field_name("extra")
+        writer.write_u8(1)
+        writer.write_field_name("id")
+        writer.write_u32(3)
+        row = decode_row(BsatnReader(writer.get_bytes()), self.User)
+        self.assertEqual(row.id, 3)
+        self.assertEqual(row.name, "Carol")
+        self.assertIsNone(row.online)
+
+
+class TestCompactRowsInClient(unittest.TestCase):
+    """Test registering tables with a schema."""
+
+    def setUp(self):
+        self.client = ModernSpacetimeDBClient(start_message_processing=False)
+        self.client.register_table("user", USER_TYPE, primary_key="id")
+
+    def tearDown(self):
+        self.client.shutdown()
+
+    def test_cache_stores_row_objects(self):
+        update = TableUpdate(table_id=0, table_name="user", num_rows=1,
+                             inserts=[{"id": 1, "name": "Alice", "online": True}], deletes=[])
+        seen = []
+        self.client.db.user.on_insert(lambda ctx, row: seen.append(row))
+        self.client._apply_to_cache([update])
+        self.client._table_event_processor.process_table_update(update)
+
+        row = self.client.db.user.find_by_unique_column("id", 1)
+        self.assertIsInstance(row, RowBase)
+        self.assertEqual(row.name, "Alice")
+        self.assertIs(seen[0], row)
+
+        delete = TableUpdate(table_id=0, table_name="user", num_rows=1,
+                             inserts=[], deletes=[{"id": 1, "name": "Alice", "online": True}])
+        self.client._apply_to_cache([delete])
+        self.assertEqual(self.client.db.user.count(), 0)
+
+    def test_transaction_rows_decoded_into_row_class(self):
+        decoder = ProtocolDecoder(use_binary=True)
+        decoder.row_decoder = self.client._db_interface.row_decoder
+        message = decoder.decode_server_message(
+            bsatn_transaction("user", [{"id": 1, "name": "Alice", "online": True}]))
+        decoded, = message.database_update.tables[0].inserts
+        self.assertIs(type(decoded), self.client.db.user.row_type)
+
+        # No dict is built and converted on the way into the cache
+        with patch.object(RowBase, "from_dict", side_effect=AssertionError("row built twice")):
+            self.client._handle_transaction_update(message)
+        self.assertIs(self.client.db.user.find_by_unique_column("id", 1), decoded)
+
+
+WIDE_TYPE = ProductType([
+    FieldInfo("id", IntType(32, False)),
+    FieldInfo("bio", StringType()),
+    FieldInfo("score", IntType(32, True)),
+    FieldInfo("flag", BoolType()),
+])
+
+
+class TestProjection(unittest.TestCase):
+    """Test projected row classes and projected tables."""
+
+    def test_projected_class(self):
+        Narrow = row_class_from_product_type(WIDE_TYPE, "wide", columns=["score", "id"])
+        self.assertEqual(Narrow._fields, ("id", "score"))
+        self.assertEqual(Narrow.coerce({"id": 4, "bio": "x", "score": -3, "flag": True}).to_dict(),
+                         {"id": 4, "score": -3})
+        writer = BsatnWriter()
+        WIDE_TYPE.serialize({"id": 4, "bio": "x", "score": -3, "flag": True}, writer)
+        with self.assertRaises(ValueError):
+            decode_row(BsatnReader(writer.get_bytes()), Narrow, WIDE_TYPE)
+
+    def test_unknown_projection_column(self):
+        with self.assertRaises(ValueError):
+            project_columns(["id"], ["id", "nope"])
+
+    def test_projected_table_in_client(self):
+        client = ModernSpacetimeDBClient(start_message_processing=False)
+        try:
+            client.register_table("wide", WIDE_TYPE, primary_key="id", columns=["score"])
+            handle = client.db.wide
+            self.assertEqual(handle.columns, ("id", "score"))
+
+            client._apply_to_cache([TableUpdate(
+                table_id=0, table_name="wide", num_rows=1,
+                inserts=[{"id": 1, "bio": "long", "score": 9, "flag": False}], deletes=[]
+            )])
+            row = handle.find_by_unique_column("id", 1)
+            self.assertEqual(row.to_dict(), {"id": 1, "score": 9})
+        finally:
+            client.shutdown()
+
+    def test_projected_dict_table(self):
+        client = ModernSpacetimeDBClient(start_message_processing=False)
+        try:
+            client.register_table("wide", dict, primary_key="id", columns=["flag"])
+            client._apply_to_cache([TableUpdate(
+                table_id=0, table_name="wide", num_rows=1,
+                inserts=[{"id": 1, "bio": "long", "score": 9, "flag": False}], deletes=[]
+            )])
+            self.assertEqual(client.db.wide.all(), [{"id": 1, "flag": False}])
+        finally:
+            client.shutdown()
+
+    def decode_projected(self, client, table_name):
+        """Decode a wide BSATN row for a table, counting the column values decoded."""
+        decoder = ProtocolDecoder(use_binary=True)
+        decoder.row_decoder = client._db_interface.row_decoder
+        data = bsatn_transaction(table_name, [{"id": 1, "bio": "long", "score": 9, "flag": False}])
+        with patch.object(row_types, "decode_from_reader", wraps=row_types.decode_from_reader) as decode:
+            message = decoder.decode_server_message(data)
+        row, = message.database_update.tables[0].inserts
+        return row, decode.call_count
+
+    def test_projected_bsatn_rows_skip_columns(self):
+        client = ModernSpacetimeDBClient(start_message_processing=False)
+        try:
+            client.register_table("wide", WIDE_TYPE, primary_key="id", columns=["score"])
+            row, decoded = self.decode_projected(client, "wide")
+            self.assertEqual(row.to_dict(), {"id": 1, "score": 9})
+            self.assertEqual(decoded, 2)
+        finally:
+            client.shutdown()
+
+    def test_projected_dict_bsatn_rows_skip_columns(self):
+        client = ModernSpacetimeDBClient(start_message_processing=False)
+        try:
+            client.register_table("wide", dict, primary_key="id", columns=["flag"])
+            row, decoded = self.decode_projected(client, "wide")
+            self.assertEqual((row, decoded), ({"id": 1, "flag": False}, 2))
+            self.assertIs(client._db_interface.decode_rows("wide", [row])[0], row)
+        finally:
+            client.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
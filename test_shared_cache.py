@@ -0,0 +1,148 @@
+"""
+Test shared-memory cache replicas for SpacetimeDB Python SDK.
+
+Tests:
+- Initial snapshot and incremental transactions reach a replica
+- Table filtering and primary-key keyed updates on the replica
+- Resync from a snapshot when the ring buffer is overwritten
+- Deletes after a resync still evict rows the replica already held
+- Publisher close detaches replicas
+- A replica in a separate process via conn.publish_shared_cache()
+"""
+
+import multiprocessing
+import sys
+import time
+import unittest
+from typing import Any, Dict, List
+
+from spacetimedb_sdk.shared_cache import SharedCachePublisher, SharedCacheReplica
+from spacetimedb_sdk.row_cache import RowCache
+from spacetimedb_sdk.protocol import TableUpdate
+from spacetimedb_sdk.modern_client import ModernSpacetimeDBClient
+
+
+def make_update(table_name: str, inserts: List[Dict[str, Any]] = None,
+                deletes: List[Dict[str, Any]] = None) -> TableUpdate:
+    inserts = inserts or []
+    deletes = deletes or []
+    return TableUpdate(
+        table_id=0,
+        table_name=table_name,
+        num_rows=len(inserts) + len(deletes),
+        inserts=inserts,
+        deletes=deletes
+    )
+
+
+def poll_until(replica: SharedCacheReplica, condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        replica.poll(timeout=0.05)
+    return condition()
+
+
+def run_replica(handle, version, results):
+    replica = SharedCacheReplica(handle)
+    replica.start()
+    deadline = time.monotonic() + 5
+    while replica.version < version and time.monotonic() < deadline:
+        time.sleep(0.01)
+    results.put(sorted(row["id"] for row in replica.cache.table("users").values()))
+    replica.close()
+
+
+class TestSharedCache(unittest.TestCase):
+    """Test publisher and replica in one process."""
+
+    def setUp(self):
+        self.cache = RowCache()
+        self.cache.set_key_getter("users", lambda row: row["id"])
+        self.cache.apply([make_update("users", inserts=[{"id": 1, "name": "a"}])])
+
+    def attach(self, publisher: SharedCachePublisher) -> SharedCacheReplica:
+        replica = SharedCacheReplica(publisher.create_replica_handle())
+        self.addCleanup(replica.close)
+        self.assertTrue(poll_until(replica, lambda: replica.synced))
+        return replica
+
+    def test_snapshot_and_transactions(self):
+        with SharedCachePublisher(self.cache, key_columns={"users": "id"}) as publisher:
+            replica = self.attach(publisher)
+            self.assertEqual(replica.cache.table("users").all(), [{"id": 1, "name": "a"}])
+
+            self.cache.apply([make_update("users", inserts=[{"id": 2, "name": "b"}])])
+            self.cache.apply([make_update("users", deletes=[{"id": 1, "name": "a"}],
+                                          inserts=[{"id": 1, "name": "c"}])])
+            self.assertTrue(poll_until(replica, lambda: replica.version == self.cache.version))
+            users = replica.cache.table("users")
+            self.assertEqual(users.get(1), {"id": 1, "name": "c"})
+            self.assertEqual(len(users), 2)
+            self.assertEqual(publisher.get_stats()['transactions'], 2)
+
+    def test_table_filter(self):
+        with SharedCachePublisher(self.cache, tables=["users"]) as publisher:
+            replica = self.attach(publisher)
+            self.cache.apply([make_update("secrets", inserts=[{"id": 1}])])
+            self.cache.apply([make_update("users", inserts=[{"id": 2, "name": "b"}])])
+            self.assertTrue(poll_until(replica, lambda: replica.version == self.cache.version))
+            self.assertEqual(replica.cache.table_names(), ["users"])
+
+    def test_resync_after_ring_overwrite(self):
+        with SharedCachePublisher(self.cache, ring_size=512) as publisher:
+            replica = self.attach(publisher)
+            for i in range(2, 40):
+                self.cache.apply([make_update("users", inserts=[{"id": i, "name": "x" * 20}])])
+            self.assertTrue(poll_until(replica, lambda: replica.synced and replica.version == self.cache.version))
+            self.assertEqual(len(replica.cache.table("users")), 39)
+            self.assertGreaterEqual(replica.get_stats()['resyncs'], 2)
+
+    def test_delete_after_resync(self):
+        with SharedCachePublisher(self.cache, ring_size=512, key_columns={"users": "id"}) as publisher:
+            replica = self.attach(publisher)
+            for i in range(2, 40):
+                self.cache.apply([make_update("users", inserts=[{"id": i, "name": "x" * 20}])])
+            self.assertTrue(poll_until(replica, lambda: replica.synced and replica.version == self.cache.version))
+            self.assertGreaterEqual(replica.get_stats()['resyncs'], 1)
+            self.assertEqual(replica.cache.ref_count("users", 1), 1)
+
+            self.cache.apply([make_update("users", deletes=[{"id": 1, "name": "a"}])])
+            self.assertTrue(poll_until(replica, lambda: replica.version == self.cache.version))
+            self.assertIsNone(replica.cache.table("users").get(1))
+            self.assertEqual(len(replica.cache.table("users")), 38)
+
+    def test_close_detaches_replica(self):
+        publisher = SharedCachePublisher(self.cache)
+        replica = self.attach(publisher)
+        publisher.close()
+        self.assertTrue(poll_until(replica, lambda: replica.closed))
+        self.assertEqual(len(replica.cache.table("users")), 1)
+
+
+@unittest.skipUnless(sys.platform.startswith("linux"), "fork start method required")
+class TestClientSharedCache(unittest.TestCase):
+    """Test a replica in a child process."""
+
+    def test_child_process_replica(self):
+        client = ModernSpacetimeDBClient(start_message_processing=False)
+        client.register_table("users", dict, primary_key="id")
+        client._apply_to_cache([make_update("users", inserts=[{"id": i} for i in range(3)])])
+        try:
+            publisher = client.publish_shared_cache()
+            context = multiprocessing.get_context("fork")
+            results = context.Queue()
+            handle = publisher.create_replica_handle()
+            client._apply_to_cache([make_update("users", deletes=[{"id": 0}], inserts=[{"id": 7}])])
+            worker = context.Process(target=run_replica, args=(handle, client.row_cache.version, results))
+            worker.start()
+            handle.close()
+            self.assertEqual(results.get(timeout=10), [1, 2, 7])
+            worker.join(timeout=5)
+        finally:
+            client.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
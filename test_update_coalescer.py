@@ -0,0 +1,151 @@
+"""
+Test per-key update coalescing for SpacetimeDB Python SDK.
+
+Tests:
+- Successive updates to one key collapse into one old-to-latest delivery
+- Timer flush at the end of the window, on one reused timer thread
+- Deletes drop pending updates
+- on_update(..., coalesce_window_ms=...) through the table interface
+"""
+
+import threading
+import time
+import unittest
+
+from spacetimedb_sdk.update_coalescer import UpdateCoalescer
+from spacetimedb_sdk.protocol import TableUpdate
+from spacetimedb_sdk.modern_client import ModernSpacetimeDBClient
+from spacetimedb_sdk.table_interface import create_event_context
+
+
+class TestUpdateCoalescer(unittest.TestCase):
+    """Test UpdateCoalescer directly."""
+
+    def setUp(self):
+        self.calls = []
+        self.coalescer = UpdateCoalescer(
+            lambda ctx, old, new: self.calls.append((ctx, old, new)), window_ms=10_000
+        )
+
+    def tearDown(self):
+        self.coalescer.close()
+
+    def test_collapses_per_key(self):
+        for i in range(1, 5):
+            self.coalescer.add("a", f"ctx{i}", {"v": i - 1}, {"v": i})
+        self.coalescer.add("b", "ctx", {"v": 0}, {"v": 9})
+        self.assertEqual(self.coalescer.pending(), 2)
+
+        self.assertEqual(self.coalescer.flush(), 2)
+        self.assertEqual(sorted(self.calls, key=lambda c: c[2]["v"]), [
+            ("ctx4", {"v": 0}, {"v": 4}),
+            ("ctx", {"v": 0}, {"v": 9}),
+        ])
+        self.assertEqual(self.coalescer.get_metrics()["received"], 5)
+
+    def test_change_and_revert_is_not_delivered(self):
+        self.coalescer.add("a", None, {"v": 0}, {"v": 1})
+        self.coalescer.add("a", None, {"v": 1}, {"v": 0})
+        self.assertEqual(self.coalescer.flush(), 0)
+
+    def test_discard(self):
+        self.coalescer.add("a", None, {"v": 0}, {"v": 1})
+        self.coalescer.discard("a")
+        self.assertEqual(self.coalescer.flush(), 0)
+
+    def test_timer_flush(self):
+        delivered = threading.Event()
+        coalescer = UpdateCoalescer(lambda ctx, old, new: delivered.set(), window_ms=20)
+        coalescer.add("a", None, 1, 2)
+        self.assertTrue(delivered.wait(2))
+        self.assertEqual(coalescer.pending(), 0)
+        coalescer.close()
+
+    def test_timer_thread_reused_across_windows(self):
+        delivered = []
+        event = threading.Event()
+
+        def callback(ctx, old, new):
+            delivered.append(new)
+            event.set()
+
+        coalescer = UpdateCoalescer(callback, window_ms=20, name="coalescer-reuse-test")
+        for value in (1, 2, 3):
+            event.clear()
+            coalescer.add("a", None, 0, value)
+            self.assertTrue(event.wait(2))
+        self.assertEqual(delivered, [1, 2, 3])
+        threads = [t for t in threading.enumerate() if t.name == "coalescer-reuse-test"]
+        self.assertEqual(len(threads), 1)
+
+        coalescer.close()
+        threads[0].join(2)
+        self.assertFalse(threads[0].is_alive())
+
+    def test_invalid_window(self):
+        with self.assertRaises(ValueError):
+            UpdateCoalescer(lambda *args: None, window_ms=0)
+
+
+class TestTableCoalescedUpdates(unittest.TestCase):
+    """Test coalesced on_update through the table interface."""
+
+    def setUp(self):
+        self.client = ModernSpacetimeDBClient(start_message_processing=False)
+        self.client.register_table("positions", dict, primary_key="id")
+        self.updates = []
+        self.callback_id = self.client.db.positions.on_update(
+            lambda ctx, old, new: self.updates.append((old["x"], new["x"])),
+            coalesce_window_ms=10_000
+        )
+
+    def tearDown(self):
+        self.client.db.positions.remove_on_update(self.callback_id)
+        self.client.shutdown()
+
+    def move(self, old_x, new_x, row_id=1):
+        self.client._table_event_processor.process_table_update(
+            TableUpdate(table_id=0, table_name="positions", num_rows=2,
+                        inserts=[{"id": row_id, "x": new_x}], deletes=[{"id": row_id, "x": old_x}]),
+            create_event_context(timestamp=time.time())
+        )
+
+    def test_latest_state_delivered_once(self):
+        for x in range(10):
+            self.move(x, x + 1)
+        self.assertEqual(self.updates, [])
+        self.assertEqual(self.client.db.positions.flush_updates(), 1)
+        self.assertEqual(self.updates, [(0, 10)])
+
+    def test_delete_drops_pending_update(self):
+        self.move(0, 1)
+        self.client._table_event_processor.process_table_update(
+            TableUpdate(table_id=0, table_name="positions", num_rows=1,
+                        inserts=[], deletes=[{"id": 1, "x": 1}]),
+            create_event_context(timestamp=time.time())
+        )
+        self.assertEqual(self.client.db.positions.flush_updates(), 0)
+
+    def test_delete_drops_pending_update_with_executor(self):
+        # Coalescing must stay ordered with the delete, not run on the executor
+        executor = self.client.enable_callback_executor(max_workers=2)
+        release = threading.Event()
+        self.client.db.positions.on_insert(lambda ctx, row: release.wait(5))
+        self.client.db.positions.use_executor(executor)
+        self.client._table_event_processor.process_table_update(
+            TableUpdate(table_id=0, table_name="positions", num_rows=1,
+                        inserts=[{"id": 1, "x": 1}], deletes=[{"id": 1, "x": 0}]),
+            create_event_context(timestamp=time.time())
+        )
+        self.client._table_event_processor.process_table_update(
+            TableUpdate(table_id=0, table_name="positions", num_rows=1,
+                        inserts=[], deletes=[{"id": 1, "x": 1}]),
+            create_event_context(timestamp=time.time())
+        )
+        release.set()
+        self.assertTrue(executor.wait_idle(timeout=5))
+        self.assertEqual(self.client.db.positions.flush_updates(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()